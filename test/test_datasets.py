@@ -20,7 +20,8 @@ import PIL
 import pytest
 import torch
 import torch.nn.functional as F
-from torchvision import datasets
+from common_utils import get_tmp_dir, assert_equal
+from torchvision import datasets, transforms
 
 
 class STL10TestCase(datasets_utils.ImageDatasetTestCase):
@@ -1608,6 +1609,83 @@ class ImageFolderTestCase(datasets_utils.ImageDatasetTestCase):
             assert len(dataset.classes) == len(info["classes"])
             assert all([a == b for a, b in zip(dataset.classes, info["classes"])])
 
+    def test_reduced_resolution_decoding(self):
+        with get_tmp_dir() as tmpdir:
+            # PIL size: 120 x 80
+            datasets_utils.create_image_folder(tmpdir, "a", lambda idx: f"{idx}.jpg", 1, size=(3, 120, 80))
+            for transform, size in [
+                (None, (120, 80)),
+                (transforms.Resize(20), (30, 20)),
+                (transforms.Compose([transforms.Resize((35, 25)), transforms.ToTensor()]), (60, 40)),
+                (transforms.Resize([50]), (120, 80)),
+            ]:
+                dataset = datasets.ImageFolder(tmpdir, transform=transform, reduced_resolution_decoding=True)
+                path, _ = dataset.samples[0]
+                assert dataset.loader(path).size == size
+
+    def test_manifest_cache(self):
+        with self.create_dataset() as (dataset, _), get_tmp_dir() as cache_dir:
+            manifest_cache = os.path.join(cache_dir, "manifest.json")
+            for _ in range(2):
+                cached_dataset = datasets.ImageFolder(dataset.root, manifest_cache=manifest_cache)
+                assert cached_dataset.samples == dataset.samples
+                assert cached_dataset.classes == dataset.classes
+            assert os.path.exists(manifest_cache)
+
+    def test_make_dataset_override_without_manifest_cache(self):
+        class LegacyImageFolder(datasets.ImageFolder):
+            @staticmethod
+            def make_dataset(directory, class_to_idx, extensions=None, is_valid_file=None):
+                return datasets.folder.make_dataset(directory, class_to_idx, extensions, is_valid_file)
+
+        with self.create_dataset() as (dataset, _):
+            assert LegacyImageFolder(dataset.root).samples == dataset.samples
+
+
+class ShardedImageFolderTestCase(datasets_utils.ImageDatasetTestCase):
+    DATASET_CLASS = datasets.ShardedImageFolder
+
+    def inject_fake_data(self, tmpdir, config):
+        image_folder = os.path.join(tmpdir, "images")
+        num_examples_total = 0
+        classes = ("a", "b")
+        for cls in classes:
+            num_examples = torch.randint(2, 4, size=()).item()
+            num_examples_total += num_examples
+            datasets_utils.create_image_folder(image_folder, cls, lambda idx: f"{cls}_{idx}.png", num_examples)
+
+        # small shards to get several of them
+        datasets.pack_dataset_folder(datasets.ImageFolder(image_folder), tmpdir, shard_size=1)
+        return dict(num_examples=num_examples_total, classes=classes, image_folder=image_folder)
+
+    def test_matches_image_folder(self):
+        with self.create_dataset() as (dataset, info):
+            image_folder = datasets.ImageFolder(info["image_folder"])
+            assert len(dataset.shards) == len(dataset)
+            assert dataset.classes == image_folder.classes
+            assert dataset.class_to_idx == image_folder.class_to_idx
+            assert dataset.targets == image_folder.targets
+
+            for idx in range(len(dataset)):
+                (image, target), (expected_image, expected_target) = dataset[idx], image_folder[idx]
+                assert target == expected_target
+                assert_equal(np.array(image), np.array(expected_image))
+
+    def test_stream(self):
+        with self.create_dataset() as (dataset, info):
+            streamed = list(dataset.stream())
+            assert len(streamed) == len(dataset)
+            for (image, target), (expected_image, expected_target) in zip(streamed, dataset):
+                assert target == expected_target
+                assert_equal(np.array(image), np.array(expected_image))
+
+    def test_pickle(self):
+        with self.create_dataset() as (dataset, info):
+            image, target = dataset[0]
+            dataset = pickle.loads(pickle.dumps(dataset))
+            assert dataset._fds is None
+            assert_equal(np.array(dataset[0][0]), np.array(image))
+
 
 class KittiTestCase(datasets_utils.ImageDatasetTestCase):
     DATASET_CLASS = datasets.Kitti
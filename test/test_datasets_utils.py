@@ -9,7 +9,7 @@ import zipfile
 import pytest
 import torchvision.datasets.utils as utils
 from torch._utils_internal import get_file_path_2
-from torchvision.datasets.folder import make_dataset
+from torchvision.datasets.folder import make_dataset, make_manifest
 from torchvision.datasets.utils import _COMPRESSED_FILE_OPENERS
 
 TEST_FILE = get_file_path_2(
@@ -240,5 +240,52 @@ def test_make_dataset_no_valid_files(tmpdir, kwargs, expected_error_msg):
         make_dataset(str(tmpdir), **kwargs)
 
 
+def _make_tree(root):
+    for path in ("b/x.png", "b/sub/y.png", "b/sub-dir/z.png", "b/sub/deeper/w.png", "a/2.png", "a/10.png", "a/a.txt"):
+        path = root / path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+    # the timestamps have a coarse resolution on some file systems, so the directories are dated back to
+    # make sure that modifying them changes their mtime
+    for dirpath, _, _ in os.walk(root):
+        os.utime(dirpath, ns=(0, 0))
+
+
+def test_make_dataset_os_walk_order(tmpdir):
+    tmpdir = pathlib.Path(tmpdir)
+    _make_tree(tmpdir)
+
+    expected = []
+    for class_index, target_class in enumerate(("a", "b")):
+        for root, _, fnames in sorted(os.walk(tmpdir / target_class, followlinks=True)):
+            expected.extend((os.path.join(root, fname), class_index) for fname in sorted(fnames) if fname != "a.txt")
+
+    assert make_dataset(str(tmpdir), extensions=".png") == expected
+
+
+def test_make_dataset_manifest_cache(tmpdir, mocker):
+    tmpdir = pathlib.Path(tmpdir)
+    root = tmpdir / "root"
+    _make_tree(root)
+    cache = str(tmpdir / "cache" / "manifest.json")
+    expected = make_dataset(str(root), extensions=".png")
+
+    assert make_dataset(str(root), extensions=".png", manifest_cache=cache) == expected
+    assert os.path.exists(cache)
+    manifest = make_manifest(str(root))
+
+    scan_tree = mocker.patch("torchvision.datasets.folder._scan_tree", side_effect=AssertionError)
+    assert make_dataset(str(root), extensions=".png", manifest_cache=cache) == expected
+    assert make_dataset(str(root), extensions=".png", manifest_cache=manifest) == expected
+    mocker.stop(scan_tree)
+
+    # adding a file modifies the mtime of its directory, which invalidates the manifest
+    (root / "b" / "sub" / "deeper" / "v.png").touch()
+    expected = make_dataset(str(root), extensions=".png")
+    assert (str(root / "b" / "sub" / "deeper" / "v.png"), 1) in expected
+    assert make_dataset(str(root), extensions=".png", manifest_cache=cache) == expected
+    assert make_dataset(str(root), extensions=".png", manifest_cache=manifest) == expected
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
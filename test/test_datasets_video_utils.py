@@ -1,7 +1,12 @@
+import os
+import pickle
+import warnings
+
 import pytest
 import torch
 from common_utils import get_list_of_videos, assert_equal
 from torchvision import io
+from torchvision.datasets import video_utils
 from torchvision.datasets.video_utils import VideoClips, unfold
 
 
@@ -100,6 +105,97 @@ class TestVideo:
         assert len(clips) == 0
         assert len(idxs) == 0
 
+    @pytest.mark.parametrize("frame_rate", [None, 1, 3, 4, 7, 10, 15])
+    def test_compute_clips_packed(self, frame_rate):
+        sizes = [0, 3, 12, 31, 45, 90]
+        metadata = {
+            "video_paths": [f"{i}.mp4" for i in range(len(sizes))],
+            "video_pts": [torch.arange(size) * 3 + 7 for size in sizes],
+            "video_fps": [None, 3, 4, 29.97, 6, 30],
+        }
+        num_frames, step = 4, 3
+        with pytest.warns(UserWarning):
+            video_clips = VideoClips(metadata["video_paths"], num_frames, step, frame_rate, metadata)
+
+        offset = 0
+        for video_idx, (video_pts, fps) in enumerate(zip(metadata["video_pts"], metadata["video_fps"])):
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                clips, idxs = VideoClips.compute_clips_for_video(video_pts, num_frames, step, fps, frame_rate)
+            assert video_clips.num_clips_per_video()[video_idx] == len(clips)
+            for clip_idx, clip in enumerate(clips):
+                assert video_clips.get_clip_location(offset + clip_idx) == (video_idx, clip_idx)
+                assert video_clips.clip_pts[offset + clip_idx].tolist() == [clip[0], clip[-1]]
+                if frame_rate is not None:
+                    resampling_idx = video_clips._get_resampling_idx(video_idx, clip_idx)
+                    if isinstance(resampling_idx, torch.Tensor):
+                        assert_equal(resampling_idx, idxs[clip_idx])
+                    else:
+                        assert resampling_idx == idxs[clip_idx]
+            offset += len(clips)
+        assert video_clips.num_clips() == offset
+        assert isinstance(video_clips.cumulative_sizes, list)
+        assert video_clips.cumulative_sizes[-1] == offset
+        assert video_clips.clips[-1] is video_clips.clips[-1]
+
+        video_clips = pickle.loads(pickle.dumps(video_clips))
+        assert video_clips.num_clips() == offset
+        assert len(video_clips.clips) == len(sizes)
+
+    def test_video_clips_metadata_cache(self, tmpdir, mocker):
+        video_list = []
+        for i, num_frames in enumerate([3, 10, 15]):
+            path = os.path.join(tmpdir, f"{i}.mp4")
+            with open(path, "wb") as f:
+                f.write(b"x" * num_frames)
+            video_list.append(path)
+
+        def read_video_timestamps(path):
+            return list(range(os.path.getsize(path))), 30.0
+
+        spy = mocker.patch.object(video_utils, "read_video_timestamps", side_effect=read_video_timestamps)
+        cache = os.path.join(tmpdir, "cache")
+
+        video_clips = VideoClips(video_list, 5, 5, metadata_cache=cache)
+        assert spy.call_count == 3
+        assert video_clips.num_clips() == 0 + 2 + 3
+
+        # everything is served from the index
+        video_clips = VideoClips(video_list, 5, 5, metadata_cache=cache)
+        assert spy.call_count == 3
+        assert video_clips.num_clips() == 0 + 2 + 3
+        assert video_clips.video_fps == [30.0] * 3
+        for pts, size in zip(video_clips.video_pts, [3, 10, 15]):
+            assert_equal(pts, torch.arange(size))
+
+        # only the modified video is probed again
+        with open(video_list[0], "wb") as f:
+            f.write(b"x" * 5)
+        video_clips = VideoClips(video_list, 5, 5, metadata_cache=cache)
+        assert spy.call_count == 4
+        assert video_clips.num_clips() == 1 + 2 + 3
+        assert len(os.listdir(cache)) == 2
+
+        # the index can be shared between subsets of the videos
+        video_clips = VideoClips(video_list[1:], 5, 5, metadata_cache=cache)
+        assert spy.call_count == 4
+        assert video_clips.num_clips() == 2 + 3
+
+        # missing videos are loaded as empty, like without the index, and are not recorded in it
+        def read_missing_video_timestamps(path):
+            if not os.path.exists(path):
+                return [], None
+            return read_video_timestamps(path)
+
+        spy.side_effect = read_missing_video_timestamps
+        missing = os.path.join(tmpdir, "missing.mp4")
+        video_clips = VideoClips(video_list + [missing], 5, 5, metadata_cache=cache)
+        assert spy.call_count == 5
+        assert video_clips.num_clips() == 1 + 2 + 3
+        assert len(video_clips.video_pts[-1]) == 0
+        video_clips = VideoClips(video_list + [missing], 5, 5, metadata_cache=cache)
+        assert spy.call_count == 6
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
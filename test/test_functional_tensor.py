@@ -46,18 +46,29 @@ def test_image_sizes(device, fn):
     assert value_img == value_img_batch
 
 
-@needs_cuda
-def test_scale_channel():
-    """Make sure that _scale_channel gives the same results on CPU and GPU as
-    histc or bincount are used depending on the device.
-    """
-    # TODO: when # https://github.com/pytorch/pytorch/issues/53194 is fixed,
-    # only use bincount and remove that test.
-    size = (1_000,)
-    img_chan = torch.randint(0, 256, size=size).to("cpu")
-    scaled_cpu = F_t._scale_channel(img_chan)
-    scaled_cuda = F_t._scale_channel(img_chan.to("cuda"))
-    assert_equal(scaled_cpu, scaled_cuda.to("cpu"))
+def _equalize_channel(img_chan):
+    # equalize of a single channel, as done by PIL
+    hist = torch.bincount(img_chan.flatten().to(torch.int64), minlength=256)
+    nonzero_hist = hist[hist != 0]
+    step = torch.div(nonzero_hist[:-1].sum(), 255, rounding_mode="floor")
+    if step == 0:
+        return img_chan
+    lut = torch.div(torch.cumsum(hist, 0) + torch.div(step, 2, rounding_mode="floor"), step, rounding_mode="floor")
+    lut = torch.nn.functional.pad(lut, [1, 0])[:-1].clamp(0, 255)
+    return lut[img_chan.to(torch.int64)].to(torch.uint8)
+
+
+@pytest.mark.parametrize("device", cpu_and_gpu())
+def test_equalize_batch(device):
+    torch.manual_seed(12)
+    batch = torch.randint(0, 256, size=(5, 3, 17, 23), dtype=torch.uint8)
+    batch[1, 0] = 7
+    batch[2, 1] = batch[2, 1] % 2 * 255
+    batch[3] = torch.div(batch[3], 64, rounding_mode="floor") + 100
+    expected = torch.stack([torch.stack([_equalize_channel(c) for c in img]) for img in batch])
+
+    assert_equal(F_t.equalize(batch.to(device)), expected.to(device))
+    assert_equal(F_t.equalize(batch[2].to(device)), expected[2].to(device))
 
 
 class TestRotate:
@@ -666,6 +677,42 @@ def test_assert_resize_antialias(interpolation):
         F.resize(tensor, size=(5, 5), interpolation=interpolation, antialias=True)
 
 
+@pytest.mark.parametrize("size", [[14, 17], [40, 35], [29, 45]])
+@pytest.mark.parametrize("interpolation", [BILINEAR, BICUBIC])
+@pytest.mark.parametrize("antialias", [False, True])
+@pytest.mark.parametrize("channels_last", [False, True])
+def test_resize_native_uint8(size, interpolation, antialias, channels_last):
+    torch.manual_seed(12)
+    tensor = torch.randint(0, 256, (2, 3, 29, 30), dtype=torch.uint8)
+    # stripes of 0 and 255, on which bicubic overshoots the most after the first pass
+    tensor[0, 0] = 255 * (torch.arange(30) // 2 % 2).to(torch.uint8)
+    if channels_last:
+        tensor = tensor.permute(0, 2, 3, 1).contiguous().permute(0, 3, 1, 2)
+
+    out = F.resize(tensor, size=size, interpolation=interpolation, antialias=antialias, native_uint8=True)
+    expected = F.resize(tensor, size=size, interpolation=interpolation, antialias=antialias)
+    assert out.dtype == torch.uint8
+    assert out.is_contiguous(memory_format=torch.channels_last) == channels_last
+    torch.testing.assert_close(out, expected, rtol=0, atol=1)
+
+    _test_fn_on_batch(tensor, F.resize, size=size, interpolation=interpolation, antialias=antialias, native_uint8=True)
+
+
+@pytest.mark.parametrize("size", [[14, 17], [40, 35]])
+@pytest.mark.parametrize("interpolation", [BILINEAR, BICUBIC])
+def test_resize_native_uint8_antialias_vs_pil(size, interpolation):
+    # the native kernel uses the same fixed-point filters as PIL, but PIL rounds and clips the image between the
+    # passes. The values are away from 0 and 255 so that this clipping is a no-op, even with the overshoot of bicubic.
+    torch.manual_seed(12)
+    tensor = torch.randint(32, 224, (3, 26, 36), dtype=torch.uint8)
+    pil_img = F.to_pil_image(tensor)
+
+    out = F.resize(tensor, size=size, interpolation=interpolation, antialias=True, native_uint8=True)
+    _assert_approx_equal_tensor_to_pil(
+        out.float(), F.resize(pil_img, size=size, interpolation=interpolation), tol=1.0 + 1e-5, agg_method="max"
+    )
+
+
 @pytest.mark.parametrize("device", cpu_and_gpu())
 @pytest.mark.parametrize("dt", [torch.float32, torch.float64, torch.float16])
 @pytest.mark.parametrize("size", [[10, 7], [10, 42], [42, 7]])
@@ -929,6 +976,66 @@ def test_adjust_gamma(device, dtype, config, channels):
     )
 
 
+_COLOR_ADJUSTMENTS = {
+    "brightness": F.adjust_brightness,
+    "contrast": F.adjust_contrast,
+    "saturation": F.adjust_saturation,
+    "hue": F.adjust_hue,
+    "posterize": lambda img, bits: F.posterize(img, int(bits)),
+    "solarize": F.solarize,
+    "invert": lambda img, _: F.invert(img),
+    "autocontrast": lambda img, _: F.autocontrast(img),
+    "equalize": lambda img, _: F.equalize(img),
+}
+
+
+@pytest.mark.parametrize("device", cpu_and_gpu())
+@pytest.mark.parametrize("channels", [1, 3])
+@pytest.mark.parametrize(
+    "ops",
+    [
+        [("brightness", 1.3), ("contrast", 0.7), ("saturation", 1.5), ("hue", 0.2)],
+        [("contrast", 1.4), ("brightness", 0.6), ("hue", -0.3), ("saturation", 0.4)],
+        [("posterize", 5.0), ("solarize", 100.0), ("autocontrast", 0.0), ("invert", 0.0)],
+        [("invert", 0.0), ("equalize", 0.0), ("brightness", 1.8), ("solarize", 200.0), ("contrast", 0.5)],
+    ],
+)
+def test_adjust_colors(device, channels, ops):
+    batch = _create_data_batch(16, 18, num_samples=4, channels=channels, device=device)
+
+    expected = batch
+    for name, factor in ops:
+        expected = _COLOR_ADJUSTMENTS[name](expected, factor)
+
+    assert_equal(F._adjust_colors(batch, ops), expected)
+    assert_equal(torch.jit.script(F._adjust_colors)(batch, ops), expected)
+
+    float_batch = batch.float() / 255
+    float_ops = [op for op in ops if op[0] not in ("posterize", "equalize", "solarize")]
+    expected = float_batch
+    for name, factor in float_ops:
+        expected = _COLOR_ADJUSTMENTS[name](expected, factor)
+    assert_equal(F._adjust_colors(float_batch, float_ops), expected)
+
+
+@pytest.mark.parametrize("device", cpu_and_gpu())
+def test_batched_adjust_colors(device):
+    batch = _create_data_batch(16, 18, num_samples=4, device=device)
+    factors = {
+        "brightness": (F._batched_adjust_brightness, torch.tensor([0.5, 1.0, 1.5, 2.0])),
+        "contrast": (F._batched_adjust_contrast, torch.tensor([1.2, 0.3, 1.0, 1.7])),
+        "saturation": (F._batched_adjust_saturation, torch.tensor([0.0, 0.8, 1.9, 1.1])),
+        "hue": (F._batched_adjust_hue, torch.tensor([-0.4, 0.1, 0.0, 0.3])),
+    }
+
+    for names in (["brightness", "contrast", "saturation", "hue"], ["hue", "contrast", "brightness", "saturation"]):
+        expected = batch
+        for name in names:
+            fn, fn_factors = factors[name]
+            expected = fn(expected, fn_factors)
+        assert_equal(F._batched_adjust_colors(batch, [(name, factors[name][1]) for name in names]), expected)
+
+
 @pytest.mark.parametrize("device", cpu_and_gpu())
 @pytest.mark.parametrize("dt", [None, torch.float32, torch.float64, torch.float16])
 @pytest.mark.parametrize(
@@ -1180,6 +1287,35 @@ def test_gaussian_blur(device, image_size, dt, ksize, sigma, fn):
     torch.testing.assert_close(out, true_out, rtol=0.0, atol=1.0, msg=f"{ksize}, {sigma}")
 
 
+@pytest.mark.parametrize("device", cpu_and_gpu())
+@pytest.mark.parametrize("ksize", [(3, 3), (3, 5), (23, 23)])
+@pytest.mark.parametrize("sigma", [(0.5, 0.5), (0.8, 1.2), (1.7, 1.7)])
+def test_gaussian_blur_uint8(device, ksize, sigma):
+    img = torch.randint(0, 256, (2, 3, 26, 28), dtype=torch.uint8, device=device)
+
+    out = F_t.gaussian_blur(img, list(ksize), list(sigma))
+    expected = F_t.gaussian_blur(img.float(), list(ksize), list(sigma)).round().to(torch.uint8)
+    assert out.dtype == torch.uint8
+    torch.testing.assert_close(out, expected, rtol=0.0, atol=1.0)
+
+    scripted_fn = torch.jit.script(F_t.gaussian_blur)
+    assert_equal(scripted_fn(img, list(ksize), list(sigma)), out)
+
+    kernel = F_t._get_blur_kernel1d(ksize[0], sigma[0], torch.uint8, img.device)
+    assert kernel.sum().item() == 2**14
+    assert F_t._get_blur_kernel1d(ksize[0], sigma[0], torch.uint8, img.device) is kernel
+
+
+@pytest.mark.parametrize("device", cpu_and_gpu())
+@pytest.mark.parametrize("channels", [1, 3])
+def test_blurred_degenerate_image_uint8(device, channels):
+    img = torch.randint(0, 256, (2, channels, 17, 19), dtype=torch.uint8, device=device)
+
+    out = F_t._blurred_degenerate_image(img)
+    expected = F_t._blurred_degenerate_image(img.float()).round().to(torch.uint8)
+    assert_equal(out, expected)
+
+
 @pytest.mark.parametrize("device", cpu_and_gpu())
 def test_hsv2rgb(device):
     scripted_fn = torch.jit.script(F_t._hsv2rgb)
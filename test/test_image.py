@@ -13,6 +13,7 @@ from PIL import Image, __version__ as PILLOW_VERSION
 from torchvision.io.image import (
     decode_png,
     decode_jpeg,
+    decode_jpeg_batch,
     encode_jpeg,
     write_jpeg,
     decode_image,
@@ -100,6 +101,37 @@ def test_decode_jpeg(img_path, pil_mode, mode):
     assert abs_mean_diff < 2
 
 
+def test_decode_jpeg_min_size():
+    img_path = os.path.join(ENCODE_JPEG, "grace_hopper_517x606.jpg")
+    data = read_file(img_path)
+    full = decode_jpeg(data)
+    assert full.shape == (3, 606, 517)
+
+    for min_size, scale in [
+        ([600], 1),
+        ([303, 258], 2),
+        ([304, 258], 1),
+        ([75], 4),
+        ([76, 65], 8),
+        ([77, 65], 4),
+        ([1], 8),
+        ([1000], 1),
+    ]:
+        img = decode_jpeg(data, min_size=min_size)
+        h, w = (606 + scale - 1) // scale, (517 + scale - 1) // scale
+        assert img.shape == (3, h, w)
+        # the scaled IDCT and the antialiased resize use different filters
+        expected = F.resize(full, [h, w], antialias=True)
+        assert (img.float() - expected.float()).abs().mean() < 8
+
+    assert_equal(decode_jpeg(data, min_size=75), decode_jpeg(data, min_size=[75, 75]))
+    assert_equal(decode_image(data, min_size=75), decode_jpeg(data, min_size=75))
+    assert read_image(img_path, mode=ImageReadMode.GRAY, min_size=75).shape == (1, 152, 130)
+
+    with pytest.raises(ValueError, match="min_size should be an int or a sequence of one or two ints"):
+        decode_jpeg(data, min_size=[1, 2, 3])
+
+
 def test_decode_jpeg_errors():
     with pytest.raises(RuntimeError, match="Expected a non empty 1-dimensional tensor"):
         decode_jpeg(torch.empty((100, 1), dtype=torch.uint8))
@@ -111,6 +143,42 @@ def test_decode_jpeg_errors():
         decode_jpeg(torch.empty((100), dtype=torch.uint8))
 
 
+@pytest.mark.parametrize("num_threads", [0, 1, 3])
+@pytest.mark.parametrize("mode", [ImageReadMode.UNCHANGED, ImageReadMode.RGB])
+def test_decode_jpeg_batch(num_threads, mode):
+    img_paths = [path for path in get_images(IMAGE_ROOT, ".jpg") if "cmyk" not in path]
+    data = [read_file(path) for path in img_paths]
+    images = decode_jpeg_batch(data, mode=mode, num_threads=num_threads)
+    assert len(images) == len(data)
+    for image, encoded in zip(images, data):
+        assert_equal(image, decode_jpeg(encoded, mode=mode))
+
+
+def test_decode_jpeg_batch_output():
+    img_paths = [path for path in get_images(IMAGE_ROOT, ".jpg") if "cmyk" not in path]
+    data = [read_file(path) for path in img_paths]
+    size = [64, 48]
+    output = torch.zeros(len(data), 3, *size, dtype=torch.uint8)
+    images = decode_jpeg_batch(data, mode=ImageReadMode.RGB, output=output)
+    for i, (image, encoded) in enumerate(zip(images, data)):
+        assert image.data_ptr() == output[i].data_ptr()
+        expected = F.resize(decode_jpeg(encoded, mode=ImageReadMode.RGB, min_size=size), size, antialias=True)
+        torch.testing.assert_close(image, expected, rtol=0, atol=1)
+
+    with pytest.raises(RuntimeError, match="Expected the decoded images to have 3 channels"):
+        decode_jpeg_batch(data, mode=ImageReadMode.GRAY, output=output)
+    with pytest.raises(RuntimeError, match="Expected output to be a 4-dimensional tensor"):
+        decode_jpeg_batch(data[:1], output=output)
+
+
+def test_decode_jpeg_batch_errors():
+    data = read_file(next(get_images(IMAGE_ROOT, ".jpg")))
+    with pytest.raises(RuntimeError, match="Not a JPEG file"):
+        decode_jpeg_batch([data, torch.zeros(100, dtype=torch.uint8), data])
+    with pytest.raises(RuntimeError, match="Expected a torch.uint8 tensor"):
+        decode_jpeg_batch([data, torch.empty((100,), dtype=torch.float16)])
+
+
 def test_decode_bad_huffman_images():
     # sanity check: make sure we can decode the bad Huffman encoding
     bad_huff = read_file(os.path.join(DAMAGED_JPEG, "bad_huffman.jpg"))
@@ -256,6 +324,26 @@ def test_read_file(tmpdir):
         read_file("tst")
 
 
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Inspects /proc/self/maps")
+def test_read_file_mmap(tmpdir):
+    fpath = os.path.join(tmpdir, "test1.bin")
+    content = b"TorchVision\211\n"
+    with open(fpath, "wb") as f:
+        f.write(content)
+
+    data = read_file(fpath)
+    with open("/proc/self/maps") as maps:
+        assert any(fpath in line for line in maps)
+
+    # the mapping is private, so the file is not modified
+    data.fill_(0)
+    with open(fpath, "rb") as f:
+        assert f.read() == content
+
+    # the decoders accept the mapped data directly
+    assert decode_image(read_file(os.path.join(ENCODE_JPEG, "grace_hopper_517x606.jpg"))).shape == (3, 606, 517)
+
+
 def test_read_file_non_ascii(tmpdir):
     fname, content = "日本語(Japanese).bin", b"TorchVision\211\n"
     fpath = os.path.join(tmpdir, fname)
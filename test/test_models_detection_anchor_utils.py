@@ -97,3 +97,35 @@ class Tester:
         assert tuple(dboxes[1].shape) == (4, 4)
         torch.testing.assert_close(dboxes[0], dboxes_output, rtol=1e-5, atol=1e-8)
         torch.testing.assert_close(dboxes[1], dboxes_output, rtol=1e-5, atol=1e-8)
+
+    @pytest.mark.parametrize("init_generator", ("_init_test_anchor_generator", "_init_test_defaultbox_generator"))
+    def test_cache(self, init_generator):
+        model = getattr(self, init_generator)()
+        model.cache_size = 2
+        model.eval()
+
+        def anchors(size):
+            images = torch.randn(2, 3, size, size)
+            return model(ImageList(images, [i.shape[-2:] for i in images]), self.get_features(images))
+
+        expected = anchors(15)
+        assert (model.cache_hits, model.cache_misses) == (0, 1)
+        for _ in range(2):
+            for actual, expected_per_image in zip(anchors(15), expected):
+                assert_equal(actual, expected_per_image)
+        assert (model.cache_hits, model.cache_misses) == (2, 1)
+
+        anchors(20)
+        anchors(15)
+        anchors(25)
+        assert (model.cache_hits, model.cache_misses) == (3, 3)
+        assert [key[1] for key in model._cache] == [(15, 15), (25, 25)]
+        # 20 was the least recently used size when 25 was added
+        anchors(15)
+        anchors(20)
+        assert (model.cache_hits, model.cache_misses) == (4, 4)
+
+        model.cache_size = 0
+        for actual, expected_per_image in zip(anchors(15), expected):
+            assert_equal(actual, expected_per_image)
+        assert (model.cache_hits, model.cache_misses) == (4, 4)
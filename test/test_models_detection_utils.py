@@ -1,9 +1,12 @@
 import copy
+from unittest import mock
 
 import pytest
 import torch
 from common_utils import assert_equal
-from torchvision.models.detection import _utils, backbone_utils
+from torchvision import ops
+from torchvision.models.detection import _utils, backbone_utils, retinanet_resnet50_fpn, roi_heads
+from torchvision.models.detection.rpn import AnchorGenerator, RegionProposalNetwork, RPNHead
 from torchvision.models.detection.transform import GeneralizedRCNNTransform
 
 
@@ -34,6 +37,91 @@ class TestModelsDetectionUtils:
         pred_boxes = box_coder.decode_single(rel_codes, boxes)
         torch.allclose(proposals, pred_boxes)
 
+    def test_box_coder_packed(self):
+        box_coder = _utils.BoxCoder(weights=(10.0, 10.0, 5.0, 5.0))
+        boxes = [torch.rand(n, 4) * 50 for n in (7, 0, 5)]
+        for b in boxes:
+            b[:, 2:] += b[:, :2] + 1
+        proposals = [b + torch.rand(b.shape) for b in boxes]
+        rel_codes = torch.randn(12, 8)
+
+        packed_boxes, image_offsets = _utils.pack_boxes(boxes)
+        assert_equal(image_offsets, torch.tensor([0, 7, 7, 12]))
+        assert_equal(
+            box_coder.decode_packed(rel_codes, packed_boxes, image_offsets), box_coder.decode(rel_codes, boxes)
+        )
+        packed_proposals, _ = _utils.pack_boxes(proposals)
+        assert_equal(
+            box_coder.encode_packed(packed_boxes, packed_proposals, image_offsets),
+            torch.cat(box_coder.encode(boxes, proposals)),
+        )
+
+        with pytest.raises(ValueError, match="number of boxes"):
+            box_coder.decode_packed(rel_codes, packed_boxes, torch.tensor([0, 7, 10]))
+        with pytest.raises(ValueError, match="non-decreasing"):
+            box_coder.decode_packed(rel_codes, packed_boxes, torch.tensor([0, 7, 5, 12]))
+        with pytest.raises(ValueError, match="same number of boxes"):
+            box_coder.encode_packed(packed_boxes, packed_proposals[:-1], image_offsets)
+
+    def test_box_similarity_in_matching(self):
+        anchor_generator = AnchorGenerator(((32,),), ((1.0,),))
+        rpn = RegionProposalNetwork(anchor_generator, RPNHead(4, 1), 0.7, 0.3, 256, 0.5, {}, {}, 0.7)
+        box_head = roi_heads.RoIHeads(None, None, None, 0.5, 0.5, 512, 0.25, None, 0.05, 0.5, 100)
+
+        gt_boxes = torch.tensor([[0.0, 0.0, 10.0, 10.0]])
+        boxes = torch.tensor([[50.0, 50.0, 60.0, 60.0], [0.0, 0.0, 10.0, 10.0]])
+        # all the boxes match the gt box with this similarity, while only the second one overlaps it
+        rpn.box_similarity = box_head.box_similarity = lambda a, b: torch.ones(a.shape[0], b.shape[0])
+
+        labels, _ = rpn.assign_targets_to_anchors([boxes], [{"boxes": gt_boxes}])
+        assert_equal(labels[0], torch.tensor([1.0, 1.0]))
+        # the RoI heads always match with the IoU, like before
+        _, labels = box_head.assign_targets_to_proposals([boxes], [gt_boxes], [torch.tensor([3])])
+        assert_equal(labels[0], torch.tensor([0, 3]))
+
+    @pytest.mark.parametrize("allow_low_quality_matches", (True, False))
+    @pytest.mark.parametrize("tile_size", (1, 100, 1 << 22))
+    def test_matcher_match_boxes(self, allow_low_quality_matches, tile_size):
+        torch.manual_seed(0)
+        gt_boxes = torch.rand(6, 4) * 100
+        gt_boxes[:, 2:] += gt_boxes[:, :2] + 1
+        # duplicated boxes give ties for the best prediction of the gt boxes
+        boxes = torch.rand(500, 4) * 100
+        boxes[:, 2:] += boxes[:, :2] + 1
+        boxes = torch.cat([boxes, boxes[:50]])
+
+        matcher = _utils.Matcher(0.5, 0.3, allow_low_quality_matches=allow_low_quality_matches)
+        expected = matcher(ops.box_iou(gt_boxes, boxes))
+        assert_equal(matcher.match_boxes(gt_boxes, boxes, tile_size=tile_size), expected)
+
+        ssd_matcher = _utils.SSDMatcher(0.5)
+        expected = ssd_matcher(ops.box_iou(gt_boxes, boxes))
+        assert_equal(ssd_matcher.match_boxes(gt_boxes, boxes, tile_size=tile_size), expected)
+
+        with pytest.raises(ValueError, match="No ground-truth boxes"):
+            matcher.match_boxes(torch.zeros(0, 4), boxes, tile_size=tile_size)
+
+    @pytest.mark.parametrize("nms_method", ("nms", "soft_nms", "matrix_nms"))
+    def test_nms(self, nms_method):
+        boxes = torch.tensor([[0, 0, 10, 10], [1, 1, 10, 10], [20, 20, 30, 30], [0, 0, 10, 10.0]])
+        scores = torch.tensor([0.9, 0.8, 0.7, 0.6])
+        labels = torch.tensor([1, 1, 1, 2])
+        image_offsets = torch.tensor([0, 3, 4])
+        keep, new_scores = _utils._nms(nms_method, boxes, scores, labels, 0.5, 0.05, image_offsets, 10)
+
+        # the second box overlaps the first one, the other ones are in another class or image
+        if nms_method == "nms":
+            assert_equal(keep, torch.tensor([0, 2, 3]))
+            assert_equal(new_scores, scores[keep])
+        else:
+            assert_equal(keep, torch.tensor([0, 2, 1, 3]))
+            torch.testing.assert_close(new_scores[[0, 1, 3]], scores[[0, 2, 3]])
+            assert new_scores[2] < scores[1]
+
+    def test_nms_method_validation(self):
+        with pytest.raises(ValueError, match="nms_method"):
+            retinanet_resnet50_fpn(pretrained=False, pretrained_backbone=False, nms_method="fast_nms")
+
     @pytest.mark.parametrize("train_layers, exp_froz_params", [(0, 53), (1, 43), (2, 24), (3, 11), (4, 1), (5, 0)])
     def test_resnet_fpn_backbone_frozen_layers(self, train_layers, exp_froz_params):
         # we know how many initial layers and parameters of the network should
@@ -80,6 +168,247 @@ class TestModelsDetectionUtils:
         with pytest.raises(TypeError):
             out = transform(image, targets)  # noqa: F841
 
+    def test_rpn_filter_proposals(self):
+        anchor_generator = AnchorGenerator(((32,), (64,), (128,)), ((0.5, 1.0, 2.0),) * 3)
+        head = RPNHead(4, 3)
+        rpn = RegionProposalNetwork(
+            anchor_generator,
+            head,
+            0.7,
+            0.3,
+            256,
+            0.5,
+            dict(training=300, testing=300),
+            dict(training=50, testing=50),
+            0.7,
+        )
+        rpn.min_size = 4.0
+        rpn.score_thresh = 0.2
+        rpn.eval()
+
+        torch.manual_seed(0)
+        num_anchors_per_level = [600, 150, 40]
+        num_anchors = sum(num_anchors_per_level)
+        corners = torch.rand(3, num_anchors, 2) * 120 - 10
+        proposals = torch.cat([corners, corners + torch.rand(3, num_anchors, 2) * 60], dim=2)
+        objectness = torch.randn(3, num_anchors)
+        image_shapes = [(100, 90), (80, 110), (60, 50)]
+
+        boxes, scores = rpn.filter_proposals(proposals, objectness, image_shapes, num_anchors_per_level)
+        # the tracing path filters the proposals image by image
+        with mock.patch("torchvision._is_tracing", return_value=True):
+            expected_boxes, expected_scores = rpn.filter_proposals(
+                proposals, objectness, image_shapes, num_anchors_per_level
+            )
+        assert len(boxes) == len(scores) == 3
+        for b, s, eb, es in zip(boxes, scores, expected_boxes, expected_scores):
+            assert 0 < len(b) <= 50
+            assert_equal(b, eb)
+            assert_equal(s, es)
+
+    def test_rpn_compute_loss_packed(self):
+        anchor_generator = AnchorGenerator(((32,),), ((0.5, 1.0, 2.0),))
+        rpn = RegionProposalNetwork(anchor_generator, RPNHead(4, 3), 0.7, 0.3, 16, 0.5, {}, {}, 0.7)
+
+        torch.manual_seed(0)
+        num_anchors = [40, 25]
+        objectness = torch.randn(sum(num_anchors), 1)
+        pred_bbox_deltas = torch.randn(sum(num_anchors), 4)
+        labels = [torch.randint(-1, 2, (n,)).float() for n in num_anchors]
+        regression_targets = [torch.randn(n, 4) for n in num_anchors]
+
+        torch.manual_seed(1)
+        expected = rpn.compute_loss(objectness, pred_bbox_deltas, labels, regression_targets)
+        torch.manual_seed(1)
+        losses = rpn.compute_loss_packed(objectness, pred_bbox_deltas, labels, torch.cat(regression_targets))
+        assert_equal(losses, expected)
+
+    def _reference_paste_masks(self, masks, boxes, img_shape):
+        masks, scale = roi_heads.expand_masks(masks, padding=1)
+        boxes = roi_heads.expand_boxes(boxes, scale).to(dtype=torch.int64)
+        pasted = [roi_heads.paste_mask_in_image(m[0], b, img_shape[0], img_shape[1]) for m, b in zip(masks, boxes)]
+        return torch.stack(pasted)[:, None]
+
+    def test_paste_masks_in_image(self):
+        torch.manual_seed(0)
+        img_shape = (60, 80)
+        masks = torch.rand(10, 1, 28, 28)
+        corners = torch.rand(10, 2) * torch.tensor([70.0, 50.0])
+        boxes = torch.cat([corners, corners + torch.rand(10, 2) * 40], dim=1)
+        # a box outside of the image
+        boxes[0] = torch.tensor([90.0, 10.0, 120.0, 30.0])
+
+        expected = self._reference_paste_masks(masks, boxes, img_shape)
+        out = roi_heads.paste_masks_in_image(masks, boxes, img_shape)
+        torch.testing.assert_close(out, expected, rtol=0, atol=1e-5)
+        # the masks are resized a few at a time, in windows of the size of the largest box
+        with mock.patch.object(roi_heads, "_paste_chunk_size", return_value=3):
+            out = roi_heads.paste_masks_in_image(masks, boxes, img_shape)
+        torch.testing.assert_close(out, expected, rtol=0, atol=1e-5)
+
+        compact, regions = roi_heads.paste_masks_in_image_compact(masks, boxes, img_shape)
+        assert compact.dtype == torch.bool
+        full = torch.zeros(10, 1, *img_shape, dtype=torch.bool)
+        for mask, full_mask, (x1, y1, x2, y2) in zip(compact, full, regions.tolist()):
+            assert 0 <= x1 <= x2 <= img_shape[1] and 0 <= y1 <= y2 <= img_shape[0]
+            full_mask[:, y1:y2, x1:x2] = mask[:, : y2 - y1, : x2 - x1]
+        assert_equal(full, expected >= 0.5)
+
+        out = roi_heads.paste_masks_in_image(masks[:0], boxes[:0], img_shape)
+        assert out.shape == (0, 1) + img_shape
+        compact, regions = roi_heads.paste_masks_in_image_compact(masks[:0], boxes[:0], img_shape)
+        assert compact.shape[0] == 0 and regions.shape == (0, 4)
+
+    def _reference_heatmaps_to_keypoints(self, maps, rois):
+        widths = (rois[:, 2] - rois[:, 0]).clamp(min=1)
+        heights = (rois[:, 3] - rois[:, 1]).clamp(min=1)
+        xy_preds, end_scores = [], []
+        for roi_maps, roi, w, h in zip(maps, rois, widths, heights):
+            size = (int(h.ceil()), int(w.ceil()))
+            roi_map = torch.nn.functional.interpolate(roi_maps[:, None], size=size, mode="bicubic")[:, 0]
+            pos = roi_map.flatten(1).argmax(dim=1)
+            x_int, y_int = pos % size[1], pos // size[1]
+            x = (x_int.float() + 0.5) * w / size[1] + roi[0]
+            y = (y_int.float() + 0.5) * h / size[0] + roi[1]
+            xy_preds.append(torch.stack([x, y, torch.ones_like(x)], dim=1))
+            end_scores.append(roi_map[torch.arange(len(pos)), y_int, x_int])
+        return torch.stack(xy_preds), torch.stack(end_scores)
+
+    def test_heatmaps_to_keypoints(self):
+        torch.manual_seed(0)
+        num_rois, num_keypoints = 20, 17
+        # noisy heatmaps with a single peak, whose maximum is refined from the maximum of the heatmaps
+        centers = torch.rand(num_rois, num_keypoints, 2, 1, 1) * 56
+        ys, xs = torch.meshgrid(torch.arange(56.0), torch.arange(56.0), indexing="ij")
+        dists = (xs - centers[:, :, 0]) ** 2 + (ys - centers[:, :, 1]) ** 2
+        maps = 8 * torch.exp(-dists / 8) - 4 + torch.randn(num_rois, num_keypoints, 56, 56) * 0.3
+        corners = torch.rand(num_rois, 2) * 300
+        # rois up to 1000 pixels, larger than the ones in which all the pixels around the maxima are sampled
+        rois = torch.cat([corners, corners + torch.rand(num_rois, 2) * 1000 + 0.5], dim=1)
+        rois[:5, 2:] = rois[:5, :2] + torch.rand(5, 2) * 20 + 0.5
+
+        expected_xy, expected_scores = self._reference_heatmaps_to_keypoints(maps, rois)
+        xy, scores = roi_heads.heatmaps_to_keypoints(maps, rois)
+        small = (rois[:, 2:] - rois[:, :2]).max(dim=1).values <= 630
+        torch.testing.assert_close(xy[small], expected_xy[small])
+        torch.testing.assert_close(scores[small], expected_scores[small], rtol=0, atol=1e-4)
+        # the larger rois are sampled every 2 pixels around the maximum
+        assert ((xy[~small, :, :2] - expected_xy[~small, :, :2]).abs() <= 2).all()
+        assert (scores[~small] <= expected_scores[~small] + 1e-4).all()
+
+        xy, scores = roi_heads.heatmaps_to_keypoints(maps[:0], rois[:0])
+        assert xy.shape == (0, num_keypoints, 3) and scores.shape == (0, num_keypoints)
+
+    def test_heatmaps_to_keypoints_adversarial(self):
+        torch.manual_seed(0)
+        rois = torch.tensor([[0.0, 0.0, 112.0, 112.0], [10.0, 20.0, 90.0, 150.0], [0.0, 0.0, 30.0, 20.0]])
+        # with noise, the maximum of the upsampled heatmaps can be anywhere. The keypoints are the maxima of the
+        # upsampled heatmaps around the maxima of the heatmaps, except in the third roi, small enough to be
+        # searched whole.
+        maps = torch.rand(3, 17, 56, 56)
+        expected_xy, expected_scores = self._reference_heatmaps_to_keypoints(maps, rois)
+        xy, scores = roi_heads.heatmaps_to_keypoints(maps, rois)
+        torch.testing.assert_close(xy[2], expected_xy[2])
+        assert (scores <= expected_scores + 1e-4).all()
+        sizes = rois[:, 2:] - rois[:, :2]
+        pos = maps.flatten(2).argmax(dim=2)
+        peak = torch.stack([pos % 56, pos // 56], dim=2) + 0.5
+        roi_xy = xy[:, :, :2] - rois[:, None, :2]
+        radius = 2 + 56 / sizes[:, None]
+        assert ((roi_xy * 56 / sizes[:, None] - peak).abs()[:2] <= radius[:2] + 1e-3).all()
+        for roi_maps, roi_xy_i, roi_scores, size in zip(maps, roi_xy, scores, sizes.int().tolist()):
+            roi_map = torch.nn.functional.interpolate(roi_maps[:, None], size=size[::-1], mode="bicubic")
+            x, y = roi_xy_i.floor().long().unbind(1)
+            torch.testing.assert_close(roi_scores, roi_map[torch.arange(17), 0, y, x], rtol=0, atol=1e-4)
+
+        # the spike is the maximum of the heatmaps, while the overshoot of the bicubic interpolation at the
+        # edges of the plateau is the maximum of the upsampled heatmaps: the keypoints are found at the spike
+        maps = torch.zeros(2, 1, 56, 56)
+        maps[:, 0, 5, 5] = 1.0
+        maps[:, 0, 30:40, 30:40] = 0.99
+        _, expected_scores = self._reference_heatmaps_to_keypoints(maps, rois[:2])
+        xy, scores = roi_heads.heatmaps_to_keypoints(maps, rois[:2])
+        assert (expected_scores > 1).all() and (scores <= 1).all()
+        spike = rois[:2, :2] + (rois[:2, 2:] - rois[:2, :2]) * 5.5 / 56
+        assert ((xy[:, 0, :2] - spike).abs() <= 2).all()
+
+    def test_transform_batch_buckets(self):
+        mean, std = [0.4, 0.5, 0.6], [0.2, 0.3, 0.4]
+        transform = GeneralizedRCNNTransform(300, 500, mean, std, batch_buckets=[(512, 320), (320, 512)])
+        reference = GeneralizedRCNNTransform(300, 500, mean, std)
+        transform.eval()
+        reference.eval()
+        images = [torch.rand(3, 200, 300), torch.rand(3, 210, 280)]
+
+        out, _ = transform(images)
+        expected, _ = reference(images)
+        assert out.tensors.shape == (2, 3, 320, 512)
+        assert out.image_sizes == expected.image_sizes
+        height, width = expected.tensors.shape[-2:]
+        torch.testing.assert_close(out.tensors[..., :height, :width], expected.tensors)
+        assert not out.tensors[..., width:].any()
+
+        # the batches returned are not overwritten by the next calls
+        previous = out.tensors.clone()
+        out2, _ = transform(images[:1])
+        assert out2.tensors.shape == (1, 3, 320, 512)
+        assert_equal(out.tensors, previous)
+        out, _ = transform([torch.rand(3, 300, 200)])
+        assert out.tensors.shape == (1, 3, 512, 320)
+
+        # images which fit in no bucket are batched as usual
+        images = [torch.rand(3, 450, 300), torch.rand(3, 300, 450)]
+        out, _ = transform(images)
+        expected, _ = reference(images)
+        assert out.tensors.shape == (2, 3, 480, 480)
+        assert_equal(out.tensors, expected.tensors)
+
+    @pytest.mark.parametrize("batch_buckets", [None, [(1280, 1152)]])
+    def test_transform_fuse_preprocessing(self, batch_buckets):
+        mean, std = [0.485, 0.456, 0.406], [0.229, 0.224, 0.225]
+        transform = GeneralizedRCNNTransform(
+            800, 1333, mean, std, batch_buckets=batch_buckets, fuse_preprocessing=True
+        ).eval()
+        reference = GeneralizedRCNNTransform(800, 1333, mean, std).eval()
+        torch.manual_seed(0)
+        # a CHW image and a HWC image
+        images = [
+            torch.randint(0, 256, (3, 480, 640), dtype=torch.uint8),
+            torch.randint(0, 256, (600, 400, 3), dtype=torch.uint8).permute(2, 0, 1),
+        ]
+        expected, _ = reference([image.float() / 255 for image in images])
+        height, width = expected.tensors.shape[-2:]
+
+        for inputs in (images, [image.float() / 255 for image in images]):
+            out, targets = transform(inputs)
+            assert targets is None
+            assert out.image_sizes == expected.image_sizes
+            if batch_buckets is None:
+                assert out.tensors.shape == expected.tensors.shape
+            else:
+                assert out.tensors.shape == (2, 3, 1280, 1152)
+                assert not out.tensors[..., :, width:].any() and not out.tensors[..., height:, :].any()
+            torch.testing.assert_close(out.tensors[..., :height, :width], expected.tensors, rtol=0, atol=1e-3)
+
+        # images with targets are transformed as usual
+        targets = [{"boxes": torch.rand(3, 4)}, {"boxes": torch.rand(2, 4)}]
+        with pytest.raises(TypeError):
+            transform(images, targets)
+
+    def test_transform_compact_masks(self):
+        result = [{"boxes": torch.tensor([[10.0, 20.0, 50.0, 40.0]]), "masks": torch.rand(1, 1, 28, 28)}]
+        transform = GeneralizedRCNNTransform(300, 500, torch.zeros(3), torch.ones(3), compact_masks=True)
+        transform.eval()
+        out = transform.postprocess(copy.deepcopy(result), [(100, 100)], [(100, 100)])
+        assert out[0]["masks"].dtype == torch.bool
+        assert out[0]["masks"].shape[-2:] == (22, 44)
+        assert out[0]["mask_regions"].tolist() == [[8, 19, 52, 41]]
+
+        transform.compact_masks = False
+        out = transform.postprocess(copy.deepcopy(result), [(100, 100)], [(100, 100)])
+        assert out[0]["masks"].shape == (1, 1, 100, 100)
+        assert "mask_regions" not in out[0]
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -1,6 +1,7 @@
 import math
 import os
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from functools import lru_cache
 from itertools import product
 from typing import Callable, List, Tuple
@@ -97,8 +98,14 @@ class RoIOpTester(ABC):
         )
 
         tol = 1e-3 if (x_dtype is torch.half or rois_dtype is torch.half) else 1e-5
+        if x_dtype is torch.bfloat16 or rois_dtype is torch.bfloat16:
+            tol = 2e-2
         torch.testing.assert_close(gt_y.to(y), y, rtol=tol, atol=tol)
 
+    @pytest.mark.parametrize("contiguous", (True, False))
+    def test_forward_bfloat16(self, contiguous):
+        self.test_forward(torch.device("cpu"), contiguous=contiguous, x_dtype=torch.bfloat16, rois_dtype=torch.bfloat16)
+
     @pytest.mark.parametrize("device", cpu_and_gpu())
     def test_is_leaf_node(self, device):
         op_obj = self.make_obj(wrap=True).to(device=device)
@@ -136,6 +143,12 @@ class RoIOpTester(ABC):
         with torch.cuda.amp.autocast():
             self.test_forward(torch.device("cuda"), contiguous=False, x_dtype=x_dtype, rois_dtype=rois_dtype)
 
+    def _make_rois(self, img_size, num_imgs, dtype, num_rois=1000):
+        rois = torch.randint(0, img_size // 2, size=(num_rois, 5)).to(dtype)
+        rois[:, 0] = torch.randint(0, num_imgs, size=(num_rois,))  # set batch index
+        rois[:, 3:] += rois[:, 1:3]  # make sure boxes aren't degenerate
+        return rois
+
     def _helper_boxes_shape(self, func):
         # test boxes as Tensor[N, 5]
         with pytest.raises(ValueError):
@@ -209,6 +222,22 @@ class TestRoiPool(RoIOpTester):
     def test_boxes_shape(self):
         self._helper_boxes_shape(ops.roi_pool)
 
+    @pytest.mark.parametrize("scale, zero_point", ((1, 0), (2, 10), (0.1, 50)))
+    @pytest.mark.parametrize("qdtype", (torch.qint8, torch.quint8, torch.qint32))
+    def test_qroi_pool(self, scale, zero_point, qdtype):
+        """Make sure quantized version of RoIPool is equal to float version"""
+        x = torch.randint(50, 100, size=(1, 2, 10, 10)).to(torch.float)
+        qx = torch.quantize_per_tensor(x, scale=scale, zero_point=zero_point, dtype=qdtype)
+        rois = self._make_rois(img_size=10, num_imgs=1, dtype=torch.float)
+        qrois = torch.quantize_per_tensor(rois, scale=scale, zero_point=zero_point, dtype=qdtype)
+
+        y = ops.roi_pool(qx.dequantize(), qrois.dequantize(), output_size=5)
+        qy = ops.roi_pool(qx, qrois, output_size=5)
+
+        # the max of quantized values is a quantized value, so no rounding is involved
+        assert qy.is_quantized
+        assert_equal(qy.dequantize(), y)
+
 
 class TestPSRoIPool(RoIOpTester):
     def fn(self, x, rois, pool_h, pool_w, spatial_scale=1, sampling_ratio=-1, **kwargs):
@@ -376,11 +405,16 @@ class TestRoIAlign(RoIOpTester):
                 torch.device("cuda"), contiguous=False, aligned=aligned, x_dtype=x_dtype, rois_dtype=rois_dtype
             )
 
-    def _make_rois(self, img_size, num_imgs, dtype, num_rois=1000):
-        rois = torch.randint(0, img_size // 2, size=(num_rois, 5)).to(dtype)
-        rois[:, 0] = torch.randint(0, num_imgs, size=(num_rois,))  # set batch index
-        rois[:, 3:] += rois[:, 1:3]  # make sure boxes aren't degenerate
-        return rois
+    @pytest.mark.parametrize("aligned", (True, False))
+    @pytest.mark.parametrize("contiguous", (True, False))
+    def test_forward_bfloat16(self, aligned, contiguous):
+        self.test_forward(
+            torch.device("cpu"),
+            contiguous=contiguous,
+            aligned=aligned,
+            x_dtype=torch.bfloat16,
+            rois_dtype=torch.bfloat16,
+        )
 
     @pytest.mark.parametrize("aligned", (True, False))
     @pytest.mark.parametrize("scale, zero_point", ((1, 0), (2, 10), (0.1, 50)))
@@ -504,6 +538,34 @@ class TestPSRoIAlign(RoIOpTester):
     def test_boxes_shape(self):
         self._helper_boxes_shape(ops.ps_roi_align)
 
+    @pytest.mark.parametrize("scale, zero_point", ((1, 0), (2, 10), (0.1, 50)))
+    @pytest.mark.parametrize("qdtype", (torch.qint8, torch.quint8, torch.qint32))
+    def test_qps_roi_align(self, scale, zero_point, qdtype):
+        """Make sure quantized version of PSRoIAlign is close to float version"""
+        pool_size = 3
+        x = torch.randint(50, 100, size=(1, 2 * pool_size ** 2, 10, 10)).to(torch.float)
+        qx = torch.quantize_per_tensor(x, scale=scale, zero_point=zero_point, dtype=qdtype)
+        rois = self._make_rois(img_size=10, num_imgs=1, dtype=torch.float)
+        qrois = torch.quantize_per_tensor(rois, scale=scale, zero_point=zero_point, dtype=qdtype)
+
+        y = ops.ps_roi_align(qx.dequantize(), qrois.dequantize(), output_size=pool_size)
+        qy = ops.ps_roi_align(qx, qrois, output_size=pool_size)
+
+        # Like for RoIAlign, rounding errors may make some outputs fall on the neighbouring quantized value
+        quantized_float_y = torch.quantize_per_tensor(y, scale=scale, zero_point=zero_point, dtype=qdtype)
+        diff_idx = torch.where(qy != quantized_float_y)
+        assert diff_idx[0].numel() / qy.numel() < 0.05
+        abs_diff = torch.abs(qy[diff_idx].dequantize() - quantized_float_y[diff_idx].dequantize())
+        torch.testing.assert_close(abs_diff, torch.full_like(abs_diff, fill_value=scale), rtol=1e-5, atol=1e-5)
+
+    def test_qps_roi_align_multiple_images(self):
+        x = torch.randint(50, 100, size=(2, 9, 10, 10)).to(torch.float)
+        qx = torch.quantize_per_tensor(x, scale=1, zero_point=0, dtype=torch.qint8)
+        rois = self._make_rois(img_size=10, num_imgs=2, dtype=torch.float, num_rois=10)
+        qrois = torch.quantize_per_tensor(rois, scale=1, zero_point=0, dtype=torch.qint8)
+        with pytest.raises(RuntimeError, match="Only one image per batch is allowed"):
+            ops.ps_roi_align(qx, qrois, output_size=3)
+
 
 class TestMultiScaleRoIAlign:
     def make_obj(self, fmap_names=None, output_size=(7, 7), sampling_ratio=2, wrap=False):
@@ -535,6 +597,38 @@ class TestMultiScaleRoIAlign:
         assert len(graph_node_names[0]) == len(graph_node_names[1])
         assert len(graph_node_names[0]) == 1 + op_obj.n_inputs
 
+    @pytest.mark.parametrize("dtype", (torch.float32, torch.float64))
+    def test_multi_level_roi_align(self, dtype):
+        torch.manual_seed(0)
+        features = OrderedDict(
+            (name, torch.rand(2, 5, size, size, dtype=dtype)) for name, size in (("0", 64), ("1", 32), ("2", 16))
+        )
+        boxes = []
+        for _ in range(2):
+            b = torch.rand(20, 4, dtype=dtype) * 200
+            b[:, 2:] += b[:, :2] + torch.rand(20, 2, dtype=dtype) * 300
+            boxes.append(b)
+        image_shapes = [(512, 512), (480, 500)]
+        m = self.make_obj(["0", "1", "2"], (5, 4), 2)
+
+        # the native op is only used when no gradient is needed
+        with torch.no_grad():
+            out = m(features, boxes, image_shapes)
+        levels = m.map_levels(boxes)
+        assert len(levels.unique()) > 1
+
+        rois = ops._utils.convert_boxes_to_roi_format(boxes)
+        expected = torch.zeros_like(out)
+        for level, (feature, scale) in enumerate(zip(features.values(), m.scales)):
+            idx = torch.where(levels == level)[0]
+            expected[idx] = ops.roi_align(feature, rois[idx], (5, 4), scale, 2)
+        torch.testing.assert_close(out, expected)
+
+        # with gradients, the levels are pooled one by one
+        for feature in features.values():
+            feature.requires_grad_()
+        torch.testing.assert_close(m(features, boxes, image_shapes), expected)
+
 
 class TestNMS:
     def _reference_nms(self, boxes, scores, iou_threshold):
@@ -683,6 +777,130 @@ class TestNMS:
         empty = torch.empty((0,), dtype=torch.int64)
         torch.testing.assert_close(empty, ops.batched_nms(empty, None, None, None))
 
+    @pytest.mark.parametrize("seed", range(5))
+    @pytest.mark.parametrize("max_output", (None, 0, 5))
+    def test_batched_nms_multi_image(self, seed, max_output):
+        torch.random.manual_seed(seed)
+        iou_threshold = 0.5
+        num_boxes_per_image = [300, 0, 1, 200]
+        image_offsets = torch.tensor([0] + num_boxes_per_image).cumsum(0)
+
+        boxes, scores = self._create_tensors_with_iou(sum(num_boxes_per_image), iou_threshold)
+        idxs = torch.randint(0, 4, size=(len(scores),))
+        keep = ops.batched_nms(boxes, scores, idxs, iou_threshold, image_offsets, max_output)
+
+        expected = []
+        for start, end in zip(image_offsets[:-1].tolist(), image_offsets[1:].tolist()):
+            image_keep = ops.boxes._batched_nms_vanilla(
+                boxes[start:end], scores[start:end], idxs[start:end], iou_threshold
+            )
+            expected.append(start + image_keep[:max_output])
+        assert_equal(keep, torch.cat(expected))
+
+        # fallback used on other devices and when tracing
+        image_idxs = ops.boxes._image_idxs(image_offsets, boxes.device)
+        keep_fallback = ops.boxes._batched_nms(boxes, scores, image_idxs * 4 + idxs, iou_threshold)
+        assert_equal(keep, ops.boxes._group_by_image(keep_fallback, image_idxs, len(num_boxes_per_image), max_output))
+
+    def _reference_soft_nms(self, boxes, scores, idxs, iou_threshold, method, sigma, score_threshold):
+        scores = scores.clone()
+        candidates = scores.sort(descending=True, stable=True)[1].tolist()
+        keep, new_scores = [], []
+        while candidates:
+            i = max(candidates, key=lambda c: scores[c])
+            if scores[i] < score_threshold:
+                break
+            keep.append(i)
+            new_scores.append(scores[i].item())
+            candidates.remove(i)
+            for j in candidates:
+                if idxs[j] == idxs[i]:
+                    iou = ops.box_iou(boxes[i : i + 1], boxes[j : j + 1]).item()
+                    if method == "gaussian":
+                        scores[j] *= math.exp(-(iou ** 2) / sigma)
+                    elif iou > iou_threshold:
+                        scores[j] *= 1 - iou
+            candidates = [j for j in candidates if scores[j] >= score_threshold]
+        return torch.tensor(keep, dtype=torch.int64), torch.tensor(new_scores)
+
+    @pytest.mark.parametrize("method", ("linear", "gaussian"))
+    @pytest.mark.parametrize("seed", range(3))
+    def test_batched_soft_nms(self, method, seed):
+        torch.random.manual_seed(seed)
+        boxes, scores = self._create_tensors_with_iou(200, 0.5)
+        idxs = torch.randint(0, 3, size=(len(scores),))
+
+        keep, new_scores = ops.batched_soft_nms(boxes, scores, idxs, 0.3, method=method, score_threshold=0.05)
+        expected_keep, expected_scores = self._reference_soft_nms(boxes, scores, idxs, 0.3, method, 0.5, 0.05)
+        assert_equal(keep, expected_keep)
+        torch.testing.assert_close(new_scores, expected_scores)
+
+        image_offsets = torch.tensor([0, 120, 200])
+        keep, _ = ops.batched_soft_nms(boxes, scores, idxs, 0.3, image_offsets, 4, method=method, score_threshold=0.05)
+        expected_keep = [
+            start
+            + self._reference_soft_nms(boxes[start:end], scores[start:end], idxs[start:end], 0.3, method, 0.5, 0.05)[0][
+                :4
+            ]
+            for start, end in ((0, 120), (120, 200))
+        ]
+        assert_equal(keep, torch.cat(expected_keep))
+
+    @pytest.mark.parametrize("kernel", ("linear", "gaussian"))
+    @pytest.mark.parametrize("seed", range(3))
+    def test_batched_matrix_nms(self, kernel, seed):
+        torch.random.manual_seed(seed)
+        boxes, scores = self._create_tensors_with_iou(200, 0.5)
+        idxs = torch.randint(0, 3, size=(len(scores),))
+        image_offsets = torch.tensor([0, 120, 120, 200])
+
+        for max_output in (None, 10):
+            keep, new_scores = ops.batched_matrix_nms(boxes, scores, idxs, 0.05, image_offsets, max_output, kernel)
+            # vectorized implementation used on other devices and when tracing
+            expected_keep, expected_scores = [], []
+            for start, end in ((0, 120), (120, 120), (120, 200)):
+                image_keep, image_scores = ops.boxes._matrix_nms_single_image(
+                    boxes[start:end], scores[start:end], idxs[start:end], 0.05, kernel, 2.0
+                )
+                expected_keep.append(start + image_keep[:max_output])
+                expected_scores.append(image_scores[:max_output])
+            assert_equal(keep, torch.cat(expected_keep))
+            torch.testing.assert_close(new_scores, torch.cat(expected_scores))
+
+        # the highest scoring box of every category keeps its score
+        keep, new_scores = ops.batched_matrix_nms(boxes, scores, idxs, 0.0, kernel=kernel)
+        for idx in range(3):
+            top = scores[idxs == idx].max()
+            torch.testing.assert_close(new_scores[keep == torch.where((idxs == idx) & (scores == top))[0]], top[None])
+
+    def test_batched_matrix_nms_duplicate_boxes(self):
+        boxes = torch.tensor([[0, 0, 10, 10]] * 3 + [[1, 1, 11, 11]], dtype=torch.float)
+        scores = torch.tensor([0.9, 0.8, 0.7, 0.6])
+        idxs = torch.zeros(4, dtype=torch.int64)
+        expected_keep = torch.tensor([0, 3, 1, 2])
+        expected_scores = torch.tensor([0.9, 0.6 * (1 - 81 / 119), 0.0, 0.0])
+
+        keep, new_scores = ops.batched_matrix_nms(boxes, scores, idxs, 0.0, kernel="linear")
+        assert_equal(keep, expected_keep)
+        torch.testing.assert_close(new_scores, expected_scores)
+        keep, new_scores = ops.boxes._matrix_nms_single_image(boxes, scores, idxs, 0.0, "linear", 2.0)
+        assert_equal(keep, expected_keep)
+        torch.testing.assert_close(new_scores, expected_scores)
+
+    def test_batched_nms_input_errors(self):
+        boxes, scores, idxs = torch.rand(3, 4), torch.rand(3), torch.zeros(3, dtype=torch.int64)
+        with pytest.raises(RuntimeError, match="idxs"):
+            ops.batched_nms(boxes, scores, idxs[:2], 0.5)
+        with pytest.raises(RuntimeError, match="image_offsets"):
+            ops.batched_nms(boxes, scores, idxs, 0.5, torch.tensor([0, 2]))
+        with pytest.raises(RuntimeError, match="image_offsets"):
+            ops.batched_nms(boxes, scores, idxs, 0.5, torch.tensor([0, 2, 1, 3]))
+        with pytest.raises(ValueError, match="max_output"):
+            ops.batched_nms(boxes, scores, idxs, 0.5, max_output=-2)
+        assert_equal(
+            ops.batched_nms(boxes, scores, idxs, 0.5, max_output=-1), ops.batched_nms(boxes, scores, idxs, 0.5)
+        )
+
 
 class TestDeformConv:
     dtype = torch.float64
@@ -840,6 +1058,21 @@ class TestDeformConv:
             res.to(expected), expected, rtol=tol, atol=tol, msg=f"\nres:\n{res}\nexpected:\n{expected}"
         )
 
+    @pytest.mark.parametrize("contiguous", (True, False))
+    def test_forward_bfloat16(self, contiguous):
+        x, weight, offset, mask, bias, stride, padding, dilation = self.get_fn_args(
+            "cpu", contiguous, batch_sz=33, dtype=torch.bfloat16
+        )
+        kwargs = dict(stride=stride, padding=padding, dilation=dilation)
+        with torch.no_grad():
+            res = ops.deform_conv2d(x, offset, weight, bias, mask=mask, **kwargs)
+            # same values in double precision, so that only the computation differs
+            x, weight, offset, mask, bias = (t.to(self.dtype) for t in (x, weight, offset, mask, bias))
+            expected = ops.deform_conv2d(x, offset, weight, bias, mask=mask, **kwargs)
+
+        assert res.dtype == torch.bfloat16
+        torch.testing.assert_close(res.to(expected), expected, rtol=2e-2, atol=5e-2)
+
     def test_wrong_sizes(self):
         in_channels = 6
         out_channels = 2
@@ -1257,6 +1490,58 @@ class TestGenBoxIou(BoxTestBase):
         self._run_jit_test([[0, 0, 100, 100], [0, 0, 50, 50], [200, 200, 300, 300]])
 
 
+class TestBoxIouReductions:
+    def _make_boxes(self, n, dtype):
+        boxes = torch.rand(n, 4, dtype=torch.float64) * 100
+        boxes[:, 2:] += boxes[:, :2] + 1
+        return boxes.to(dtype)
+
+    @pytest.mark.parametrize("native", (True, False))
+    @pytest.mark.parametrize("generalized", (True, False))
+    @pytest.mark.parametrize("dtype", (torch.float32, torch.float64))
+    def test_box_iou_max(self, monkeypatch, native, generalized, dtype):
+        if not native:
+            monkeypatch.setattr(ops.boxes, "_use_native_box_iou", lambda boxes1, boxes2: False)
+            monkeypatch.setattr(ops.boxes, "_BOX_IOU_TILE_SIZE", 64)
+        torch.manual_seed(0)
+        boxes1 = self._make_boxes(300, dtype)
+        boxes2 = self._make_boxes(40, dtype)
+        iou_fn = ops.generalized_box_iou if generalized else ops.box_iou
+        expected_values, expected_indices = iou_fn(boxes1, boxes2).max(dim=1)
+
+        values, indices = ops.box_iou_max(boxes1, boxes2, generalized=generalized)
+        torch.testing.assert_close(values, expected_values)
+        assert_equal(indices, expected_indices)
+
+        values, indices = ops.box_iou_max(boxes1[:0], boxes2, generalized=generalized)
+        assert values.shape == indices.shape == (0,)
+        with pytest.raises(ValueError, match="at least one box"):
+            ops.box_iou_max(boxes1, boxes2[:0], generalized=generalized)
+
+    @pytest.mark.parametrize("native", (True, False))
+    @pytest.mark.parametrize("generalized", (True, False))
+    @pytest.mark.parametrize("dtype", (torch.float32, torch.float64))
+    def test_box_iou_pairs(self, monkeypatch, native, generalized, dtype):
+        if not native:
+            monkeypatch.setattr(ops.boxes, "_use_native_box_iou", lambda boxes1, boxes2: False)
+            monkeypatch.setattr(ops.boxes, "_BOX_IOU_TILE_SIZE", 64)
+        torch.manual_seed(0)
+        boxes1 = self._make_boxes(300, dtype)
+        boxes2 = self._make_boxes(40, dtype)
+        iou = (ops.generalized_box_iou if generalized else ops.box_iou)(boxes1, boxes2)
+        threshold = 0.3
+        expected_pairs = torch.nonzero(iou >= threshold)
+
+        pairs, values = ops.box_iou_pairs(boxes1, boxes2, threshold, generalized=generalized)
+        assert len(pairs) > 0
+        assert_equal(pairs, expected_pairs)
+        torch.testing.assert_close(values, iou[expected_pairs[:, 0], expected_pairs[:, 1]])
+
+        pairs, values = ops.box_iou_pairs(boxes1, boxes2[:0], threshold, generalized=generalized)
+        assert pairs.shape == (0, 2)
+        assert values.shape == (0,)
+
+
 class TestMasksToBoxes:
     def test_masks_box(self):
         def masks_box_check(masks, expected, tolerance=1e-4):
@@ -35,6 +35,33 @@ def test_fromfile(tmpdir, np_dtype, torch_dtype, byte_order, count, mode):
         torch.testing.assert_close(actual, expected)
 
 
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Inspects /proc/self/maps")
+def test_fromfile_read_only_mmap(tmpdir):
+    path = tmpdir / "data.bin"
+    data = bytes(range(256))
+    path.write_binary(data)
+
+    with open(path, "rb") as file:
+        actual = fromfile(file, dtype=torch.uint8, byte_order=sys.byteorder)
+
+    with open("/proc/self/maps") as maps:
+        assert any(str(path) in line for line in maps)
+    torch.testing.assert_close(actual, torch.tensor(list(data), dtype=torch.uint8))
+
+    # the mapping is private, so the file is not modified
+    actual.fill_(0)
+    assert path.read_binary() == data
+
+
+def test_fromfile_empty(tmpdir):
+    path = tmpdir / "data.bin"
+    path.write_binary(b"")
+
+    for mode in ("rb", "r+b"):
+        with open(path, mode) as file:
+            assert fromfile(file, dtype=torch.uint8, byte_order=sys.byteorder).numel() == 0
+
+
 def test_read_flo(tmpdir):
     path = tmpdir / "test.flo"
     make_fake_flo_file(3, 4, path)
@@ -242,3 +242,34 @@ class TestRandomHorizontalFlip:
         assert_equal(expected, actual)
         assert actual.format == expected.format
         assert actual.image_size == expected.image_size
+
+
+class TestCompose:
+    @pytest.mark.parametrize("seed", range(3))
+    def test_fuse_geometric(self, seed):
+        image = features.Image(torch.randint(0, 256, (3, 26, 34), dtype=torch.uint8))
+        transform_list = [
+            transforms.CenterCrop([20, 24]),
+            transforms.RandomHorizontalFlip(),
+            transforms.RandomZoomOut(side_range=(1.0, 2.0)),
+        ]
+
+        torch.manual_seed(seed)
+        actual = transforms.Compose(*transform_list, fuse_geometric=True)(image)
+        torch.manual_seed(seed)
+        expected = transforms.Compose(*transform_list)(image)
+
+        assert isinstance(actual, features.Image)
+        assert_equal(actual, expected)
+
+    def test_fuse_geometric_bounding_box(self):
+        image = features.Image(torch.rand(3, 10, 10))
+        bounding_box = features.BoundingBox([0, 0, 5, 5], format=features.BoundingBoxFormat.XYXY, image_size=(10, 10))
+        transform = transforms.Compose(
+            transforms.RandomHorizontalFlip(p=1.0), transforms.RandomHorizontalFlip(p=1.0), fuse_geometric=True
+        )
+
+        actual_image, actual_bounding_box = transform(image, bounding_box)
+
+        assert_equal(actual_image, image)
+        assert_equal(actual_bounding_box, bounding_box)
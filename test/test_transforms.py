@@ -304,6 +304,24 @@ class TestToTensor:
             trans(np_rng.rand(1, height, width))
 
 
+@pytest.mark.parametrize("seed", range(5))
+def test_compose_fuse_geometric(seed):
+    img = transforms.ToPILImage()(torch.randint(0, 256, (3, 26, 34), dtype=torch.uint8))
+    trans = [
+        transforms.RandomCrop([20, 24]),
+        transforms.RandomHorizontalFlip(),
+        transforms.RandomVerticalFlip(),
+        transforms.CenterCrop([24, 18]),
+    ]
+
+    torch.manual_seed(seed)
+    fused = transforms.Compose(trans, fuse_geometric=True)(img)
+    torch.manual_seed(seed)
+    expected = transforms.Compose(trans)(img)
+    assert fused.size == expected.size
+    assert_equal(F.pil_to_tensor(fused), F.pil_to_tensor(expected))
+
+
 def test_randomresized_params():
     height = random.randint(24, 32) * 2
     width = random.randint(24, 32) * 2
@@ -981,3 +981,178 @@ def test_gaussian_blur(device, channels, meth_kwargs):
         agg_method="max",
         tol=tol,
     )
+
+
+class TestPerSample:
+    @pytest.mark.parametrize("device", cpu_and_gpu())
+    @pytest.mark.parametrize(
+        "batched_fn, fn, low, high",
+        [
+            (F._batched_adjust_brightness, F.adjust_brightness, 0.0, 2.0),
+            (F._batched_adjust_contrast, F.adjust_contrast, 0.0, 2.0),
+            (F._batched_adjust_saturation, F.adjust_saturation, 0.0, 2.0),
+            (F._batched_adjust_hue, F.adjust_hue, -0.5, 0.5),
+        ],
+    )
+    def test_color(self, device, batched_fn, fn, low, high):
+        batch = _create_data_batch(16, 18, num_samples=4, device=device)
+        factors = torch.empty(4).uniform_(low, high)
+
+        out = batched_fn(batch, factors)
+        for i in range(len(batch)):
+            assert_equal(out[i], fn(batch[i], float(factors[i])))
+
+    @pytest.mark.parametrize("device", cpu_and_gpu())
+    @pytest.mark.parametrize("interpolation", [NEAREST, BILINEAR])
+    def test_resized_crop(self, device, interpolation):
+        batch = _create_data_batch(26, 34, num_samples=4, device=device)
+        if interpolation == BILINEAR:
+            batch = batch.float()
+        boxes = torch.tensor([[0, 0, 26, 34], [3, 5, 10, 20], [10, 2, 7, 7], [20, 30, 6, 4]])
+        size = [12, 15]
+
+        out = F._batched_resized_crop(batch, boxes, size, interpolation)
+        for i, (top, left, height, width) in enumerate(boxes.tolist()):
+            expected = F.resized_crop(batch[i], top, left, height, width, size, interpolation)
+            torch.testing.assert_close(out[i], expected, rtol=0, atol=1e-4)
+
+    @pytest.mark.parametrize("device", cpu_and_gpu())
+    @pytest.mark.parametrize("center", [None, [5, 7]])
+    def test_affine(self, device, center):
+        batch = _create_data_batch(26, 34, num_samples=3, device=device).float()
+        angles = torch.tensor([0.0, 30.0, -75.0])
+        translations = torch.tensor([[0.0, 0.0], [2.0, -3.0], [-5.0, 1.0]])
+        scales = torch.tensor([1.0, 0.8, 1.3])
+        shears = torch.tensor([[0.0, 0.0], [10.0, 0.0], [-5.0, 20.0]])
+
+        out = F._batched_affine(batch, angles, translations, scales, shears, BILINEAR, [1.0, 2.0, 3.0], center)
+        for i in range(len(batch)):
+            expected = F.affine(
+                batch[i],
+                angle=angles[i].item(),
+                translate=translations[i].tolist(),
+                scale=scales[i].item(),
+                shear=shears[i].tolist(),
+                interpolation=BILINEAR,
+                fill=[1.0, 2.0, 3.0],
+                center=center,
+            )
+            torch.testing.assert_close(out[i], expected, rtol=0, atol=1e-3)
+
+    @pytest.mark.parametrize("device", cpu_and_gpu())
+    @pytest.mark.parametrize("kernel_size", [[3, 3], [5, 3]])
+    def test_gaussian_blur(self, device, kernel_size):
+        batch = _create_data_batch(16, 18, num_samples=3, device=device)
+        sigmas = torch.tensor([[0.5, 0.5], [1.0, 2.0], [2.0, 0.3]])
+
+        out = F._batched_gaussian_blur(batch, kernel_size, sigmas)
+        for i in range(len(batch)):
+            expected = F.gaussian_blur(batch[i], kernel_size, sigmas[i].tolist())
+            torch.testing.assert_close(out[i], expected, rtol=0, atol=1)
+
+    @pytest.mark.parametrize("device", cpu_and_gpu())
+    @pytest.mark.parametrize(
+        "transform",
+        [
+            T.RandomResizedCrop([12, 14], per_sample=True),
+            T.ColorJitter(brightness=0.5, contrast=0.5, saturation=0.5, hue=0.2, per_sample=True),
+            T.RandomRotation(45, per_sample=True),
+            T.RandomAffine(30, translate=(0.1, 0.2), scale=(0.8, 1.2), shear=(-10, 10, -5, 5), per_sample=True),
+            T.GaussianBlur(5, sigma=(0.1, 2.0), per_sample=True),
+        ],
+    )
+    def test_transform(self, device, transform):
+        # the same image repeated, which must be transformed differently
+        batch = _create_data_batch(26, 34, num_samples=1, device=device).expand(8, 3, 26, 34)
+
+        torch.manual_seed(12)
+        out = transform(batch)
+        assert all(not out[0].equal(out[i]) for i in range(1, len(out)))
+
+        torch.manual_seed(12)
+        assert_equal(torch.jit.script(transform)(batch), out)
+
+    def test_transform_errors(self):
+        with pytest.raises(ValueError, match="is not supported with per_sample=True"):
+            T.RandomResizedCrop(10, interpolation=BICUBIC, per_sample=True)
+        with pytest.raises(ValueError, match="expand=True is not supported"):
+            T.RandomRotation(45, expand=True, per_sample=True)
+
+
+class TestFuseGeometric:
+    def _compare(self, transforms, img, seed):
+        torch.manual_seed(seed)
+        fused = T.Compose(transforms, fuse_geometric=True)(img)
+        fused_rand = torch.rand(1)
+        torch.manual_seed(seed)
+        expected = T.Compose(transforms)(img)
+        # the random parameters are drawn in the same order
+        assert_equal(torch.rand(1), fused_rand)
+        return fused, expected
+
+    @pytest.mark.parametrize("device", cpu_and_gpu())
+    @pytest.mark.parametrize("seed", range(5))
+    def test_crops_and_flips(self, device, seed):
+        tensor, _ = _create_data(26, 34, device=device)
+        transforms = [
+            T.RandomCrop([20, 24]),
+            T.RandomHorizontalFlip(),
+            T.RandomVerticalFlip(),
+            T.CenterCrop([24, 18]),
+        ]
+
+        fused, expected = self._compare(transforms, tensor, seed)
+        assert_equal(fused, expected)
+
+    @pytest.mark.parametrize("device", cpu_and_gpu())
+    def test_resize_and_crop(self, device):
+        tensor, _ = _create_data(26, 34, device=device)
+        transforms = [T.Resize([52, 68], interpolation=NEAREST), T.CenterCrop([40, 50])]
+
+        fused, expected = self._compare(transforms, tensor, 0)
+        assert_equal(fused, expected)
+
+    @pytest.mark.parametrize("device", cpu_and_gpu())
+    @pytest.mark.parametrize("center", [None, [5, 7]])
+    def test_rotations(self, device, center):
+        tensor = _create_data(26, 34, device=device)[0].float() / 255
+        transforms = [
+            T.RandomRotation((20, 20), interpolation=BILINEAR, center=center, fill=0.5),
+            T.RandomRotation((25, 25), interpolation=BILINEAR, center=center, fill=0.5),
+        ]
+
+        fused, _ = self._compare(transforms, tensor, 0)
+        expected = F.rotate(tensor, 45.0, interpolation=BILINEAR, center=center, fill=[0.5])
+        torch.testing.assert_close(fused, expected, rtol=0, atol=1e-3)
+
+    @pytest.mark.parametrize("device", cpu_and_gpu())
+    def test_affine_and_resize(self, device):
+        # a linear gradient, on which resampling once or twice with bilinear interpolation gives the same result as
+        # long as the zoomed in image stays within the borders
+        yy, xx = torch.meshgrid(torch.arange(26.0, device=device) / 26, torch.arange(34.0, device=device) / 34)
+        tensor = torch.stack([xx, yy, (xx + yy) / 2])
+        transforms = [
+            T.RandomAffine((5, 10), scale=(1.3, 1.4), interpolation=BILINEAR),
+            T.Resize(13, interpolation=BILINEAR),
+        ]
+
+        torch.manual_seed(0)
+        angle, translate, scale, shear = T.RandomAffine.get_params([5, 10], None, [1.3, 1.4], None, [34, 26])
+        fused, _ = self._compare(transforms, tensor, 0)
+        expected = F.resize(F.affine(tensor, angle, translate, scale, shear, interpolation=BILINEAR), [13, 17])
+        torch.testing.assert_close(fused, expected, rtol=0, atol=1e-4)
+
+    @pytest.mark.parametrize("device", cpu_and_gpu())
+    def test_not_fused(self, device):
+        tensor, _ = _create_data(26, 34, device=device)
+        transforms = [
+            T.RandomRotation(30, interpolation=NEAREST),
+            T.RandomRotation(30, interpolation=BILINEAR),
+            T.RandomAffine(10, interpolation=BILINEAR, fill=1),
+            T.Resize([13, 17], interpolation=BICUBIC),
+            T.RandomCrop(12, padding=2),
+            T.Resize([20, 20], antialias=True),
+        ]
+
+        fused, expected = self._compare(transforms, tensor, 0)
+        assert_equal(fused, expected)
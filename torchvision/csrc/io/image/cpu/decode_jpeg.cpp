@@ -1,14 +1,29 @@
 #include "decode_jpeg.h"
 #include "common_jpeg.h"
 
+#include <ATen/Parallel.h>
+
 namespace vision {
 namespace image {
 
 #if !JPEG_FOUND
-torch::Tensor decode_jpeg(const torch::Tensor& data, ImageReadMode mode) {
+torch::Tensor decode_jpeg(
+    const torch::Tensor& data,
+    ImageReadMode mode,
+    at::IntArrayRef min_size) {
   TORCH_CHECK(
       false, "decode_jpeg: torchvision not compiled with libjpeg support");
 }
+
+std::vector<torch::Tensor> decode_jpeg_batch(
+    const std::vector<torch::Tensor>& data,
+    ImageReadMode mode,
+    int64_t num_threads,
+    const c10::optional<torch::Tensor>& output) {
+  TORCH_CHECK(
+      false,
+      "decode_jpeg_batch: torchvision not compiled with libjpeg support");
+}
 #else
 
 using namespace detail;
@@ -69,7 +84,10 @@ static void torch_jpeg_set_source_mgr(
 
 } // namespace
 
-torch::Tensor decode_jpeg(const torch::Tensor& data, ImageReadMode mode) {
+torch::Tensor decode_jpeg(
+    const torch::Tensor& data,
+    ImageReadMode mode,
+    at::IntArrayRef min_size) {
   C10_LOG_API_USAGE_ONCE(
       "torchvision.csrc.io.image.cpu.decode_jpeg.decode_jpeg");
   // Check that the input tensor dtype is uint8
@@ -78,6 +96,10 @@ torch::Tensor decode_jpeg(const torch::Tensor& data, ImageReadMode mode) {
   TORCH_CHECK(
       data.dim() == 1 && data.numel() > 0,
       "Expected a non empty 1-dimensional tensor");
+  TORCH_CHECK(
+      min_size.size() <= 2,
+      "Expected min_size to have at most 2 elements, got ",
+      min_size.size());
 
   struct jpeg_decompress_struct cinfo;
   struct torch_jpeg_error_mgr jerr;
@@ -101,6 +123,21 @@ torch::Tensor decode_jpeg(const torch::Tensor& data, ImageReadMode mode) {
   // read info from header.
   jpeg_read_header(&cinfo, TRUE);
 
+  if (!min_size.empty()) {
+    int64_t min_height = min_size[0];
+    int64_t min_width = min_size.back();
+    // Use the largest reduction of the IDCT scaling (1/8, 1/4 or 1/2) for
+    // which the decoded image is still at least min_height x min_width
+    for (unsigned int scale = 8; scale > 1; scale /= 2) {
+      if ((cinfo.image_height + scale - 1) / scale >= min_height &&
+          (cinfo.image_width + scale - 1) / scale >= min_width) {
+        cinfo.scale_num = 1;
+        cinfo.scale_denom = scale;
+        break;
+      }
+    }
+  }
+
   int channels = cinfo.num_components;
 
   if (mode != IMAGE_READ_MODE_UNCHANGED) {
@@ -153,6 +190,74 @@ torch::Tensor decode_jpeg(const torch::Tensor& data, ImageReadMode mode) {
   return tensor.permute({2, 0, 1});
 }
 
+namespace {
+
+void write_resized(const torch::Tensor& image, torch::Tensor& out) {
+  TORCH_CHECK(
+      image.size(0) == out.size(0),
+      "Expected the decoded images to have ",
+      out.size(0),
+      " channels, got ",
+      image.size(0),
+      ". Use a mode that matches the number of channels of output");
+  if (image.size(1) == out.size(1) && image.size(2) == out.size(2)) {
+    out.copy_(image);
+    return;
+  }
+  auto resized = at::_upsample_bilinear2d_aa(
+      image.unsqueeze(0).to(torch::kFloat),
+      {out.size(1), out.size(2)},
+      /*align_corners=*/false);
+  out.copy_(resized.squeeze(0).round_().clamp_(0, 255));
+}
+
+} // namespace
+
+std::vector<torch::Tensor> decode_jpeg_batch(
+    const std::vector<torch::Tensor>& data,
+    ImageReadMode mode,
+    int64_t num_threads,
+    const c10::optional<torch::Tensor>& output) {
+  C10_LOG_API_USAGE_ONCE(
+      "torchvision.csrc.io.image.cpu.decode_jpeg.decode_jpeg_batch");
+  TORCH_CHECK(num_threads >= 0, "Expected num_threads to be non negative");
+  int64_t batch_size = data.size();
+  if (output.has_value()) {
+    auto out = output.value();
+    TORCH_CHECK(out.dtype() == torch::kU8, "Expected output to be uint8");
+    TORCH_CHECK(out.device() == torch::kCPU, "Expected output to be on CPU");
+    TORCH_CHECK(
+        out.dim() == 4 && out.size(0) == batch_size,
+        "Expected output to be a 4-dimensional tensor with ",
+        batch_size,
+        " images");
+  }
+
+  if (num_threads == 0) {
+    num_threads = at::get_num_threads();
+  }
+  // split the batch in at most num_threads chunks decoded in parallel. Each
+  // image is decoded by a single thread, which owns its libjpeg state
+  int64_t grain_size =
+      std::max<int64_t>(1, (batch_size + num_threads - 1) / num_threads);
+  std::vector<torch::Tensor> images(batch_size);
+  at::parallel_for(0, batch_size, grain_size, [&](int64_t begin, int64_t end) {
+    for (int64_t i = begin; i < end; i++) {
+      // decode at the smallest scale that is still larger than the output
+      auto image = output.has_value()
+          ? decode_jpeg(data[i], mode, {output->size(2), output->size(3)})
+          : decode_jpeg(data[i], mode);
+      if (output.has_value()) {
+        auto out = output.value()[i];
+        write_resized(image, out);
+        image = out;
+      }
+      images[i] = image;
+    }
+  });
+  return images;
+}
+
 #endif
 
 } // namespace image
@@ -8,7 +8,14 @@ namespace image {
 
 C10_EXPORT torch::Tensor decode_jpeg(
     const torch::Tensor& data,
-    ImageReadMode mode = IMAGE_READ_MODE_UNCHANGED);
+    ImageReadMode mode = IMAGE_READ_MODE_UNCHANGED,
+    at::IntArrayRef min_size = {});
+
+C10_EXPORT std::vector<torch::Tensor> decode_jpeg_batch(
+    const std::vector<torch::Tensor>& data,
+    ImageReadMode mode = IMAGE_READ_MODE_UNCHANGED,
+    int64_t num_threads = 0,
+    const c10::optional<torch::Tensor>& output = c10::nullopt);
 
 } // namespace image
 } // namespace vision
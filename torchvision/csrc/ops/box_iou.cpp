@@ -0,0 +1,41 @@
+#include "box_iou.h"
+
+#include <ATen/core/dispatch/Dispatcher.h>
+#include <torch/library.h>
+#include <torch/types.h>
+
+namespace vision {
+namespace ops {
+
+std::tuple<at::Tensor, at::Tensor> box_iou_max(
+    const at::Tensor& boxes1,
+    const at::Tensor& boxes2,
+    bool generalized) {
+  C10_LOG_API_USAGE_ONCE("torchvision.csrc.ops.box_iou.box_iou_max");
+  static auto op = c10::Dispatcher::singleton()
+                       .findSchemaOrThrow("torchvision::box_iou_max", "")
+                       .typed<decltype(box_iou_max)>();
+  return op.call(boxes1, boxes2, generalized);
+}
+
+std::tuple<at::Tensor, at::Tensor> box_iou_pairs(
+    const at::Tensor& boxes1,
+    const at::Tensor& boxes2,
+    double threshold,
+    bool generalized) {
+  C10_LOG_API_USAGE_ONCE("torchvision.csrc.ops.box_iou.box_iou_pairs");
+  static auto op = c10::Dispatcher::singleton()
+                       .findSchemaOrThrow("torchvision::box_iou_pairs", "")
+                       .typed<decltype(box_iou_pairs)>();
+  return op.call(boxes1, boxes2, threshold, generalized);
+}
+
+TORCH_LIBRARY_FRAGMENT(torchvision, m) {
+  m.def(TORCH_SELECTIVE_SCHEMA(
+      "torchvision::box_iou_max(Tensor boxes1, Tensor boxes2, bool generalized) -> (Tensor, Tensor)"));
+  m.def(TORCH_SELECTIVE_SCHEMA(
+      "torchvision::box_iou_pairs(Tensor boxes1, Tensor boxes2, float threshold, bool generalized) -> (Tensor, Tensor)"));
+}
+
+} // namespace ops
+} // namespace vision
@@ -0,0 +1,21 @@
+#pragma once
+
+#include <ATen/ATen.h>
+#include "../macros.h"
+
+namespace vision {
+namespace ops {
+
+VISION_API std::tuple<at::Tensor, at::Tensor> box_iou_max(
+    const at::Tensor& boxes1,
+    const at::Tensor& boxes2,
+    bool generalized);
+
+VISION_API std::tuple<at::Tensor, at::Tensor> box_iou_pairs(
+    const at::Tensor& boxes1,
+    const at::Tensor& boxes2,
+    double threshold,
+    bool generalized);
+
+} // namespace ops
+} // namespace vision
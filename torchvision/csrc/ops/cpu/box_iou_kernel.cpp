@@ -0,0 +1,212 @@
+#include <ATen/ATen.h>
+#include <ATen/Parallel.h>
+#include <torch/library.h>
+
+#include <algorithm>
+#include <vector>
+
+namespace vision {
+namespace ops {
+
+namespace {
+
+// Number of rows of boxes1 handled by a task. The IoU of a row is computed
+// against all of boxes2 without being stored, so only the reduced values of
+// the rows are ever kept in memory.
+constexpr int64_t kRowsPerBlock = 64;
+
+void check_box_iou_inputs(const at::Tensor& boxes1, const at::Tensor& boxes2) {
+  TORCH_CHECK(
+      boxes1.dim() == 2 && boxes1.size(1) == 4,
+      "boxes1 should be a Tensor[N, 4], got ",
+      boxes1.sizes());
+  TORCH_CHECK(
+      boxes2.dim() == 2 && boxes2.size(1) == 4,
+      "boxes2 should be a Tensor[M, 4], got ",
+      boxes2.sizes());
+  TORCH_CHECK(
+      boxes1.scalar_type() == boxes2.scalar_type(),
+      "boxes1 and boxes2 should have the same type, got ",
+      boxes1.scalar_type(),
+      " and ",
+      boxes2.scalar_type());
+}
+
+template <typename scalar_t>
+std::vector<scalar_t> box_areas(const scalar_t* boxes, int64_t n) {
+  std::vector<scalar_t> areas(n);
+  for (int64_t i = 0; i < n; i++) {
+    areas[i] = (boxes[4 * i + 2] - boxes[4 * i]) *
+        (boxes[4 * i + 3] - boxes[4 * i + 1]);
+  }
+  return areas;
+}
+
+// Same arithmetic as box_iou and generalized_box_iou in ops/boxes.py
+template <typename scalar_t>
+inline scalar_t pair_iou(
+    const scalar_t* b1,
+    scalar_t area1,
+    const scalar_t* b2,
+    scalar_t area2,
+    bool generalized) {
+  scalar_t w = std::max(
+      std::min(b1[2], b2[2]) - std::max(b1[0], b2[0]), scalar_t(0));
+  scalar_t h = std::max(
+      std::min(b1[3], b2[3]) - std::max(b1[1], b2[1]), scalar_t(0));
+  scalar_t inter = w * h;
+  scalar_t uni = area1 + area2 - inter;
+  scalar_t iou = inter / uni;
+  if (!generalized)
+    return iou;
+  scalar_t wi = std::max(
+      std::max(b1[2], b2[2]) - std::min(b1[0], b2[0]), scalar_t(0));
+  scalar_t hi = std::max(
+      std::max(b1[3], b2[3]) - std::min(b1[1], b2[1]), scalar_t(0));
+  scalar_t areai = wi * hi;
+  return iou - (areai - uni) / areai;
+}
+
+template <typename scalar_t>
+std::tuple<at::Tensor, at::Tensor> box_iou_max_kernel_impl(
+    const at::Tensor& boxes1,
+    const at::Tensor& boxes2,
+    bool generalized) {
+  auto boxes1_t = boxes1.contiguous();
+  auto boxes2_t = boxes2.contiguous();
+  auto n = boxes1.size(0);
+  auto m = boxes2.size(0);
+  auto b1 = boxes1_t.data_ptr<scalar_t>();
+  auto b2 = boxes2_t.data_ptr<scalar_t>();
+
+  at::Tensor values_t = at::empty({n}, boxes1.options());
+  at::Tensor indices_t = at::empty({n}, boxes1.options().dtype(at::kLong));
+  auto values = values_t.data_ptr<scalar_t>();
+  auto indices = indices_t.data_ptr<int64_t>();
+
+  auto areas1 = box_areas(b1, n);
+  auto areas2 = box_areas(b2, m);
+
+  at::parallel_for(0, n, kRowsPerBlock, [&](int64_t begin, int64_t end) {
+    for (int64_t i = begin; i < end; i++) {
+      scalar_t best =
+          pair_iou(b1 + 4 * i, areas1[i], b2, areas2[0], generalized);
+      int64_t best_j = 0;
+      for (int64_t j = 1; j < m; j++) {
+        auto iou = pair_iou(
+            b1 + 4 * i, areas1[i], b2 + 4 * j, areas2[j], generalized);
+        // strict comparison, so that ties keep the first box like torch.max
+        if (iou > best) {
+          best = iou;
+          best_j = j;
+        }
+      }
+      values[i] = best;
+      indices[i] = best_j;
+    }
+  });
+  return std::make_tuple(values_t, indices_t);
+}
+
+template <typename scalar_t>
+std::tuple<at::Tensor, at::Tensor> box_iou_pairs_kernel_impl(
+    const at::Tensor& boxes1,
+    const at::Tensor& boxes2,
+    double threshold,
+    bool generalized) {
+  auto boxes1_t = boxes1.contiguous();
+  auto boxes2_t = boxes2.contiguous();
+  auto n = boxes1.size(0);
+  auto m = boxes2.size(0);
+  auto b1 = boxes1_t.data_ptr<scalar_t>();
+  auto b2 = boxes2_t.data_ptr<scalar_t>();
+
+  auto areas1 = box_areas(b1, n);
+  auto areas2 = box_areas(b2, m);
+
+  // compared in the type of the boxes, like torch.where(iou >= threshold)
+  auto thresh = static_cast<scalar_t>(threshold);
+
+  // the pairs of every block of rows are gathered separately, and copied to
+  // the output in the order of the blocks so that it is sorted by row
+  auto nblocks = (n + kRowsPerBlock - 1) / kRowsPerBlock;
+  std::vector<std::vector<int64_t>> block_pairs(nblocks);
+  std::vector<std::vector<scalar_t>> block_values(nblocks);
+  at::parallel_for(0, nblocks, 1, [&](int64_t begin, int64_t end) {
+    for (int64_t b = begin; b < end; b++) {
+      auto& pairs = block_pairs[b];
+      auto& vals = block_values[b];
+      auto row_end = std::min((b + 1) * kRowsPerBlock, n);
+      for (int64_t i = b * kRowsPerBlock; i < row_end; i++) {
+        for (int64_t j = 0; j < m; j++) {
+          auto iou = pair_iou(
+              b1 + 4 * i, areas1[i], b2 + 4 * j, areas2[j], generalized);
+          if (iou >= thresh) {
+            pairs.push_back(i);
+            pairs.push_back(j);
+            vals.push_back(iou);
+          }
+        }
+      }
+    }
+  });
+
+  int64_t num_pairs = 0;
+  for (const auto& vals : block_values)
+    num_pairs += vals.size();
+  at::Tensor pairs_t =
+      at::empty({num_pairs, 2}, boxes1.options().dtype(at::kLong));
+  at::Tensor values_t = at::empty({num_pairs}, boxes1.options());
+  auto pairs = pairs_t.data_ptr<int64_t>();
+  auto values = values_t.data_ptr<scalar_t>();
+  for (int64_t b = 0; b < nblocks; b++) {
+    pairs = std::copy(block_pairs[b].begin(), block_pairs[b].end(), pairs);
+    values =
+        std::copy(block_values[b].begin(), block_values[b].end(), values);
+  }
+  return std::make_tuple(pairs_t, values_t);
+}
+
+std::tuple<at::Tensor, at::Tensor> box_iou_max_kernel(
+    const at::Tensor& boxes1,
+    const at::Tensor& boxes2,
+    bool generalized) {
+  check_box_iou_inputs(boxes1, boxes2);
+  TORCH_CHECK(boxes2.size(0) > 0, "boxes2 should contain at least one box");
+
+  std::tuple<at::Tensor, at::Tensor> result;
+  AT_DISPATCH_FLOATING_TYPES(boxes1.scalar_type(), "box_iou_max_kernel", [&] {
+    result = box_iou_max_kernel_impl<scalar_t>(boxes1, boxes2, generalized);
+  });
+  return result;
+}
+
+std::tuple<at::Tensor, at::Tensor> box_iou_pairs_kernel(
+    const at::Tensor& boxes1,
+    const at::Tensor& boxes2,
+    double threshold,
+    bool generalized) {
+  check_box_iou_inputs(boxes1, boxes2);
+
+  std::tuple<at::Tensor, at::Tensor> result;
+  AT_DISPATCH_FLOATING_TYPES(
+      boxes1.scalar_type(), "box_iou_pairs_kernel", [&] {
+        result = box_iou_pairs_kernel_impl<scalar_t>(
+            boxes1, boxes2, threshold, generalized);
+      });
+  return result;
+}
+
+} // namespace
+
+TORCH_LIBRARY_IMPL(torchvision, CPU, m) {
+  m.impl(
+      TORCH_SELECTIVE_NAME("torchvision::box_iou_max"),
+      TORCH_FN(box_iou_max_kernel));
+  m.impl(
+      TORCH_SELECTIVE_NAME("torchvision::box_iou_pairs"),
+      TORCH_FN(box_iou_pairs_kernel));
+}
+
+} // namespace ops
+} // namespace vision
@@ -76,6 +76,11 @@ namespace {
 
 const int kMaxParallelImgs = 32;
 
+// Upper bound on the size of the im2col column buffer. The images of a batch
+// are processed in blocks small enough for their columns to fit in it, so the
+// peak memory of the op does not grow with the batch size.
+const int64_t kMaxColumnsBytes = 64 * 1024 * 1024;
+
 template <typename scalar_t>
 scalar_t bilinear_interpolate(
     const scalar_t* in,
@@ -215,8 +220,12 @@ void deformable_im2col(
     at::Tensor data_col) {
   int num_kernels = n_in_channels * out_h * out_w * parallel_imgs;
 
-  AT_DISPATCH_FLOATING_TYPES_AND_HALF(
-      input.scalar_type(), "deformable_im2col", ([&] {
+  AT_DISPATCH_FLOATING_TYPES_AND2(
+      at::ScalarType::Half,
+      at::ScalarType::BFloat16,
+      input.scalar_type(),
+      "deformable_im2col",
+      ([&] {
         deformable_im2col_kernel(
             num_kernels,
             input.data_ptr<scalar_t>(),
@@ -251,6 +260,23 @@ int get_greatest_divisor_below_bound(int n, int bound) {
   return 1;
 }
 
+int get_n_parallel_imgs(
+    int batch_sz,
+    int n_in_channels,
+    int weight_h,
+    int weight_w,
+    int out_h,
+    int out_w,
+    int64_t element_size) {
+  int64_t img_columns_bytes = std::max<int64_t>(
+      int64_t(n_in_channels) * weight_h * weight_w * out_h * out_w *
+          element_size,
+      1);
+  int64_t bound = std::max<int64_t>(kMaxColumnsBytes / img_columns_bytes, 1);
+  return get_greatest_divisor_below_bound(
+      batch_sz, static_cast<int>(std::min<int64_t>(kMaxParallelImgs, bound)));
+}
+
 template <typename scalar_t>
 void deformable_col2im_kernel(
     int n,
@@ -353,8 +379,12 @@ void compute_grad_input(
   int num_kernels =
       channels * weight_h * weight_w * out_h * out_w * parallel_imgs;
 
-  AT_DISPATCH_FLOATING_TYPES_AND_HALF(
-      columns.scalar_type(), "compute_grad_input", ([&] {
+  AT_DISPATCH_FLOATING_TYPES_AND2(
+      at::ScalarType::Half,
+      at::ScalarType::BFloat16,
+      columns.scalar_type(),
+      "compute_grad_input",
+      ([&] {
         deformable_col2im_kernel(
             num_kernels,
             columns.data_ptr<scalar_t>(),
@@ -554,8 +584,12 @@ void compute_grad_offset_and_mask(
   int num_kernels =
       out_h * out_w * 2 * weight_h * weight_w * n_offset_grps * parallel_imgs;
 
-  AT_DISPATCH_FLOATING_TYPES_AND_HALF(
-      columns.scalar_type(), "compute_grad_offset_and_mask", ([&] {
+  AT_DISPATCH_FLOATING_TYPES_AND2(
+      at::ScalarType::Half,
+      at::ScalarType::BFloat16,
+      columns.scalar_type(),
+      "compute_grad_offset_and_mask",
+      ([&] {
         deformable_col2im_coord_kernel(
             num_kernels,
             columns.data_ptr<scalar_t>(),
@@ -896,9 +930,6 @@ at::Tensor deform_conv2d_forward_kernel(
   int in_h = input_c.size(2);
   int in_w = input_c.size(3);
 
-  int n_parallel_imgs =
-      get_greatest_divisor_below_bound(batch_sz, kMaxParallelImgs);
-
   // Unpack shapes and args
   int out_channels = weight_c.size(0);
   int weight_h = weight_c.size(2);
@@ -980,6 +1011,15 @@ at::Tensor deform_conv2d_forward_kernel(
       " out_w: ",
       out_w);
 
+  int n_parallel_imgs = get_n_parallel_imgs(
+      batch_sz,
+      n_in_channels,
+      weight_h,
+      weight_w,
+      out_h,
+      out_w,
+      input_c.element_size());
+
   auto out =
       at::zeros({batch_sz, out_channels, out_h, out_w}, input_c.options());
   if (batch_sz == 0) {
@@ -1012,20 +1052,7 @@ at::Tensor deform_conv2d_forward_kernel(
          out_w});
   }
 
-  at::Tensor out_buf = at::zeros(
-      {batch_sz / n_parallel_imgs,
-       out_channels,
-       n_parallel_imgs * out_h,
-       out_w},
-      out.options());
-
   // Separate channels into convolution groups
-  out_buf = out_buf.view(
-      {out_buf.size(0),
-       n_weight_grps,
-       out_buf.size(1) / n_weight_grps,
-       out_buf.size(2),
-       out_buf.size(3)});
   weight_c = weight_c.view(
       {n_weight_grps,
        weight_c.size(0) / n_weight_grps,
@@ -1033,10 +1060,16 @@ at::Tensor deform_conv2d_forward_kernel(
        weight_c.size(2),
        weight_c.size(3)});
 
-  // Sample points and perform convolution
+  // Sample points and perform convolution. The output of a block is computed
+  // in a buffer of the size of the block and then copied to its images.
   auto columns = at::zeros(
       {n_in_channels * weight_h * weight_w, n_parallel_imgs * out_h * out_w},
       input_c.options());
+  at::Tensor out_buf = at::empty(
+      {n_weight_grps,
+       out_channels / n_weight_grps,
+       n_parallel_imgs * out_h * out_w},
+      out.options());
   for (int b = 0; b < batch_sz / n_parallel_imgs; b++) {
     deformable_im2col(
         input_c[b],
@@ -1063,23 +1096,17 @@ at::Tensor deform_conv2d_forward_kernel(
     columns = columns.view(
         {n_weight_grps, columns.size(0) / n_weight_grps, columns.size(1)});
     for (int g = 0; g < n_weight_grps; g++) {
-      out_buf[b][g] = out_buf[b][g]
-                          .flatten(1)
-                          .addmm_(weight_c[g].flatten(1), columns[g])
-                          .view_as(out_buf[b][g]);
+      auto out_buf_g = out_buf[g];
+      at::mm_out(out_buf_g, weight_c[g].flatten(1), columns[g]);
     }
     columns =
         columns.view({columns.size(0) * columns.size(1), columns.size(2)});
+
+    out[b].copy_(
+        out_buf.view({out_channels, n_parallel_imgs, out_h, out_w})
+            .transpose(0, 1));
   }
 
-  out_buf = out_buf.view(
-      {batch_sz / n_parallel_imgs,
-       out_channels,
-       n_parallel_imgs,
-       out_h,
-       out_w});
-  out_buf.transpose_(1, 2);
-  out.copy_(out_buf);
   out = out.view({batch_sz, out_channels, out_h, out_w});
 
   return out + bias_c.view({1, out_channels, 1, 1});
@@ -1110,8 +1137,14 @@ deform_conv2d_backward_kernel(
   at::Tensor bias_c = bias.contiguous();
 
   const int batch_sz = input_c.size(0);
-  const int n_parallel_imgs =
-      get_greatest_divisor_below_bound(batch_sz, kMaxParallelImgs);
+  const int n_parallel_imgs = get_n_parallel_imgs(
+      batch_sz,
+      input_c.size(1),
+      weight_c.size(2),
+      weight_c.size(3),
+      grad_out_c.size(2),
+      grad_out_c.size(3),
+      input_c.element_size());
 
   auto grad_input_and_offset_and_mask = backward_gradient_inputs(
       input_c,
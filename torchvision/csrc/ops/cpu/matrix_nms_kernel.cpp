@@ -0,0 +1,167 @@
+#include <ATen/ATen.h>
+#include <ATen/Parallel.h>
+#include <torch/library.h>
+
+#include <limits>
+
+#include "./nms_common.h"
+
+namespace vision {
+namespace ops {
+
+namespace {
+
+enum MatrixNMSKernel { LINEAR = 0, GAUSSIAN = 1 };
+
+template <typename scalar_t>
+std::tuple<at::Tensor, at::Tensor> matrix_nms_kernel_impl(
+    const at::Tensor& dets,
+    const at::Tensor& scores,
+    const at::Tensor& idxs,
+    const at::Tensor& image_offsets,
+    double sigma,
+    double score_threshold,
+    int64_t kernel,
+    int64_t max_output) {
+  auto dets_t = dets.contiguous();
+  auto scores_t = scores.contiguous();
+  auto idxs_t = idxs.to(at::kLong).contiguous();
+  auto offsets_t = image_offsets.to(at::kLong).contiguous();
+
+  auto ndets = dets.size(0);
+  auto nimages = offsets_t.size(0) - 1;
+  auto dets_data = dets_t.data_ptr<scalar_t>();
+  auto scores_data = scores_t.data_ptr<scalar_t>();
+  auto idxs_data = idxs_t.data_ptr<int64_t>();
+  auto offsets = offsets_t.data_ptr<int64_t>();
+
+  detail::check_image_offsets(offsets, nimages, ndets);
+
+  at::Tensor keep_t = at::empty({ndets}, dets.options().dtype(at::kLong));
+  at::Tensor new_scores_t = at::empty({ndets}, scores.options());
+  auto keep = keep_t.data_ptr<int64_t>();
+  auto new_scores = new_scores_t.data_ptr<scalar_t>();
+  std::vector<int64_t> num_kept(nimages);
+
+  std::vector<int64_t> order;
+  std::vector<scalar_t> sorted_boxes;
+  std::vector<int64_t> sorted_idxs;
+  std::vector<scalar_t> areas;
+  std::vector<scalar_t> max_iou;
+  std::vector<scalar_t> decayed;
+
+  // Unlike nms, the decay of every box only depends on the boxes with a higher
+  // score, so the boxes of an image are processed in parallel.
+  for (int64_t b = 0; b < nimages; b++) {
+    auto start = offsets[b];
+    auto n = offsets[b + 1] - start;
+    auto image_scores = scores_data + start;
+
+    detail::sort_by_decreasing_score(order, image_scores, n);
+    sorted_boxes.resize(4 * n);
+    sorted_idxs.resize(n);
+    for (int64_t k = 0; k < n; k++) {
+      std::copy(
+          dets_data + 4 * (start + order[k]),
+          dets_data + 4 * (start + order[k] + 1),
+          sorted_boxes.begin() + 4 * k);
+      sorted_idxs[k] = idxs_data[start + order[k]];
+    }
+    auto boxes = sorted_boxes.data();
+    detail::box_areas(areas, boxes, n);
+
+    // largest IoU of every box with a box of the same category and a higher
+    // score, which measures how much the box itself is likely to be suppressed
+    max_iou.assign(n, 0);
+    at::parallel_for(0, n, 64, [&](int64_t begin, int64_t end) {
+      for (int64_t k = begin; k < end; k++) {
+        for (int64_t m = 0; m < k; m++) {
+          if (sorted_idxs[m] == sorted_idxs[k])
+            max_iou[k] = std::max(
+                max_iou[k], detail::box_iou(boxes, areas.data(), m, k));
+        }
+      }
+    });
+
+    // duplicated boxes have a max_iou of 1, clamp the denominator of the
+    // linear kernel so that they decay the boxes they overlap instead of
+    // producing NaNs
+    const scalar_t eps = std::numeric_limits<scalar_t>::epsilon();
+    decayed.resize(n);
+    at::parallel_for(0, n, 64, [&](int64_t begin, int64_t end) {
+      for (int64_t k = begin; k < end; k++) {
+        scalar_t decay = 1;
+        for (int64_t m = 0; m < k; m++) {
+          if (sorted_idxs[m] != sorted_idxs[k])
+            continue;
+          auto iou = detail::box_iou(boxes, areas.data(), m, k);
+          scalar_t box_decay = kernel == GAUSSIAN
+              ? std::exp(-sigma * (iou * iou - max_iou[m] * max_iou[m]))
+              : (1 - iou) / std::max(1 - max_iou[m], eps);
+          decay = std::min(decay, box_decay);
+        }
+        decayed[k] = image_scores[order[k]] * decay;
+      }
+    });
+
+    // the decayed scores are not sorted anymore
+    std::vector<int64_t> ranks;
+    detail::sort_by_decreasing_score(ranks, decayed.data(), n);
+    int64_t num_to_keep = 0;
+    for (int64_t r = 0; r < n && num_to_keep != max_output; r++) {
+      auto k = ranks[r];
+      if (!(decayed[k] >= score_threshold))
+        break;
+      keep[start + num_to_keep] = start + order[k];
+      new_scores[start + num_to_keep] = decayed[k];
+      num_to_keep++;
+    }
+    num_kept[b] = num_to_keep;
+  }
+
+  return std::make_tuple(
+      detail::concat_kept<int64_t>(keep_t, offsets, num_kept),
+      detail::concat_kept<scalar_t>(new_scores_t, offsets, num_kept));
+}
+
+std::tuple<at::Tensor, at::Tensor> matrix_nms_kernel(
+    const at::Tensor& dets,
+    const at::Tensor& scores,
+    const at::Tensor& idxs,
+    const at::Tensor& image_offsets,
+    double sigma,
+    double score_threshold,
+    int64_t kernel,
+    int64_t max_output) {
+  detail::check_batched_nms_inputs(dets, scores, idxs, image_offsets);
+  TORCH_CHECK(
+      kernel == LINEAR || kernel == GAUSSIAN,
+      "kernel should be 0 (linear) or 1 (gaussian), got ",
+      kernel);
+
+  std::tuple<at::Tensor, at::Tensor> result;
+
+  AT_DISPATCH_FLOATING_TYPES(dets.scalar_type(), "matrix_nms_kernel", [&] {
+    result = matrix_nms_kernel_impl<scalar_t>(
+        dets,
+        scores,
+        idxs,
+        image_offsets,
+        sigma,
+        score_threshold,
+        kernel,
+        max_output);
+  });
+  return result;
+}
+
+} // namespace
+
+TORCH_LIBRARY_IMPL(torchvision, CPU, m) {
+  m.impl(
+      TORCH_SELECTIVE_NAME("torchvision::matrix_nms"),
+      TORCH_FN(matrix_nms_kernel));
+}
+
+} // namespace ops
+} // namespace vision
@@ -0,0 +1,148 @@
+#include <ATen/ATen.h>
+#include <ATen/Parallel.h>
+#include <torch/library.h>
+
+#include <vector>
+
+#include "./roi_align_common.h"
+
+namespace vision {
+namespace ops {
+
+namespace {
+
+template <typename T>
+void multi_level_roi_align_kernel_impl(
+    const std::vector<at::Tensor>& inputs,
+    const T* rois,
+    const int64_t* levels,
+    at::ArrayRef<double> spatial_scales,
+    int64_t n_rois,
+    int channels,
+    int pooled_height,
+    int pooled_width,
+    int sampling_ratio,
+    bool aligned,
+    T* output) {
+  std::vector<const T*> input_data;
+  for (const auto& input : inputs)
+    input_data.push_back(input.data_ptr<T>());
+
+  // every roi is pooled from its own level and written at its place in the
+  // output, so the rois of all the levels are processed in parallel
+  at::parallel_for(0, n_rois, 1, [&](int64_t begin, int64_t end) {
+    for (int64_t n = begin; n < end; n++) {
+      auto level = levels[n];
+      detail::roi_align_forward_single_roi(
+          input_data[level],
+          static_cast<T>(spatial_scales[level]),
+          channels,
+          static_cast<int>(inputs[level].size(2)),
+          static_cast<int>(inputs[level].size(3)),
+          pooled_height,
+          pooled_width,
+          sampling_ratio,
+          aligned,
+          rois + n * 5,
+          output + n * channels * pooled_width * pooled_height);
+    }
+  });
+}
+
+at::Tensor multi_level_roi_align_kernel(
+    at::TensorList inputs,
+    const at::Tensor& rois,
+    const at::Tensor& levels,
+    at::ArrayRef<double> spatial_scales,
+    int64_t pooled_height,
+    int64_t pooled_width,
+    int64_t sampling_ratio,
+    bool aligned) {
+  TORCH_CHECK(!inputs.empty(), "inputs should contain at least one level");
+  TORCH_CHECK(
+      inputs.size() == spatial_scales.size(),
+      "inputs and spatial_scales should have the same length, got ",
+      inputs.size(),
+      " and ",
+      spatial_scales.size());
+  TORCH_CHECK(rois.device().is_cpu(), "rois must be a CPU tensor");
+  TORCH_CHECK(
+      rois.dim() == 2 && rois.size(1) == 5,
+      "rois must have shape as Tensor[K, 5]");
+  TORCH_CHECK(
+      levels.dim() == 1 && levels.size(0) == rois.size(0),
+      "levels should be a Tensor[K], got ",
+      levels.sizes());
+
+  const auto& first = inputs[0];
+  for (const auto& input : inputs) {
+    TORCH_CHECK(input.device().is_cpu(), "inputs must be CPU tensors");
+    TORCH_CHECK(input.dim() == 4, "inputs should be 4d tensors");
+    TORCH_CHECK(
+        input.size(0) == first.size(0) && input.size(1) == first.size(1),
+        "inputs should all have the same batch size and number of channels");
+    TORCH_CHECK(
+        input.scalar_type() == rois.scalar_type(),
+        "inputs and rois should have the same type, got ",
+        input.scalar_type(),
+        " and ",
+        rois.scalar_type());
+  }
+
+  auto num_rois = rois.size(0);
+  auto channels = first.size(1);
+  auto num_levels = static_cast<int64_t>(inputs.size());
+
+  auto levels_ = levels.to(at::kLong).contiguous();
+  auto levels_data = levels_.data_ptr<int64_t>();
+  for (int64_t n = 0; n < num_rois; n++) {
+    TORCH_CHECK(
+        levels_data[n] >= 0 && levels_data[n] < num_levels,
+        "levels should be in [0, ",
+        num_levels,
+        "), got ",
+        levels_data[n]);
+  }
+
+  at::Tensor output = at::zeros(
+      {num_rois, channels, pooled_height, pooled_width}, first.options());
+
+  if (output.numel() == 0)
+    return output;
+
+  std::vector<at::Tensor> inputs_;
+  for (const auto& input : inputs)
+    inputs_.push_back(input.contiguous());
+  auto rois_ = rois.contiguous();
+  AT_DISPATCH_FLOATING_TYPES_AND2(
+      at::ScalarType::Half,
+      at::ScalarType::BFloat16,
+      first.scalar_type(),
+      "multi_level_roi_align_kernel",
+      [&] {
+        multi_level_roi_align_kernel_impl<scalar_t>(
+            inputs_,
+            rois_.data_ptr<scalar_t>(),
+            levels_data,
+            spatial_scales,
+            num_rois,
+            channels,
+            pooled_height,
+            pooled_width,
+            sampling_ratio,
+            aligned,
+            output.data_ptr<scalar_t>());
+      });
+  return output;
+}
+
+} // namespace
+
+TORCH_LIBRARY_IMPL(torchvision, CPU, m) {
+  m.impl(
+      TORCH_SELECTIVE_NAME("torchvision::multi_level_roi_align"),
+      TORCH_FN(multi_level_roi_align_kernel));
+}
+
+} // namespace ops
+} // namespace vision
@@ -0,0 +1,132 @@
+#pragma once
+
+#include <ATen/ATen.h>
+
+#include <algorithm>
+#include <cmath>
+#include <numeric>
+#include <vector>
+
+namespace vision {
+namespace ops {
+namespace detail {
+
+// Checks the inputs shared by the batched NMS kernels: boxes of several images
+// concatenated along the first dimension, their scores, their category indices
+// and the boundaries of the images.
+inline void check_batched_nms_inputs(
+    const at::Tensor& dets,
+    const at::Tensor& scores,
+    const at::Tensor& idxs,
+    const at::Tensor& image_offsets) {
+  TORCH_CHECK(
+      dets.dim() == 2, "boxes should be a 2d tensor, got ", dets.dim(), "D");
+  TORCH_CHECK(
+      dets.size(1) == 4,
+      "boxes should have 4 elements in dimension 1, got ",
+      dets.size(1));
+  TORCH_CHECK(
+      scores.dim() == 1,
+      "scores should be a 1d tensor, got ",
+      scores.dim(),
+      "D");
+  TORCH_CHECK(
+      idxs.dim() == 1, "idxs should be a 1d tensor, got ", idxs.dim(), "D");
+  TORCH_CHECK(
+      dets.size(0) == scores.size(0) && dets.size(0) == idxs.size(0),
+      "boxes, scores and idxs should have same number of elements in ",
+      "dimension 0, got ",
+      dets.size(0),
+      ", ",
+      scores.size(0),
+      " and ",
+      idxs.size(0));
+  TORCH_CHECK(
+      image_offsets.dim() == 1 && image_offsets.size(0) > 0,
+      "image_offsets should be a non-empty 1d tensor");
+  TORCH_CHECK(
+      dets.scalar_type() == scores.scalar_type(),
+      "dets should have the same type as scores");
+}
+
+inline void check_image_offsets(
+    const int64_t* offsets,
+    int64_t nimages,
+    int64_t ndets) {
+  TORCH_CHECK(
+      offsets[0] == 0 && offsets[nimages] == ndets,
+      "image_offsets should start at 0 and end at the number of boxes, got ",
+      offsets[0],
+      " and ",
+      offsets[nimages]);
+  for (int64_t b = 0; b < nimages; b++) {
+    TORCH_CHECK(
+        offsets[b] <= offsets[b + 1], "image_offsets should be non-decreasing");
+  }
+}
+
+// Stable sort of [0, n) by decreasing score, with NaNs first like at::sort.
+template <typename scalar_t>
+void sort_by_decreasing_score(
+    std::vector<int64_t>& order,
+    const scalar_t* scores,
+    int64_t n) {
+  order.resize(n);
+  std::iota(order.begin(), order.end(), 0);
+  std::stable_sort(order.begin(), order.end(), [&](int64_t i, int64_t j) {
+    auto si = scores[i];
+    auto sj = scores[j];
+    return si > sj || (std::isnan(si) && !std::isnan(sj));
+  });
+}
+
+template <typename scalar_t>
+void box_areas(std::vector<scalar_t>& areas, const scalar_t* boxes, int64_t n) {
+  areas.resize(n);
+  for (int64_t i = 0; i < n; i++) {
+    areas[i] = (boxes[4 * i + 2] - boxes[4 * i]) *
+        (boxes[4 * i + 3] - boxes[4 * i + 1]);
+  }
+}
+
+template <typename scalar_t>
+inline scalar_t box_iou(
+    const scalar_t* boxes,
+    const scalar_t* areas,
+    int64_t i,
+    int64_t j) {
+  auto xx1 = std::max(boxes[4 * i], boxes[4 * j]);
+  auto yy1 = std::max(boxes[4 * i + 1], boxes[4 * j + 1]);
+  auto xx2 = std::min(boxes[4 * i + 2], boxes[4 * j + 2]);
+  auto yy2 = std::min(boxes[4 * i + 3], boxes[4 * j + 3]);
+
+  auto w = std::max(static_cast<scalar_t>(0), xx2 - xx1);
+  auto h = std::max(static_cast<scalar_t>(0), yy2 - yy1);
+  auto inter = w * h;
+  return inter / (areas[i] + areas[j] - inter);
+}
+
+// The kernels process the images concurrently and write the results of every
+// image to the slots of its boxes. This concatenates the first num_kept[b]
+// slots of every image b.
+template <typename T>
+at::Tensor concat_kept(
+    const at::Tensor& slots,
+    const int64_t* offsets,
+    const std::vector<int64_t>& num_kept) {
+  auto total = std::accumulate(num_kept.begin(), num_kept.end(), int64_t(0));
+  at::Tensor result = at::empty({total}, slots.options());
+  auto slots_data = slots.data_ptr<T>();
+  auto result_data = result.data_ptr<T>();
+  for (size_t b = 0; b < num_kept.size(); b++) {
+    result_data = std::copy(
+        slots_data + offsets[b],
+        slots_data + offsets[b] + num_kept[b],
+        result_data);
+  }
+  return result;
+}
+
+} // namespace detail
+} // namespace ops
+} // namespace vision
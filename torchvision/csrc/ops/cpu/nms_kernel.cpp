@@ -1,6 +1,9 @@
 #include <ATen/ATen.h>
+#include <ATen/Parallel.h>
 #include <torch/library.h>
 
+#include "./nms_common.h"
+
 namespace vision {
 namespace ops {
 
@@ -76,6 +79,101 @@ at::Tensor nms_kernel_impl(
   return keep_t.narrow(/*dim=*/0, /*start=*/0, /*length=*/num_to_keep);
 }
 
+template <typename scalar_t>
+at::Tensor batched_nms_kernel_impl(
+    const at::Tensor& dets,
+    const at::Tensor& scores,
+    const at::Tensor& idxs,
+    const at::Tensor& image_offsets,
+    double iou_threshold,
+    int64_t max_output) {
+  auto dets_t = dets.contiguous();
+  auto scores_t = scores.contiguous();
+  auto idxs_t = idxs.to(at::kLong).contiguous();
+  auto offsets_t = image_offsets.to(at::kLong).contiguous();
+
+  auto ndets = dets.size(0);
+  auto nimages = offsets_t.size(0) - 1;
+  auto dets_data = dets_t.data_ptr<scalar_t>();
+  auto scores_data = scores_t.data_ptr<scalar_t>();
+  auto idxs_data = idxs_t.data_ptr<int64_t>();
+  auto offsets = offsets_t.data_ptr<int64_t>();
+
+  detail::check_image_offsets(offsets, nimages, ndets);
+
+  at::Tensor keep_t = at::empty({ndets}, dets.options().dtype(at::kLong));
+  auto keep = keep_t.data_ptr<int64_t>();
+  std::vector<int64_t> num_kept(nimages);
+
+  at::parallel_for(0, nimages, 1, [&](int64_t begin, int64_t end) {
+    std::vector<int64_t> order;
+    std::vector<int64_t> category_order;
+    std::vector<uint8_t> suppressed;
+    std::vector<uint8_t> kept;
+    std::vector<scalar_t> areas;
+
+    for (int64_t b = begin; b < end; b++) {
+      auto start = offsets[b];
+      auto n = offsets[b + 1] - start;
+      auto boxes = dets_data + 4 * start;
+      auto image_scores = scores_data + start;
+      auto image_idxs = idxs_data + start;
+
+      detail::sort_by_decreasing_score(order, image_scores, n);
+      // boxes of different categories never suppress each other: group the
+      // boxes by category, still sorted by decreasing score within each
+      // category, and only compare the boxes of the same group
+      category_order = order;
+      std::stable_sort(
+          category_order.begin(),
+          category_order.end(),
+          [&](int64_t i, int64_t j) { return image_idxs[i] < image_idxs[j]; });
+      detail::box_areas(areas, boxes, n);
+      suppressed.assign(n, 0);
+      kept.assign(n, 0);
+
+      for (int64_t group_start = 0; group_start < n;) {
+        auto idx = image_idxs[category_order[group_start]];
+        auto group_end = group_start + 1;
+        while (group_end < n && image_idxs[category_order[group_end]] == idx)
+          group_end++;
+
+        // a category can't contribute more than max_output boxes
+        int64_t num_kept_in_category = 0;
+        for (int64_t _i = group_start;
+             _i < group_end && num_kept_in_category != max_output;
+             _i++) {
+          auto i = category_order[_i];
+          if (suppressed[i] == 1)
+            continue;
+          kept[i] = 1;
+          if (++num_kept_in_category == max_output)
+            break;
+          for (int64_t _j = _i + 1; _j < group_end; _j++) {
+            auto j = category_order[_j];
+            if (suppressed[j] == 1)
+              continue;
+            if (detail::box_iou(boxes, areas.data(), i, j) > iou_threshold)
+              suppressed[j] = 1;
+          }
+        }
+        group_start = group_end;
+      }
+
+      // merge the boxes kept in all the categories by decreasing score
+      int64_t num_to_keep = 0;
+      for (int64_t _i = 0; _i < n && num_to_keep != max_output; _i++) {
+        auto i = order[_i];
+        if (kept[i] == 1)
+          keep[start + num_to_keep++] = start + i;
+      }
+      num_kept[b] = num_to_keep;
+    }
+  });
+
+  return detail::concat_kept<int64_t>(keep_t, offsets, num_kept);
+}
+
 at::Tensor nms_kernel(
     const at::Tensor& dets,
     const at::Tensor& scores,
@@ -107,10 +205,31 @@ at::Tensor nms_kernel(
   return result;
 }
 
+at::Tensor batched_nms_kernel(
+    const at::Tensor& dets,
+    const at::Tensor& scores,
+    const at::Tensor& idxs,
+    const at::Tensor& image_offsets,
+    double iou_threshold,
+    int64_t max_output) {
+  detail::check_batched_nms_inputs(dets, scores, idxs, image_offsets);
+
+  auto result = at::empty({0}, dets.options());
+
+  AT_DISPATCH_FLOATING_TYPES(dets.scalar_type(), "batched_nms_kernel", [&] {
+    result = batched_nms_kernel_impl<scalar_t>(
+        dets, scores, idxs, image_offsets, iou_threshold, max_output);
+  });
+  return result;
+}
+
 } // namespace
 
 TORCH_LIBRARY_IMPL(torchvision, CPU, m) {
   m.impl(TORCH_SELECTIVE_NAME("torchvision::nms"), TORCH_FN(nms_kernel));
+  m.impl(
+      TORCH_SELECTIVE_NAME("torchvision::batched_nms"),
+      TORCH_FN(batched_nms_kernel));
 }
 
 } // namespace ops
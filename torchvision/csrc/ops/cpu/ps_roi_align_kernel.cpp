@@ -338,8 +338,12 @@ std::tuple<at::Tensor, at::Tensor> ps_roi_align_forward_kernel(
   }
 
   auto input_ = input.contiguous(), rois_ = rois.contiguous();
-  AT_DISPATCH_FLOATING_TYPES_AND_HALF(
-      input.scalar_type(), "ps_roi_align_forward_kernel", [&] {
+  AT_DISPATCH_FLOATING_TYPES_AND2(
+      at::ScalarType::Half,
+      at::ScalarType::BFloat16,
+      input.scalar_type(),
+      "ps_roi_align_forward_kernel",
+      [&] {
         ps_roi_align_forward_kernel_impl<scalar_t>(
             num_rois,
             input_.data_ptr<scalar_t>(),
@@ -394,8 +398,12 @@ at::Tensor ps_roi_align_backward_kernel(
   int channels_out = channels / (pooled_height * pooled_width);
 
   auto grad_ = grad.contiguous(), rois_ = rois.contiguous();
-  AT_DISPATCH_FLOATING_TYPES_AND_HALF(
-      grad.scalar_type(), "ps_roi_align_backward_kernel", [&] {
+  AT_DISPATCH_FLOATING_TYPES_AND2(
+      at::ScalarType::Half,
+      at::ScalarType::BFloat16,
+      grad.scalar_type(),
+      "ps_roi_align_backward_kernel",
+      [&] {
         ps_roi_align_backward_kernel_impl<scalar_t>(
             grad.numel(),
             grad_.data_ptr<scalar_t>(),
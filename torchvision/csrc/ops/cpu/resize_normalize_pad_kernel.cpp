@@ -0,0 +1,211 @@
+#include <ATen/ATen.h>
+#include <ATen/Parallel.h>
+#include <torch/library.h>
+
+#include <cmath>
+#include <vector>
+
+namespace vision {
+namespace ops {
+
+namespace {
+
+// Source pixels and weights of the bilinear interpolation of F.interpolate
+// (align_corners=False) from in_size to out_size pixels, along one axis.
+template <typename acc_t>
+struct AxisWeights {
+  std::vector<int64_t> index0;
+  std::vector<int64_t> index1;
+  std::vector<acc_t> lambda0;
+  std::vector<acc_t> lambda1;
+
+  AxisWeights(int64_t in_size, int64_t out_size)
+      : index0(out_size),
+        index1(out_size),
+        lambda0(out_size),
+        lambda1(out_size) {
+    acc_t scale = static_cast<acc_t>(in_size) / out_size;
+    for (int64_t i = 0; i < out_size; i++) {
+      acc_t half = 0.5;
+      acc_t src = std::max<acc_t>(scale * (i + half) - half, 0);
+      int64_t i0 = static_cast<int64_t>(src);
+      index0[i] = i0;
+      index1[i] = i0 + (i0 < in_size - 1 ? 1 : 0);
+      lambda1[i] = src - i0;
+      lambda0[i] = 1 - lambda1[i];
+    }
+  }
+};
+
+template <typename in_t, typename out_t>
+void resize_normalize_pad_kernel_impl(
+    at::TensorList images,
+    at::IntArrayRef sizes,
+    at::ArrayRef<double> mean,
+    at::ArrayRef<double> std,
+    at::Tensor& batch,
+    double value_scale) {
+  using acc_t = out_t;
+  auto nimages = static_cast<int64_t>(images.size());
+  auto channels = batch.size(1);
+  auto batch_height = batch.size(2);
+  auto batch_width = batch.size(3);
+  auto batch_data = batch.data_ptr<out_t>();
+
+  // out = (v * value_scale - mean) / std = v * multiplier + offset
+  std::vector<acc_t> multiplier(channels);
+  std::vector<acc_t> offset(channels);
+  for (int64_t c = 0; c < channels; c++) {
+    multiplier[c] = value_scale / std[c];
+    offset[c] = -mean[c] / std[c];
+  }
+
+  std::vector<AxisWeights<acc_t>> weights_x;
+  std::vector<AxisWeights<acc_t>> weights_y;
+  for (int64_t n = 0; n < nimages; n++) {
+    weights_x.emplace_back(images[n].size(2), sizes[2 * n + 1]);
+    weights_y.emplace_back(images[n].size(1), sizes[2 * n]);
+  }
+
+  // The rows of all the images are processed in parallel, so that a single
+  // image also uses all the threads. The images are read with their strides,
+  // which makes channels last images as fast as contiguous ones.
+  auto grain_size = std::max<int64_t>(
+      1,
+      at::internal::GRAIN_SIZE / std::max<int64_t>(1, channels * batch_width));
+  at::parallel_for(
+      0, nimages * batch_height, grain_size, [&](int64_t begin, int64_t end) {
+        for (int64_t row = begin; row < end; row++) {
+          auto n = row / batch_height;
+          auto y = row % batch_height;
+          auto out_height = sizes[2 * n];
+          auto out_width = sizes[2 * n + 1];
+          out_t* out_row =
+              batch_data + (n * channels * batch_height + y) * batch_width;
+          auto channel_stride = batch_height * batch_width;
+
+          if (y >= out_height) {
+            for (int64_t c = 0; c < channels; c++)
+              std::fill(
+                  out_row + c * channel_stride,
+                  out_row + c * channel_stride + batch_width,
+                  out_t(0));
+            continue;
+          }
+
+          const auto& image = images[n];
+          auto image_data = image.data_ptr<in_t>();
+          auto stride_c = image.stride(0);
+          auto stride_y = image.stride(1);
+          auto stride_x = image.stride(2);
+          const auto& wx = weights_x[n];
+          const auto& wy = weights_y[n];
+          auto ly0 = wy.lambda0[y];
+          auto ly1 = wy.lambda1[y];
+
+          for (int64_t c = 0; c < channels; c++) {
+            const in_t* row0 =
+                image_data + c * stride_c + wy.index0[y] * stride_y;
+            const in_t* row1 =
+                image_data + c * stride_c + wy.index1[y] * stride_y;
+            out_t* out = out_row + c * channel_stride;
+            for (int64_t x = 0; x < out_width; x++) {
+              auto x0 = wx.index0[x] * stride_x;
+              auto x1 = wx.index1[x] * stride_x;
+              acc_t value = ly0 *
+                      (wx.lambda0[x] * static_cast<acc_t>(row0[x0]) +
+                       wx.lambda1[x] * static_cast<acc_t>(row0[x1])) +
+                  ly1 *
+                      (wx.lambda0[x] * static_cast<acc_t>(row1[x0]) +
+                       wx.lambda1[x] * static_cast<acc_t>(row1[x1]));
+              out[x] = value * multiplier[c] + offset[c];
+            }
+            std::fill(out + out_width, out + batch_width, out_t(0));
+          }
+        }
+      });
+}
+
+void resize_normalize_pad_kernel(
+    at::TensorList images,
+    at::IntArrayRef sizes,
+    at::ArrayRef<double> mean,
+    at::ArrayRef<double> std,
+    at::Tensor& batch) {
+  auto nimages = static_cast<int64_t>(images.size());
+  TORCH_CHECK(nimages > 0, "images should not be empty");
+  TORCH_CHECK(
+      batch.dim() == 4, "batch should be a 4d tensor, got ", batch.dim(), "D");
+  TORCH_CHECK(batch.is_contiguous(), "batch should be contiguous");
+  TORCH_CHECK(
+      batch.size(0) == nimages,
+      "batch should have one element per image in dimension 0, got ",
+      batch.size(0),
+      " and ",
+      nimages,
+      " images");
+  TORCH_CHECK(
+      static_cast<int64_t>(sizes.size()) == 2 * nimages,
+      "sizes should have 2 elements per image, got ",
+      sizes.size(),
+      " for ",
+      nimages,
+      " images");
+  auto channels = batch.size(1);
+  TORCH_CHECK(
+      static_cast<int64_t>(mean.size()) == channels &&
+          static_cast<int64_t>(std.size()) == channels,
+      "mean and std should have one element per channel");
+
+  auto in_type = images[0].scalar_type();
+  for (int64_t n = 0; n < nimages; n++) {
+    const auto& image = images[n];
+    TORCH_CHECK(
+        image.dim() == 3,
+        "images should be 3d tensors of shape [C, H, W], got ",
+        image.dim(),
+        "D");
+    TORCH_CHECK(
+        image.scalar_type() == in_type, "images should all have the same type");
+    TORCH_CHECK(
+        image.size(0) == channels,
+        "images should have the same number of channels as batch, got ",
+        image.size(0),
+        " and ",
+        channels);
+    TORCH_CHECK(
+        image.size(1) > 0 && image.size(2) > 0, "images should not be empty");
+    TORCH_CHECK(
+        sizes[2 * n] > 0 && sizes[2 * n] <= batch.size(2) &&
+            sizes[2 * n + 1] > 0 && sizes[2 * n + 1] <= batch.size(3),
+        "the resized images should fit in batch");
+  }
+
+  if (in_type == at::kByte) {
+    TORCH_CHECK(
+        batch.scalar_type() == at::kFloat,
+        "batch should be a float tensor for uint8 images");
+    // uint8 images are converted to [0, 1]
+    resize_normalize_pad_kernel_impl<uint8_t, float>(
+        images, sizes, mean, std, batch, 1. / 255);
+    return;
+  }
+  TORCH_CHECK(
+      batch.scalar_type() == in_type,
+      "batch should have the same type as the images");
+  AT_DISPATCH_FLOATING_TYPES(in_type, "resize_normalize_pad_kernel", [&] {
+    resize_normalize_pad_kernel_impl<scalar_t, scalar_t>(
+        images, sizes, mean, std, batch, 1.);
+  });
+}
+
+} // namespace
+
+TORCH_LIBRARY_IMPL(torchvision, CPU, m) {
+  m.impl(
+      TORCH_SELECTIVE_NAME("torchvision::_resize_normalize_pad"),
+      TORCH_FN(resize_normalize_pad_kernel));
+}
+
+} // namespace ops
+} // namespace vision
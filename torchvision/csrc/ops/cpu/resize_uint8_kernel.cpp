@@ -0,0 +1,294 @@
+#include <ATen/ATen.h>
+#include <ATen/Parallel.h>
+#include <torch/library.h>
+
+#include <algorithm>
+#include <cmath>
+#include <type_traits>
+#include <vector>
+
+namespace vision {
+namespace ops {
+
+namespace {
+
+// Number of fractional bits of the fixed-point weights, as in Pillow: the sums
+// of uint8 pixels stay in int32 even with the negative lobes of the bicubic
+// filter.
+constexpr int kPrecisionBits = 32 - 8 - 2;
+
+double bilinear_filter(double x) {
+  x = std::abs(x);
+  return x < 1. ? 1. - x : 0.;
+}
+
+// Cubic convolution, with a = -0.5 in PIL and the antialiased modes of
+// F.interpolate, and a = -0.75 in its plain bicubic mode
+double bicubic_filter(double x, double a) {
+  x = std::abs(x);
+  if (x < 1.)
+    return ((a + 2.) * x - (a + 3.)) * x * x + 1.;
+  if (x < 2.)
+    return (((x - 5.) * x + 8.) * x - 4.) * a;
+  return 0.;
+}
+
+// Resampling from in_size to out_size pixels along one axis: output pixel i is
+// the sum of the size[i] input pixels from start[i], with the fixed-point
+// weights from i * ksize.
+struct AxisCoeffs {
+  int64_t ksize;
+  std::vector<int64_t> start;
+  std::vector<int64_t> size;
+  std::vector<int32_t> weights;
+
+  AxisCoeffs(int64_t in_size, int64_t out_size, bool bicubic, bool antialias)
+      : start(out_size), size(out_size) {
+    double scale = static_cast<double>(in_size) / out_size;
+    std::vector<double> values;
+
+    if (bicubic && !antialias) {
+      // Same as F.interpolate: the 4 pixels around the source position, with
+      // the weights of the pixels outside of the image put on its border.
+      ksize = std::min<int64_t>(4, in_size);
+      values.assign(out_size * ksize, 0.);
+      for (int64_t i = 0; i < out_size; i++) {
+        double src = scale * (i + 0.5) - 0.5;
+        auto x0 = static_cast<int64_t>(std::floor(src));
+        double t = src - x0;
+        start[i] = std::min(std::max<int64_t>(x0 - 1, 0), in_size - ksize);
+        size[i] = ksize;
+        for (int64_t k = 0; k < 4; k++) {
+          auto x = std::min(std::max<int64_t>(x0 - 1 + k, 0), in_size - 1);
+          values[i * ksize + x - start[i]] += bicubic_filter(t + 1 - k, -0.75);
+        }
+      }
+    } else {
+      // Same as Pillow and the antialiased modes of F.interpolate. Without
+      // antialiasing, the filter is not stretched when downsampling, which
+      // gives the weights of the plain bilinear mode of F.interpolate.
+      double filterscale = antialias ? std::max(scale, 1.) : 1.;
+      double support = (bicubic ? 2. : 1.) * filterscale;
+      ksize = static_cast<int64_t>(std::ceil(support)) * 2 + 1;
+      values.assign(out_size * ksize, 0.);
+      for (int64_t i = 0; i < out_size; i++) {
+        double center = (i + 0.5) * scale;
+        auto xmin = std::max<int64_t>(
+            static_cast<int64_t>(center - support + 0.5), 0);
+        auto xmax = std::min<int64_t>(
+            static_cast<int64_t>(center + support + 0.5), in_size);
+        start[i] = xmin;
+        size[i] = xmax - xmin;
+        double total = 0.;
+        double* w = &values[i * ksize];
+        for (int64_t k = 0; k < size[i]; k++) {
+          double x = (k + xmin - center + 0.5) / filterscale;
+          w[k] = bicubic ? bicubic_filter(x, -0.5) : bilinear_filter(x);
+          total += w[k];
+        }
+        if (total != 0.) {
+          for (int64_t k = 0; k < size[i]; k++)
+            w[k] /= total;
+        }
+      }
+    }
+
+    weights.resize(values.size());
+    for (size_t k = 0; k < values.size(); k++)
+      weights[k] =
+          static_cast<int32_t>(std::lround(values[k] * (1 << kPrecisionBits)));
+  }
+};
+
+// Fractional bits of the intermediate image between the two passes. It is
+// kept in int32 without clipping, like the float image of F.interpolate, so
+// that the overshoot of the bicubic filters in the first pass reaches the
+// second one: the output then only differs from the float path by its
+// rounding. Pillow instead clips to uint8 after each pass.
+constexpr int kIntermediateBits = 8;
+
+template <typename scalar_t>
+constexpr int fraction_bits() {
+  return std::is_same<scalar_t, uint8_t>::value ? 0 : kIntermediateBits;
+}
+
+// Rounds a sum of pixels with `bits` fractional bits to an output pixel, which
+// is clipped for uint8 outputs.
+template <typename out_t, typename acc_t>
+inline out_t round_pixel(acc_t acc, int bits) {
+  auto shift = bits - fraction_bits<out_t>();
+  acc = (acc + (static_cast<acc_t>(1) << (shift - 1))) >> shift;
+  if (std::is_same<out_t, uint8_t>::value)
+    acc = std::min<acc_t>(std::max<acc_t>(acc, 0), 255);
+  return static_cast<out_t>(acc);
+}
+
+int64_t grain_size(int64_t work_per_row) {
+  return std::max<int64_t>(
+      1, at::internal::GRAIN_SIZE / std::max<int64_t>(1, work_per_row));
+}
+
+// Both passes read and write the [N, C, H, W] tensors through their strides,
+// so that channels last (HWC) images are resized without a copy. The
+// horizontal pass reads uint8 pixels, whose sums fit in int32 as in Pillow.
+template <typename out_t>
+void resample_horizontal(
+    const at::Tensor& input,
+    at::Tensor& output,
+    const AxisCoeffs& coeffs) {
+  auto in_data = input.data_ptr<uint8_t>();
+  auto out_data = output.data_ptr<out_t>();
+  auto channels = output.size(1);
+  auto height = output.size(2);
+  auto out_width = output.size(3);
+  auto in_stride_x = input.stride(3);
+  auto out_stride_x = output.stride(3);
+
+  at::parallel_for(
+      0,
+      output.size(0) * height,
+      grain_size(channels * out_width * coeffs.ksize),
+      [&](int64_t begin, int64_t end) {
+        for (int64_t row = begin; row < end; row++) {
+          auto n = row / height;
+          auto y = row % height;
+          for (int64_t c = 0; c < channels; c++) {
+            const uint8_t* in_row = in_data + n * input.stride(0) +
+                c * input.stride(1) + y * input.stride(2);
+            out_t* out_row = out_data + n * output.stride(0) +
+                c * output.stride(1) + y * output.stride(2);
+            for (int64_t x = 0; x < out_width; x++) {
+              const uint8_t* src = in_row + coeffs.start[x] * in_stride_x;
+              const int32_t* w = &coeffs.weights[x * coeffs.ksize];
+              int32_t acc = 0;
+              for (int64_t k = 0; k < coeffs.size[x]; k++)
+                acc += src[k * in_stride_x] * w[k];
+              out_row[x * out_stride_x] =
+                  round_pixel<out_t>(acc, kPrecisionBits);
+            }
+          }
+        }
+      });
+}
+
+// The vertical pass reads uint8 pixels, or the intermediate image whose sums
+// need int64.
+template <typename in_t>
+void resample_vertical(
+    const at::Tensor& input,
+    at::Tensor& output,
+    const AxisCoeffs& coeffs) {
+  using acc_t = typename std::
+      conditional<std::is_same<in_t, uint8_t>::value, int32_t, int64_t>::type;
+  constexpr int bits = kPrecisionBits + fraction_bits<in_t>();
+  auto in_data = input.data_ptr<in_t>();
+  auto out_data = output.data_ptr<uint8_t>();
+  auto channels = output.size(1);
+  auto out_height = output.size(2);
+  auto width = output.size(3);
+  auto in_stride_y = input.stride(2);
+  auto in_stride_x = input.stride(3);
+  auto out_stride_x = output.stride(3);
+
+  at::parallel_for(
+      0,
+      output.size(0) * out_height,
+      grain_size(channels * width * coeffs.ksize),
+      [&](int64_t begin, int64_t end) {
+        // the input rows are accumulated one after the other, so that the
+        // inner loop runs along a row
+        std::vector<acc_t> acc(width);
+        for (int64_t row = begin; row < end; row++) {
+          auto n = row / out_height;
+          auto y = row % out_height;
+          const int32_t* w = &coeffs.weights[y * coeffs.ksize];
+          for (int64_t c = 0; c < channels; c++) {
+            const in_t* in_plane =
+                in_data + n * input.stride(0) + c * input.stride(1);
+            uint8_t* out_row = out_data + n * output.stride(0) +
+                c * output.stride(1) + y * output.stride(2);
+            std::fill(acc.begin(), acc.end(), 0);
+            for (int64_t k = 0; k < coeffs.size[y]; k++) {
+              const in_t* src = in_plane + (coeffs.start[y] + k) * in_stride_y;
+              for (int64_t x = 0; x < width; x++)
+                acc[x] += static_cast<acc_t>(src[x * in_stride_x]) * w[k];
+            }
+            for (int64_t x = 0; x < width; x++)
+              out_row[x * out_stride_x] = round_pixel<uint8_t>(acc[x], bits);
+          }
+        }
+      });
+}
+
+at::Tensor resize_uint8_kernel(
+    const at::Tensor& input,
+    at::IntArrayRef size,
+    c10::string_view interpolation,
+    bool antialias) {
+  TORCH_CHECK(
+      input.dim() == 4,
+      "input should be a 4d tensor of shape [N, C, H, W], got ",
+      input.dim(),
+      "D");
+  TORCH_CHECK(
+      input.scalar_type() == at::kByte,
+      "input should be a uint8 tensor, got ",
+      input.scalar_type());
+  TORCH_CHECK(
+      input.size(2) > 0 && input.size(3) > 0, "input should not be empty");
+  TORCH_CHECK(
+      size.size() == 2 && size[0] > 0 && size[1] > 0,
+      "size should contain 2 positive values, got ",
+      size);
+  TORCH_CHECK(
+      interpolation == "bilinear" || interpolation == "bicubic",
+      "interpolation should be bilinear or bicubic, got ",
+      interpolation);
+  bool bicubic = interpolation == "bicubic";
+
+  // The image is resized horizontally then vertically, in the memory format
+  // of the input. A pass is skipped when it keeps the size of its axis, as
+  // its weights would be the identity.
+  auto memory_format = input.suggest_memory_format();
+  bool resize_x = size[1] != input.size(3);
+  bool resize_y = size[0] != input.size(2);
+  auto output = input;
+  if (resize_x) {
+    AxisCoeffs coeffs(input.size(3), size[1], bicubic, antialias);
+    auto resized = at::empty(
+        {input.size(0), input.size(1), input.size(2), size[1]},
+        input.options()
+            .dtype(resize_y ? at::kInt : at::kByte)
+            .memory_format(memory_format));
+    if (resize_y)
+      resample_horizontal<int32_t>(input, resized, coeffs);
+    else
+      resample_horizontal<uint8_t>(input, resized, coeffs);
+    output = resized;
+  }
+  if (resize_y) {
+    AxisCoeffs coeffs(input.size(2), size[0], bicubic, antialias);
+    auto resized = at::empty(
+        {input.size(0), input.size(1), size[0], size[1]},
+        input.options().memory_format(memory_format));
+    if (resize_x)
+      resample_vertical<int32_t>(output, resized, coeffs);
+    else
+      resample_vertical<uint8_t>(output, resized, coeffs);
+    output = resized;
+  }
+  if (output.is_same(input))
+    output = input.clone();
+  return output;
+}
+
+} // namespace
+
+TORCH_LIBRARY_IMPL(torchvision, CPU, m) {
+  m.impl(
+      TORCH_SELECTIVE_NAME("torchvision::_resize_uint8"),
+      TORCH_FN(resize_uint8_kernel));
+}
+
+} // namespace ops
+} // namespace vision
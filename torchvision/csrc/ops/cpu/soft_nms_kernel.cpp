@@ -0,0 +1,149 @@
+#include <ATen/ATen.h>
+#include <ATen/Parallel.h>
+#include <torch/library.h>
+
+#include "./nms_common.h"
+
+namespace vision {
+namespace ops {
+
+namespace {
+
+enum SoftNMSMethod { LINEAR = 0, GAUSSIAN = 1 };
+
+template <typename scalar_t>
+std::tuple<at::Tensor, at::Tensor> soft_nms_kernel_impl(
+    const at::Tensor& dets,
+    const at::Tensor& scores,
+    const at::Tensor& idxs,
+    const at::Tensor& image_offsets,
+    double iou_threshold,
+    double sigma,
+    double score_threshold,
+    int64_t method,
+    int64_t max_output) {
+  auto dets_t = dets.contiguous();
+  auto scores_t = scores.contiguous();
+  auto idxs_t = idxs.to(at::kLong).contiguous();
+  auto offsets_t = image_offsets.to(at::kLong).contiguous();
+
+  auto ndets = dets.size(0);
+  auto nimages = offsets_t.size(0) - 1;
+  auto dets_data = dets_t.data_ptr<scalar_t>();
+  auto scores_data = scores_t.data_ptr<scalar_t>();
+  auto idxs_data = idxs_t.data_ptr<int64_t>();
+  auto offsets = offsets_t.data_ptr<int64_t>();
+
+  detail::check_image_offsets(offsets, nimages, ndets);
+
+  at::Tensor keep_t = at::empty({ndets}, dets.options().dtype(at::kLong));
+  at::Tensor new_scores_t = at::empty({ndets}, scores.options());
+  auto keep = keep_t.data_ptr<int64_t>();
+  auto new_scores = new_scores_t.data_ptr<scalar_t>();
+  std::vector<int64_t> num_kept(nimages);
+
+  at::parallel_for(0, nimages, 1, [&](int64_t begin, int64_t end) {
+    std::vector<int64_t> candidates;
+    std::vector<scalar_t> decayed;
+    std::vector<scalar_t> areas;
+
+    for (int64_t b = begin; b < end; b++) {
+      auto start = offsets[b];
+      auto n = offsets[b + 1] - start;
+      auto boxes = dets_data + 4 * start;
+      auto image_idxs = idxs_data + start;
+
+      // candidates are kept in decreasing order of their initial score, so
+      // that ties are broken the same way as by nms
+      detail::sort_by_decreasing_score(candidates, scores_data + start, n);
+      decayed.assign(scores_data + start, scores_data + start + n);
+      detail::box_areas(areas, boxes, n);
+
+      int64_t num_to_keep = 0;
+      while (!candidates.empty() && num_to_keep != max_output) {
+        auto best = candidates.begin();
+        for (auto it = candidates.begin() + 1; it != candidates.end(); it++) {
+          if (decayed[*it] > decayed[*best])
+            best = it;
+        }
+        auto i = *best;
+        if (!(decayed[i] >= score_threshold))
+          break;
+        keep[start + num_to_keep] = start + i;
+        new_scores[start + num_to_keep] = decayed[i];
+        num_to_keep++;
+
+        // decay the scores of the remaining boxes of the same category and
+        // drop the ones that fall below the threshold
+        auto last = candidates.begin();
+        for (auto it = candidates.begin(); it != candidates.end(); it++) {
+          auto j = *it;
+          if (j == i)
+            continue;
+          if (image_idxs[j] == image_idxs[i]) {
+            auto iou = detail::box_iou(boxes, areas.data(), i, j);
+            if (method == GAUSSIAN) {
+              decayed[j] *= std::exp(-iou * iou / sigma);
+            } else if (iou > iou_threshold) {
+              decayed[j] *= 1 - iou;
+            }
+            if (decayed[j] < score_threshold)
+              continue;
+          }
+          *last++ = j;
+        }
+        candidates.erase(last, candidates.end());
+      }
+      num_kept[b] = num_to_keep;
+    }
+  });
+
+  return std::make_tuple(
+      detail::concat_kept<int64_t>(keep_t, offsets, num_kept),
+      detail::concat_kept<scalar_t>(new_scores_t, offsets, num_kept));
+}
+
+std::tuple<at::Tensor, at::Tensor> soft_nms_kernel(
+    const at::Tensor& dets,
+    const at::Tensor& scores,
+    const at::Tensor& idxs,
+    const at::Tensor& image_offsets,
+    double iou_threshold,
+    double sigma,
+    double score_threshold,
+    int64_t method,
+    int64_t max_output) {
+  detail::check_batched_nms_inputs(dets, scores, idxs, image_offsets);
+  TORCH_CHECK(
+      method == LINEAR || method == GAUSSIAN,
+      "method should be 0 (linear) or 1 (gaussian), got ",
+      method);
+  TORCH_CHECK(
+      method == LINEAR || sigma > 0, "sigma should be positive, got ", sigma);
+
+  std::tuple<at::Tensor, at::Tensor> result;
+
+  AT_DISPATCH_FLOATING_TYPES(dets.scalar_type(), "soft_nms_kernel", [&] {
+    result = soft_nms_kernel_impl<scalar_t>(
+        dets,
+        scores,
+        idxs,
+        image_offsets,
+        iou_threshold,
+        sigma,
+        score_threshold,
+        method,
+        max_output);
+  });
+  return result;
+}
+
+} // namespace
+
+TORCH_LIBRARY_IMPL(torchvision, CPU, m) {
+  m.impl(
+      TORCH_SELECTIVE_NAME("torchvision::soft_nms"), TORCH_FN(soft_nms_kernel));
+}
+
+} // namespace ops
+} // namespace vision
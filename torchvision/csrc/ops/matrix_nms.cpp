@@ -0,0 +1,40 @@
+#include "matrix_nms.h"
+
+#include <ATen/core/dispatch/Dispatcher.h>
+#include <torch/library.h>
+#include <torch/types.h>
+
+namespace vision {
+namespace ops {
+
+std::tuple<at::Tensor, at::Tensor> matrix_nms(
+    const at::Tensor& dets,
+    const at::Tensor& scores,
+    const at::Tensor& idxs,
+    const at::Tensor& image_offsets,
+    double sigma,
+    double score_threshold,
+    int64_t kernel,
+    int64_t max_output) {
+  C10_LOG_API_USAGE_ONCE("torchvision.csrc.ops.matrix_nms.matrix_nms");
+  static auto op = c10::Dispatcher::singleton()
+                       .findSchemaOrThrow("torchvision::matrix_nms", "")
+                       .typed<decltype(matrix_nms)>();
+  return op.call(
+      dets,
+      scores,
+      idxs,
+      image_offsets,
+      sigma,
+      score_threshold,
+      kernel,
+      max_output);
+}
+
+TORCH_LIBRARY_FRAGMENT(torchvision, m) {
+  m.def(TORCH_SELECTIVE_SCHEMA(
+      "torchvision::matrix_nms(Tensor dets, Tensor scores, Tensor idxs, Tensor image_offsets, float sigma, float score_threshold, int kernel, int max_output) -> (Tensor, Tensor)"));
+}
+
+} // namespace ops
+} // namespace vision
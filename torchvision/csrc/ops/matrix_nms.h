@@ -0,0 +1,20 @@
+#pragma once
+
+#include <ATen/ATen.h>
+#include "../macros.h"
+
+namespace vision {
+namespace ops {
+
+VISION_API std::tuple<at::Tensor, at::Tensor> matrix_nms(
+    const at::Tensor& dets,
+    const at::Tensor& scores,
+    const at::Tensor& idxs,
+    const at::Tensor& image_offsets,
+    double sigma,
+    double score_threshold,
+    int64_t kernel,
+    int64_t max_output);
+
+} // namespace ops
+} // namespace vision
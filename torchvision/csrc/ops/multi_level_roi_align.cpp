@@ -0,0 +1,42 @@
+#include "multi_level_roi_align.h"
+
+#include <ATen/core/dispatch/Dispatcher.h>
+#include <torch/library.h>
+#include <torch/types.h>
+
+namespace vision {
+namespace ops {
+
+at::Tensor multi_level_roi_align(
+    at::TensorList inputs,
+    const at::Tensor& rois,
+    const at::Tensor& levels,
+    at::ArrayRef<double> spatial_scales,
+    int64_t pooled_height,
+    int64_t pooled_width,
+    int64_t sampling_ratio,
+    bool aligned) {
+  C10_LOG_API_USAGE_ONCE(
+      "torchvision.csrc.ops.multi_level_roi_align.multi_level_roi_align");
+  static auto op =
+      c10::Dispatcher::singleton()
+          .findSchemaOrThrow("torchvision::multi_level_roi_align", "")
+          .typed<decltype(multi_level_roi_align)>();
+  return op.call(
+      inputs,
+      rois,
+      levels,
+      spatial_scales,
+      pooled_height,
+      pooled_width,
+      sampling_ratio,
+      aligned);
+}
+
+TORCH_LIBRARY_FRAGMENT(torchvision, m) {
+  m.def(TORCH_SELECTIVE_SCHEMA(
+      "torchvision::multi_level_roi_align(Tensor[] inputs, Tensor rois, Tensor levels, float[] spatial_scales, int pooled_height, int pooled_width, int sampling_ratio, bool aligned) -> Tensor"));
+}
+
+} // namespace ops
+} // namespace vision
@@ -18,9 +18,25 @@ at::Tensor nms(
   return op.call(dets, scores, iou_threshold);
 }
 
+at::Tensor batched_nms(
+    const at::Tensor& dets,
+    const at::Tensor& scores,
+    const at::Tensor& idxs,
+    const at::Tensor& image_offsets,
+    double iou_threshold,
+    int64_t max_output) {
+  C10_LOG_API_USAGE_ONCE("torchvision.csrc.ops.nms.batched_nms");
+  static auto op = c10::Dispatcher::singleton()
+                       .findSchemaOrThrow("torchvision::batched_nms", "")
+                       .typed<decltype(batched_nms)>();
+  return op.call(dets, scores, idxs, image_offsets, iou_threshold, max_output);
+}
+
 TORCH_LIBRARY_FRAGMENT(torchvision, m) {
   m.def(TORCH_SELECTIVE_SCHEMA(
       "torchvision::nms(Tensor dets, Tensor scores, float iou_threshold) -> Tensor"));
+  m.def(TORCH_SELECTIVE_SCHEMA(
+      "torchvision::batched_nms(Tensor dets, Tensor scores, Tensor idxs, Tensor image_offsets, float iou_threshold, int max_output) -> Tensor"));
 }
 
 } // namespace ops
@@ -11,5 +11,13 @@ VISION_API at::Tensor nms(
     const at::Tensor& scores,
     double iou_threshold);
 
+VISION_API at::Tensor batched_nms(
+    const at::Tensor& dets,
+    const at::Tensor& scores,
+    const at::Tensor& idxs,
+    const at::Tensor& image_offsets,
+    double iou_threshold,
+    int64_t max_output);
+
 } // namespace ops
 } // namespace vision
@@ -1,8 +1,14 @@
 #pragma once
 
+#include "box_iou.h"
 #include "deform_conv2d.h"
+#include "matrix_nms.h"
+#include "multi_level_roi_align.h"
 #include "nms.h"
 #include "ps_roi_align.h"
 #include "ps_roi_pool.h"
+#include "resize_normalize_pad.h"
+#include "resize_uint8.h"
 #include "roi_align.h"
 #include "roi_pool.h"
+#include "soft_nms.h"
@@ -0,0 +1,252 @@
+#include <ATen/ATen.h>
+#include <torch/library.h>
+
+#include "./quantize_utils.h"
+
+namespace vision {
+namespace ops {
+
+namespace {
+
+using detail::dequantize_val;
+using detail::quantize_val;
+
+// Same sampling as bilinear_interpolate in cpu/ps_roi_align_kernel.cpp, but
+// returning the weights and the positions of the 4 neighbours, so that the
+// interpolation can be done on the raw quantized values.
+void bilinear_interpolate_weights(
+    int height,
+    int width,
+    float y,
+    float x,
+    float (&w)[4],
+    int (&pos)[4]) {
+  // deal with cases that inverse elements are out of feature map boundary
+  if (y < -1.0 || y > height || x < -1.0 || x > width) {
+    // empty
+    w[0] = w[1] = w[2] = w[3] = 0.;
+    pos[0] = pos[1] = pos[2] = pos[3] = 0;
+    return;
+  }
+
+  if (y <= 0)
+    y = 0;
+  if (x <= 0)
+    x = 0;
+
+  int y_low = (int)y;
+  int x_low = (int)x;
+  int y_high;
+  int x_high;
+
+  if (y_low >= height - 1) {
+    y_high = y_low = height - 1;
+    y = (float)y_low;
+  } else {
+    y_high = y_low + 1;
+  }
+
+  if (x_low >= width - 1) {
+    x_high = x_low = width - 1;
+    x = (float)x_low;
+  } else {
+    x_high = x_low + 1;
+  }
+
+  float ly = y - y_low;
+  float lx = x - x_low;
+  float hy = 1. - ly, hx = 1. - lx;
+
+  w[0] = hy * hx, w[1] = hy * lx, w[2] = ly * hx, w[3] = ly * lx;
+  pos[0] = y_low * width + x_low;
+  pos[1] = y_low * width + x_high;
+  pos[2] = y_high * width + x_low;
+  pos[3] = y_high * width + x_high;
+}
+
+template <typename T>
+void qps_roi_align_forward_kernel_impl(
+    int num_rois,
+    const at::Tensor& t_input,
+    float spatial_scale,
+    int channels,
+    int height,
+    int width,
+    int pooled_height,
+    int pooled_width,
+    int sampling_ratio,
+    const at::Tensor& t_rois,
+    int channels_out,
+    T* output,
+    int* channel_mapping) {
+  // Don't delete these otherwise the .data_ptr() data might be undefined
+  auto t_input_cont = t_input.contiguous();
+  auto t_rois_cont = t_rois.contiguous();
+
+  const T* input = t_input_cont.data_ptr<T>();
+  int64_t input_zp = t_input.q_zero_point();
+  float input_scale = t_input.q_scale();
+
+  const T* rois = t_rois_cont.data_ptr<T>();
+  int64_t rois_zp = t_rois.q_zero_point();
+  float rois_scale = t_rois.q_scale();
+
+  for (int n = 0; n < num_rois; n++) {
+    // [start, end) interval for spatial sampling
+    const T* offset_rois = rois + n * 5;
+
+    // FIXME: change this when batches of size > 1 are allowed
+    const int roi_batch_ind = 0;
+
+    // Do not using rounding; this implementation detail is critical
+    float roi_start_w =
+        dequantize_val(rois_scale, rois_zp, offset_rois[1]) * spatial_scale -
+        0.5f;
+    float roi_start_h =
+        dequantize_val(rois_scale, rois_zp, offset_rois[2]) * spatial_scale -
+        0.5f;
+    float roi_end_w =
+        dequantize_val(rois_scale, rois_zp, offset_rois[3]) * spatial_scale -
+        0.5f;
+    float roi_end_h =
+        dequantize_val(rois_scale, rois_zp, offset_rois[4]) * spatial_scale -
+        0.5f;
+
+    float roi_width = roi_end_w - roi_start_w;
+    float roi_height = roi_end_h - roi_start_h;
+    float bin_size_h = roi_height / pooled_height;
+    float bin_size_w = roi_width / pooled_width;
+
+    // We use roi_bin_grid to sample the grid and mimic integral
+    int roi_bin_grid_h = (sampling_ratio > 0)
+        ? sampling_ratio
+        : ceil(roi_height / pooled_height);
+    int roi_bin_grid_w =
+        (sampling_ratio > 0) ? sampling_ratio : ceil(roi_width / pooled_width);
+    // When the grid is empty, output zeros.
+    const float count = std::max(roi_bin_grid_h * roi_bin_grid_w, 1);
+
+    int c_in = 0;
+    for (int c_out = 0; c_out < channels_out; ++c_out) {
+      for (int ph = 0; ph < pooled_height; ++ph) {
+        for (int pw = 0; pw < pooled_width; ++pw) {
+          int index =
+              ((n * channels_out + c_out) * pooled_height + ph) * pooled_width +
+              pw;
+
+          // Do not using floor/ceil; this implementation detail is critical
+          float hstart = ph * bin_size_h + roi_start_h;
+          float wstart = pw * bin_size_w + roi_start_w;
+
+          const T* offset_input =
+              input + (roi_batch_ind * channels + c_in) * height * width;
+
+          float out_sum = 0.;
+          float sum_w = 0.;
+          for (int iy = 0; iy < roi_bin_grid_h; iy++) {
+            const float y = hstart + (iy + .5f) * bin_size_h / roi_bin_grid_h;
+            for (int ix = 0; ix < roi_bin_grid_w; ix++) {
+              const float x = wstart + (ix + .5f) * bin_size_w / roi_bin_grid_w;
+              float w[4];
+              int pos[4];
+              bilinear_interpolate_weights(height, width, y, x, w, pos);
+
+              // Optimization: we use the raw values here and we'll dequantize
+              // later
+              out_sum += w[0] * offset_input[pos[0]].val_ +
+                  w[1] * offset_input[pos[1]].val_ +
+                  w[2] * offset_input[pos[2]].val_ +
+                  w[3] * offset_input[pos[3]].val_;
+              sum_w += w[0] + w[1] + w[2] + w[3];
+            }
+          }
+          // Dequantize here
+          out_sum = input_scale * (out_sum - (float)input_zp * sum_w);
+
+          out_sum /= count; // Average pooling
+
+          output[index] = quantize_val<T>(input_scale, input_zp, out_sum);
+          channel_mapping[index] = c_in;
+          c_in++;
+        }
+      }
+    }
+  }
+}
+
+std::tuple<at::Tensor, at::Tensor> qps_roi_align_forward_kernel(
+    const at::Tensor& input,
+    const at::Tensor& rois,
+    double spatial_scale,
+    int64_t pooled_height,
+    int64_t pooled_width,
+    int64_t sampling_ratio) {
+  TORCH_CHECK(input.device().is_cpu(), "input must be a CPU tensor");
+  TORCH_CHECK(rois.device().is_cpu(), "rois must be a CPU tensor");
+  TORCH_CHECK(
+      rois.size(1) == 5, "Tensor rois should have shape as Tensor[K, 5]");
+  // Same restriction as in qroi_align: not all image indices can be
+  // represented in the first column of quantized rois.
+  TORCH_CHECK(
+      input.size(0) == 1,
+      "Only one image per batch is allowed in ps_roi_align when quantized tensors are passed.");
+
+  at::TensorArg input_t{input, "input", 1}, rois_t{rois, "rois", 2};
+
+  at::CheckedFrom c = "qps_roi_align_forward_kernel";
+  at::checkAllSameType(c, {input_t, rois_t});
+
+  int num_rois = rois.size(0);
+  int channels = input.size(1);
+  int height = input.size(2);
+  int width = input.size(3);
+
+  TORCH_CHECK(
+      channels % (pooled_height * pooled_width) == 0,
+      "input channels must be a multiple of pooling height * pooling width");
+  int channels_out = channels / (pooled_height * pooled_width);
+
+  // FIXME: This is private, API might change:
+  // https://github.com/pytorch/pytorch/wiki/Introducing-Quantized-Tensor#quantized-tensor-apis
+  at::Tensor output = at::_empty_affine_quantized(
+      {num_rois, channels_out, pooled_height, pooled_width},
+      input.options(),
+      input.q_scale(),
+      input.q_zero_point());
+  auto channel_mapping =
+      at::zeros(output.sizes(), input.options().dtype(at::kInt));
+
+  if (output.numel() == 0) {
+    return std::make_tuple(output, channel_mapping);
+  }
+
+  AT_DISPATCH_QINT_TYPES(
+      input.scalar_type(), "qps_roi_align_forward_kernel", [&] {
+        qps_roi_align_forward_kernel_impl<scalar_t>(
+            num_rois,
+            input,
+            spatial_scale,
+            channels,
+            height,
+            width,
+            pooled_height,
+            pooled_width,
+            sampling_ratio,
+            rois,
+            channels_out,
+            output.data_ptr<scalar_t>(),
+            channel_mapping.data_ptr<int>());
+      });
+  return std::make_tuple(output, channel_mapping);
+}
+
+} // namespace
+
+TORCH_LIBRARY_IMPL(torchvision, QuantizedCPU, m) {
+  m.impl(
+      TORCH_SELECTIVE_NAME("torchvision::ps_roi_align"),
+      TORCH_FN(qps_roi_align_forward_kernel));
+}
+
+} // namespace ops
+} // namespace vision
@@ -0,0 +1,170 @@
+#include <ATen/ATen.h>
+#include <torch/library.h>
+
+#include "./quantize_utils.h"
+
+namespace vision {
+namespace ops {
+
+namespace {
+
+using detail::dequantize_val;
+
+template <typename T>
+void qroi_pool_forward_kernel_impl(
+    const at::Tensor& t_input,
+    float spatial_scale,
+    int channels,
+    int height,
+    int width,
+    int pooled_height,
+    int pooled_width,
+    const at::Tensor& t_rois,
+    int num_rois,
+    T* output,
+    int* argmax_data) {
+  // Don't delete these otherwise the .data_ptr() data might be undefined
+  auto t_input_cont = t_input.contiguous();
+  auto t_rois_cont = t_rois.contiguous();
+
+  const T* input = t_input_cont.data_ptr<T>();
+  auto input_zp = static_cast<typename T::underlying>(t_input.q_zero_point());
+
+  const T* rois = t_rois_cont.data_ptr<T>();
+  int64_t rois_zp = t_rois.q_zero_point();
+  float rois_scale = t_rois.q_scale();
+
+  for (int n = 0; n < num_rois; ++n) {
+    const T* offset_rois = rois + n * 5;
+
+    // FIXME: change this when batches of size > 1 are allowed
+    const int roi_batch_ind = 0;
+
+    int roi_start_w = round(
+        dequantize_val(rois_scale, rois_zp, offset_rois[1]) * spatial_scale);
+    int roi_start_h = round(
+        dequantize_val(rois_scale, rois_zp, offset_rois[2]) * spatial_scale);
+    int roi_end_w = round(
+        dequantize_val(rois_scale, rois_zp, offset_rois[3]) * spatial_scale);
+    int roi_end_h = round(
+        dequantize_val(rois_scale, rois_zp, offset_rois[4]) * spatial_scale);
+
+    // Force malformed ROIs to be 1x1
+    int roi_width = std::max(roi_end_w - roi_start_w + 1, 1);
+    int roi_height = std::max(roi_end_h - roi_start_h + 1, 1);
+    float bin_size_h = static_cast<float>(roi_height) / pooled_height;
+    float bin_size_w = static_cast<float>(roi_width) / pooled_width;
+
+    for (int ph = 0; ph < pooled_height; ++ph) {
+      for (int pw = 0; pw < pooled_width; ++pw) {
+        int hstart = static_cast<int>(floor(ph * bin_size_h));
+        int wstart = static_cast<int>(floor(pw * bin_size_w));
+        int hend = static_cast<int>(ceil((ph + 1) * bin_size_h));
+        int wend = static_cast<int>(ceil((pw + 1) * bin_size_w));
+
+        // Add roi offsets and clip to input boundaries
+        hstart = std::min(std::max(hstart + roi_start_h, 0), height);
+        hend = std::min(std::max(hend + roi_start_h, 0), height);
+        wstart = std::min(std::max(wstart + roi_start_w, 0), width);
+        wend = std::min(std::max(wend + roi_start_w, 0), width);
+        bool is_empty = (hend <= hstart) || (wend <= wstart);
+
+        for (int c = 0; c < channels; ++c) {
+          // Optimization: the scale is positive, so the max can be taken over
+          // the raw values, which are already quantized with the output's
+          // qparams. An empty pooling region is zero, i.e. the zero point.
+          auto maxval = is_empty
+              ? input_zp
+              : std::numeric_limits<typename T::underlying>::lowest();
+          // If nothing is pooled, argmax = -1 causes nothing to be backprop'd
+          int maxidx = -1;
+
+          const T* input_offset =
+              input + (roi_batch_ind * channels + c) * height * width;
+
+          for (int h = hstart; h < hend; ++h) {
+            for (int w = wstart; w < wend; ++w) {
+              int input_index = h * width + w;
+              if (maxidx == -1 || input_offset[input_index].val_ > maxval) {
+                maxval = input_offset[input_index].val_;
+                maxidx = input_index;
+              }
+            }
+          }
+          int index =
+              ((n * channels + c) * pooled_height + ph) * pooled_width + pw;
+          output[index] = T(maxval);
+          argmax_data[index] = maxidx;
+        } // channels
+      } // pooled_width
+    } // pooled_height
+  } // num_rois
+}
+
+std::tuple<at::Tensor, at::Tensor> qroi_pool_forward_kernel(
+    const at::Tensor& input,
+    const at::Tensor& rois,
+    double spatial_scale,
+    int64_t pooled_height,
+    int64_t pooled_width) {
+  TORCH_CHECK(input.device().is_cpu(), "input must be a CPU tensor");
+  TORCH_CHECK(rois.device().is_cpu(), "rois must be a CPU tensor");
+  TORCH_CHECK(rois.size(1) == 5, "rois must have shape as Tensor[K, 5]");
+  // Same restriction as in qroi_align: not all image indices can be
+  // represented in the first column of quantized rois.
+  TORCH_CHECK(
+      input.size(0) == 1,
+      "Only one image per batch is allowed in roi_pool when quantized tensors are passed.");
+
+  at::TensorArg input_t{input, "input", 1}, rois_t{rois, "rois", 2};
+
+  at::CheckedFrom c = "qroi_pool_forward_kernel";
+  at::checkAllSameType(c, {input_t, rois_t});
+
+  int num_rois = rois.size(0);
+  int channels = input.size(1);
+  int height = input.size(2);
+  int width = input.size(3);
+
+  // FIXME: This is private, API might change:
+  // https://github.com/pytorch/pytorch/wiki/Introducing-Quantized-Tensor#quantized-tensor-apis
+  at::Tensor output = at::_empty_affine_quantized(
+      {num_rois, channels, pooled_height, pooled_width},
+      input.options(),
+      input.q_scale(),
+      input.q_zero_point());
+  at::Tensor argmax = at::zeros(
+      {num_rois, channels, pooled_height, pooled_width},
+      input.options().dtype(at::kInt));
+
+  if (output.numel() == 0) {
+    return std::make_tuple(output, argmax);
+  }
+
+  AT_DISPATCH_QINT_TYPES(input.scalar_type(), "qroi_pool_forward_kernel", [&] {
+    qroi_pool_forward_kernel_impl<scalar_t>(
+        input,
+        spatial_scale,
+        channels,
+        height,
+        width,
+        pooled_height,
+        pooled_width,
+        rois,
+        num_rois,
+        output.data_ptr<scalar_t>(),
+        argmax.data_ptr<int>());
+  });
+  return std::make_tuple(output, argmax);
+}
+
+} // namespace
+
+TORCH_LIBRARY_IMPL(torchvision, QuantizedCPU, m) {
+  m.impl(
+      TORCH_SELECTIVE_NAME("torchvision::roi_pool"),
+      TORCH_FN(qroi_pool_forward_kernel));
+}
+
+} // namespace ops
+} // namespace vision
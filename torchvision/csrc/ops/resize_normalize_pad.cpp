@@ -0,0 +1,31 @@
+#include "resize_normalize_pad.h"
+
+#include <ATen/core/dispatch/Dispatcher.h>
+#include <torch/library.h>
+#include <torch/types.h>
+
+namespace vision {
+namespace ops {
+
+void _resize_normalize_pad(
+    at::TensorList images,
+    at::IntArrayRef sizes,
+    at::ArrayRef<double> mean,
+    at::ArrayRef<double> std,
+    at::Tensor& batch) {
+  C10_LOG_API_USAGE_ONCE(
+      "torchvision.csrc.ops.resize_normalize_pad._resize_normalize_pad");
+  static auto op =
+      c10::Dispatcher::singleton()
+          .findSchemaOrThrow("torchvision::_resize_normalize_pad", "")
+          .typed<decltype(_resize_normalize_pad)>();
+  op.call(images, sizes, mean, std, batch);
+}
+
+TORCH_LIBRARY_FRAGMENT(torchvision, m) {
+  m.def(TORCH_SELECTIVE_SCHEMA(
+      "torchvision::_resize_normalize_pad(Tensor[] images, int[] sizes, float[] mean, float[] std, Tensor(a!) batch) -> ()"));
+}
+
+} // namespace ops
+} // namespace vision
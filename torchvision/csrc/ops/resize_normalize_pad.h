@@ -0,0 +1,17 @@
+#pragma once
+
+#include <ATen/ATen.h>
+#include "../macros.h"
+
+namespace vision {
+namespace ops {
+
+VISION_API void _resize_normalize_pad(
+    at::TensorList images,
+    at::IntArrayRef sizes,
+    at::ArrayRef<double> mean,
+    at::ArrayRef<double> std,
+    at::Tensor& batch);
+
+} // namespace ops
+} // namespace vision
@@ -0,0 +1,28 @@
+#include "resize_uint8.h"
+
+#include <ATen/core/dispatch/Dispatcher.h>
+#include <torch/library.h>
+#include <torch/types.h>
+
+namespace vision {
+namespace ops {
+
+at::Tensor _resize_uint8(
+    const at::Tensor& input,
+    at::IntArrayRef size,
+    c10::string_view interpolation,
+    bool antialias) {
+  C10_LOG_API_USAGE_ONCE("torchvision.csrc.ops.resize_uint8._resize_uint8");
+  static auto op = c10::Dispatcher::singleton()
+                       .findSchemaOrThrow("torchvision::_resize_uint8", "")
+                       .typed<decltype(_resize_uint8)>();
+  return op.call(input, size, interpolation, antialias);
+}
+
+TORCH_LIBRARY_FRAGMENT(torchvision, m) {
+  m.def(TORCH_SELECTIVE_SCHEMA(
+      "torchvision::_resize_uint8(Tensor input, int[] size, str interpolation, bool antialias) -> Tensor"));
+}
+
+} // namespace ops
+} // namespace vision
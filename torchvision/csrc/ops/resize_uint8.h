@@ -0,0 +1,16 @@
+#pragma once
+
+#include <ATen/ATen.h>
+#include "../macros.h"
+
+namespace vision {
+namespace ops {
+
+VISION_API at::Tensor _resize_uint8(
+    const at::Tensor& input,
+    at::IntArrayRef size,
+    c10::string_view interpolation,
+    bool antialias);
+
+} // namespace ops
+} // namespace vision
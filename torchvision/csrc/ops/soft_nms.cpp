@@ -0,0 +1,42 @@
+#include "soft_nms.h"
+
+#include <ATen/core/dispatch/Dispatcher.h>
+#include <torch/library.h>
+#include <torch/types.h>
+
+namespace vision {
+namespace ops {
+
+std::tuple<at::Tensor, at::Tensor> soft_nms(
+    const at::Tensor& dets,
+    const at::Tensor& scores,
+    const at::Tensor& idxs,
+    const at::Tensor& image_offsets,
+    double iou_threshold,
+    double sigma,
+    double score_threshold,
+    int64_t method,
+    int64_t max_output) {
+  C10_LOG_API_USAGE_ONCE("torchvision.csrc.ops.soft_nms.soft_nms");
+  static auto op = c10::Dispatcher::singleton()
+                       .findSchemaOrThrow("torchvision::soft_nms", "")
+                       .typed<decltype(soft_nms)>();
+  return op.call(
+      dets,
+      scores,
+      idxs,
+      image_offsets,
+      iou_threshold,
+      sigma,
+      score_threshold,
+      method,
+      max_output);
+}
+
+TORCH_LIBRARY_FRAGMENT(torchvision, m) {
+  m.def(TORCH_SELECTIVE_SCHEMA(
+      "torchvision::soft_nms(Tensor dets, Tensor scores, Tensor idxs, Tensor image_offsets, float iou_threshold, float sigma, float score_threshold, int method, int max_output) -> (Tensor, Tensor)"));
+}
+
+} // namespace ops
+} // namespace vision
@@ -33,6 +33,7 @@ from .rendered_sst2 import RenderedSST2
 from .sbd import SBDataset
 from .sbu import SBU
 from .semeion import SEMEION
+from .sharded import ShardedDatasetFolder, ShardedImageFolder, pack_dataset_folder
 from .stanford_cars import StanfordCars
 from .stl10 import STL10
 from .sun397 import SUN397
@@ -48,6 +49,9 @@ __all__ = (
     "LSUNClass",
     "ImageFolder",
     "DatasetFolder",
+    "ShardedImageFolder",
+    "ShardedDatasetFolder",
+    "pack_dataset_folder",
     "FakeData",
     "CocoCaptions",
     "CocoDetection",
@@ -1,10 +1,15 @@
+import json
 import os
 import os.path
-from typing import Any, Callable, cast, Dict, List, Optional, Tuple
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, cast, Dict, Iterable, List, Optional, Tuple
 from typing import Union
 
 from PIL import Image
 
+from .. import transforms
 from .vision import VisionDataset
 
 
@@ -46,11 +51,145 @@ def find_classes(directory: str) -> Tuple[List[str], Dict[str, int]]:
     return classes, class_to_idx
 
 
+def _scan_tree(directory: str) -> Tuple[List[str], Dict[str, int]]:
+    """Lists the files below ``directory`` in the order of ``sorted(os.walk(directory, followlinks=True))``, together
+    with the modification times of the directories that were traversed.
+    """
+    listing = []
+    mtimes = {}
+    stack = [directory]
+    while stack:
+        dirpath = stack.pop()
+        try:
+            # the time is taken before listing, so that a concurrent modification invalidates the listing
+            mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+            entries = list(os.scandir(dirpath))
+        except OSError:
+            # same as os.walk, directories that can't be listed are skipped
+            continue
+        fnames = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                stack.append(entry.path)
+            else:
+                fnames.append(entry.name)
+        listing.append((dirpath, sorted(fnames)))
+    listing.sort(key=lambda item: item[0])
+    return [os.path.join(dirpath, fname) for dirpath, fnames in listing for fname in fnames], mtimes
+
+
+def _scan_class_dirs(directory: str, classes: Iterable[str]) -> Dict[str, Tuple[List[str], Dict[str, int]]]:
+    classes = list(classes)
+    # listing directories is mostly waiting for the file system, especially for network storage, so the class
+    # directories are scanned concurrently
+    with ThreadPoolExecutor() as executor:
+        scans = executor.map(_scan_tree, [os.path.join(directory, target_class) for target_class in classes])
+        return dict(zip(classes, scans))
+
+
+_MANIFEST_VERSION = 1
+
+
+def make_manifest(directory: str) -> Dict[str, Any]:
+    """Lists the files of all class folders of a dataset, to be passed as ``manifest_cache`` to
+    :class:`DatasetFolder` or :class:`ImageFolder`.
+
+    The manifest is JSON serializable and records the modification times of all directories of the dataset,
+    so that it is only used as long as no file was added, removed or renamed. In distributed training, it can
+    be built by a single process and sent to the others::
+
+        manifest = [make_manifest(root) if torch.distributed.get_rank() == 0 else None]
+        torch.distributed.broadcast_object_list(manifest, src=0)
+        dataset = ImageFolder(root, manifest_cache=manifest[0])
+
+    Args:
+        directory (str): root dataset directory.
+
+    Returns:
+        Dict[str, Any]: the manifest.
+    """
+    directory = os.path.expanduser(directory)
+    prefix = os.path.join(directory, "")
+    mtimes = {"": os.stat(directory).st_mtime_ns}
+    classes = sorted(entry.name for entry in os.scandir(directory) if entry.is_dir())
+    files = {}
+    for target_class, (paths, class_mtimes) in _scan_class_dirs(directory, classes).items():
+        files[target_class] = [path[len(prefix) :] for path in paths]
+        mtimes.update((path[len(prefix) :], mtime) for path, mtime in class_mtimes.items())
+    return dict(version=_MANIFEST_VERSION, root=os.path.abspath(directory), mtimes=mtimes, files=files)
+
+
+def _is_valid_manifest(manifest: Dict[str, Any], directory: str) -> bool:
+    if manifest.get("version") != _MANIFEST_VERSION or manifest.get("root") != os.path.abspath(directory):
+        return False
+
+    prefix = os.path.join(directory, "")
+
+    def mtime(rel_path: str) -> Optional[int]:
+        try:
+            return os.stat(prefix + rel_path).st_mtime_ns
+        except OSError:
+            return None
+
+    rel_paths = list(manifest["mtimes"].keys())
+    with ThreadPoolExecutor() as executor:
+        return all(
+            current == manifest["mtimes"][rel_path]
+            for rel_path, current in zip(rel_paths, executor.map(mtime, rel_paths))
+        )
+
+
+def _load_manifest(manifest_cache: Union[str, Dict[str, Any]], directory: str) -> Dict[str, Any]:
+    if not isinstance(manifest_cache, str):
+        return manifest_cache if _is_valid_manifest(manifest_cache, directory) else make_manifest(directory)
+
+    try:
+        with open(manifest_cache) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = None
+    if manifest is not None and _is_valid_manifest(manifest, directory):
+        return manifest
+
+    manifest = make_manifest(directory)
+    dirname = os.path.dirname(os.path.abspath(manifest_cache))
+    os.makedirs(dirname, exist_ok=True)
+    # write to a temporary file first, so that processes sharing the cache never read a partial manifest
+    tmp_path = os.path.join(dirname, f".{os.path.basename(manifest_cache)}.{uuid.uuid4().hex}")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_cache)
+    return manifest
+
+
+def _list_class_files(
+    directory: str, classes: List[str], manifest_cache: Optional[Union[str, Dict[str, Any]]] = None
+) -> Dict[str, List[str]]:
+    files: Dict[str, List[str]] = {}
+    if manifest_cache is not None:
+        manifest = _load_manifest(manifest_cache, directory)
+        prefix = os.path.join(directory, "")
+        files.update(
+            (target_class, [prefix + rel_path for rel_path in manifest["files"][target_class]])
+            for target_class in classes
+            if target_class in manifest["files"]
+        )
+    # classes that are not direct subdirectories of the root are not part of the manifest
+    missing = [target_class for target_class in classes if target_class not in files]
+    files.update((target_class, paths) for target_class, (paths, _) in _scan_class_dirs(directory, missing).items())
+    return files
+
+
 def make_dataset(
     directory: str,
     class_to_idx: Optional[Dict[str, int]] = None,
     extensions: Optional[Union[str, Tuple[str, ...]]] = None,
     is_valid_file: Optional[Callable[[str], bool]] = None,
+    manifest_cache: Optional[Union[str, Dict[str, Any]]] = None,
 ) -> List[Tuple[str, int]]:
     """Generates a list of samples of a form (path_to_sample, class).
 
@@ -78,22 +217,20 @@ def make_dataset(
 
     is_valid_file = cast(Callable[[str], bool], is_valid_file)
 
+    classes = sorted(class_to_idx.keys())
+    class_files = _list_class_files(directory, classes, manifest_cache)
+
     instances = []
     available_classes = set()
-    for target_class in sorted(class_to_idx.keys()):
+    for target_class in classes:
         class_index = class_to_idx[target_class]
-        target_dir = os.path.join(directory, target_class)
-        if not os.path.isdir(target_dir):
-            continue
-        for root, _, fnames in sorted(os.walk(target_dir, followlinks=True)):
-            for fname in sorted(fnames):
-                path = os.path.join(root, fname)
-                if is_valid_file(path):
-                    item = path, class_index
-                    instances.append(item)
+        for path in class_files[target_class]:
+            if is_valid_file(path):
+                item = path, class_index
+                instances.append(item)
 
-                    if target_class not in available_classes:
-                        available_classes.add(target_class)
+                if target_class not in available_classes:
+                    available_classes.add(target_class)
 
     empty_classes = set(class_to_idx.keys()) - available_classes
     if empty_classes:
@@ -124,6 +261,10 @@ class DatasetFolder(VisionDataset):
         is_valid_file (callable, optional): A function that takes path of a file
             and check if the file is a valid file (used to check of corrupt files)
             both extensions and is_valid_file should not be passed.
+        manifest_cache (string or dict, optional): Path of a JSON file caching the list of files of the
+            dataset, or a manifest returned by :func:`~torchvision.datasets.folder.make_manifest`. The
+            directories are only listed again if one of them was modified since the manifest was made, in
+            which case the file is rewritten.
 
      Attributes:
         classes (list): List of the class names sorted alphabetically.
@@ -140,10 +281,17 @@ class DatasetFolder(VisionDataset):
         transform: Optional[Callable] = None,
         target_transform: Optional[Callable] = None,
         is_valid_file: Optional[Callable[[str], bool]] = None,
+        manifest_cache: Optional[Union[str, Dict[str, Any]]] = None,
     ) -> None:
         super().__init__(root, transform=transform, target_transform=target_transform)
         classes, class_to_idx = self.find_classes(self.root)
-        samples = self.make_dataset(self.root, class_to_idx, extensions, is_valid_file)
+        if manifest_cache is None:
+            # overrides of make_dataset written before manifest_cache was added don't accept it
+            samples = self.make_dataset(self.root, class_to_idx, extensions, is_valid_file)
+        else:
+            samples = self.make_dataset(
+                self.root, class_to_idx, extensions, is_valid_file, manifest_cache=manifest_cache
+            )
 
         self.loader = loader
         self.extensions = extensions
@@ -159,6 +307,7 @@ class DatasetFolder(VisionDataset):
         class_to_idx: Dict[str, int],
         extensions: Optional[Tuple[str, ...]] = None,
         is_valid_file: Optional[Callable[[str], bool]] = None,
+        manifest_cache: Optional[Union[str, Dict[str, Any]]] = None,
     ) -> List[Tuple[str, int]]:
         """Generates a list of samples of a form (path_to_sample, class).
 
@@ -173,6 +322,8 @@ class DatasetFolder(VisionDataset):
                 and checks if the file is a valid file
                 (used to check of corrupt files) both extensions and
                 is_valid_file should not be passed. Defaults to None.
+            manifest_cache (optional): Path of a JSON file caching the list of files, or a manifest
+                returned by :func:`~torchvision.datasets.folder.make_manifest`. Defaults to None.
 
         Raises:
             ValueError: In case ``class_to_idx`` is empty.
@@ -187,7 +338,13 @@ class DatasetFolder(VisionDataset):
             # find_classes() function, instead of using that of the find_classes() method, which
             # is potentially overridden and thus could have a different logic.
             raise ValueError("The class_to_idx parameter cannot be None.")
-        return make_dataset(directory, class_to_idx, extensions=extensions, is_valid_file=is_valid_file)
+        return make_dataset(
+            directory,
+            class_to_idx,
+            extensions=extensions,
+            is_valid_file=is_valid_file,
+            manifest_cache=manifest_cache,
+        )
 
     def find_classes(self, directory: str) -> Tuple[List[str], Dict[str, int]]:
         """Find the class folders in a dataset structured as follows::
@@ -242,10 +399,14 @@ class DatasetFolder(VisionDataset):
 IMG_EXTENSIONS = (".jpg", ".jpeg", ".png", ".ppm", ".bmp", ".pgm", ".tif", ".tiff", ".webp")
 
 
-def pil_loader(path: str) -> Image.Image:
+def pil_loader(path: str, min_size: Optional[Tuple[int, int]] = None) -> Image.Image:
     # open path as file to avoid ResourceWarning (https://github.com/python-pillow/Pillow/issues/835)
     with open(path, "rb") as f:
         img = Image.open(f)
+        if min_size is not None:
+            # JPEG images are decoded at the smallest reduced resolution that is at least min_size,
+            # this is a no-op for the other formats
+            img.draft("RGB", (min_size[1], min_size[0]))
         return img.convert("RGB")
 
 
@@ -260,13 +421,29 @@ def accimage_loader(path: str) -> Any:
         return pil_loader(path)
 
 
-def default_loader(path: str) -> Any:
+def default_loader(path: str, min_size: Optional[Tuple[int, int]] = None) -> Any:
     from torchvision import get_image_backend
 
     if get_image_backend() == "accimage":
         return accimage_loader(path)
     else:
-        return pil_loader(path)
+        return pil_loader(path, min_size)
+
+
+def _get_decode_min_size(transform: Optional[Callable]) -> Optional[Tuple[int, int]]:
+    """Returns the minimum (height, width) images can be decoded at without loss of quality, if
+    ``transform`` starts by resizing them.
+    """
+    while isinstance(transform, transforms.Compose) and transform.transforms:
+        transform = transform.transforms[0]
+    if not isinstance(transform, transforms.Resize):
+        return None
+    size = transform.size
+    if isinstance(size, int):
+        return size, size
+    if len(size) == 1:
+        return size[0], size[0]
+    return size[0], size[1]
 
 
 class ImageFolder(DatasetFolder):
@@ -292,6 +469,14 @@ class ImageFolder(DatasetFolder):
         loader (callable, optional): A function to load an image given its path.
         is_valid_file (callable, optional): A function that takes path of an Image file
             and check if the file is a valid file (used to check of corrupt files)
+        reduced_resolution_decoding (bool, optional): If True and ``transform`` starts with a
+            :class:`~torchvision.transforms.Resize`, the default loader decodes JPEG images at the
+            smallest reduced resolution (1/2, 1/4 or 1/8) that is still larger than the output of the
+            resize, which is much faster than decoding them at full resolution. The resized images can
+            differ slightly from the ones obtained from full resolution images. Default: False.
+        manifest_cache (string or dict, optional): Path of a JSON file caching the list of images, or a
+            manifest returned by :func:`~torchvision.datasets.folder.make_manifest`. See
+            :class:`~torchvision.datasets.DatasetFolder` for details.
 
      Attributes:
         classes (list): List of the class names sorted alphabetically.
@@ -306,7 +491,13 @@ class ImageFolder(DatasetFolder):
         target_transform: Optional[Callable] = None,
         loader: Callable[[str], Any] = default_loader,
         is_valid_file: Optional[Callable[[str], bool]] = None,
+        reduced_resolution_decoding: bool = False,
+        manifest_cache: Optional[Union[str, Dict[str, Any]]] = None,
     ):
+        if reduced_resolution_decoding and loader is default_loader:
+            min_size = _get_decode_min_size(transform)
+            if min_size is not None:
+                loader = partial(default_loader, min_size=min_size)
         super().__init__(
             root,
             loader,
@@ -314,5 +505,6 @@ class ImageFolder(DatasetFolder):
             transform=transform,
             target_transform=target_transform,
             is_valid_file=is_valid_file,
+            manifest_cache=manifest_cache,
         )
         self.imgs = self.samples
@@ -0,0 +1,235 @@
+import io
+import json
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import torch.utils.data
+from PIL import Image
+
+from .folder import DatasetFolder
+from .vision import VisionDataset
+
+_VERSION = 1
+_META_FILE = "meta.json"
+_INDEX_FILE = "index.npz"
+
+
+def pack_dataset_folder(dataset: DatasetFolder, root: str, shard_size: int = 1 << 30) -> None:
+    """Packs the samples of a :class:`~torchvision.datasets.DatasetFolder` into a few large shard files, which can
+    then be read with :class:`ShardedDatasetFolder` or :class:`ShardedImageFolder`.
+
+    The raw bytes of the sample files are stored back to back, without being decoded. The directory layout is::
+
+        root/
+        ├── meta.json
+        ├── index.npz
+        ├── shard-00000.bin
+        ├── shard-00001.bin
+        └── ...
+
+    ``index.npz`` holds the shard, offset, length and target of every sample, and ``meta.json`` the classes of the
+    dataset. Both are written last, so an interrupted conversion can not be read.
+
+    Args:
+        dataset (DatasetFolder): dataset to pack. Only its ``samples``, ``classes`` and ``class_to_idx`` are used.
+        root (string): Directory the shards are written to. It is created if it does not exist.
+        shard_size (int, optional): Maximum size of a shard in bytes. A sample larger than this gets its own shard.
+            Default: 1 GiB.
+    """
+    os.makedirs(root, exist_ok=True)
+    num_samples = len(dataset.samples)
+    shard_idxs = np.empty(num_samples, dtype=np.int32)
+    offsets = np.empty(num_samples, dtype=np.int64)
+    lengths = np.empty(num_samples, dtype=np.int64)
+    targets = np.empty(num_samples, dtype=np.int64)
+
+    shards: List[str] = []
+    shard_file = None
+    offset = 0
+    try:
+        for idx, (path, target) in enumerate(dataset.samples):
+            with open(path, "rb") as f:
+                data = f.read()
+            if shard_file is None or (offset > 0 and offset + len(data) > shard_size):
+                if shard_file is not None:
+                    shard_file.close()
+                shards.append(f"shard-{len(shards):05d}.bin")
+                shard_file = open(os.path.join(root, shards[-1]), "wb")
+                offset = 0
+            shard_file.write(data)
+            shard_idxs[idx] = len(shards) - 1
+            offsets[idx] = offset
+            lengths[idx] = len(data)
+            targets[idx] = target
+            offset += len(data)
+    finally:
+        if shard_file is not None:
+            shard_file.close()
+
+    np.savez(os.path.join(root, _INDEX_FILE), shards=shard_idxs, offsets=offsets, lengths=lengths, targets=targets)
+    with open(os.path.join(root, _META_FILE), "w") as f:
+        json.dump(dict(version=_VERSION, shards=shards, classes=dataset.classes, class_to_idx=dataset.class_to_idx), f)
+
+
+def pil_decoder(data: bytes) -> Image.Image:
+    img = Image.open(io.BytesIO(data))
+    return img.convert("RGB")
+
+
+class ShardedDatasetFolder(VisionDataset):
+    """A generic data loader for datasets packed with :func:`pack_dataset_folder`.
+
+    Instead of opening one file per sample, the shards are opened once, the first time a sample is accessed in a
+    process, and samples are read with a single positional read. The dataset supports both random access by index
+    and sequential streaming through :meth:`stream`.
+
+    Args:
+        root (string): Directory the dataset was packed into.
+        decoder (callable): A function to decode a sample given its raw bytes.
+        transform (callable, optional): A function/transform that takes in
+            a sample and returns a transformed version.
+            E.g, ``transforms.RandomCrop`` for images.
+        target_transform (callable, optional): A function/transform that takes
+            in the target and transforms it.
+
+     Attributes:
+        classes (list): List of the class names sorted alphabetically.
+        class_to_idx (dict): Dict with items (class_name, class_index).
+        targets (list): The class_index value for each sample in the dataset
+    """
+
+    def __init__(
+        self,
+        root: str,
+        decoder: Callable[[bytes], Any],
+        transform: Optional[Callable] = None,
+        target_transform: Optional[Callable] = None,
+    ) -> None:
+        super().__init__(root, transform=transform, target_transform=target_transform)
+        with open(os.path.join(self.root, _META_FILE)) as f:
+            meta = json.load(f)
+        if meta["version"] != _VERSION:
+            raise RuntimeError(f"Unsupported version {meta['version']} of the sharded dataset in {self.root}.")
+        with np.load(os.path.join(self.root, _INDEX_FILE)) as index:
+            self._shard_idxs = index["shards"]
+            self._offsets = index["offsets"]
+            self._lengths = index["lengths"]
+            self.targets: List[int] = index["targets"].tolist()
+
+        self.decoder = decoder
+        self.shards: List[str] = meta["shards"]
+        self.classes: List[str] = meta["classes"]
+        self.class_to_idx: Dict[str, int] = meta["class_to_idx"]
+        self._fds: Optional[List[int]] = None
+
+    def _get_fds(self) -> List[int]:
+        if self._fds is None:
+            flags = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+            self._fds = [os.open(os.path.join(self.root, shard), flags) for shard in self.shards]
+        return self._fds
+
+    def read(self, index: int) -> bytes:
+        """Returns the raw bytes of a sample.
+
+        Args:
+            index (int): Index
+
+        Returns:
+            bytes: the undecoded sample.
+        """
+        fd = self._get_fds()[self._shard_idxs[index]]
+        offset, length = int(self._offsets[index]), int(self._lengths[index])
+        if hasattr(os, "pread"):
+            # positional reads don't use the file offset, so the descriptors can be shared by threads and forked
+            # DataLoader workers
+            return os.pread(fd, length, offset)
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.read(fd, length)
+
+    def _load(self, index: int, data: bytes) -> Tuple[Any, Any]:
+        sample = self.decoder(data)
+        target = self.targets[index]
+        if self.transform is not None:
+            sample = self.transform(sample)
+        if self.target_transform is not None:
+            target = self.target_transform(target)
+        return sample, target
+
+    def __getitem__(self, index: int) -> Tuple[Any, Any]:
+        """
+        Args:
+            index (int): Index
+
+        Returns:
+            tuple: (sample, target) where target is class_index of the target class.
+        """
+        return self._load(index, self.read(index))
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+    def stream(self) -> Iterator[Tuple[Any, Any]]:
+        """Iterates over the samples in storage order, reading every shard sequentially.
+
+        When called in a :class:`~torch.utils.data.DataLoader` worker, only the shards whose index modulo the number
+        of workers equals the worker id are read, so that an :class:`~torch.utils.data.IterableDataset` wrapping this
+        method yields every sample exactly once.
+
+        Returns:
+            iterator: (sample, target) tuples.
+        """
+        worker_info = torch.utils.data.get_worker_info()
+        worker_id, num_workers = (0, 1) if worker_info is None else (worker_info.id, worker_info.num_workers)
+
+        order = np.lexsort((self._offsets, self._shard_idxs))
+        bounds = np.searchsorted(self._shard_idxs[order], np.arange(len(self.shards) + 1))
+        for shard_idx in range(worker_id, len(self.shards), num_workers):
+            with open(os.path.join(self.root, self.shards[shard_idx]), "rb") as f:
+                for index in order[bounds[shard_idx] : bounds[shard_idx + 1]].tolist():
+                    f.seek(int(self._offsets[index]))
+                    yield self._load(index, f.read(int(self._lengths[index])))
+
+    def close(self) -> None:
+        """Closes the shards opened by this process."""
+        if getattr(self, "_fds", None) is not None:
+            for fd in self._fds:  # type: ignore[union-attr]
+                os.close(fd)
+            self._fds = None
+
+    def __del__(self) -> None:
+        self.close()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # file descriptors can't be pickled, the shards are opened again on first access
+        state = self.__dict__.copy()
+        state["_fds"] = None
+        return state
+
+
+class ShardedImageFolder(ShardedDatasetFolder):
+    """A data loader for image datasets packed with :func:`pack_dataset_folder`, e.g. from an
+    :class:`~torchvision.datasets.ImageFolder`. See :class:`ShardedDatasetFolder` for details.
+
+    Args:
+        root (string): Directory the dataset was packed into.
+        transform (callable, optional): A function/transform that  takes in an PIL image
+            and returns a transformed version. E.g, ``transforms.RandomCrop``
+        target_transform (callable, optional): A function/transform that takes in the
+            target and transforms it.
+        decoder (callable, optional): A function to decode an image given its raw bytes.
+
+     Attributes:
+        classes (list): List of the class names sorted alphabetically.
+        class_to_idx (dict): Dict with items (class_name, class_index).
+        targets (list): The class_index value for each image in the dataset
+    """
+
+    def __init__(
+        self,
+        root: str,
+        transform: Optional[Callable] = None,
+        target_transform: Optional[Callable] = None,
+        decoder: Callable[[bytes], Any] = pil_decoder,
+    ) -> None:
+        super().__init__(root, decoder, transform=transform, target_transform=target_transform)
@@ -1,9 +1,12 @@
-import bisect
+import json
 import math
+import os
+import uuid
 import warnings
 from fractions import Fraction
-from typing import Any, Dict, List, Optional, Callable, Union, Tuple, TypeVar, cast
+from typing import Any, Dict, List, Optional, Callable, Union, Tuple, TypeVar
 
+import numpy as np
 import torch
 from torchvision.io import (
     _probe_video_from_file,
@@ -75,6 +78,185 @@ def _collate_fn(x: T) -> T:
     return x
 
 
+def _read_frame_pts(video_paths: List[str], num_workers: int = 0) -> Tuple[List[torch.Tensor], List[Optional[float]]]:
+    """
+    Decodes the timestamps of every video in ``video_paths``, using a DataLoader
+    with ``num_workers`` workers to parallelize the work.
+    """
+    video_pts: List[torch.Tensor] = []
+    video_fps: List[Optional[float]] = []
+
+    # strategy: use a DataLoader to parallelize read_video_timestamps
+    # so need to create a dummy dataset first
+    import torch.utils.data
+
+    dl: torch.utils.data.DataLoader = torch.utils.data.DataLoader(
+        _VideoTimestampsDataset(video_paths),  # type: ignore[arg-type]
+        batch_size=16,
+        num_workers=num_workers,
+        collate_fn=_collate_fn,
+    )
+
+    with tqdm(total=len(dl)) as pbar:
+        for batch in dl:
+            pbar.update(1)
+            clips, fps = list(zip(*batch))
+            # we need to specify dtype=torch.long because for empty list,
+            # torch.as_tensor will use torch.float as default dtype. This
+            # happens when decoding fails and no pts is returned in the list.
+            clips = [torch.as_tensor(c, dtype=torch.long) for c in clips]
+            video_pts.extend(clips)
+            video_fps.extend(fps)
+    return video_pts, video_fps
+
+
+class _VideoMetadataIndex:
+    """
+    Persistent on-disk index of the frame timestamps of a collection of videos.
+
+    Every entry is keyed by the absolute path of the video and remembers its size and
+    modification time, so that only new or modified videos need to be probed again.
+    The timestamps of all videos are stored back to back in a single int64 ``.npy``
+    file, which is memory-mapped when loaded: the pts of a video are only paged in
+    once they are actually accessed.
+
+    The directory layout is::
+
+        root/
+        ├── index.json
+        └── pts-<token>.npy
+
+    ``index.json`` is always replaced atomically and references the ``.npy`` file it
+    was written with, so concurrent readers never see a torn index.
+
+    Args:
+        root (str): directory holding the index. It is created if it does not exist.
+    """
+
+    _VERSION = 1
+    _INDEX_FILE = "index.json"
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._pts_file: Optional[str] = None
+        self._pts: Optional[torch.Tensor] = None
+        self._load()
+
+    def _load(self) -> None:
+        index_path = os.path.join(self.root, self._INDEX_FILE)
+        if not os.path.isfile(index_path):
+            return
+        with open(index_path) as f:
+            index = json.load(f)
+        if index.get("version") != self._VERSION:
+            warnings.warn(f"Ignoring video metadata index at {self.root} written with an incompatible version.")
+            return
+        pts_path = os.path.join(self.root, index["pts_file"])
+        if not os.path.isfile(pts_path):
+            warnings.warn(f"Ignoring video metadata index at {self.root}, since {pts_path} is missing.")
+            return
+        self._entries = index["videos"]
+        self._pts_file = index["pts_file"]
+        # copy-on-write mapping: the data is shared with the page cache, and the
+        # resulting tensors are writable without touching the file on disk
+        self._pts = torch.from_numpy(np.load(pts_path, mmap_mode="c"))
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.abspath(path)
+
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, int]]:
+        # missing videos have no stat, and are never recorded in the index
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def _is_valid(self, key: str, stat: Optional[Tuple[int, int]]) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and (entry["size"], entry["mtime_ns"]) == stat
+
+    def _get(self, key: str) -> Tuple[torch.Tensor, Optional[float]]:
+        entry = self._entries[key]
+        assert self._pts is not None
+        return self._pts[entry["offset"] : entry["offset"] + entry["length"]], entry["fps"]
+
+    def update(self, video_paths: List[str], num_workers: int = 0) -> Tuple[List[torch.Tensor], List[Optional[float]]]:
+        """
+        Returns the frame timestamps and frame rate of each video in ``video_paths``. Only the
+        videos that are not in the index, or whose size or modification time changed, are decoded.
+        Entries of videos not in ``video_paths`` are kept, so that a single index can be shared by
+        several splits of a dataset. Missing videos are decoded like without an index, which gives
+        them no timestamps, and are not added to it.
+
+        Args:
+            video_paths (List[str]): paths to the video files
+            num_workers (int): how many subprocesses to use to decode the missing timestamps
+
+        Returns:
+            video_pts (List[Tensor]), video_fps (List[float])
+        """
+        keys = [self._key(path) for path in video_paths]
+        stats = {key: self._stat(key) for key in keys}
+        stale = [key for key in dict.fromkeys(keys) if not self._is_valid(key, stats[key])]
+        decoded: Dict[str, Tuple[torch.Tensor, Optional[float]]] = {}
+        if stale:
+            stale_pts, stale_fps = _read_frame_pts(stale, num_workers)
+            decoded = dict(zip(stale, zip(stale_pts, stale_fps)))
+            updates = {key: value for key, value in decoded.items() if stats[key] is not None}
+            if updates:
+                self._write(stats, updates)
+
+        video_pts, video_fps = [], []
+        for key in keys:
+            pts, fps = decoded[key] if stats[key] is None else self._get(key)
+            video_pts.append(pts)
+            video_fps.append(fps)
+        return video_pts, video_fps
+
+    def _write(
+        self, stats: Dict[str, Optional[Tuple[int, int]]], updates: Dict[str, Tuple[torch.Tensor, Optional[float]]]
+    ) -> None:
+        chunks: List[np.ndarray] = []
+        entries: Dict[str, Dict[str, Any]] = {}
+        offset = 0
+        for key in list(self._entries.keys()) + [key for key in updates if key not in self._entries]:
+            if key in updates:
+                pts, fps = updates[key]
+                stat = stats[key]
+                assert stat is not None
+                size, mtime_ns = stat
+            else:
+                pts, fps = self._get(key)
+                size, mtime_ns = self._entries[key]["size"], self._entries[key]["mtime_ns"]
+            chunks.append(pts.numpy().astype(np.int64, copy=False))
+            entries[key] = dict(size=size, mtime_ns=mtime_ns, offset=offset, length=len(pts), fps=fps)
+            offset += len(pts)
+
+        os.makedirs(self.root, exist_ok=True)
+        token = uuid.uuid4().hex
+        pts_file = f"pts-{token}.npy"
+        np.save(os.path.join(self.root, pts_file), np.concatenate(chunks) if chunks else np.zeros(0, np.int64))
+
+        index_path = os.path.join(self.root, self._INDEX_FILE)
+        tmp_index_path = f"{index_path}.{token}.tmp"
+        with open(tmp_index_path, "w") as f:
+            json.dump(dict(version=self._VERSION, pts_file=pts_file, videos=entries), f)
+        os.replace(tmp_index_path, index_path)
+
+        old_pts_file = self._pts_file
+        self._load()
+        if old_pts_file is not None and old_pts_file != self._pts_file:
+            # readers that still map the old file keep a valid view of it until they release it
+            try:
+                os.remove(os.path.join(self.root, old_pts_file))
+            except OSError:
+                pass
+
+
 class VideoClips:
     """
     Given a list of video files, computes all consecutive subvideos of size
@@ -85,7 +267,8 @@ class VideoClips:
 
     Creating this instance the first time is time-consuming, as it needs to
     decode all the videos in `video_paths`. It is recommended that you
-    cache the results after instantiation of the class.
+    cache the results after instantiation of the class, or to pass a
+    ``metadata_cache`` directory.
 
     Recreating the clips for different clip lengths is fast, and can be done
     with the `compute_clips` method.
@@ -99,6 +282,10 @@ class VideoClips:
             on the resampled video
         num_workers (int): how many subprocesses to use for data loading.
             0 means that the data will be loaded in the main process. (default: 0)
+        metadata_cache (str, optional): if specified, directory of a persistent index of the
+            video timestamps. Videos that are already in the index, and whose size and modification
+            time did not change, are not decoded again; the others are decoded and added to the index.
+            The timestamps are memory-mapped from disk, so they are only read when needed.
     """
 
     def __init__(
@@ -115,10 +302,12 @@ class VideoClips:
         _video_max_dimension: int = 0,
         _audio_samples: int = 0,
         _audio_channels: int = 0,
+        metadata_cache: Optional[str] = None,
     ) -> None:
 
         self.video_paths = video_paths
         self.num_workers = num_workers
+        self.metadata_cache = metadata_cache
 
         # these options are not valid for pyav backend
         self._video_width = _video_width
@@ -135,30 +324,11 @@ class VideoClips:
         self.compute_clips(clip_length_in_frames, frames_between_clips, frame_rate)
 
     def _compute_frame_pts(self) -> None:
-        self.video_pts = []
-        self.video_fps = []
-
-        # strategy: use a DataLoader to parallelize read_video_timestamps
-        # so need to create a dummy dataset first
-        import torch.utils.data
-
-        dl: torch.utils.data.DataLoader = torch.utils.data.DataLoader(
-            _VideoTimestampsDataset(self.video_paths),  # type: ignore[arg-type]
-            batch_size=16,
-            num_workers=self.num_workers,
-            collate_fn=_collate_fn,
-        )
-
-        with tqdm(total=len(dl)) as pbar:
-            for batch in dl:
-                pbar.update(1)
-                clips, fps = list(zip(*batch))
-                # we need to specify dtype=torch.long because for empty list,
-                # torch.as_tensor will use torch.float as default dtype. This
-                # happens when decoding fails and no pts is returned in the list.
-                clips = [torch.as_tensor(c, dtype=torch.long) for c in clips]
-                self.video_pts.extend(clips)
-                self.video_fps.extend(fps)
+        if self.metadata_cache is not None:
+            index = _VideoMetadataIndex(self.metadata_cache)
+            self.video_pts, self.video_fps = index.update(self.video_paths, self.num_workers)
+        else:
+            self.video_pts, self.video_fps = _read_frame_pts(self.video_paths, self.num_workers)
 
     def _init_from_metadata(self, metadata: Dict[str, Any]) -> None:
         self.video_paths = metadata["video_paths"]
@@ -198,6 +368,7 @@ class VideoClips:
             _video_max_dimension=self._video_max_dimension,
             _audio_samples=self._audio_samples,
             _audio_channels=self._audio_channels,
+            metadata_cache=self.metadata_cache,
         )
 
     @staticmethod
@@ -232,6 +403,10 @@ class VideoClips:
         Always returns clips of size `num_frames`, meaning that the
         last few frames in a video can potentially be dropped.
 
+        The clips of all videos are stored in a packed representation: ``clip_pts`` is a single
+        ``Tensor[num_clips, 2]`` holding the first and last pts of every clip, and
+        ``cumulative_sizes`` is the list of the cumulative number of clips per video.
+
         Args:
             num_frames (int): number of frames for the clip
             step (int): distance between two clips
@@ -240,14 +415,87 @@ class VideoClips:
         self.num_frames = num_frames
         self.step = step
         self.frame_rate = frame_rate
-        self.clips = []
-        self.resampling_idxs = []
-        for video_pts, fps in zip(self.video_pts, self.video_fps):
-            clips, idxs = self.compute_clips_for_video(video_pts, num_frames, step, fps, frame_rate)
-            self.clips.append(clips)
-            self.resampling_idxs.append(idxs)
-        clip_lengths = torch.as_tensor([len(v) for v in self.clips])
-        self.cumulative_sizes = clip_lengths.cumsum(0).tolist()
+
+        clip_pts, clips_per_video = [], []
+        # the videos are processed in chunks to bound the size of the temporary buffers
+        for start in range(0, len(self.video_pts), self._COMPUTE_CLIPS_CHUNK_SIZE):
+            end = start + self._COMPUTE_CLIPS_CHUNK_SIZE
+            pts, counts = self._compute_clip_pts(
+                self.video_pts[start:end], self.video_fps[start:end], num_frames, step, frame_rate
+            )
+            clip_pts.append(pts)
+            clips_per_video.append(counts)
+
+        self.clip_pts = torch.cat(clip_pts) if clip_pts else torch.empty((0, 2), dtype=torch.int64)
+        clip_lengths = torch.cat(clips_per_video) if clips_per_video else torch.empty((0,), dtype=torch.int64)
+        if (clip_lengths == 0).any():
+            warnings.warn(
+                "There aren't enough frames in the current video to get a clip for the given clip length and "
+                "frames between clips. The video (and potentially others) will be skipped."
+            )
+        self._cumulative_sizes = clip_lengths.cumsum(0)
+        self.cumulative_sizes = self._cumulative_sizes.tolist()
+        self._clips_per_video: Optional[List[Tuple[torch.Tensor, Union[List[slice], torch.Tensor]]]] = None
+
+    _COMPUTE_CLIPS_CHUNK_SIZE = 4096
+
+    @staticmethod
+    def _compute_clip_pts(
+        video_pts: List[torch.Tensor],
+        video_fps: List[Optional[float]],
+        num_frames: int,
+        step: int,
+        frame_rate: Optional[int] = None,
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Vectorized version of :meth:`compute_clips_for_video` over several videos, which only keeps
+        the first and last pts of each clip.
+
+        Returns:
+            clip_pts (Tensor[num_clips, 2]), clips_per_video (Tensor[num_videos])
+        """
+        lengths = torch.tensor([len(pts) for pts in video_pts], dtype=torch.int64)
+        # if for some reason the video doesn't have fps (because doesn't have a video stream)
+        # set the fps to 1. The value doesn't matter, because video_pts is empty anyway
+        fps = torch.tensor([1 if f is None else f for f in video_fps], dtype=torch.float64)
+        if frame_rate is None:
+            resampling_step = torch.ones_like(fps)
+            rate_ratio = torch.ones_like(fps)
+        else:
+            # divide by tensors rather than scalars to round exactly like the Python floats
+            # used in compute_clips_for_video
+            frame_rates = torch.full_like(fps, frame_rate)
+            resampling_step = fps / frame_rates
+            rate_ratio = frame_rates / fps
+        # mirrors _resample_video_idx: integer steps slice the frames, the other ones index them
+        is_integer = resampling_step == resampling_step.floor()
+        integer_step = torch.where(is_integer, resampling_step, torch.ones_like(fps)).to(torch.int64)
+        num_resampled = torch.where(
+            is_integer,
+            torch.div(lengths + integer_step - 1, integer_step, rounding_mode="floor"),
+            (lengths * rate_ratio).floor().to(torch.int64),
+        )
+        clips_per_video = (torch.div(num_resampled - num_frames, step, rounding_mode="floor") + 1).clamp(min=0)
+
+        video_idx = torch.repeat_interleave(torch.arange(len(video_pts)), clips_per_video)
+        clip_idx = torch.arange(len(video_idx)) - (clips_per_video.cumsum(0) - clips_per_video)[video_idx]
+        # indices of the first and last frames of every clip, in the resampled video
+        resampled_idx = torch.stack([clip_idx * step, clip_idx * step + num_frames - 1], dim=1)
+        frame_idx = torch.where(
+            is_integer[video_idx, None],
+            resampled_idx * integer_step[video_idx, None],
+            (resampled_idx.to(torch.float32) * resampling_step[video_idx, None].to(torch.float32))
+            .floor()
+            .to(torch.int64),
+        )
+
+        if video_pts:
+            flat_pts = torch.cat([pts.to(torch.int64) for pts in video_pts])
+        else:
+            flat_pts = torch.empty((0,), dtype=torch.int64)
+        pts_offsets = lengths.cumsum(0) - lengths
+        clip_pts = flat_pts[frame_idx + pts_offsets[video_idx, None]]
+        return clip_pts, clips_per_video
 
     def __len__(self) -> int:
         return self.num_clips()
@@ -261,18 +509,62 @@ class VideoClips:
         """
         return self.cumulative_sizes[-1]
 
+    def num_clips_per_video(self) -> torch.Tensor:
+        """
+        Number of subclips that are available in each video of the video list.
+        """
+        return torch.diff(self._cumulative_sizes, prepend=self._cumulative_sizes.new_zeros(1))
+
     def get_clip_location(self, idx: int) -> Tuple[int, int]:
         """
         Converts a flattened representation of the indices into a video_idx, clip_idx
         representation.
         """
-        video_idx = bisect.bisect_right(self.cumulative_sizes, idx)
+        video_idx = int(torch.searchsorted(self._cumulative_sizes, idx, right=True))
         if video_idx == 0:
             clip_idx = idx
         else:
-            clip_idx = idx - self.cumulative_sizes[video_idx - 1]
+            clip_idx = idx - int(self._cumulative_sizes[video_idx - 1])
         return video_idx, clip_idx
 
+    @property
+    def clips(self) -> List[torch.Tensor]:
+        """
+        Per-video clips, as returned by :meth:`compute_clips_for_video`. Kept for backwards
+        compatibility, these are computed on first access.
+        """
+        return [clips for clips, _ in self._compute_clips_per_video()]
+
+    @property
+    def resampling_idxs(self) -> List[Union[List[slice], torch.Tensor]]:
+        """
+        Per-video resampling indices, as returned by :meth:`compute_clips_for_video`. Kept for
+        backwards compatibility, these are computed on first access.
+        """
+        return [idxs for _, idxs in self._compute_clips_per_video()]
+
+    def _compute_clips_per_video(self) -> List[Tuple[torch.Tensor, Union[List[slice], torch.Tensor]]]:
+        if self._clips_per_video is None:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                self._clips_per_video = [
+                    self.compute_clips_for_video(video_pts, self.num_frames, self.step, fps, self.frame_rate)
+                    for video_pts, fps in zip(self.video_pts, self.video_fps)
+                ]
+        return self._clips_per_video
+
+    def _get_resampling_idx(self, video_idx: int, clip_idx: int) -> Union[slice, torch.Tensor]:
+        fps = self.video_fps[video_idx]
+        if fps is None:
+            fps = 1
+        assert self.frame_rate is not None
+        resampling_step = float(fps) / self.frame_rate
+        if resampling_step.is_integer():
+            return slice(None, None, int(resampling_step))
+        start = clip_idx * self.step
+        idxs = torch.arange(start, start + self.num_frames, dtype=torch.float32) * resampling_step
+        return idxs.floor().to(torch.int64)
+
     @staticmethod
     def _resample_video_idx(num_frames: int, original_fps: int, new_fps: int) -> Union[slice, torch.Tensor]:
         step = float(original_fps) / new_fps
@@ -302,7 +594,7 @@ class VideoClips:
             raise IndexError(f"Index {idx} out of range ({self.num_clips()} number of clips)")
         video_idx, clip_idx = self.get_clip_location(idx)
         video_path = self.video_paths[video_idx]
-        clip_pts = self.clips[video_idx][clip_idx]
+        video_start_pts, video_end_pts = self.clip_pts[idx].tolist()
 
         from torchvision import get_video_backend
 
@@ -322,17 +614,12 @@ class VideoClips:
                 raise ValueError("pyav backend doesn't support _audio_samples != 0")
 
         if backend == "pyav":
-            start_pts = clip_pts[0].item()
-            end_pts = clip_pts[-1].item()
-            video, audio, info = read_video(video_path, start_pts, end_pts)
+            video, audio, info = read_video(video_path, video_start_pts, video_end_pts)
         else:
             _info = _probe_video_from_file(video_path)
             video_fps = _info.video_fps
             audio_fps = None
 
-            video_start_pts = cast(int, clip_pts[0].item())
-            video_end_pts = cast(int, clip_pts[-1].item())
-
             audio_start_pts, audio_end_pts = 0, -1
             audio_timebase = Fraction(0, 1)
             video_timebase = Fraction(_info.video_timebase.numerator, _info.video_timebase.denominator)
@@ -360,7 +647,7 @@ class VideoClips:
                 info["audio_fps"] = audio_fps
 
         if self.frame_rate is not None:
-            resampling_idx = self.resampling_idxs[video_idx][clip_idx]
+            resampling_idx = self._get_resampling_idx(video_idx, clip_idx)
             if isinstance(resampling_idx, torch.Tensor):
                 resampling_idx = resampling_idx - resampling_idx[0]
             video = video[resampling_idx]
@@ -382,24 +669,28 @@ class VideoClips:
             # TODO: Revert it once the bug is fixed.
             video_pts = video_pts.numpy()  # type: ignore[attr-defined]
 
-        # make a copy of the fields of self
+        # make a copy of the fields of self. The packed clips are kept as is: when pickled
+        # for DataLoader workers, torch.multiprocessing moves them to shared memory
         d = self.__dict__.copy()
         d["video_pts_sizes"] = video_pts_sizes
         d["video_pts"] = video_pts
-        # delete the following attributes to reduce the size of dictionary. They
-        # will be re-computed in "__setstate__()"
-        del d["clips"]
-        del d["resampling_idxs"]
-        del d["cumulative_sizes"]
+        # the per-video clips are only a cache of the packed ones
+        d["_clips_per_video"] = None
 
         # for backwards-compatibility
-        d["_version"] = 2
+        d["_version"] = 3
         return d
 
     def __setstate__(self, d: Dict[str, Any]) -> None:
         # for backwards-compatibility
+        d.setdefault("metadata_cache", None)
+        d.setdefault("_clips_per_video", None)
         if "_version" not in d:
+            # the per-video clips are superseded by the packed representation
+            d.pop("clips", None)
+            d.pop("resampling_idxs", None)
             self.__dict__ = d
+            self.compute_clips(self.num_frames, self.step, self.frame_rate)
             return
 
         video_pts = torch.as_tensor(d["video_pts"], dtype=torch.int64)
@@ -409,5 +700,6 @@ class VideoClips:
 
         d["video_pts"] = video_pts
         self.__dict__ = d
-        # recompute attributes "clips", "resampling_idxs" and other derivative ones
-        self.compute_clips(self.num_frames, self.step, self.frame_rate)
+        if d["_version"] < 3:
+            # recompute the packed clips, which were not stored
+            self.compute_clips(self.num_frames, self.step, self.frame_rate)
@@ -23,6 +23,7 @@ from .image import (
     ImageReadMode,
     decode_image,
     decode_jpeg,
+    decode_jpeg_batch,
     decode_png,
     encode_jpeg,
     encode_png,
@@ -59,6 +60,7 @@ __all__ = [
     "ImageReadMode",
     "decode_image",
     "decode_jpeg",
+    "decode_jpeg_batch",
     "decode_png",
     "encode_jpeg",
     "encode_png",
@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import List, Optional
 from warnings import warn
 
 import torch
@@ -36,6 +37,11 @@ def read_file(path: str) -> torch.Tensor:
     Reads and outputs the bytes contents of a file as a uint8 Tensor
     with one dimension.
 
+    .. note::
+        On platforms other than Windows, the file is not copied but memory-mapped with a private,
+        copy-on-write mapping: the data is served directly from the page cache, and the mapping
+        lives as long as the returned tensor. Inplace operations on the tensor never modify the file.
+
     Args:
         path (str): the path to the file to be read
 
@@ -124,8 +130,21 @@ def write_png(input: torch.Tensor, filename: str, compression_level: int = 6):
     write_file(filename, output)
 
 
+def _parse_min_size(min_size: Optional[List[int]]) -> List[int]:
+    if min_size is None:
+        return []
+    if isinstance(min_size, int):
+        min_size = [min_size]
+    if len(min_size) not in (1, 2):
+        raise ValueError(f"min_size should be an int or a sequence of one or two ints, got {min_size}")
+    return min_size
+
+
 def decode_jpeg(
-    input: torch.Tensor, mode: ImageReadMode = ImageReadMode.UNCHANGED, device: str = "cpu"
+    input: torch.Tensor,
+    mode: ImageReadMode = ImageReadMode.UNCHANGED,
+    device: str = "cpu",
+    min_size: Optional[List[int]] = None,
 ) -> torch.Tensor:
     """
     Decodes a JPEG image into a 3 dimensional RGB or grayscale Tensor.
@@ -148,6 +167,12 @@ def decode_jpeg(
             .. warning::
                 There is a memory leak in the nvjpeg library for CUDA versions < 11.6.
                 Make sure to rely on CUDA 11.6 or above before using ``device="cuda"``.
+        min_size (int or sequence, optional): minimum ``(height, width)`` of the decoded image, or a
+            single int to use for both. If specified, the image is decoded at the smallest reduced
+            resolution (1/2, 1/4 or 1/8, performed during the inverse DCT) that is at least this
+            size, which is much faster than decoding at full resolution when the image is
+            downscaled right after. The image is never upscaled. Only supported on CPU, ignored
+            for cuda devices.
 
     Returns:
         output (Tensor[image_channels, image_height, image_width])
@@ -158,10 +183,47 @@ def decode_jpeg(
     if device.type == "cuda":
         output = torch.ops.image.decode_jpeg_cuda(input, mode.value, device)
     else:
-        output = torch.ops.image.decode_jpeg(input, mode.value)
+        output = torch.ops.image.decode_jpeg(input, mode.value, _parse_min_size(min_size))
     return output
 
 
+def decode_jpeg_batch(
+    inputs: List[torch.Tensor],
+    mode: ImageReadMode = ImageReadMode.UNCHANGED,
+    num_threads: int = 0,
+    output: Optional[torch.Tensor] = None,
+) -> List[torch.Tensor]:
+    """
+    Decodes a batch of JPEG images on CPU into 3 dimensional RGB or grayscale Tensors.
+    The images are decoded in parallel without holding the GIL, each of them by a single thread.
+    Optionally converts the images to the desired format.
+    The values of the output tensors are uint8 between 0 and 255.
+
+    Args:
+        inputs (List[Tensor[1]]): one dimensional uint8 tensors containing
+            the raw bytes of the JPEG images.
+        mode (ImageReadMode): the read mode used for optionally
+            converting the images. Default: ``ImageReadMode.UNCHANGED``.
+            See ``ImageReadMode`` class for more information on various
+            available modes.
+        num_threads (int): maximum number of threads used to decode the batch. If 0, the number of
+            threads of the intra-op thread pool is used, see :func:`torch.get_num_threads`. Default: 0.
+        output (Tensor[batch_size, image_channels, height, width], optional): preallocated uint8 tensor
+            the images are written into. Images whose size differs from ``height x width`` are decoded
+            at the smallest reduced resolution that is at least ``height x width`` (see ``min_size`` in
+            :func:`decode_jpeg`), and resized with antialiased bilinear interpolation. The number of
+            channels of the decoded images must match the one of ``output``, which can be enforced
+            with ``mode``.
+
+    Returns:
+        output (List[Tensor[image_channels, image_height, image_width]]): the decoded images. If
+        ``output`` is given, these are views of its images.
+    """
+    if not torch.jit.is_scripting() and not torch.jit.is_tracing():
+        _log_api_usage_once(decode_jpeg_batch)
+    return torch.ops.image.decode_jpeg_batch(inputs, mode.value, num_threads, output)
+
+
 def encode_jpeg(input: torch.Tensor, quality: int = 75) -> torch.Tensor:
     """
     Takes an input tensor in CHW layout and returns a buffer with the contents
@@ -203,7 +265,9 @@ def write_jpeg(input: torch.Tensor, filename: str, quality: int = 75):
     write_file(filename, output)
 
 
-def decode_image(input: torch.Tensor, mode: ImageReadMode = ImageReadMode.UNCHANGED) -> torch.Tensor:
+def decode_image(
+    input: torch.Tensor, mode: ImageReadMode = ImageReadMode.UNCHANGED, min_size: Optional[List[int]] = None
+) -> torch.Tensor:
     """
     Detects whether an image is a JPEG or PNG and performs the appropriate
     operation to decode the image into a 3 dimensional RGB or grayscale Tensor.
@@ -218,17 +282,22 @@ def decode_image(input: torch.Tensor, mode: ImageReadMode = ImageReadMode.UNCHAN
             Default: ``ImageReadMode.UNCHANGED``.
             See ``ImageReadMode`` class for more information on various
             available modes.
+        min_size (int or sequence, optional): minimum ``(height, width)`` of the decoded image, used
+            to decode JPEG images at a reduced resolution. See :func:`decode_jpeg` for details.
+            Ignored for PNG images.
 
     Returns:
         output (Tensor[image_channels, image_height, image_width])
     """
     if not torch.jit.is_scripting() and not torch.jit.is_tracing():
         _log_api_usage_once(decode_image)
-    output = torch.ops.image.decode_image(input, mode.value)
+    output = torch.ops.image.decode_image(input, mode.value, _parse_min_size(min_size))
     return output
 
 
-def read_image(path: str, mode: ImageReadMode = ImageReadMode.UNCHANGED) -> torch.Tensor:
+def read_image(
+    path: str, mode: ImageReadMode = ImageReadMode.UNCHANGED, min_size: Optional[List[int]] = None
+) -> torch.Tensor:
     """
     Reads a JPEG or PNG image into a 3 dimensional RGB or grayscale Tensor.
     Optionally converts the image to the desired format.
@@ -240,6 +309,9 @@ def read_image(path: str, mode: ImageReadMode = ImageReadMode.UNCHANGED) -> torc
             Default: ``ImageReadMode.UNCHANGED``.
             See ``ImageReadMode`` class for more information on various
             available modes.
+        min_size (int or sequence, optional): minimum ``(height, width)`` of the decoded image, used
+            to decode JPEG images at a reduced resolution. See :func:`decode_jpeg` for details.
+            Ignored for PNG images.
 
     Returns:
         output (Tensor[image_channels, image_height, image_width])
@@ -247,7 +319,7 @@ def read_image(path: str, mode: ImageReadMode = ImageReadMode.UNCHANGED) -> torc
     if not torch.jit.is_scripting() and not torch.jit.is_tracing():
         _log_api_usage_once(read_image)
     data = read_file(path)
-    return decode_image(data, mode)
+    return decode_image(data, mode, min_size)
 
 
 def _read_png_16(path: str, mode: ImageReadMode = ImageReadMode.UNCHANGED) -> torch.Tensor:
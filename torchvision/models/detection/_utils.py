@@ -1,9 +1,10 @@
 import math
 from collections import OrderedDict
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import torch
 from torch import Tensor, nn
+from torchvision.ops import boxes as box_ops
 from torchvision.ops.misc import FrozenBatchNorm2d
 
 
@@ -70,6 +71,41 @@ class BalancedPositiveNegativeSampler:
         return pos_idx, neg_idx
 
 
+def pack_boxes(boxes: List[Tensor]) -> Tuple[Tensor, Tensor]:
+    """
+    Packs the boxes of several images in a single tensor. The boxes are concatenated once here, so that
+    the packed tensor can then be passed to :meth:`BoxCoder.encode_packed` and :meth:`BoxCoder.decode_packed`
+    as many times as needed, which concatenate nothing.
+
+    Args:
+        boxes (List[Tensor[K_i, 4]]): boxes of each image
+
+    Returns:
+        packed_boxes (Tensor[K, 4]): the concatenated boxes
+        image_offsets (Tensor[B + 1]): int64 boundaries of the images, on the CPU like the default of
+        ``batched_nms``: the boxes of the i-th image are ``packed_boxes[image_offsets[i]:image_offsets[i + 1]]``
+    """
+    offsets = [0]
+    for b in boxes:
+        offsets.append(offsets[-1] + b.shape[0])
+    return torch.cat(boxes, dim=0), torch.tensor(offsets, dtype=torch.int64)
+
+
+def _check_image_offsets(image_offsets: Tensor, num_boxes: int) -> None:
+    # The offsets are expected on the CPU, as returned by pack_boxes, where reading them does not synchronize
+    if image_offsets.dim() != 1 or image_offsets.numel() == 0:
+        raise ValueError(f"image_offsets should be a non-empty 1d tensor, instead got shape {image_offsets.shape}")
+    offsets: List[int] = image_offsets.tolist()
+    if offsets[0] != 0 or offsets[-1] != num_boxes:
+        raise ValueError(
+            f"image_offsets should go from 0 to the number of boxes ({num_boxes}), "
+            f"instead got {offsets[0]} to {offsets[-1]}"
+        )
+    for start, end in zip(offsets[:-1], offsets[1:]):
+        if end < start:
+            raise ValueError(f"image_offsets should be non-decreasing, instead got {offsets}")
+
+
 @torch.jit._script_if_tracing
 def encode_boxes(reference_boxes: Tensor, proposals: Tensor, weights: Tensor) -> Tensor:
     """
@@ -142,6 +178,25 @@ class BoxCoder:
         targets = self.encode_single(reference_boxes, proposals)
         return targets.split(boxes_per_image, 0)
 
+    def encode_packed(self, reference_boxes: Tensor, proposals: Tensor, image_offsets: Tensor) -> Tensor:
+        """
+        Same as ``encode``, for the boxes of all the images packed in single tensors (see
+        :func:`pack_boxes`). The targets are returned packed as well, instead of being split per image.
+
+        Args:
+            reference_boxes (Tensor[K, 4]): reference boxes of all the images
+            proposals (Tensor[K, 4]): boxes to be encoded, of all the images
+            image_offsets (Tensor[B + 1]): boundaries of the images in the packed tensors, checked against
+                both of them
+        """
+        _check_image_offsets(image_offsets, reference_boxes.shape[0])
+        if proposals.shape[0] != reference_boxes.shape[0]:
+            raise ValueError(
+                f"proposals and reference_boxes should have the same number of boxes, "
+                f"instead got {proposals.shape[0]} and {reference_boxes.shape[0]}"
+            )
+        return self.encode_single(reference_boxes, proposals)
+
     def encode_single(self, reference_boxes: Tensor, proposals: Tensor) -> Tensor:
         """
         Encode a set of proposals with respect to some
@@ -175,6 +230,28 @@ class BoxCoder:
             pred_boxes = pred_boxes.reshape(box_sum, -1, 4)
         return pred_boxes
 
+    def decode_packed(self, rel_codes: Tensor, boxes: Tensor, image_offsets: Tensor) -> Tensor:
+        """
+        Same as ``decode``, for the reference boxes of all the images already packed in a single tensor
+        (see :func:`pack_boxes`), instead of a list that ``decode`` concatenates on every call.
+
+        Args:
+            rel_codes (Tensor): encoded boxes, with ``K`` rows or reshapable to ``K`` rows
+            boxes (Tensor[K, 4]): reference boxes of all the images
+            image_offsets (Tensor[B + 1]): boundaries of the images in ``boxes``, checked against it
+
+        Returns:
+            Tensor[K, C, 4]: the decoded boxes
+        """
+        _check_image_offsets(image_offsets, boxes.shape[0])
+        box_sum = boxes.shape[0]
+        if box_sum > 0:
+            rel_codes = rel_codes.reshape(box_sum, -1)
+        pred_boxes = self.decode_single(rel_codes, boxes)
+        if box_sum > 0:
+            pred_boxes = pred_boxes.reshape(box_sum, -1, 4)
+        return pred_boxes
+
     def decode_single(self, rel_codes: Tensor, boxes: Tensor) -> Tensor:
         """
         From a set of original boxes and encoded relative box offsets,
@@ -367,11 +444,7 @@ class Matcher:
         else:
             all_matches = None  # type: ignore[assignment]
 
-        # Assign candidate matches with low quality to negative (unassigned) values
-        below_low_threshold = matched_vals < self.low_threshold
-        between_thresholds = (matched_vals >= self.low_threshold) & (matched_vals < self.high_threshold)
-        matches[below_low_threshold] = self.BELOW_LOW_THRESHOLD
-        matches[between_thresholds] = self.BETWEEN_THRESHOLDS
+        self._apply_thresholds_(matches, matched_vals)
 
         if self.allow_low_quality_matches:
             if all_matches is None:
@@ -380,6 +453,82 @@ class Matcher:
 
         return matches
 
+    def match_boxes(self, gt_boxes: Tensor, boxes: Tensor, tile_size: int = 1 << 22) -> Tensor:
+        """
+        Same as calling the matcher on ``box_iou(gt_boxes, boxes)``, without materializing the
+        full IoU matrix. The IoU is computed in tiles of at most ``tile_size`` elements, of which
+        only the per-prediction and per-ground-truth maxima are kept, so the memory used does not
+        grow with the product of the number of ground-truth and predicted boxes. For another similarity
+        than the IoU, call the matcher on the full similarity matrix instead.
+
+        Args:
+            gt_boxes (Tensor[M, 4]): ground-truth boxes in ``(x1, y1, x2, y2)`` format
+            boxes (Tensor[N, 4]): predicted boxes (e.g. anchors) in ``(x1, y1, x2, y2)`` format
+            tile_size (int): maximum number of IoU values computed at once
+
+        Returns:
+            matches (Tensor[int64]): an N tensor where N[i] is a matched gt in
+            [0, M - 1] or a negative value indicating that prediction i could not
+            be matched.
+        """
+        matched_vals, matches, highest_quality_foreach_gt, _ = self._reduce_iou(gt_boxes, boxes, tile_size)
+        if self.allow_low_quality_matches:
+            all_matches = matches.clone()
+        else:
+            all_matches = None  # type: ignore[assignment]
+
+        self._apply_thresholds_(matches, matched_vals)
+
+        if self.allow_low_quality_matches:
+            if all_matches is None:
+                raise ValueError("all_matches should not be None")
+            # second pass over the tiles to find the predictions tied with the best one of each gt
+            chunk_size = self._chunk_size(gt_boxes, tile_size)
+            for start in range(0, boxes.shape[0], chunk_size):
+                iou = box_ops.box_iou(gt_boxes, boxes[start : start + chunk_size])
+                pred_inds_to_update = torch.where((iou == highest_quality_foreach_gt[:, None]).any(dim=0))[0] + start
+                matches[pred_inds_to_update] = all_matches[pred_inds_to_update]
+
+        return matches
+
+    def _apply_thresholds_(self, matches: Tensor, matched_vals: Tensor) -> None:
+        # Assign candidate matches with low quality to negative (unassigned) values
+        below_low_threshold = matched_vals < self.low_threshold
+        between_thresholds = (matched_vals >= self.low_threshold) & (matched_vals < self.high_threshold)
+        matches[below_low_threshold] = self.BELOW_LOW_THRESHOLD
+        matches[between_thresholds] = self.BETWEEN_THRESHOLDS
+
+    def _chunk_size(self, gt_boxes: Tensor, tile_size: int) -> int:
+        return max(tile_size // max(gt_boxes.shape[0], 1), 1)
+
+    def _reduce_iou(self, gt_boxes: Tensor, boxes: Tensor, tile_size: int) -> Tuple[Tensor, Tensor, Tensor, Tensor]:
+        # Returns the max and argmax of the IoU over the gt boxes for each prediction, and over the
+        # predictions for each gt box, computing the IoU matrix tile by tile
+        if gt_boxes.shape[0] == 0:
+            raise ValueError("No ground-truth boxes available for one of the images during training")
+        if boxes.shape[0] == 0:
+            raise ValueError("No proposal boxes available for one of the images during training")
+
+        chunk_size = self._chunk_size(gt_boxes, tile_size)
+        matched_vals = []
+        matches = []
+        # box_iou returns float32 values for integer boxes
+        dtype = gt_boxes.dtype if gt_boxes.is_floating_point() else torch.float32
+        highest_quality_foreach_gt = torch.full((gt_boxes.shape[0],), -1.0, dtype=dtype, device=gt_boxes.device)
+        highest_quality_pred_foreach_gt = torch.zeros((gt_boxes.shape[0],), dtype=torch.int64, device=gt_boxes.device)
+        for start in range(0, boxes.shape[0], chunk_size):
+            iou = box_ops.box_iou(gt_boxes, boxes[start : start + chunk_size])
+            vals, idxs = iou.max(dim=0)
+            matched_vals.append(vals)
+            matches.append(idxs)
+
+            tile_vals, tile_idxs = iou.max(dim=1)
+            # strict comparison, so that the first prediction wins ties like in a single max
+            better = tile_vals > highest_quality_foreach_gt
+            highest_quality_foreach_gt = torch.where(better, tile_vals, highest_quality_foreach_gt)
+            highest_quality_pred_foreach_gt = torch.where(better, tile_idxs + start, highest_quality_pred_foreach_gt)
+        return torch.cat(matched_vals), torch.cat(matches), highest_quality_foreach_gt, highest_quality_pred_foreach_gt
+
     def set_low_quality_matches_(self, matches: Tensor, all_matches: Tensor, match_quality_matrix: Tensor) -> None:
         """
         Produce additional matches for predictions that have only low-quality matches.
@@ -425,6 +574,17 @@ class SSDMatcher(Matcher):
 
         return matches
 
+    def match_boxes(self, gt_boxes: Tensor, boxes: Tensor, tile_size: int = 1 << 22) -> Tensor:
+        matched_vals, matches, _, highest_quality_pred_foreach_gt = self._reduce_iou(gt_boxes, boxes, tile_size)
+        self._apply_thresholds_(matches, matched_vals)
+
+        # For each gt, the prediction with which it has the highest quality is always matched to it
+        matches[highest_quality_pred_foreach_gt] = torch.arange(
+            highest_quality_pred_foreach_gt.size(0), dtype=torch.int64, device=highest_quality_pred_foreach_gt.device
+        )
+
+        return matches
+
 
 def overwrite_eps(model: nn.Module, eps: float) -> None:
     """
@@ -503,3 +663,40 @@ def _topk_min(input: Tensor, orig_kval: int, axis: int) -> int:
     axis_dim_val = torch._shape_as_tensor(input)[axis].unsqueeze(0)
     min_kval = torch.min(torch.cat((torch.tensor([orig_kval], dtype=axis_dim_val.dtype), axis_dim_val), 0))
     return _fake_cast_onnx(min_kval)
+
+
+_NMS_METHODS = ("nms", "soft_nms", "matrix_nms")
+
+
+def _check_nms_method(nms_method: str) -> None:
+    if nms_method not in _NMS_METHODS:
+        raise ValueError(f"nms_method should be one of {_NMS_METHODS}, got {nms_method}")
+
+
+def _nms(
+    nms_method: str,
+    boxes: Tensor,
+    scores: Tensor,
+    labels: Tensor,
+    nms_thresh: float,
+    score_thresh: float,
+    image_offsets: Optional[Tensor],
+    detections_per_img: int,
+) -> Tuple[Tensor, Tensor]:
+    """
+    Removes the duplicate detections of the dense detectors with either hard NMS, Soft-NMS or
+    Matrix NMS, independently per class and per image. The last two rescore the detections, and
+    drop the ones whose new score is lower than ``score_thresh``.
+
+    Returns:
+        keep (Tensor): indices of the kept detections
+        scores (Tensor): their scores
+    """
+    if nms_method == "soft_nms":
+        return box_ops.batched_soft_nms(
+            boxes, scores, labels, nms_thresh, image_offsets, detections_per_img, score_threshold=score_thresh
+        )
+    if nms_method == "matrix_nms":
+        return box_ops.batched_matrix_nms(boxes, scores, labels, score_thresh, image_offsets, detections_per_img)
+    keep = box_ops.batched_nms(boxes, scores, labels, nms_thresh, image_offsets, detections_per_img)
+    return keep, scores[keep]
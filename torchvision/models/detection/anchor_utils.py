@@ -1,12 +1,35 @@
 import math
-from typing import List, Optional
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 
 import torch
+import torchvision
 from torch import nn, Tensor
 
 from .image_list import ImageList
 
 
+# The anchors only depend on the sizes of the feature maps and of the padded images, which only take a few
+# values at inference time, so the generators keep the anchors of the most recently used sizes. The cache is
+# keyed by tuples, which TorchScript doesn't support as dict keys, so scripted generators don't use it.
+def _anchors_cache_key(grid_sizes: List[List[int]], image_size: List[int], dtype: torch.dtype, device: torch.device):
+    return (tuple(map(tuple, grid_sizes)), tuple(image_size), dtype, device)
+
+
+def _cache_get(cache: "OrderedDict[Tuple, Tensor]", key: Tuple) -> Optional[Tensor]:
+    value = cache.get(key)
+    if value is not None:
+        # the first entry is always the least recently used one
+        cache.move_to_end(key)
+    return value
+
+
+def _cache_put(cache: "OrderedDict[Tuple, Tensor]", key: Tuple, value: Tensor, cache_size: int) -> None:
+    cache[key] = value
+    if len(cache) > cache_size:
+        cache.popitem(last=False)
+
+
 class AnchorGenerator(nn.Module):
     """
     Module that generates anchors for a set of feature maps and
@@ -23,9 +46,14 @@ class AnchorGenerator(nn.Module):
     and AnchorGenerator will output a set of sizes[i] * aspect_ratios[i] anchors
     per spatial location for feature map i.
 
+    The anchors of the ``cache_size`` most recently used image and feature map sizes are cached, and the
+    anchors returned for the images of a batch are the same tensor, so they must not be modified in place.
+    The ``cache_hits`` and ``cache_misses`` attributes count how often the cache was used.
+
     Args:
         sizes (Tuple[Tuple[int]]):
         aspect_ratios (Tuple[Tuple[float]]):
+        cache_size (int): maximum number of cached anchor sets. 0 disables the cache. Default: 8.
     """
 
     __annotations__ = {
@@ -36,6 +64,7 @@ class AnchorGenerator(nn.Module):
         self,
         sizes=((128, 256, 512),),
         aspect_ratios=((0.5, 1.0, 2.0),),
+        cache_size: int = 8,
     ):
         super().__init__()
 
@@ -50,6 +79,10 @@ class AnchorGenerator(nn.Module):
         self.cell_anchors = [
             self.generate_anchors(size, aspect_ratio) for size, aspect_ratio in zip(sizes, aspect_ratios)
         ]
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = OrderedDict()
 
     # TODO: https://github.com/pytorch/pytorch/issues/26792
     # For every (aspect_ratios, scales) combination, output a zero-centered anchor with those values.
@@ -115,25 +148,47 @@ class AnchorGenerator(nn.Module):
 
         return anchors
 
+    @torch.jit.unused
+    def _cache_lookup(
+        self, grid_sizes: List[List[int]], image_size: List[int], dtype: torch.dtype, device: torch.device
+    ) -> Optional[Tensor]:
+        return _cache_get(self._cache, _anchors_cache_key(grid_sizes, image_size, dtype, device))
+
+    @torch.jit.unused
+    def _cache_store(
+        self,
+        grid_sizes: List[List[int]],
+        image_size: List[int],
+        dtype: torch.dtype,
+        device: torch.device,
+        value: Tensor,
+    ) -> None:
+        _cache_put(self._cache, _anchors_cache_key(grid_sizes, image_size, dtype, device), value, self.cache_size)
+
     def forward(self, image_list: ImageList, feature_maps: List[Tensor]) -> List[Tensor]:
         grid_sizes = [feature_map.shape[-2:] for feature_map in feature_maps]
         image_size = image_list.tensors.shape[-2:]
         dtype, device = feature_maps[0].dtype, feature_maps[0].device
-        strides = [
-            [
-                torch.empty((), dtype=torch.int64, device=device).fill_(image_size[0] // g[0]),
-                torch.empty((), dtype=torch.int64, device=device).fill_(image_size[1] // g[1]),
+        # traced graphs must compute the anchors from the input sizes
+        use_cache = self.cache_size > 0 and not torchvision._is_tracing() and not torch.jit.is_scripting()
+        anchors = self._cache_lookup(grid_sizes, image_size, dtype, device) if use_cache else None
+        if anchors is None:
+            strides = [
+                [
+                    torch.empty((), dtype=torch.int64, device=device).fill_(image_size[0] // g[0]),
+                    torch.empty((), dtype=torch.int64, device=device).fill_(image_size[1] // g[1]),
+                ]
+                for g in grid_sizes
             ]
-            for g in grid_sizes
-        ]
-        self.set_cell_anchors(dtype, device)
-        anchors_over_all_feature_maps = self.grid_anchors(grid_sizes, strides)
-        anchors: List[List[torch.Tensor]] = []
-        for _ in range(len(image_list.image_sizes)):
-            anchors_in_image = [anchors_per_feature_map for anchors_per_feature_map in anchors_over_all_feature_maps]
-            anchors.append(anchors_in_image)
-        anchors = [torch.cat(anchors_per_image) for anchors_per_image in anchors]
-        return anchors
+            self.set_cell_anchors(dtype, device)
+            anchors = torch.cat(self.grid_anchors(grid_sizes, strides))
+            if use_cache:
+                self.cache_misses += 1
+                self._cache_store(grid_sizes, image_size, dtype, device, anchors)
+        else:
+            self.cache_hits += 1
+        # all the images of the batch are padded to the same size, so they share the same anchors
+        return [anchors for _ in range(len(image_list.image_sizes))]
 
 
 class DefaultBoxGenerator(nn.Module):
@@ -152,6 +207,8 @@ class DefaultBoxGenerator(nn.Module):
             it will be estimated from the data.
         clip (bool): Whether the standardized values of default boxes should be clipped between 0 and 1. The clipping
             is applied while the boxes are encoded in format ``(cx, cy, w, h)``.
+        cache_size (int): maximum number of cached sets of default boxes, see
+            :class:`~torchvision.models.detection.anchor_utils.AnchorGenerator`. 0 disables the cache. Default: 8.
     """
 
     def __init__(
@@ -162,6 +219,7 @@ class DefaultBoxGenerator(nn.Module):
         scales: Optional[List[float]] = None,
         steps: Optional[List[int]] = None,
         clip: bool = True,
+        cache_size: int = 8,
     ):
         super().__init__()
         if steps is not None and len(aspect_ratios) != len(steps):
@@ -183,6 +241,10 @@ class DefaultBoxGenerator(nn.Module):
             self.scales = scales
 
         self._wh_pairs = self._generate_wh_pairs(num_outputs)
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = OrderedDict()
 
     def _generate_wh_pairs(
         self, num_outputs: int, dtype: torch.dtype = torch.float32, device: torch.device = torch.device("cpu")
@@ -249,23 +311,45 @@ class DefaultBoxGenerator(nn.Module):
         )
         return s
 
+    @torch.jit.unused
+    def _cache_lookup(
+        self, grid_sizes: List[List[int]], image_size: List[int], dtype: torch.dtype, device: torch.device
+    ) -> Optional[Tensor]:
+        return _cache_get(self._cache, _anchors_cache_key(grid_sizes, image_size, dtype, device))
+
+    @torch.jit.unused
+    def _cache_store(
+        self,
+        grid_sizes: List[List[int]],
+        image_size: List[int],
+        dtype: torch.dtype,
+        device: torch.device,
+        value: Tensor,
+    ) -> None:
+        _cache_put(self._cache, _anchors_cache_key(grid_sizes, image_size, dtype, device), value, self.cache_size)
+
     def forward(self, image_list: ImageList, feature_maps: List[Tensor]) -> List[Tensor]:
         grid_sizes = [feature_map.shape[-2:] for feature_map in feature_maps]
         image_size = image_list.tensors.shape[-2:]
         dtype, device = feature_maps[0].dtype, feature_maps[0].device
-        default_boxes = self._grid_default_boxes(grid_sizes, image_size, dtype=dtype)
-        default_boxes = default_boxes.to(device)
-
-        dboxes = []
-        x_y_size = torch.tensor([image_size[1], image_size[0]], device=default_boxes.device)
-        for _ in image_list.image_sizes:
-            dboxes_in_image = default_boxes
-            dboxes_in_image = torch.cat(
+        use_cache = self.cache_size > 0 and not torchvision._is_tracing() and not torch.jit.is_scripting()
+        dboxes = self._cache_lookup(grid_sizes, image_size, dtype, device) if use_cache else None
+        if dboxes is None:
+            default_boxes = self._grid_default_boxes(grid_sizes, image_size, dtype=dtype)
+            default_boxes = default_boxes.to(device)
+
+            x_y_size = torch.tensor([image_size[1], image_size[0]], device=default_boxes.device)
+            dboxes = torch.cat(
                 [
-                    (dboxes_in_image[:, :2] - 0.5 * dboxes_in_image[:, 2:]) * x_y_size,
-                    (dboxes_in_image[:, :2] + 0.5 * dboxes_in_image[:, 2:]) * x_y_size,
+                    (default_boxes[:, :2] - 0.5 * default_boxes[:, 2:]) * x_y_size,
+                    (default_boxes[:, :2] + 0.5 * default_boxes[:, 2:]) * x_y_size,
                 ],
                 -1,
             )
-            dboxes.append(dboxes_in_image)
-        return dboxes
+            if use_cache:
+                self.cache_misses += 1
+                self._cache_store(grid_sizes, image_size, dtype, device, dboxes)
+        else:
+            self.cache_hits += 1
+        # all the images of the batch are padded to the same size, so they share the same default boxes
+        return [dboxes for _ in range(len(image_list.image_sizes))]
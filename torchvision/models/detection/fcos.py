@@ -309,6 +309,10 @@ class FCOS(nn.Module):
         nms_thresh (float): NMS threshold used for postprocessing the detections.
         detections_per_img (int): Number of best detections to keep after NMS.
         topk_candidates (int): Number of best detections to keep before NMS.
+        nms_method (str): method used to remove the duplicate detections: ``"nms"``, ``"soft_nms"`` or
+            ``"matrix_nms"``. The last two decay the scores of the overlapping detections instead of
+            discarding them, see :func:`~torchvision.ops.batched_soft_nms` and
+            :func:`~torchvision.ops.batched_matrix_nms`. Default: ``"nms"``.
 
     Example:
 
@@ -366,6 +370,7 @@ class FCOS(nn.Module):
         nms_thresh: float = 0.6,
         detections_per_img: int = 100,
         topk_candidates: int = 1000,
+        nms_method: str = "nms",
     ):
         super().__init__()
         _log_api_usage_once(self)
@@ -410,6 +415,8 @@ class FCOS(nn.Module):
         self.nms_thresh = nms_thresh
         self.detections_per_img = detections_per_img
         self.topk_candidates = topk_candidates
+        det_utils._check_nms_method(nms_method)
+        self.nms_method = nms_method
 
         # used only on torchscript mode
         self._has_warned = False
@@ -481,7 +488,9 @@ class FCOS(nn.Module):
 
         num_images = len(image_shapes)
 
-        detections: List[Dict[str, Tensor]] = []
+        all_boxes: List[Tensor] = []
+        all_scores: List[Tensor] = []
+        all_labels: List[Tensor] = []
 
         for index in range(num_images):
             box_regression_per_image = [br[index] for br in box_regression]
@@ -523,19 +532,36 @@ class FCOS(nn.Module):
                 image_scores.append(scores_per_level)
                 image_labels.append(labels_per_level)
 
-            image_boxes = torch.cat(image_boxes, dim=0)
-            image_scores = torch.cat(image_scores, dim=0)
-            image_labels = torch.cat(image_labels, dim=0)
-
-            # non-maximum suppression
-            keep = box_ops.batched_nms(image_boxes, image_scores, image_labels, self.nms_thresh)
-            keep = keep[: self.detections_per_img]
+            all_boxes.append(torch.cat(image_boxes, dim=0))
+            all_scores.append(torch.cat(image_scores, dim=0))
+            all_labels.append(torch.cat(image_labels, dim=0))
+
+        # non-maximum suppression, for all the images at once
+        image_offsets = [0]
+        for image_boxes in all_boxes:
+            image_offsets.append(image_offsets[-1] + image_boxes.shape[0])
+        boxes = torch.cat(all_boxes, dim=0)
+        scores = torch.cat(all_scores, dim=0)
+        labels = torch.cat(all_labels, dim=0)
+        keep, scores = det_utils._nms(
+            self.nms_method,
+            boxes,
+            scores,
+            labels,
+            self.nms_thresh,
+            self.score_thresh,
+            torch.tensor(image_offsets),
+            self.detections_per_img,
+        )
 
+        detections: List[Dict[str, Tensor]] = []
+        for start, end in zip(image_offsets[:-1], image_offsets[1:]):
+            in_image = (keep >= start) & (keep < end)
             detections.append(
                 {
-                    "boxes": image_boxes[keep],
-                    "scores": image_scores[keep],
-                    "labels": image_labels[keep],
+                    "boxes": boxes[keep[in_image]],
+                    "scores": scores[in_image],
+                    "labels": labels[keep[in_image]],
                 }
             )
 
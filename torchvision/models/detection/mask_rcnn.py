@@ -102,6 +102,9 @@ class MaskRCNN(FasterRCNN):
         mask_head (nn.Module): module that takes the cropped feature maps as input
         mask_predictor (nn.Module): module that takes the output of the mask_head and returns the
             segmentation mask logits
+        compact_masks (bool): if True, the predicted masks are thresholded at 0.5 and cropped to their
+            boxes instead of being pasted in full size images, and the image regions covered by the crops
+            are returned as ``mask_regions`` (``Int64Tensor[N, 4]``, in ``[x1, y1, x2, y2)`` format).
 
     Example::
 
@@ -189,6 +192,7 @@ class MaskRCNN(FasterRCNN):
         mask_roi_pool=None,
         mask_head=None,
         mask_predictor=None,
+        compact_masks=False,
     ):
 
         if not isinstance(mask_roi_pool, (MultiScaleRoIAlign, type(None))):
@@ -253,6 +257,7 @@ class MaskRCNN(FasterRCNN):
         self.roi_heads.mask_roi_pool = mask_roi_pool
         self.roi_heads.mask_head = mask_head
         self.roi_heads.mask_predictor = mask_predictor
+        self.transform.compact_masks = compact_masks
 
 
 class MaskRCNNHeads(nn.Sequential):
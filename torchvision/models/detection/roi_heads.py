@@ -232,6 +232,64 @@ def _onnx_heatmaps_to_keypoints_loop(
     return xy_preds, end_scores
 
 
+# Number of samples of the upsampled heatmaps per axis around each maximum, and radius in pixels of the
+# heatmaps of the windows in which they are taken. The discrete maximum of a noisy peak can be one pixel away
+# from its continuous maximum, and the bicubic interpolation only overshoots its samples within one pixel of a
+# local maximum, so the continuous maximum of the upsampled peak is less than 2 pixels away from the discrete
+# one. Its closest upsampled pixel is then less than 2 + 1 / scale pixels away, where 1 / scale is the spacing of
+# the upsampled pixels in pixels of the heatmaps. The windows span at most 4 * scale + 3 upsampled pixels,
+# which are all sampled for a scale of up to 11.25, e.g. for rois of up to 630 pixels with 56 x 56 heatmaps,
+# and every few pixels for larger rois. The upsampled heatmaps that have at most _KEYPOINT_SAMPLES pixels
+# along an axis, where a sample may be far from any peak, are sampled whole along it.
+_KEYPOINT_SAMPLES = 48
+_KEYPOINT_RADIUS = 2
+
+
+def _keypoint_samples(pos, map_size, out_size):
+    # type: (Tensor, int, Tensor) -> Tensor
+    """
+    Returns the [M, _KEYPOINT_SAMPLES] pixels of the heatmaps upsampled from map_size to out_size at which the
+    upsampled heatmaps are evaluated around pos, the maximum of the heatmaps: the pixels interpolated less than
+    _KEYPOINT_RADIUS + 1 / scale pixels away from pos, or all the pixels of the small upsampled heatmaps.
+    """
+    scale = out_size.to(torch.float32) / map_size
+    radius = _KEYPOINT_RADIUS + 1 / scale
+    last = out_size - 1
+    whole = out_size <= _KEYPOINT_SAMPLES
+    first_sample = torch.ceil((pos - radius + 0.5) * scale - 0.5).to(torch.int64)
+    first_sample = torch.min(first_sample.clamp(min=0), last).masked_fill(whole, 0)
+    last_sample = torch.floor((pos + radius + 0.5) * scale - 0.5).to(torch.int64)
+    last_sample = torch.where(whole, last, torch.max(torch.min(last_sample, last), first_sample))
+    step = torch.div(last_sample - first_sample + _KEYPOINT_SAMPLES, _KEYPOINT_SAMPLES, rounding_mode="floor")
+    samples = first_sample[:, None] + step[:, None] * torch.arange(_KEYPOINT_SAMPLES, device=pos.device)
+    return torch.min(samples, last_sample[:, None])
+
+
+def _bicubic_weights(dst, in_size, out_size):
+    # type: (Tensor, int, Tensor) -> Tensor
+    """
+    Returns the [M, K, in_size] weights of F.interpolate(mode="bicubic", align_corners=False) from in_size to
+    out_size[m], for the [M, K] output pixels dst.
+    """
+    A = -0.75
+    scale = in_size / out_size.to(torch.float32)
+    src = (dst.to(torch.float32) + 0.5) * scale[:, None] - 0.5
+    src_floor = torch.floor(src)
+    t = src - src_floor
+    coeffs = [
+        ((A * (t + 1) - 5 * A) * (t + 1) + 8 * A) * (t + 1) - 4 * A,
+        ((A + 2) * t - (A + 3)) * t * t + 1,
+        ((A + 2) * (1 - t) - (A + 3)) * (1 - t) * (1 - t) + 1,
+        ((A * (2 - t) - 5 * A) * (2 - t) + 8 * A) * (2 - t) - 4 * A,
+    ]
+
+    weights = torch.zeros(list(dst.shape) + [in_size], dtype=torch.float32, device=dst.device)
+    for i, coeff in enumerate(coeffs):
+        index = (src_floor.to(torch.int64) + (i - 1)).clamp(min=0, max=in_size - 1)
+        weights.scatter_add_(2, index[:, :, None], coeff[:, :, None])
+    return weights
+
+
 def heatmaps_to_keypoints(maps, rois):
     """Extract predicted keypoint locations from heatmaps. Output has shape
     (#rois, 4, #keypoints) with the 4 rows corresponding to (x, y, logit, prob)
@@ -268,32 +326,37 @@ def heatmaps_to_keypoints(maps, rois):
         )
         return xy_preds.permute(0, 2, 1), end_scores
 
-    xy_preds = torch.zeros((len(rois), 3, num_keypoints), dtype=torch.float32, device=maps.device)
-    end_scores = torch.zeros((len(rois), num_keypoints), dtype=torch.float32, device=maps.device)
-    for i in range(len(rois)):
-        roi_map_width = int(widths_ceil[i].item())
-        roi_map_height = int(heights_ceil[i].item())
-        width_correction = widths[i] / roi_map_width
-        height_correction = heights[i] / roi_map_height
-        roi_map = F.interpolate(
-            maps[i][:, None], size=(roi_map_height, roi_map_width), mode="bicubic", align_corners=False
-        )[:, 0]
-        # roi_map_probs = scores_to_probs(roi_map.copy())
-        w = roi_map.shape[2]
-        pos = roi_map.reshape(num_keypoints, -1).argmax(dim=1)
-
-        x_int = pos % w
-        y_int = torch.div(pos - x_int, w, rounding_mode="floor")
-        # assert (roi_map_probs[k, y_int, x_int] ==
-        #         roi_map_probs[k, :, :].max())
-        x = (x_int.float() + 0.5) * width_correction
-        y = (y_int.float() + 0.5) * height_correction
-        xy_preds[i, 0, :] = x + offset_x[i]
-        xy_preds[i, 1, :] = y + offset_y[i]
-        xy_preds[i, 2, :] = 1
-        end_scores[i, :] = roi_map[torch.arange(num_keypoints, device=roi_map.device), y_int, x_int]
-
-    return xy_preds.permute(0, 2, 1), end_scores
+    if rois.shape[0] == 0:
+        xy_preds = torch.zeros((0, num_keypoints, 3), dtype=torch.float32, device=maps.device)
+        end_scores = torch.zeros((0, num_keypoints), dtype=torch.float32, device=maps.device)
+        return xy_preds, end_scores
+
+    # The keypoints are the maxima of the heatmaps upsampled to the size of their roi with a bicubic
+    # interpolation. They are refined from the maxima of the heatmaps, by evaluating the upsampled heatmaps
+    # only around the latter, for all the keypoints of all the rois at once.
+    maps = maps.float().flatten(0, 1)
+    map_h, map_w = maps.shape[-2], maps.shape[-1]
+    out_w = widths_ceil.to(torch.int64).repeat_interleave(num_keypoints)
+    out_h = heights_ceil.to(torch.int64).repeat_interleave(num_keypoints)
+    pos = maps.flatten(1).argmax(dim=1)
+    samples_x = _keypoint_samples(pos % map_w, map_w, out_w)
+    samples_y = _keypoint_samples(torch.div(pos, map_w, rounding_mode="floor"), map_h, out_h)
+    weights_x = _bicubic_weights(samples_x, map_w, out_w)
+    weights_y = _bicubic_weights(samples_y, map_h, out_h)
+    roi_maps = torch.matmul(torch.matmul(weights_y, maps), weights_x.transpose(1, 2))
+    end_scores, pos = roi_maps.flatten(1).max(dim=1)
+    x_int = samples_x.gather(1, (pos % _KEYPOINT_SAMPLES)[:, None])
+    y_int = samples_y.gather(1, torch.div(pos, _KEYPOINT_SAMPLES, rounding_mode="floor")[:, None])
+    end_scores = end_scores.view(-1, num_keypoints)
+    x_int = x_int.view(-1, num_keypoints)
+    y_int = y_int.view(-1, num_keypoints)
+
+    width_correction = widths / widths_ceil
+    height_correction = heights / heights_ceil
+    x = (x_int.float() + 0.5) * width_correction[:, None]
+    y = (y_int.float() + 0.5) * height_correction[:, None]
+    xy_preds = torch.stack([x + offset_x[:, None], y + offset_y[:, None], torch.ones_like(x)], dim=2)
+    return xy_preds, end_scores
 
 
 def keypointrcnn_loss(keypoint_logits, proposals, gt_keypoints, keypoint_matched_idxs):
@@ -333,6 +396,11 @@ def keypointrcnn_inference(x, boxes):
     kp_scores = []
 
     boxes_per_image = [box.size(0) for box in boxes]
+    if not torchvision._is_tracing():
+        # the keypoints of all the images are extracted at once
+        kp_prob, scores = heatmaps_to_keypoints(x, torch.cat(boxes, dim=0))
+        return list(kp_prob.split(boxes_per_image, dim=0)), list(scores.split(boxes_per_image, dim=0))
+
     x2 = x.split(boxes_per_image, dim=0)
 
     for xx, bb in zip(x2, boxes):
@@ -472,6 +540,58 @@ def _onnx_paste_masks_in_image_loop(masks, boxes, im_h, im_w):
     return res_append
 
 
+def _interpolation_weights(start, box_start, box_end, size, mask_size, dtype):
+    # type: (Tensor, Tensor, Tensor, int, int, torch.dtype) -> Tensor
+    """
+    Returns the [N, size, mask_size] weights of the bilinear interpolation (align_corners=False) of the
+    masks resized to their boxes, along one axis, for the pixels [start, start + size) of the image.
+    The pixels that are outside of the boxes get null weights.
+    """
+    box_size = box_end - box_start + 1
+    pos = torch.arange(size, device=start.device)[None, :] + (start - box_start)[:, None]
+    scale = mask_size / box_size.clamp(min=1).to(dtype)
+    src = ((pos.to(dtype) + 0.5) * scale[:, None] - 0.5).clamp(min=0)
+    src_0 = src.to(torch.int64).clamp(max=mask_size - 1)
+    src_1 = (src_0 + 1).clamp(max=mask_size - 1)
+    lambda_1 = src - src_0.to(dtype)
+    inside = ((pos >= 0) & (pos < box_size[:, None])).to(dtype)
+
+    weights = torch.zeros((start.shape[0], size, mask_size), dtype=dtype, device=start.device)
+    weights.scatter_add_(2, src_0[:, :, None], ((1 - lambda_1) * inside)[:, :, None])
+    weights.scatter_add_(2, src_1[:, :, None], (lambda_1 * inside)[:, :, None])
+    return weights
+
+
+def _paste_masks_in_windows(masks, boxes, x_start, y_start, height, width):
+    # type: (Tensor, Tensor, Tensor, Tensor, int, int) -> Tensor
+    """
+    Resizes every mask to its box and pastes it on a height x width window of the image whose top-left
+    corner is at (x_start, y_start), like paste_mask_in_image does. The bilinear resizing is separable,
+    so all the masks are resized at once by two batched matrix products.
+    """
+    mask_h, mask_w = masks.shape[-2], masks.shape[-1]
+    weights_x = _interpolation_weights(x_start, boxes[:, 0], boxes[:, 2], width, mask_w, masks.dtype)
+    weights_y = _interpolation_weights(y_start, boxes[:, 1], boxes[:, 3], height, mask_h, masks.dtype)
+    return torch.bmm(torch.bmm(weights_y, masks[:, 0]), weights_x.transpose(1, 2))[:, None]
+
+
+def _clip_boxes_to_image(boxes, im_h, im_w):
+    # type: (Tensor, int, int) -> Tuple[Tensor, Tensor, Tensor, Tensor]
+    # the parts of the integer boxes, with inclusive x2 and y2, that are inside of the image, with exclusive x2
+    # and y2, and possibly empty
+    x_0 = boxes[:, 0].clamp(min=0, max=im_w)
+    y_0 = boxes[:, 1].clamp(min=0, max=im_h)
+    x_1 = torch.max((boxes[:, 2] + 1).clamp(max=im_w), x_0)
+    y_1 = torch.max((boxes[:, 3] + 1).clamp(max=im_h), y_0)
+    return x_0, y_0, x_1, y_1
+
+
+def _paste_chunk_size(height, width):
+    # type: (int, int) -> int
+    # the float masks are only materialized for a few instances at a time, up to 2 ** 24 pixels
+    return max(1, (1 << 24) // max(1, height * width))
+
+
 def paste_masks_in_image(masks, boxes, img_shape, padding=1):
     # type: (Tensor, Tensor, Tuple[int, int], int) -> Tensor
     masks, scale = expand_masks(masks, padding=padding)
@@ -482,12 +602,68 @@ def paste_masks_in_image(masks, boxes, img_shape, padding=1):
         return _onnx_paste_masks_in_image_loop(
             masks, boxes, torch.scalar_tensor(im_h, dtype=torch.int64), torch.scalar_tensor(im_w, dtype=torch.int64)
         )[:, None]
-    res = [paste_mask_in_image(m[0], b, im_h, im_w) for m, b in zip(masks, boxes)]
-    if len(res) > 0:
-        ret = torch.stack(res, dim=0)[:, None]
-    else:
-        ret = masks.new_empty((0, 1, im_h, im_w))
-    return ret
+
+    ret = masks.new_zeros((masks.shape[0], im_h, im_w))
+    if masks.shape[0] == 0:
+        return ret[:, None]
+    x_0, y_0, x_1, y_1 = _clip_boxes_to_image(boxes, im_h, im_w)
+    height = int((y_1 - y_0).max())
+    width = int((x_1 - x_0).max())
+    if height == 0 or width == 0:
+        return ret[:, None]
+
+    # The masks are only resized in windows of the size of the largest clipped box, moved inside of the image,
+    # where they still cover their clipped box, and are then written in the image masks.
+    x_start = torch.min(x_0, torch.full_like(x_0, im_w - width))
+    y_start = torch.min(y_0, torch.full_like(y_0, im_h - height))
+    xs = x_start[:, None] + torch.arange(width, device=masks.device)
+    ys = y_start[:, None] + torch.arange(height, device=masks.device)
+    rows = torch.arange(masks.shape[0], device=masks.device)
+    chunk_size = _paste_chunk_size(height, width)
+    for start in range(0, masks.shape[0], chunk_size):
+        end = min(start + chunk_size, masks.shape[0])
+        pasted = _paste_masks_in_windows(
+            masks[start:end], boxes[start:end], x_start[start:end], y_start[start:end], height, width
+        )
+        ret[rows[start:end, None, None], ys[start:end, :, None], xs[start:end, None, :]] = pasted[:, 0]
+    return ret[:, None]
+
+
+def paste_masks_in_image_compact(masks, boxes, img_shape, padding=1):
+    # type: (Tensor, Tensor, Tuple[int, int], int) -> Tuple[Tensor, Tensor]
+    """
+    Compact alternative to paste_masks_in_image, which never materializes the full image masks.
+
+    Every mask is resized to its box, thresholded at 0.5 and cropped to the part of its box that
+    lies inside of the image.
+
+    Returns:
+        masks (Tensor[N, 1, H, W]): the boolean cropped masks, zero-padded to the size H x W of the
+            largest crop
+        regions (Tensor[N, 4]): the ``[x1, y1, x2, y2]`` image regions covered by the crops, with
+            exclusive ``x2`` and ``y2``, so that ``full[y1:y2, x1:x2] = masks[i, 0, : y2 - y1, : x2 - x1]``
+            reconstructs the full image mask of instance ``i``
+    """
+    masks, scale = expand_masks(masks, padding=padding)
+    boxes = expand_boxes(boxes, scale).to(dtype=torch.int64)
+    im_h, im_w = img_shape
+
+    x_0, y_0, x_1, y_1 = _clip_boxes_to_image(boxes, im_h, im_w)
+    regions = torch.stack([x_0, y_0, x_1, y_1], dim=1)
+    if masks.shape[0] == 0:
+        return masks.new_zeros((0, 1, 0, 0), dtype=torch.bool), regions
+
+    height = int((y_1 - y_0).max())
+    width = int((x_1 - x_0).max())
+    ret = torch.empty((masks.shape[0], 1, height, width), dtype=torch.bool, device=masks.device)
+    chunk_size = _paste_chunk_size(height, width)
+    for start in range(0, masks.shape[0], chunk_size):
+        end = min(start + chunk_size, masks.shape[0])
+        pasted = _paste_masks_in_windows(
+            masks[start:end], boxes[start:end], x_0[start:end], y_0[start:end], height, width
+        )
+        ret[start:end] = pasted >= 0.5
+    return ret, regions
 
 
 class RoIHeads(nn.Module):
@@ -581,8 +757,7 @@ class RoIHeads(nn.Module):
                 labels_in_image = torch.zeros((proposals_in_image.shape[0],), dtype=torch.int64, device=device)
             else:
                 #  set to self.box_similarity when https://github.com/pytorch/pytorch/issues/27495 lands
-                match_quality_matrix = box_ops.box_iou(gt_boxes_in_image, proposals_in_image)
-                matched_idxs_in_image = self.proposal_matcher(match_quality_matrix)
+                matched_idxs_in_image = self.proposal_matcher.match_boxes(gt_boxes_in_image, proposals_in_image)
 
                 clamped_matched_idxs_in_image = matched_idxs_in_image.clamp(min=0)
 
@@ -713,10 +888,8 @@ class RoIHeads(nn.Module):
             keep = box_ops.remove_small_boxes(boxes, min_size=1e-2)
             boxes, scores, labels = boxes[keep], scores[keep], labels[keep]
 
-            # non-maximum suppression, independently done per class
-            keep = box_ops.batched_nms(boxes, scores, labels, self.nms_thresh)
-            # keep only topk scoring predictions
-            keep = keep[: self.detections_per_img]
+            # non-maximum suppression, independently done per class, keeping only topk scoring predictions
+            keep = box_ops.batched_nms(boxes, scores, labels, self.nms_thresh, max_output=self.detections_per_img)
             boxes, scores, labels = boxes[keep], scores[keep], labels[keep]
 
             all_boxes.append(boxes)
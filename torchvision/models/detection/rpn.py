@@ -1,6 +1,7 @@
 from typing import List, Optional, Dict, Tuple
 
 import torch
+import torchvision
 from torch import nn, Tensor
 from torch.nn import functional as F
 from torchvision.ops import boxes as box_ops
@@ -152,6 +153,14 @@ class RegionProposalNetwork(torch.nn.Module):
             return self._post_nms_top_n["training"]
         return self._post_nms_top_n["testing"]
 
+    @torch.jit.unused
+    def _match_anchors(self, gt_boxes: Tensor, anchors: Tensor) -> Tensor:
+        if self.box_similarity is box_ops.box_iou:
+            # the IoU between the gt boxes and the anchors is reduced tile by tile, as the full matrix
+            # gets very large for high resolution images
+            return self.proposal_matcher.match_boxes(gt_boxes, anchors)
+        return self.proposal_matcher(self.box_similarity(gt_boxes, anchors))
+
     def assign_targets_to_anchors(
         self, anchors: List[Tensor], targets: List[Dict[str, Tensor]]
     ) -> Tuple[List[Tensor], List[Tensor]]:
@@ -167,8 +176,11 @@ class RegionProposalNetwork(torch.nn.Module):
                 matched_gt_boxes_per_image = torch.zeros(anchors_per_image.shape, dtype=torch.float32, device=device)
                 labels_per_image = torch.zeros((anchors_per_image.shape[0],), dtype=torch.float32, device=device)
             else:
-                match_quality_matrix = self.box_similarity(gt_boxes, anchors_per_image)
-                matched_idxs = self.proposal_matcher(match_quality_matrix)
+                if torch.jit.is_scripting():
+                    # functions cannot be compared in TorchScript, so any box_similarity is a full matrix there
+                    matched_idxs = self.proposal_matcher(self.box_similarity(gt_boxes, anchors_per_image))
+                else:
+                    matched_idxs = self._match_anchors(gt_boxes, anchors_per_image)
                 # get the targets corresponding GT for each proposal
                 # NB: need to clamp the indices because we can have a single
                 # GT in the image, and matched_idxs can be -2, which goes
@@ -191,6 +203,9 @@ class RegionProposalNetwork(torch.nn.Module):
         return labels, matched_gt_boxes
 
     def _get_top_n_idx(self, objectness: Tensor, num_anchors_per_level: List[int]) -> Tensor:
+        if not torchvision._is_tracing():
+            return self._get_top_n_idx_batched(objectness, num_anchors_per_level)
+
         r = []
         offset = 0
         for ob in objectness.split(num_anchors_per_level, 1):
@@ -201,6 +216,28 @@ class RegionProposalNetwork(torch.nn.Module):
             offset += num_anchors
         return torch.cat(r, dim=1)
 
+    def _get_top_n_idx_batched(self, objectness: Tensor, num_anchors_per_level: List[int]) -> Tensor:
+        # Same as _get_top_n_idx, with a single topk over the levels padded to the same length
+        num_images = objectness.shape[0]
+        num_levels = len(num_anchors_per_level)
+        device = objectness.device
+        max_anchors = max(num_anchors_per_level)
+        pre_nms_top_n = min(self.pre_nms_top_n(), max_anchors)
+
+        anchors_per_level = torch.tensor(num_anchors_per_level, dtype=torch.int64, device=device)
+        level_starts = anchors_per_level.cumsum(0) - anchors_per_level
+        levels = torch.repeat_interleave(torch.arange(num_levels, device=device), anchors_per_level)
+        padded_idx = levels * max_anchors + torch.arange(objectness.shape[1], device=device) - level_starts[levels]
+
+        padded = objectness.new_full((num_images, num_levels * max_anchors), float("-inf"))
+        padded[:, padded_idx] = objectness
+        _, top_n_idx = padded.reshape(num_images, num_levels, max_anchors).topk(pre_nms_top_n, dim=2)
+        top_n_idx = top_n_idx + level_starts[:, None]
+
+        # levels with fewer anchors than pre_nms_top_n only keep their own anchors
+        valid = torch.arange(pre_nms_top_n, device=device)[None, :] < anchors_per_level[:, None]
+        return top_n_idx[:, valid]
+
     def filter_proposals(
         self,
         proposals: Tensor,
@@ -233,6 +270,9 @@ class RegionProposalNetwork(torch.nn.Module):
 
         objectness_prob = torch.sigmoid(objectness)
 
+        if not torchvision._is_tracing():
+            return self._filter_proposals_batched(proposals, objectness_prob, levels, image_shapes)
+
         final_boxes = []
         final_scores = []
         for boxes, scores, lvl, img_shape in zip(proposals, objectness_prob, levels, image_shapes):
@@ -247,17 +287,50 @@ class RegionProposalNetwork(torch.nn.Module):
             keep = torch.where(scores >= self.score_thresh)[0]
             boxes, scores, lvl = boxes[keep], scores[keep], lvl[keep]
 
-            # non-maximum suppression, independently done per level
-            keep = box_ops.batched_nms(boxes, scores, lvl, self.nms_thresh)
-
-            # keep only topk scoring predictions
-            keep = keep[: self.post_nms_top_n()]
+            # non-maximum suppression, independently done per level, keeping only topk scoring predictions
+            keep = box_ops.batched_nms(boxes, scores, lvl, self.nms_thresh, max_output=self.post_nms_top_n())
             boxes, scores = boxes[keep], scores[keep]
 
             final_boxes.append(boxes)
             final_scores.append(scores)
         return final_boxes, final_scores
 
+    def _filter_proposals_batched(
+        self,
+        proposals: Tensor,
+        objectness_prob: Tensor,
+        levels: Tensor,
+        image_shapes: List[Tuple[int, int]],
+    ) -> Tuple[List[Tensor], List[Tensor]]:
+        # Same as the loop of filter_proposals, for all the images at once
+        num_images = proposals.shape[0]
+        device = proposals.device
+
+        image_sizes = torch.tensor([[s[0], s[1]] for s in image_shapes], dtype=proposals.dtype, device=device)
+        boxes_x = torch.min(proposals[..., 0::2].clamp(min=0), image_sizes[:, None, 1:])
+        boxes_y = torch.min(proposals[..., 1::2].clamp(min=0), image_sizes[:, None, :1])
+        proposals = torch.stack((boxes_x, boxes_y), dim=3).reshape(proposals.shape)
+
+        # remove small and low scoring boxes
+        ws, hs = proposals[..., 2] - proposals[..., 0], proposals[..., 3] - proposals[..., 1]
+        valid = (ws >= self.min_size) & (hs >= self.min_size) & (objectness_prob >= self.score_thresh)
+        keep = torch.where(valid.flatten())[0]
+        boxes = proposals.flatten(0, 1)[keep]
+        scores = objectness_prob.flatten()[keep]
+        lvl = levels.flatten()[keep]
+        image_idxs = torch.div(keep, valid.shape[1], rounding_mode="floor")
+
+        # non-maximum suppression, independently done per image and level, keeping only topk scoring predictions
+        image_offsets = torch.zeros(num_images + 1, dtype=torch.int64, device=device)
+        image_offsets[1:] = valid.sum(dim=1).cumsum(dim=0)
+        keep = box_ops.batched_nms(
+            boxes, scores, lvl, self.nms_thresh, image_offsets=image_offsets, max_output=self.post_nms_top_n()
+        )
+        counts: List[int] = torch.bincount(image_idxs[keep], minlength=num_images).tolist()
+        final_boxes = list(boxes[keep].split(counts))
+        final_scores = list(scores[keep].split(counts))
+        return final_boxes, final_scores
+
     def compute_loss(
         self, objectness: Tensor, pred_bbox_deltas: Tensor, labels: List[Tensor], regression_targets: List[Tensor]
     ) -> Tuple[Tensor, Tensor]:
@@ -268,6 +341,25 @@ class RegionProposalNetwork(torch.nn.Module):
             labels (List[Tensor])
             regression_targets (List[Tensor])
 
+        Returns:
+            objectness_loss (Tensor)
+            box_loss (Tensor)
+        """
+        return self.compute_loss_packed(objectness, pred_bbox_deltas, labels, torch.cat(regression_targets, dim=0))
+
+    def compute_loss_packed(
+        self, objectness: Tensor, pred_bbox_deltas: Tensor, labels: List[Tensor], regression_targets: Tensor
+    ) -> Tuple[Tensor, Tensor]:
+        """
+        Same as ``compute_loss``, for the regression targets of all the images already packed in a
+        single tensor (see :meth:`BoxCoder.encode_packed`).
+
+        Args:
+            objectness (Tensor)
+            pred_bbox_deltas (Tensor)
+            labels (List[Tensor])
+            regression_targets (Tensor)
+
         Returns:
             objectness_loss (Tensor)
             box_loss (Tensor)
@@ -282,7 +374,6 @@ class RegionProposalNetwork(torch.nn.Module):
         objectness = objectness.flatten()
 
         labels = torch.cat(labels, dim=0)
-        regression_targets = torch.cat(regression_targets, dim=0)
 
         box_loss = (
             F.smooth_l1_loss(
@@ -333,7 +424,8 @@ class RegionProposalNetwork(torch.nn.Module):
         # apply pred_bbox_deltas to anchors to obtain the decoded proposals
         # note that we detach the deltas because Faster R-CNN do not backprop through
         # the proposals
-        proposals = self.box_coder.decode(pred_bbox_deltas.detach(), anchors)
+        packed_anchors, image_offsets = det_utils.pack_boxes(anchors)
+        proposals = self.box_coder.decode_packed(pred_bbox_deltas.detach(), packed_anchors, image_offsets)
         proposals = proposals.view(num_images, -1, 4)
         boxes, scores = self.filter_proposals(proposals, objectness, images.image_sizes, num_anchors_per_level)
 
@@ -342,8 +434,10 @@ class RegionProposalNetwork(torch.nn.Module):
             if targets is None:
                 raise ValueError("targets should not be None")
             labels, matched_gt_boxes = self.assign_targets_to_anchors(anchors, targets)
-            regression_targets = self.box_coder.encode(matched_gt_boxes, anchors)
-            loss_objectness, loss_rpn_box_reg = self.compute_loss(
+            regression_targets = self.box_coder.encode_packed(
+                torch.cat(matched_gt_boxes, dim=0), packed_anchors, image_offsets
+            )
+            loss_objectness, loss_rpn_box_reg = self.compute_loss_packed(
                 objectness, pred_bbox_deltas, labels, regression_targets
             )
             losses = {
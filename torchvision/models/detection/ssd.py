@@ -158,6 +158,10 @@ class SSD(nn.Module):
         positive_fraction (float): a number between 0 and 1 which indicates the proportion of positive
             proposals used during the training of the classification head. It is used to estimate the negative to
             positive ratio.
+        nms_method (str): method used to remove the duplicate detections: ``"nms"``, ``"soft_nms"`` or
+            ``"matrix_nms"``. The last two decay the scores of the overlapping detections instead of
+            discarding them, see :func:`~torchvision.ops.batched_soft_nms` and
+            :func:`~torchvision.ops.batched_matrix_nms`. Default: ``"nms"``.
     """
 
     __annotations__ = {
@@ -180,6 +184,7 @@ class SSD(nn.Module):
         iou_thresh: float = 0.5,
         topk_candidates: int = 400,
         positive_fraction: float = 0.25,
+        nms_method: str = "nms",
     ):
         super().__init__()
         _log_api_usage_once(self)
@@ -218,6 +223,8 @@ class SSD(nn.Module):
         self.score_thresh = score_thresh
         self.nms_thresh = nms_thresh
         self.detections_per_img = detections_per_img
+        det_utils._check_nms_method(nms_method)
+        self.nms_method = nms_method
         self.topk_candidates = topk_candidates
         self.neg_to_pos_ratio = (1.0 - positive_fraction) / positive_fraction
 
@@ -428,13 +435,21 @@ class SSD(nn.Module):
             image_labels = torch.cat(image_labels, dim=0)
 
             # non-maximum suppression
-            keep = box_ops.batched_nms(image_boxes, image_scores, image_labels, self.nms_thresh)
-            keep = keep[: self.detections_per_img]
+            keep, image_scores = det_utils._nms(
+                self.nms_method,
+                image_boxes,
+                image_scores,
+                image_labels,
+                self.nms_thresh,
+                self.score_thresh,
+                None,
+                self.detections_per_img,
+            )
 
             detections.append(
                 {
                     "boxes": image_boxes[keep],
-                    "scores": image_scores[keep],
+                    "scores": image_scores,
                     "labels": image_labels[keep],
                 }
             )
@@ -4,9 +4,10 @@ from typing import List, Tuple, Dict, Optional
 import torch
 import torchvision
 from torch import nn, Tensor
+from torchvision.extension import _assert_has_ops
 
 from .image_list import ImageList
-from .roi_heads import paste_masks_in_image
+from .roi_heads import paste_masks_in_image, paste_masks_in_image_compact
 
 
 @torch.jit.unused
@@ -22,6 +23,15 @@ def _fake_cast_onnx(v: Tensor) -> float:
     return v
 
 
+def _check_image(image: Tensor) -> None:
+    if image.dim() != 3:
+        raise ValueError(f"images is expected to be a list of 3d tensors of shape [C, H, W], got {image.shape}")
+    if not image.is_floating_point():
+        raise TypeError(
+            f"Expected input images to be of floating type (in range [0, 1]), but found type {image.dtype} instead"
+        )
+
+
 def _resize_image_and_masks(
     image: Tensor,
     self_min_size: float,
@@ -81,8 +91,28 @@ class GeneralizedRCNNTransform(nn.Module):
         - input / target resizing to match min_size / max_size
 
     It returns a ImageList for the inputs, and a List[Dict[Tensor]] for the targets
+
+    If ``compact_masks`` is True, the predicted masks are not pasted in full size images during
+    postprocessing: the ``masks`` of the predictions are the boolean masks cropped to their boxes, and
+    the regions of the images that they cover are returned as ``mask_regions``
+    (see :func:`~torchvision.models.detection.roi_heads.paste_masks_in_image_compact`).
+
+    If ``batch_buckets`` is given as a list of ``(height, width)`` batch shapes, the batches built in
+    evaluation mode are padded to the smallest bucket which fits all their images, instead of the size of
+    their largest image, and the resized images are normalized straight into the batch. Every call returns
+    a new batch, but as their shapes come from a small set, the allocator can reuse their memory. The
+    batches which fit in no bucket are built as usual.
+
+    If ``fuse_preprocessing`` is True, the images given without targets, which all have to be CPU tensors of
+    the same type, are resized, normalized and batched by a single native op, in parallel, without
+    intermediate copies. These images can then also be uint8 images, in range [0, 255], and in any memory
+    layout, e.g. ``image.permute(2, 0, 1)`` for an image in HWC layout.
     """
 
+    __annotations__ = {
+        "batch_buckets": Optional[List[Tuple[int, int]]],
+    }
+
     def __init__(
         self,
         min_size: int,
@@ -91,6 +121,9 @@ class GeneralizedRCNNTransform(nn.Module):
         image_std: List[float],
         size_divisible: int = 32,
         fixed_size: Optional[Tuple[int, int]] = None,
+        compact_masks: bool = False,
+        batch_buckets: Optional[List[Tuple[int, int]]] = None,
+        fuse_preprocessing: bool = False,
     ):
         super().__init__()
         if not isinstance(min_size, (list, tuple)):
@@ -101,6 +134,11 @@ class GeneralizedRCNNTransform(nn.Module):
         self.image_std = image_std
         self.size_divisible = size_divisible
         self.fixed_size = fixed_size
+        self.compact_masks = compact_masks
+        if batch_buckets is not None:
+            batch_buckets = sorted(((int(h), int(w)) for h, w in batch_buckets), key=lambda hw: hw[0] * hw[1])
+        self.batch_buckets = batch_buckets
+        self.fuse_preprocessing = fuse_preprocessing
 
     def forward(
         self, images: List[Tensor], targets: Optional[List[Dict[str, Tensor]]] = None
@@ -118,12 +156,15 @@ class GeneralizedRCNNTransform(nn.Module):
                     data[k] = v
                 targets_copy.append(data)
             targets = targets_copy
+        if self.fuse_preprocessing and targets is None and self._can_fuse_preprocessing(images):
+            return self._forward_fused(images)
+        if self.batch_buckets is not None and not self.training and not torchvision._is_tracing():
+            return self._forward_bucketed(images, targets)
         for i in range(len(images)):
             image = images[i]
             target_index = targets[i] if targets is not None else None
 
-            if image.dim() != 3:
-                raise ValueError(f"images is expected to be a list of 3d tensors of shape [C, H, W], got {image.shape}")
+            _check_image(image)
             image = self.normalize(image)
             image, target_index = self.resize(image, target_index)
             images[i] = image
@@ -143,6 +184,104 @@ class GeneralizedRCNNTransform(nn.Module):
         image_list = ImageList(images, image_sizes_list)
         return image_list, targets
 
+    def _forward_bucketed(
+        self, images: List[Tensor], targets: Optional[List[Dict[str, Tensor]]] = None
+    ) -> Tuple[ImageList, Optional[List[Dict[str, Tensor]]]]:
+        # Resizing and normalizing commute, so the images are normalized after having been resized,
+        # straight into the batch.
+        image_sizes_list: List[Tuple[int, int]] = []
+        for i in range(len(images)):
+            image = images[i]
+            target_index = targets[i] if targets is not None else None
+
+            _check_image(image)
+            image, target_index = self.resize(image, target_index)
+            images[i] = image
+            image_sizes_list.append((image.shape[-2], image.shape[-1]))
+            if targets is not None and target_index is not None:
+                targets[i] = target_index
+
+        bucket_shape = self._bucket_shape([list(img.shape) for img in images])
+        if bucket_shape is None:
+            images = [self.normalize(img) for img in images]
+            batched_imgs = self.batch_images(images, size_divisible=self.size_divisible)
+        else:
+            batched_imgs = torch.empty(bucket_shape, dtype=images[0].dtype, device=images[0].device)
+            for i, img in enumerate(images):
+                c, h, w = img.shape
+                dtype, device = img.dtype, img.device
+                mean = torch.as_tensor(self.image_mean, dtype=dtype, device=device)[:, None, None]
+                std = torch.as_tensor(self.image_std, dtype=dtype, device=device)[:, None, None]
+                torch.div(img - mean, std, out=batched_imgs[i, :, :h, :w])
+                batched_imgs[i, :, h:, :].zero_()
+                batched_imgs[i, :, :h, w:].zero_()
+
+        image_list = ImageList(batched_imgs, image_sizes_list)
+        return image_list, targets
+
+    def _bucket_shape(self, image_shapes: List[List[int]]) -> Optional[List[int]]:
+        """
+        Returns the shape of a batch of the smallest bucket which fits images of the given shapes, or None
+        if the images fit in no bucket.
+        """
+        batch_buckets = self.batch_buckets
+        if batch_buckets is None:
+            return None
+        max_size = self.max_by_axis(image_shapes)
+        for height, width in batch_buckets:
+            if height >= max_size[1] and width >= max_size[2]:
+                return [len(image_shapes), max_size[0], height, width]
+        return None
+
+    def _can_fuse_preprocessing(self, images: List[Tensor]) -> bool:
+        if torchvision._is_tracing() or len(images) == 0:
+            return False
+        for image in images:
+            if image.device.type != "cpu" or image.dim() != 3 or image.dtype != images[0].dtype:
+                return False
+        return images[0].dtype == torch.uint8 or images[0].is_floating_point()
+
+    def _resized_size(self, image: Tensor) -> Tuple[int, int]:
+        # same as the output size of the interpolation of _resize_image_and_masks
+        fixed_size = self.fixed_size
+        if fixed_size is not None:
+            return fixed_size[1], fixed_size[0]
+        if self.training:
+            size = float(self.torch_choice(self.min_size))
+        else:
+            size = float(self.min_size[-1])
+        im_shape = torch.tensor(image.shape[-2:])
+        min_size = torch.min(im_shape).to(dtype=torch.float32)
+        max_size = torch.max(im_shape).to(dtype=torch.float32)
+        scale = torch.min(size / min_size, float(self.max_size) / max_size).item()
+        return int(math.floor(image.shape[-2] * scale)), int(math.floor(image.shape[-1] * scale))
+
+    def _forward_fused(self, images: List[Tensor]) -> Tuple[ImageList, Optional[List[Dict[str, Tensor]]]]:
+        _assert_has_ops()
+        image_sizes_list: List[Tuple[int, int]] = []
+        sizes: List[int] = []
+        for image in images:
+            h, w = self._resized_size(image)
+            image_sizes_list.append((h, w))
+            sizes.extend([h, w])
+
+        dtype = torch.float32 if images[0].dtype == torch.uint8 else images[0].dtype
+        image_shapes = [[img.shape[0], h, w] for img, (h, w) in zip(images, image_sizes_list)]
+        batch_shape: Optional[List[int]] = None
+        if not self.training:
+            batch_shape = self._bucket_shape(image_shapes)
+        if batch_shape is None:
+            max_size = self.max_by_axis(image_shapes)
+            stride = float(self.size_divisible)
+            max_size[1] = int(math.ceil(float(max_size[1]) / stride) * stride)
+            max_size[2] = int(math.ceil(float(max_size[2]) / stride) * stride)
+            batch_shape = [len(images)] + max_size
+        batched_imgs = torch.empty(batch_shape, dtype=dtype, device=images[0].device)
+
+        torch.ops.torchvision._resize_normalize_pad(images, sizes, self.image_mean, self.image_std, batched_imgs)
+        image_list = ImageList(batched_imgs, image_sizes_list)
+        return image_list, None
+
     def normalize(self, image: Tensor) -> Tensor:
         if not image.is_floating_point():
             raise TypeError(
@@ -254,7 +393,11 @@ class GeneralizedRCNNTransform(nn.Module):
             result[i]["boxes"] = boxes
             if "masks" in pred:
                 masks = pred["masks"]
-                masks = paste_masks_in_image(masks, boxes, o_im_s)
+                if self.compact_masks:
+                    masks, regions = paste_masks_in_image_compact(masks, boxes, o_im_s)
+                    result[i]["mask_regions"] = regions
+                else:
+                    masks = paste_masks_in_image(masks, boxes, o_im_s)
                 result[i]["masks"] = masks
             if "keypoints" in pred:
                 keypoints = pred["keypoints"]
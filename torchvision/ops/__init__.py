@@ -2,10 +2,14 @@ from ._register_onnx_ops import _register_custom_op
 from .boxes import (
     nms,
     batched_nms,
+    batched_soft_nms,
+    batched_matrix_nms,
     remove_small_boxes,
     clip_boxes_to_image,
     box_area,
     box_iou,
+    box_iou_max,
+    box_iou_pairs,
     generalized_box_iou,
     masks_to_boxes,
 )
@@ -32,11 +36,15 @@ __all__ = [
     "DeformConv2d",
     "nms",
     "batched_nms",
+    "batched_soft_nms",
+    "batched_matrix_nms",
     "remove_small_boxes",
     "clip_boxes_to_image",
     "box_convert",
     "box_area",
     "box_iou",
+    "box_iou_max",
+    "box_iou_pairs",
     "generalized_box_iou",
     "roi_align",
     "RoIAlign",
@@ -1,4 +1,4 @@
-from typing import Tuple
+from typing import List, Optional, Tuple
 
 import torch
 import torchvision
@@ -45,6 +45,8 @@ def batched_nms(
     scores: Tensor,
     idxs: Tensor,
     iou_threshold: float,
+    image_offsets: Optional[Tensor] = None,
+    max_output: Optional[int] = None,
 ) -> Tensor:
     """
     Performs non-maximum suppression in a batched fashion.
@@ -52,6 +54,11 @@ def batched_nms(
     Each index value correspond to a category, and NMS
     will not be applied between elements of different categories.
 
+    The boxes of several images can be processed in a single call by concatenating them and passing
+    ``image_offsets``, in which case NMS is not applied between elements of different images either.
+    On CPU, all images and categories are handled by a single native call, which processes the images
+    in parallel.
+
     Args:
         boxes (Tensor[N, 4]): boxes where NMS will be performed. They
             are expected to be in ``(x1, y1, x2, y2)`` format with ``0 <= x1 < x2`` and
@@ -59,13 +66,44 @@ def batched_nms(
         scores (Tensor[N]): scores for each one of the boxes
         idxs (Tensor[N]): indices of the categories for each one of the boxes.
         iou_threshold (float): discards all overlapping boxes with IoU > iou_threshold
+        image_offsets (Tensor[B + 1], optional): boundaries of the images in ``boxes``: the boxes of
+            the i-th image are ``boxes[image_offsets[i]:image_offsets[i + 1]]``. Default: a single image.
+        max_output (int, optional): maximum number of elements kept per image. The suppression stops as
+            soon as this many elements are kept, which is much faster than truncating the output when
+            only the top scoring detections are used. ``-1`` also means no limit. Default: no limit.
 
     Returns:
         Tensor: int64 tensor with the indices of the elements that have been kept by NMS, sorted
-        in decreasing order of scores
+        in decreasing order of scores within each image, and by image
     """
     if not torch.jit.is_scripting() and not torch.jit.is_tracing():
         _log_api_usage_once(batched_nms)
+    if max_output is not None:
+        if max_output < -1:
+            raise ValueError(f"max_output should be -1 or non-negative, got {max_output}")
+        if max_output == -1:
+            max_output = None
+    if boxes.numel() == 0:
+        return torch.empty((0,), dtype=torch.int64, device=boxes.device)
+    if boxes.device.type == "cpu" and not boxes.is_quantized and not torchvision._is_tracing():
+        _assert_has_ops()
+        if image_offsets is None:
+            image_offsets = torch.tensor([0, boxes.shape[0]])
+        return torch.ops.torchvision.batched_nms(
+            boxes, scores, idxs, image_offsets, iou_threshold, -1 if max_output is None else max_output
+        )
+
+    if image_offsets is None:
+        keep = _batched_nms(boxes, scores, idxs, iou_threshold)
+        return keep if max_output is None else keep[:max_output]
+
+    # suppress per image and category by giving each (image, category) pair its own index
+    image_idxs = _image_idxs(image_offsets, boxes.device)
+    keep = _batched_nms(boxes, scores, image_idxs * (idxs.max() + 1) + idxs, iou_threshold)
+    return _group_by_image(keep, image_idxs, image_offsets.numel() - 1, max_output)
+
+
+def _batched_nms(boxes: Tensor, scores: Tensor, idxs: Tensor, iou_threshold: float) -> Tensor:
     # Benchmarks that drove the following thresholds are at
     # https://github.com/pytorch/vision/issues/1311#issuecomment-781329339
     if boxes.numel() > (4000 if boxes.device.type == "cpu" else 20000) and not torchvision._is_tracing():
@@ -74,6 +112,180 @@ def batched_nms(
         return _batched_nms_coordinate_trick(boxes, scores, idxs, iou_threshold)
 
 
+def _image_idxs(image_offsets: Tensor, device: torch.device) -> Tensor:
+    image_offsets = image_offsets.to(device=device, dtype=torch.int64)
+    return torch.repeat_interleave(
+        torch.arange(image_offsets.numel() - 1, device=device), image_offsets[1:] - image_offsets[:-1]
+    )
+
+
+def _group_by_image(keep: Tensor, image_idxs: Tensor, num_images: int, max_output: Optional[int]) -> Tensor:
+    # stable sort, so that the elements of each image remain sorted by decreasing score
+    keep_image_idxs, order = image_idxs[keep].sort(stable=True)
+    keep = keep[order]
+    if max_output is None:
+        return keep
+    counts = torch.bincount(keep_image_idxs, minlength=num_images)
+    starts = counts.cumsum(0) - counts
+    rank = torch.arange(keep.numel(), device=keep.device) - starts[keep_image_idxs]
+    return keep[rank < max_output]
+
+
+def batched_soft_nms(
+    boxes: Tensor,
+    scores: Tensor,
+    idxs: Tensor,
+    iou_threshold: float,
+    image_offsets: Optional[Tensor] = None,
+    max_output: Optional[int] = None,
+    method: str = "gaussian",
+    sigma: float = 0.5,
+    score_threshold: float = 0.001,
+) -> Tuple[Tensor, Tensor]:
+    """
+    Performs Soft-NMS, as described in `Soft-NMS -- Improving Object Detection With One Line of Code
+    <https://arxiv.org/abs/1704.04503>`_, in a batched fashion.
+
+    Instead of discarding the boxes overlapping a higher scoring box, Soft-NMS decays their score
+    according to the overlap, and discards the boxes whose score falls below ``score_threshold``.
+    Like for :func:`batched_nms`, the boxes of different categories or images don't affect each other.
+
+    The operator runs on CPU, the inputs on other devices are moved to CPU for it.
+
+    Args:
+        boxes (Tensor[N, 4]): boxes where NMS will be performed. They
+            are expected to be in ``(x1, y1, x2, y2)`` format with ``0 <= x1 < x2`` and
+            ``0 <= y1 < y2``.
+        scores (Tensor[N]): scores for each one of the boxes
+        idxs (Tensor[N]): indices of the categories for each one of the boxes.
+        iou_threshold (float): the linear method decays the scores of the boxes with IoU > iou_threshold.
+            It is not used by the gaussian method.
+        image_offsets (Tensor[B + 1], optional): boundaries of the images in ``boxes``, see
+            :func:`batched_nms`. Default: a single image.
+        max_output (int, optional): maximum number of elements kept per image. Default: no limit.
+        method (str): ``"linear"`` to multiply the scores by ``1 - IoU``, or ``"gaussian"`` to multiply
+            them by ``exp(-IoU ** 2 / sigma)``. Default: ``"gaussian"``.
+        sigma (float): parameter of the gaussian method. Default: 0.5.
+        score_threshold (float): discards the elements whose decayed score is lower. Default: 0.001.
+
+    Returns:
+        Tuple[Tensor, Tensor]: int64 tensor with the indices of the elements that have been kept,
+        and their decayed scores, sorted in decreasing order of decayed scores within each image,
+        and by image
+    """
+    if not torch.jit.is_scripting() and not torch.jit.is_tracing():
+        _log_api_usage_once(batched_soft_nms)
+    _assert_has_ops()
+    if method not in ("linear", "gaussian"):
+        raise ValueError(f"method should be either 'linear' or 'gaussian', got {method}")
+    if image_offsets is None:
+        image_offsets = torch.tensor([0, boxes.shape[0]])
+    keep, new_scores = torch.ops.torchvision.soft_nms(
+        boxes.cpu(),
+        scores.cpu(),
+        idxs.cpu(),
+        image_offsets.cpu(),
+        iou_threshold,
+        sigma,
+        score_threshold,
+        0 if method == "linear" else 1,
+        -1 if max_output is None else max_output,
+    )
+    return keep.to(boxes.device), new_scores.to(scores.device)
+
+
+def batched_matrix_nms(
+    boxes: Tensor,
+    scores: Tensor,
+    idxs: Tensor,
+    score_threshold: float,
+    image_offsets: Optional[Tensor] = None,
+    max_output: Optional[int] = None,
+    kernel: str = "gaussian",
+    sigma: float = 2.0,
+) -> Tuple[Tensor, Tensor]:
+    """
+    Performs Matrix NMS, as described in `SOLOv2: Dynamic and Fast Instance Segmentation
+    <https://arxiv.org/abs/2003.10152>`_, in a batched fashion.
+
+    Like Soft-NMS, Matrix NMS decays the scores of the boxes overlapping a higher scoring box instead
+    of discarding them. The decay of a box only depends on its IoU with the higher scoring boxes,
+    and on how much these are likely to be suppressed themselves, so all the boxes are processed in
+    parallel instead of sequentially. Like for :func:`batched_nms`, the boxes of different categories or
+    images don't affect each other.
+
+    Args:
+        boxes (Tensor[N, 4]): boxes where NMS will be performed. They
+            are expected to be in ``(x1, y1, x2, y2)`` format with ``0 <= x1 < x2`` and
+            ``0 <= y1 < y2``.
+        scores (Tensor[N]): scores for each one of the boxes
+        idxs (Tensor[N]): indices of the categories for each one of the boxes.
+        score_threshold (float): discards the elements whose decayed score is lower
+        image_offsets (Tensor[B + 1], optional): boundaries of the images in ``boxes``, see
+            :func:`batched_nms`. Default: a single image.
+        max_output (int, optional): maximum number of elements kept per image. Default: no limit.
+        kernel (str): decay function, ``"linear"`` or ``"gaussian"``. Default: ``"gaussian"``.
+        sigma (float): parameter of the gaussian kernel. Default: 2.0.
+
+    Returns:
+        Tuple[Tensor, Tensor]: int64 tensor with the indices of the elements that have been kept,
+        and their decayed scores, sorted in decreasing order of decayed scores within each image,
+        and by image
+    """
+    if not torch.jit.is_scripting() and not torch.jit.is_tracing():
+        _log_api_usage_once(batched_matrix_nms)
+    if kernel not in ("linear", "gaussian"):
+        raise ValueError(f"kernel should be either 'linear' or 'gaussian', got {kernel}")
+    if image_offsets is None:
+        image_offsets = torch.tensor([0, boxes.shape[0]])
+    if boxes.device.type == "cpu" and not torchvision._is_tracing():
+        _assert_has_ops()
+        return torch.ops.torchvision.matrix_nms(
+            boxes,
+            scores,
+            idxs,
+            image_offsets,
+            sigma,
+            score_threshold,
+            0 if kernel == "linear" else 1,
+            -1 if max_output is None else max_output,
+        )
+
+    offsets: List[int] = image_offsets.tolist()
+    all_keep = []
+    all_scores = []
+    for start, end in zip(offsets[:-1], offsets[1:]):
+        keep, new_scores = _matrix_nms_single_image(
+            boxes[start:end], scores[start:end], idxs[start:end], score_threshold, kernel, sigma
+        )
+        if max_output is not None:
+            keep, new_scores = keep[:max_output], new_scores[:max_output]
+        all_keep.append(start + keep)
+        all_scores.append(new_scores)
+    return torch.cat(all_keep), torch.cat(all_scores)
+
+
+def _matrix_nms_single_image(
+    boxes: Tensor, scores: Tensor, idxs: Tensor, score_threshold: float, kernel: str, sigma: float
+) -> Tuple[Tensor, Tensor]:
+    if boxes.numel() == 0:
+        return torch.empty((0,), dtype=torch.int64, device=boxes.device), scores
+    scores, order = scores.sort(descending=True, stable=True)
+    boxes, idxs = boxes[order], idxs[order]
+    # IoU of every box (column) with the boxes of the same category and a higher score (rows)
+    iou = box_iou(boxes, boxes).triu(diagonal=1) * (idxs[:, None] == idxs[None, :])
+    max_iou = iou.max(dim=0).values[:, None]
+    if kernel == "gaussian":
+        decay = torch.exp(-sigma * (iou ** 2 - max_iou ** 2))
+    else:
+        # duplicated boxes have a max_iou of 1
+        decay = (1 - iou) / (1 - max_iou).clamp(min=torch.finfo(iou.dtype).eps)
+    decay = decay.min(dim=0).values.clamp(max=1)
+    new_scores, new_order = (scores * decay).sort(descending=True, stable=True)
+    keep = new_scores >= score_threshold
+    return order[new_order[keep]], new_scores[keep]
+
+
 @torch.jit._script_if_tracing
 def _batched_nms_coordinate_trick(
     boxes: Tensor,
@@ -298,6 +510,11 @@ def generalized_box_iou(boxes1: Tensor, boxes2: Tensor) -> Tensor:
     """
     if not torch.jit.is_scripting() and not torch.jit.is_tracing():
         _log_api_usage_once(generalized_box_iou)
+    _check_generalized_box_iou_inputs(boxes1, boxes2)
+    return _pairwise_box_iou(boxes1, boxes2, True)
+
+
+def _check_generalized_box_iou_inputs(boxes1: Tensor, boxes2: Tensor) -> None:
     # degenerate boxes gives inf / nan results
     # so do an early check
     if (boxes1[:, 2:] < boxes1[:, :2]).any():
@@ -305,8 +522,12 @@ def generalized_box_iou(boxes1: Tensor, boxes2: Tensor) -> Tensor:
     if not (boxes2[:, 2:] >= boxes2[:, :2]).all():
         raise ValueError("Some of the input boxes2 are invalid.")
 
+
+def _pairwise_box_iou(boxes1: Tensor, boxes2: Tensor, generalized: bool) -> Tensor:
     inter, union = _box_inter_union(boxes1, boxes2)
     iou = inter / union
+    if not generalized:
+        return iou
 
     lti = torch.min(boxes1[:, None, :2], boxes2[:, :2])
     rbi = torch.max(boxes1[:, None, 2:], boxes2[:, 2:])
@@ -317,6 +538,103 @@ def generalized_box_iou(boxes1: Tensor, boxes2: Tensor) -> Tensor:
     return iou - (areai - union) / areai
 
 
+# maximum number of IoU values computed at once by the reductions below when they are not
+# computed by the native ops
+_BOX_IOU_TILE_SIZE = 1 << 20
+
+
+def _use_native_box_iou(boxes1: Tensor, boxes2: Tensor) -> bool:
+    return (
+        boxes1.device.type == "cpu"
+        and boxes1.dtype in (torch.float32, torch.float64)
+        and boxes2.dtype == boxes1.dtype
+        and not torchvision._is_tracing()
+    )
+
+
+def box_iou_max(boxes1: Tensor, boxes2: Tensor, generalized: bool = False) -> Tuple[Tensor, Tensor]:
+    """
+    Return, for every box of ``boxes1``, the largest intersection-over-union with a box of ``boxes2``
+    and the index of that box. This is the same as ``box_iou(boxes1, boxes2).max(dim=1)``, without
+    materializing the NxM matrix: the IoU values are reduced as they are computed, in parallel on CPU
+    and in bounded tiles on other devices.
+
+    Both sets of boxes are expected to be in ``(x1, y1, x2, y2)`` format with
+    ``0 <= x1 < x2`` and ``0 <= y1 < y2``.
+
+    Args:
+        boxes1 (Tensor[N, 4]): first set of boxes
+        boxes2 (Tensor[M, 4]): second set of boxes, which should not be empty
+        generalized (bool): use the generalized IoU (see :func:`generalized_box_iou`) instead of the IoU.
+            Default: False
+
+    Returns:
+        Tuple[Tensor[N], Tensor[N]]: the largest IoU value of every box of ``boxes1``, and the int64 index
+        in ``boxes2`` of the first box with that value
+    """
+    if not torch.jit.is_scripting() and not torch.jit.is_tracing():
+        _log_api_usage_once(box_iou_max)
+    if boxes2.shape[0] == 0:
+        raise ValueError("boxes2 should contain at least one box.")
+    if generalized:
+        _check_generalized_box_iou_inputs(boxes1, boxes2)
+    if _use_native_box_iou(boxes1, boxes2):
+        _assert_has_ops()
+        return torch.ops.torchvision.box_iou_max(boxes1, boxes2, generalized)
+
+    rows_per_tile = max(_BOX_IOU_TILE_SIZE // boxes2.shape[0], 1)
+    values = [_pairwise_box_iou(boxes1[:0], boxes2[:0], generalized).flatten()]
+    indices = [torch.zeros((0,), dtype=torch.int64, device=boxes1.device)]
+    for start in range(0, boxes1.shape[0], rows_per_tile):
+        iou = _pairwise_box_iou(boxes1[start : start + rows_per_tile], boxes2, generalized)
+        tile_values, tile_indices = iou.max(dim=1)
+        values.append(tile_values)
+        indices.append(tile_indices)
+    return torch.cat(values), torch.cat(indices)
+
+
+def box_iou_pairs(boxes1: Tensor, boxes2: Tensor, threshold: float, generalized: bool = False) -> Tuple[Tensor, Tensor]:
+    """
+    Return the pairs of boxes of ``boxes1`` and ``boxes2`` whose intersection-over-union is greater than
+    or equal to ``threshold``. This is the same as ``torch.where(box_iou(boxes1, boxes2) >= threshold)``,
+    without materializing the NxM matrix: only the selected pairs are stored, so the memory used grows
+    with the number of matching pairs rather than with N * M. The IoU values are computed in parallel on
+    CPU and in bounded tiles on other devices.
+
+    Both sets of boxes are expected to be in ``(x1, y1, x2, y2)`` format with
+    ``0 <= x1 < x2`` and ``0 <= y1 < y2``.
+
+    Args:
+        boxes1 (Tensor[N, 4]): first set of boxes
+        boxes2 (Tensor[M, 4]): second set of boxes
+        threshold (float): minimum IoU value of the returned pairs
+        generalized (bool): use the generalized IoU (see :func:`generalized_box_iou`) instead of the IoU.
+            Default: False
+
+    Returns:
+        Tuple[Tensor[K, 2], Tensor[K]]: the int64 ``(i, j)`` indices in ``boxes1`` and ``boxes2`` of the
+        selected pairs, sorted by ``i`` and then ``j``, and their IoU values
+    """
+    if not torch.jit.is_scripting() and not torch.jit.is_tracing():
+        _log_api_usage_once(box_iou_pairs)
+    if generalized:
+        _check_generalized_box_iou_inputs(boxes1, boxes2)
+    if _use_native_box_iou(boxes1, boxes2):
+        _assert_has_ops()
+        return torch.ops.torchvision.box_iou_pairs(boxes1, boxes2, threshold, generalized)
+
+    rows_per_tile = max(_BOX_IOU_TILE_SIZE // max(boxes2.shape[0], 1), 1)
+    pairs = [torch.zeros((0, 2), dtype=torch.int64, device=boxes1.device)]
+    values = [_pairwise_box_iou(boxes1[:0], boxes2[:0], generalized).flatten()]
+    for start in range(0, boxes1.shape[0], rows_per_tile):
+        iou = _pairwise_box_iou(boxes1[start : start + rows_per_tile], boxes2, generalized)
+        tile_pairs = torch.nonzero(iou >= threshold)
+        values.append(iou[tile_pairs[:, 0], tile_pairs[:, 1]])
+        tile_pairs[:, 0] += start
+        pairs.append(tile_pairs)
+    return torch.cat(pairs), torch.cat(values)
+
+
 def masks_to_boxes(masks: torch.Tensor) -> torch.Tensor:
     """
     Compute the bounding boxes around the provided masks.
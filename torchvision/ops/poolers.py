@@ -5,6 +5,7 @@ import torch
 import torch.fx
 import torchvision
 from torch import nn, Tensor
+from torchvision.extension import _assert_has_ops
 from torchvision.ops.boxes import box_area
 
 from ..utils import _log_api_usage_once
@@ -144,6 +145,18 @@ def _filter_input(x: Dict[str, Tensor], featmap_names: List[str]) -> List[Tensor
     return x_filtered
 
 
+def _can_use_multi_level_roi_align(x_filtered: List[Tensor], rois: Tensor) -> bool:
+    # the native op only has a CPU forward, so the levels are pooled one by one when a gradient is needed
+    if torchvision._is_tracing() or rois.device.type != "cpu":
+        return False
+    for feature in x_filtered:
+        if feature.device.type != "cpu" or feature.dtype != rois.dtype or feature.is_quantized:
+            return False
+        if torch.is_grad_enabled() and feature.requires_grad:
+            return False
+    return not (torch.is_grad_enabled() and rois.requires_grad)
+
+
 @torch.fx.wrap
 def _multiscale_roi_align(
     x_filtered: List[Tensor],
@@ -183,6 +196,14 @@ def _multiscale_roi_align(
 
     levels = mapper(boxes)
 
+    if _can_use_multi_level_roi_align(x_filtered, rois):
+        # all the levels are pooled by a single parallel native call, which writes every roi
+        # directly at its place in the result
+        _assert_has_ops()
+        return torch.ops.torchvision.multi_level_roi_align(
+            x_filtered, rois, levels, scales, output_size[0], output_size[1], sampling_ratio, False
+        )
+
     num_rois = len(rois)
     num_channels = x_filtered[0].shape[1]
 
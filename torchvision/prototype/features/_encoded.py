@@ -32,6 +32,7 @@ class EncodedData(_Feature):
 
     @classmethod
     def from_path(cls: Type[D], path: Union[str, os.PathLike], **kwargs: Any) -> D:
+        # The data is memory-mapped rather than read, see fromfile() for details. The mapping outlives the file object.
         with open(path, "rb") as file:
             return cls.from_file(file, **kwargs)
 
@@ -1,23 +1,105 @@
-from typing import Any, Optional, List
+import functools
+from typing import Any, Optional, List, Sequence, Tuple
 
 import torch
+from torchvision.prototype import features
+from torchvision.prototype.utils._internal import apply_recursively
+from torchvision.transforms.functional import _compose_homographies
 
+from ._geometry import _apply_homography
 from ._transform import Transform
+from ._utils import query_image, get_image_dimensions, has_any
+from .functional import InterpolationMode
 
 
 class Compose(Transform):
-    def __init__(self, *transforms: Transform) -> None:
+    def __init__(self, *transforms: Transform, fuse_geometric: bool = False) -> None:
         super().__init__()
         self.transforms = transforms
         for idx, transform in enumerate(transforms):
             self.add_module(str(idx), transform)
+        # Same as in torchvision.transforms.Compose: consecutive geometric transforms are folded into a single
+        # projective transform, and the images are resampled once
+        self.fuse_geometric = fuse_geometric
 
     def forward(self, *inputs: Any) -> Any:
         sample = inputs if len(inputs) > 1 else inputs[0]
+        if self.fuse_geometric and not has_any(sample, features.BoundingBox, features.SegmentationMask):
+            try:
+                query_image(sample)
+            except TypeError:
+                pass
+            else:
+                return self._fused_forward(sample)
+
         for transform in self.transforms:
             sample = transform(sample)
         return sample
 
+    def _fused_forward(self, sample: Any) -> Any:
+        group: List[Transform] = []
+        group_key: Tuple[Any, ...] = (None, None)
+        for transform in self.transforms:
+            key = self._get_fusion_key(transform, sample)
+            if key is not None:
+                merged_key = self._merge_fusion_keys(group_key, key)
+                if merged_key is not None:
+                    group.append(transform)
+                    group_key = merged_key
+                    continue
+
+            sample = self._apply_fused(sample, group, group_key)
+            if key is None:
+                sample = transform(sample)
+                group, group_key = [], (None, None)
+            else:
+                group, group_key = [transform], key
+        return self._apply_fused(sample, group, group_key)
+
+    @staticmethod
+    def _get_fusion_key(transform: Transform, sample: Any) -> Optional[Tuple[Any, ...]]:
+        # subclasses overriding forward or _transform are run as they are
+        owner = next((cls for cls in type(transform).__mro__ if "_fusion_key" in vars(cls)), None)
+        if owner is None or any(
+            getattr(type(transform), name) is not getattr(owner, name) for name in ("forward", "_transform")
+        ):
+            return None
+        return transform._fusion_key(query_image(sample))  # type: ignore[operator]
+
+    @staticmethod
+    def _merge_fusion_keys(first: Sequence[Any], second: Sequence[Any]) -> Optional[Tuple[Any, ...]]:
+        merged = []
+        for a, b in zip(first, second):
+            if a is not None and b is not None and a != b:
+                return None
+            merged.append(a if a is not None else b)
+        return tuple(merged)
+
+    @staticmethod
+    def _apply_fused(sample: Any, transforms: List[Transform], key: Tuple[Any, ...]) -> Any:
+        if len(transforms) < 2:
+            for transform in transforms:
+                sample = transform(sample)
+            return sample
+
+        _, height, width = get_image_dimensions(query_image(sample))
+        size = [height, width]
+        matrix = [1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0]
+        for transform in transforms:
+            step, size = transform._get_homography(size[0], size[1])  # type: ignore[operator]
+            matrix = _compose_homographies(matrix, step)
+
+        if size == [height, width] and matrix == [1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0]:
+            return sample
+
+        interpolation, fill = key
+        if interpolation is None:
+            interpolation = InterpolationMode.NEAREST
+        return apply_recursively(
+            functools.partial(_apply_homography, matrix=matrix, size=size, interpolation=interpolation, fill=fill),
+            sample,
+        )
+
 
 class RandomApply(Transform):
     def __init__(self, transform: Transform, *, p: float = 0.5) -> None:
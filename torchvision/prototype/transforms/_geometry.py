@@ -1,14 +1,25 @@
 import collections.abc
-import math
 import warnings
-from typing import Any, Dict, List, Union, Sequence, Tuple, cast
+from typing import Any, Dict, List, Optional, Union, Sequence, Tuple, cast
 
 import PIL.Image
 import torch
 from torchvision.prototype import features
 from torchvision.prototype.transforms import Transform, InterpolationMode, functional as F
-from torchvision.transforms.functional import pil_to_tensor
-from torchvision.transforms.transforms import _setup_size, _interpolation_modes_from_int
+from torchvision.transforms.functional import (
+    pil_to_tensor,
+    _compute_resized_output_size,
+    _get_center_crop_homography,
+    _get_crop_resize_homography,
+    _get_flip_homography,
+)
+from torchvision.transforms.transforms import (
+    _setup_size,
+    _interpolation_modes_from_int,
+    _get_fusion_fill,
+    _get_resized_crop_params,
+    _FUSED_INTERPOLATION_MODES,
+)
 
 from ._utils import query_image, get_image_dimensions, has_any, is_simple_tensor
 
@@ -42,6 +53,14 @@ class RandomHorizontalFlip(Transform):
         else:
             return input
 
+    def _fusion_key(self, image: Any) -> Optional[Tuple[Optional[InterpolationMode], Optional[List[float]]]]:
+        return None, None
+
+    def _get_homography(self, height: int, width: int) -> Tuple[List[float], List[int]]:
+        if torch.rand(1) >= self.p:
+            return [1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0], [height, width]
+        return _get_flip_homography(height, width, horizontal=True), [height, width]
+
 
 class Resize(Transform):
     def __init__(
@@ -70,6 +89,15 @@ class Resize(Transform):
         else:
             return input
 
+    def _fusion_key(self, image: Any) -> Optional[Tuple[Optional[InterpolationMode], Optional[List[float]]]]:
+        if self.interpolation not in _FUSED_INTERPOLATION_MODES:
+            return None
+        return self.interpolation, None
+
+    def _get_homography(self, height: int, width: int) -> Tuple[List[float], List[int]]:
+        new_size = _compute_resized_output_size([height, width], self.size)
+        return _get_crop_resize_homography(0, 0, height, width, new_size), new_size
+
 
 class CenterCrop(Transform):
     def __init__(self, output_size: List[int]):
@@ -87,6 +115,17 @@ class CenterCrop(Transform):
         else:
             return input
 
+    def _fusion_key(self, image: Any) -> Optional[Tuple[Optional[InterpolationMode], Optional[List[float]]]]:
+        # images smaller than the crop are padded with 0
+        channels, _, _ = get_image_dimensions(image)
+        return None, [0.0] * channels
+
+    def _get_homography(self, height: int, width: int) -> Tuple[List[float], List[int]]:
+        crop_height, crop_width = _setup_size(
+            self.output_size, error_msg="Please provide only two dimensions (h, w) for size."
+        )
+        return _get_center_crop_homography(height, width, crop_height, crop_width), [crop_height, crop_width]
+
     def forward(self, *inputs: Any) -> Any:
         sample = inputs if len(inputs) > 1 else inputs[0]
         if has_any(sample, features.BoundingBox, features.SegmentationMask):
@@ -130,40 +169,7 @@ class RandomResizedCrop(Transform):
     def _get_params(self, sample: Any) -> Dict[str, Any]:
         image = query_image(sample)
         _, height, width = get_image_dimensions(image)
-        area = height * width
-
-        log_ratio = torch.log(torch.tensor(self.ratio))
-        for _ in range(10):
-            target_area = area * torch.empty(1).uniform_(self.scale[0], self.scale[1]).item()
-            aspect_ratio = torch.exp(
-                torch.empty(1).uniform_(
-                    log_ratio[0],  # type: ignore[arg-type]
-                    log_ratio[1],  # type: ignore[arg-type]
-                )
-            ).item()
-
-            w = int(round(math.sqrt(target_area * aspect_ratio)))
-            h = int(round(math.sqrt(target_area / aspect_ratio)))
-
-            if 0 < w <= width and 0 < h <= height:
-                i = torch.randint(0, height - h + 1, size=(1,)).item()
-                j = torch.randint(0, width - w + 1, size=(1,)).item()
-                break
-        else:
-            # Fallback to central crop
-            in_ratio = float(width) / float(height)
-            if in_ratio < min(self.ratio):
-                w = width
-                h = int(round(w / min(self.ratio)))
-            elif in_ratio > max(self.ratio):
-                h = height
-                w = int(round(h * max(self.ratio)))
-            else:  # whole image
-                w = width
-                h = height
-            i = (height - h) // 2
-            j = (width - w) // 2
-
+        i, j, h, w = _get_resized_crop_params(height, width, list(self.scale), list(self.ratio))
         return dict(top=i, left=j, height=h, width=w)
 
     def _transform(self, input: Any, params: Dict[str, Any]) -> Any:
@@ -179,6 +185,16 @@ class RandomResizedCrop(Transform):
         else:
             return input
 
+    def _fusion_key(self, image: Any) -> Optional[Tuple[Optional[InterpolationMode], Optional[List[float]]]]:
+        if self.interpolation not in _FUSED_INTERPOLATION_MODES:
+            return None
+        return self.interpolation, None
+
+    def _get_homography(self, height: int, width: int) -> Tuple[List[float], List[int]]:
+        i, j, h, w = _get_resized_crop_params(height, width, list(self.scale), list(self.ratio))
+        size = list(_setup_size(self.size, error_msg="Please provide only two dimensions (h, w) for size."))
+        return _get_crop_resize_homography(i, j, h, w, size), size
+
     def forward(self, *inputs: Any) -> Any:
         sample = inputs if len(inputs) > 1 else inputs[0]
         if has_any(sample, features.BoundingBox, features.SegmentationMask):
@@ -291,7 +307,15 @@ class RandomZoomOut(Transform):
     def _get_params(self, sample: Any) -> Dict[str, Any]:
         image = query_image(sample)
         orig_c, orig_h, orig_w = get_image_dimensions(image)
+        padding = self._get_padding(orig_h, orig_w)
+
+        fill = self.fill
+        if not isinstance(fill, collections.abc.Sequence):
+            fill = [fill] * orig_c
+
+        return dict(padding=padding, fill=fill)
 
+    def _get_padding(self, orig_h: int, orig_w: int) -> List[int]:
         r = self.side_range[0] + torch.rand(1) * (self.side_range[1] - self.side_range[0])
         canvas_width = int(orig_w * r)
         canvas_height = int(orig_h * r)
@@ -301,13 +325,7 @@ class RandomZoomOut(Transform):
         top = int((canvas_height - orig_h) * r[1])
         right = canvas_width - (left + orig_w)
         bottom = canvas_height - (top + orig_h)
-        padding = [left, top, right, bottom]
-
-        fill = self.fill
-        if not isinstance(fill, collections.abc.Sequence):
-            fill = [fill] * orig_c
-
-        return dict(padding=padding, fill=fill)
+        return [left, top, right, bottom]
 
     def _transform(self, input: Any, params: Dict[str, Any]) -> Any:
         if isinstance(input, features.Image) or is_simple_tensor(input):
@@ -355,3 +373,33 @@ class RandomZoomOut(Transform):
             return sample
 
         return super().forward(sample)
+
+    def _fusion_key(self, image: Any) -> Optional[Tuple[Optional[InterpolationMode], Optional[List[float]]]]:
+        channels, _, _ = get_image_dimensions(image)
+        return None, _get_fusion_fill(self.fill, channels)
+
+    def _get_homography(self, height: int, width: int) -> Tuple[List[float], List[int]]:
+        if torch.rand(1) >= self.p:
+            return [1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0], [height, width]
+        left, top, right, bottom = self._get_padding(height, width)
+        canvas_height, canvas_width = height + top + bottom, width + left + right
+        matrix = _get_crop_resize_homography(-top, -left, canvas_height, canvas_width, [canvas_height, canvas_width])
+        return matrix, [canvas_height, canvas_width]
+
+
+def _apply_homography(
+    input: Any,
+    matrix: List[float],
+    size: List[int],
+    interpolation: InterpolationMode,
+    fill: Optional[List[float]],
+) -> Any:
+    if isinstance(input, features.Image):
+        output = F.homography_image_tensor(input, matrix, size, interpolation=interpolation, fill=fill)
+        return features.Image.new_like(input, output)
+    elif is_simple_tensor(input):
+        return F.homography_image_tensor(input, matrix, size, interpolation=interpolation, fill=fill)
+    elif isinstance(input, PIL.Image.Image):
+        return F.homography_image_pil(input, matrix, size, interpolation=interpolation, fill=fill)
+    else:
+        return input
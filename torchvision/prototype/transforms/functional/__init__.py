@@ -61,6 +61,8 @@ from ._geometry import (
     crop_image_pil,
     perspective_image_tensor,
     perspective_image_pil,
+    homography_image_tensor,
+    homography_image_pil,
     vertical_flip_image_tensor,
     vertical_flip_image_pil,
     five_crop_image_tensor,
@@ -41,6 +41,7 @@ def resize_image_tensor(
     interpolation: InterpolationMode = InterpolationMode.BILINEAR,
     max_size: Optional[int] = None,
     antialias: Optional[bool] = None,
+    native_uint8: bool = False,
 ) -> torch.Tensor:
     new_height, new_width = size
     num_channels, old_height, old_width = get_dimensions_image_tensor(image)
@@ -51,6 +52,7 @@ def resize_image_tensor(
         interpolation=interpolation.value,
         max_size=max_size,
         antialias=antialias,
+        native_uint8=native_uint8,
     ).reshape(batch_shape + (num_channels, new_height, new_width))
 
 
@@ -307,6 +309,26 @@ def perspective_image_pil(
     return _FP.perspective(img, perspective_coeffs, interpolation=pil_modes_mapping[interpolation], fill=fill)
 
 
+def homography_image_tensor(
+    img: torch.Tensor,
+    matrix: List[float],
+    output_size: List[int],
+    interpolation: InterpolationMode = InterpolationMode.BILINEAR,
+    fill: Optional[List[float]] = None,
+) -> torch.Tensor:
+    return _FT.homography(img, matrix, output_size, interpolation=interpolation.value, fill=fill)
+
+
+def homography_image_pil(
+    img: PIL.Image.Image,
+    matrix: List[float],
+    output_size: List[int],
+    interpolation: InterpolationMode = InterpolationMode.BILINEAR,
+    fill: Optional[List[float]] = None,
+) -> PIL.Image.Image:
+    return _FP.homography(img, matrix, output_size, interpolation=pil_modes_mapping[interpolation], fill=fill)
+
+
 def _center_crop_parse_output_size(output_size: List[int]) -> List[int]:
     if isinstance(output_size, numbers.Number):
         return [int(output_size), int(output_size)]
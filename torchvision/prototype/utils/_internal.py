@@ -196,6 +196,16 @@ def _read_mutable_buffer_fallback(file: BinaryIO, count: int, item_size: int) ->
     return bytearray(file.read(-1 if count == -1 else count * item_size))
 
 
+def _mmap(file: BinaryIO) -> mmap.mmap:
+    try:
+        # If the file was opened for updating, i.e. 'r+b' or 'w+b', the mapping is shared with the file.
+        return mmap.mmap(file.fileno(), 0)
+    except PermissionError:
+        # Otherwise, we use a private copy-on-write mapping. Until they are written to, its pages are the ones of the
+        # page cache, so no data is copied.
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+
 def fromfile(
     file: BinaryIO,
     *,
@@ -210,8 +220,10 @@ def fromfile(
         2. This function has an additional ``byte_order`` parameter, since PyTorch's ``dtype``'s do not support that
             concept.
     .. note::
-        If the ``file`` was opened in update mode, i.e. "r+b" or "w+b", reading data is much faster. Be aware that as
-        long as the file is still open, inplace operations on the returned tensor will reflect back to the file.
+        On platforms other than Windows, the data is not read but memory-mapped and thus served directly from the page
+        cache. If the ``file`` was opened in update mode, i.e. "r+b" or "w+b", be aware that as long as the file is
+        still open, inplace operations on the returned tensor will reflect back to the file. Otherwise, the mapping is
+        private and inplace operations only copy the pages they modify.
     Args:
         file (IO): Open binary file.
         dtype (torch.dtype): Data type of the underlying data as well as of the returned tensor.
@@ -227,15 +239,15 @@ def fromfile(
     if platform.system() != "Windows":
         # PyTorch does not support tensors with underlying read-only memory. In case
         # - the file has a .fileno(),
-        # - the file was opened for updating, i.e. 'r+b' or 'w+b',
-        # - the file is seekable
-        # we can avoid copying the data for performance. Otherwise we fall back to simply .read() the data and copy it
-        # to a mutable location afterwards.
+        # - the file is seekable,
+        # - the file is not empty
+        # we can avoid copying the data for performance by memory-mapping the file. Otherwise we fall back to simply
+        # .read() the data and copy it to a mutable location afterwards.
         try:
-            buffer = memoryview(mmap.mmap(file.fileno(), 0))[file.tell() :]
+            buffer = memoryview(_mmap(file))[file.tell() :]
             # Reading from the memoryview does not advance the file cursor, so we have to do it manually.
             file.seek(*(0, io.SEEK_END) if count == -1 else (count * item_size, io.SEEK_CUR))
-        except (AttributeError, PermissionError, io.UnsupportedOperation):
+        except (AttributeError, PermissionError, ValueError, io.UnsupportedOperation):
             buffer = _read_mutable_buffer_fallback(file, count, item_size)
     else:
         # On Windows just trying to call mmap.mmap() on a file that does not support it, may corrupt the internal state
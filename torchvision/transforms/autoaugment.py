@@ -90,6 +90,49 @@ def _apply_op(
     return img
 
 
+def _get_color_op(op_name: str, magnitude: float) -> Optional[Tuple[str, float]]:
+    # The color adjustment of F._adjust_colors matching an op of _apply_op, if there is one
+    if op_name == "Brightness":
+        return ("brightness", 1.0 + magnitude)
+    if op_name == "Color":
+        return ("saturation", 1.0 + magnitude)
+    if op_name == "Contrast":
+        return ("contrast", 1.0 + magnitude)
+    if op_name == "Posterize":
+        return ("posterize", float(int(magnitude)))
+    if op_name == "Solarize":
+        return ("solarize", magnitude)
+    if op_name == "AutoContrast":
+        return ("autocontrast", 0.0)
+    if op_name == "Equalize":
+        return ("equalize", 0.0)
+    if op_name == "Invert":
+        return ("invert", 0.0)
+    return None
+
+
+def _apply_ops(
+    img: Tensor, ops: List[Tuple[str, float]], interpolation: InterpolationMode, fill: Optional[List[float]]
+) -> Tensor:
+    # Same as calling _apply_op for every (op_name, magnitude) in order, with the consecutive color ops applied
+    # together by F._adjust_colors
+    color_ops: List[Tuple[str, float]] = []
+    for op_name, magnitude in ops:
+        color_op = _get_color_op(op_name, magnitude)
+        if color_op is not None:
+            color_ops.append(color_op)
+            continue
+
+        if len(color_ops) > 0:
+            img = F._adjust_colors(img, color_ops)
+            color_ops = []
+        img = _apply_op(img, op_name, magnitude, interpolation=interpolation, fill=fill)
+
+    if len(color_ops) > 0:
+        img = F._adjust_colors(img, color_ops)
+    return img
+
+
 class AutoAugmentPolicy(Enum):
     """AutoAugment policies learned on different datasets.
     Available policies are IMAGENET, CIFAR10 and SVHN.
@@ -270,15 +313,16 @@ class AutoAugment(torch.nn.Module):
         transform_id, probs, signs = self.get_params(len(self.policies))
 
         op_meta = self._augmentation_space(10, (height, width))
+        ops: List[Tuple[str, float]] = []
         for i, (op_name, p, magnitude_id) in enumerate(self.policies[transform_id]):
             if probs[i] <= p:
                 magnitudes, signed = op_meta[op_name]
                 magnitude = float(magnitudes[magnitude_id].item()) if magnitude_id is not None else 0.0
                 if signed and signs[i] == 0:
                     magnitude *= -1.0
-                img = _apply_op(img, op_name, magnitude, interpolation=self.interpolation, fill=fill)
+                ops.append((op_name, magnitude))
 
-        return img
+        return _apply_ops(img, ops, interpolation=self.interpolation, fill=fill)
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(policy={self.policy}, fill={self.fill})"
@@ -353,6 +397,7 @@ class RandAugment(torch.nn.Module):
                 fill = [float(f) for f in fill]
 
         op_meta = self._augmentation_space(self.num_magnitude_bins, (height, width))
+        ops: List[Tuple[str, float]] = []
         for _ in range(self.num_ops):
             op_index = int(torch.randint(len(op_meta), (1,)).item())
             op_name = list(op_meta.keys())[op_index]
@@ -360,9 +405,9 @@ class RandAugment(torch.nn.Module):
             magnitude = float(magnitudes[self.magnitude].item()) if magnitudes.ndim > 0 else 0.0
             if signed and torch.randint(2, (1,)):
                 magnitude *= -1.0
-            img = _apply_op(img, op_name, magnitude, interpolation=self.interpolation, fill=fill)
+            ops.append((op_name, magnitude))
 
-        return img
+        return _apply_ops(img, ops, interpolation=self.interpolation, fill=fill)
 
     def __repr__(self) -> str:
         s = (
@@ -581,6 +626,7 @@ class AugMix(torch.nn.Module):
         for i in range(self.mixture_width):
             aug = batch
             depth = self.chain_depth if self.chain_depth > 0 else int(torch.randint(low=1, high=4, size=(1,)).item())
+            ops: List[Tuple[str, float]] = []
             for _ in range(depth):
                 op_index = int(torch.randint(len(op_meta), (1,)).item())
                 op_name = list(op_meta.keys())[op_index]
@@ -592,7 +638,8 @@ class AugMix(torch.nn.Module):
                 )
                 if signed and torch.randint(2, (1,)):
                     magnitude *= -1.0
-                aug = _apply_op(aug, op_name, magnitude, interpolation=self.interpolation, fill=fill)
+                ops.append((op_name, magnitude))
+            aug = _apply_ops(aug, ops, interpolation=self.interpolation, fill=fill)
             mix.add_(combined_weights[:, i].view(batch_dims) * aug)
         mix = mix.view(orig_dims).to(dtype=img.dtype)
 
@@ -366,6 +366,7 @@ def resize(
     interpolation: InterpolationMode = InterpolationMode.BILINEAR,
     max_size: Optional[int] = None,
     antialias: Optional[bool] = None,
+    native_uint8: bool = False,
 ) -> Tensor:
     r"""Resize the input image to the given size.
     If the image is torch Tensor, it is expected
@@ -405,6 +406,13 @@ def resize(
             is always used. If ``img`` is Tensor, the flag is False by default and can be set to True for
             ``InterpolationMode.BILINEAR`` and ``InterpolationMode.BICUBIC`` modes.
             This can help making the output for PIL images and tensors closer.
+        native_uint8 (bool): if ``True``, uint8 tensors on the CPU are resized with ``InterpolationMode.BILINEAR``
+            and ``InterpolationMode.BICUBIC`` by a native kernel in fixed-point arithmetic, instead of being converted
+            to float and back. The intermediate image between its horizontal and vertical passes is not clipped,
+            like in the default path, so the values only differ from it by their rounding, by at most 1. It works on
+            both CHW tensors and HWC tensors viewed as CHW, and keeps their memory format. The flag is ignored for
+            other inputs.
+            Default is ``False``.
 
     Returns:
         PIL Image or Tensor: Resized image.
@@ -428,7 +436,38 @@ def resize(
         pil_interpolation = pil_modes_mapping[interpolation]
         return F_pil.resize(img, size=size, interpolation=pil_interpolation, max_size=max_size)
 
-    return F_t.resize(img, size=size, interpolation=interpolation.value, max_size=max_size, antialias=antialias)
+    return F_t.resize(
+        img,
+        size=size,
+        interpolation=interpolation.value,
+        max_size=max_size,
+        antialias=antialias,
+        native_uint8=native_uint8,
+    )
+
+
+def _compute_resized_output_size(image_size: List[int], size: List[int], max_size: Optional[int] = None) -> List[int]:
+    # [height, width] of the output of resize, for an image of the given [height, width]
+    if len(size) == 2:
+        return [size[0], size[1]]
+
+    h, w = image_size
+    short, long = (w, h) if w <= h else (h, w)
+    requested_new_short = size[0]
+
+    new_short, new_long = requested_new_short, int(requested_new_short * long / short)
+
+    if max_size is not None:
+        if max_size <= requested_new_short:
+            raise ValueError(
+                f"max_size = {max_size} must be strictly greater than the requested "
+                f"size for the smaller edge size = {size}"
+            )
+        if new_long > max_size:
+            new_short, new_long = int(max_size * new_short / new_long), max_size
+
+    new_w, new_h = (new_short, new_long) if w <= h else (new_long, new_short)
+    return [new_h, new_w]
 
 
 def pad(img: Tensor, padding: List[int], fill: int = 0, padding_mode: str = "constant") -> Tensor:
@@ -990,6 +1029,32 @@ def _get_inverse_affine_matrix(
     return matrix
 
 
+def _get_batched_inverse_affine_matrix(
+    center: List[float], angles: Tensor, translations: Tensor, scales: Tensor, shears: Tensor
+) -> Tensor:
+    # Same as the inverted matrix of _get_inverse_affine_matrix, computed for the [N] angles and scales and the
+    # [N, 2] translations and shears of a batch. Returns the [N, 2, 3] matrices.
+    rot = torch.deg2rad(angles)
+    sx = torch.deg2rad(shears[:, 0])
+    sy = torch.deg2rad(shears[:, 1])
+
+    cx, cy = center[0], center[1]
+    tx, ty = translations[:, 0], translations[:, 1]
+
+    # RSS without scaling
+    a = torch.cos(rot - sy) / torch.cos(sy)
+    b = -torch.cos(rot - sy) * torch.tan(sx) / torch.cos(sy) - torch.sin(rot)
+    c = torch.sin(rot - sy) / torch.cos(sy)
+    d = -torch.sin(rot - sy) * torch.tan(sx) / torch.cos(sy) + torch.cos(rot)
+
+    # Inverted rotation matrix with scale and shear
+    m0, m1, m3, m4 = d / scales, -b / scales, -c / scales, a / scales
+    # Apply inverse of translation and of center translation, then center translation
+    m2 = m0 * (-cx - tx) + m1 * (-cy - ty) + cx
+    m5 = m3 * (-cx - tx) + m4 * (-cy - ty) + cy
+    return torch.stack([m0, m1, m2, m3, m4, m5], dim=1).view(-1, 2, 3)
+
+
 def rotate(
     img: Tensor,
     angle: float,
@@ -1207,6 +1272,77 @@ def affine(
     return F_t.affine(img, matrix=matrix, interpolation=interpolation.value, fill=fill)
 
 
+def _compose_homographies(first: List[float], second: List[float]) -> List[float]:
+    # Homographies map the coordinates of the output pixels to the input, so transforming an image by first and then
+    # by second samples it through first @ second
+    return [sum(first[3 * i + k] * second[3 * k + j] for k in range(3)) for i in range(3) for j in range(3)]
+
+
+def _get_crop_resize_homography(top: int, left: int, height: int, width: int, size: List[int]) -> List[float]:
+    # Crop of the given box, resized to size like resize does with align_corners=False
+    return [width / size[1], 0.0, float(left), 0.0, height / size[0], float(top), 0.0, 0.0, 1.0]
+
+
+def _get_center_crop_homography(image_height: int, image_width: int, crop_height: int, crop_width: int) -> List[float]:
+    # An image smaller than the crop is padded with zeros as in center_crop, i.e. the crop starts before the image
+    if crop_height > image_height:
+        top = -((crop_height - image_height) // 2)
+    else:
+        top = int(round((image_height - crop_height) / 2.0))
+    if crop_width > image_width:
+        left = -((crop_width - image_width) // 2)
+    else:
+        left = int(round((image_width - crop_width) / 2.0))
+    return _get_crop_resize_homography(top, left, crop_height, crop_width, [crop_height, crop_width])
+
+
+def _get_flip_homography(height: int, width: int, horizontal: bool) -> List[float]:
+    if horizontal:
+        return [-1.0, 0.0, float(width), 0.0, 1.0, 0.0, 0.0, 0.0, 1.0]
+    return [1.0, 0.0, 0.0, 0.0, -1.0, float(height), 0.0, 0.0, 1.0]
+
+
+def _get_affine_homography(
+    height: int,
+    width: int,
+    angle: float,
+    translate: List[float],
+    scale: float,
+    shear: List[float],
+    center: Optional[List[int]] = None,
+) -> List[float]:
+    # Same matrix as affine on tensors, which has its origin at the image center, moved to the top-left corner
+    center_f = [0.0, 0.0]
+    if center is not None:
+        center_f = [1.0 * (c - s * 0.5) for c, s in zip(center, [width, height])]
+    translate_f = [1.0 * t for t in translate]
+    a, b, c, d, e, f = _get_inverse_affine_matrix(center_f, angle, translate_f, scale, list(shear))
+    cx, cy = width * 0.5, height * 0.5
+    return [a, b, c + cx - a * cx - b * cy, d, e, f + cy - d * cx - e * cy, 0.0, 0.0, 1.0]
+
+
+def _homography(
+    img: Tensor,
+    matrix: List[float],
+    output_size: List[int],
+    interpolation: InterpolationMode = InterpolationMode.BILINEAR,
+    fill: Optional[List[float]] = None,
+) -> Tensor:
+    # matrix is the row-major 3x3 homography mapping the coordinates of the output pixels to the input, with the
+    # origin at the top-left corner of the images and the pixel centers at half-integers, as in perspective. The
+    # output has the given [height, width] and is sampled once, without antialiasing.
+    if len(matrix) != 9:
+        raise ValueError(f"matrix should have 9 values, got {len(matrix)}")
+    if len(output_size) != 2:
+        raise ValueError(f"output_size should be a sequence of length 2, got {output_size}")
+
+    if not isinstance(img, torch.Tensor):
+        pil_interpolation = pil_modes_mapping[interpolation]
+        return F_pil.homography(img, matrix, output_size, interpolation=pil_interpolation, fill=fill)
+
+    return F_t.homography(img, matrix, output_size, interpolation=interpolation.value, fill=fill)
+
+
 @torch.jit.unused
 def to_grayscale(img, num_output_channels=1):
     """Convert PIL image of any mode (RGB, HSV, LAB, etc) to grayscale version of image.
@@ -1477,3 +1613,93 @@ def equalize(img: Tensor) -> Tensor:
         return F_pil.equalize(img)
 
     return F_t.equalize(img)
+
+
+def _adjust_colors(img: Tensor, ops: List[Tuple[str, float]]) -> Tensor:
+    # Applies the color adjustments given as (name, factor) pairs in order, like the calls to adjust_brightness,
+    # adjust_contrast, adjust_saturation, adjust_hue, posterize, solarize, invert, autocontrast and equalize they are
+    # named after. Uint8 tensor images are adjusted with lookup tables, see F_t.adjust_colors.
+    if not isinstance(img, torch.Tensor):
+        return F_pil.adjust_colors(img, ops)
+
+    factors: List[Tuple[str, Tensor]] = []
+    for name, factor in ops:
+        factors.append((name, torch.tensor(factor, dtype=torch.float64)))
+    return F_t.adjust_colors(img, factors)
+
+
+# Per-sample transforms of batches of tensor images. Each of them takes an [N, C, H, W] tensor and one set of
+# parameters per image, as tensors whose first dimension is N, and transforms the whole batch at once.
+
+
+def _batched_adjust_brightness(img: Tensor, brightness_factors: Tensor) -> Tensor:
+    return F_t.batched_adjust_brightness(img, brightness_factors)
+
+
+def _batched_adjust_contrast(img: Tensor, contrast_factors: Tensor) -> Tensor:
+    return F_t.batched_adjust_contrast(img, contrast_factors)
+
+
+def _batched_adjust_saturation(img: Tensor, saturation_factors: Tensor) -> Tensor:
+    return F_t.batched_adjust_saturation(img, saturation_factors)
+
+
+def _batched_adjust_hue(img: Tensor, hue_factors: Tensor) -> Tensor:
+    return F_t.batched_adjust_hue(img, hue_factors)
+
+
+def _batched_adjust_colors(img: Tensor, ops: List[Tuple[str, Tensor]]) -> Tensor:
+    # Same as _adjust_colors, with [N] factors for brightness, contrast, saturation and hue
+    return F_t.adjust_colors(img, ops)
+
+
+def _batched_resized_crop(
+    img: Tensor,
+    boxes: Tensor,
+    size: List[int],
+    interpolation: InterpolationMode = InterpolationMode.BILINEAR,
+) -> Tensor:
+    # boxes is [N, 4] and holds the (top, left, height, width) crop of each image. Only NEAREST and BILINEAR are
+    # supported, with the same sampling as resized_crop without antialiasing.
+    if len(size) != 2:
+        raise ValueError(f"size should be a sequence of length 2, got {size}")
+    return F_t.batched_resized_crop(img, boxes, size, interpolation.value)
+
+
+def _batched_affine(
+    img: Tensor,
+    angles: Tensor,
+    translations: Tensor,
+    scales: Tensor,
+    shears: Tensor,
+    interpolation: InterpolationMode = InterpolationMode.NEAREST,
+    fill: Optional[List[float]] = None,
+    center: Optional[List[int]] = None,
+) -> Tensor:
+    # Same parameters as affine, with [N] angles and scales and [N, 2] translations and shears
+    center_f = [0.0, 0.0]
+    if center is not None:
+        _, height, width = get_dimensions(img)
+        # Center values should be in pixel coordinates but translated such that (0, 0) corresponds to image center.
+        center_f = [1.0 * (c - s * 0.5) for c, s in zip(center, [width, height])]
+
+    matrices = _get_batched_inverse_affine_matrix(
+        center_f,
+        angles.to(torch.float64),
+        translations.to(torch.float64),
+        scales.to(torch.float64),
+        shears.to(torch.float64),
+    )
+    return F_t.batched_affine(img, matrices, interpolation=interpolation.value, fill=fill)
+
+
+def _batched_gaussian_blur(img: Tensor, kernel_size: List[int], sigmas: Tensor) -> Tensor:
+    # sigmas is [N] or [N, 2], for the same sigma on both axes or the (sigma_x, sigma_y) of each image
+    if len(kernel_size) != 2:
+        raise ValueError(f"kernel_size should have 2 values, got {kernel_size}")
+    for ksize in kernel_size:
+        if ksize % 2 == 0 or ksize < 0:
+            raise ValueError(f"kernel_size should have odd and positive integers. Got {kernel_size}")
+    if bool((sigmas <= 0).any()):
+        raise ValueError("sigmas should be positive")
+    return F_t.batched_gaussian_blur(img, kernel_size, sigmas)
@@ -359,6 +359,26 @@ def perspective(
     return img.transform(img.size, Image.PERSPECTIVE, perspective_coeffs, interpolation, **opts)
 
 
+@torch.jit.unused
+def homography(
+    img: Image.Image,
+    matrix: List[float],
+    output_size: List[int],
+    interpolation: int = Image.BILINEAR,
+    fill: Optional[Union[float, List[float], Tuple[float, ...]]] = 0,
+) -> Image.Image:
+
+    if not _is_pil_image(img):
+        raise TypeError(f"img should be PIL Image. Got {type(img)}")
+
+    opts = _parse_fill(fill, img)
+    coeffs = [v / matrix[8] for v in matrix[:8]]
+    size = (output_size[1], output_size[0])
+    if coeffs[6] == 0 and coeffs[7] == 0:
+        return img.transform(size, Image.AFFINE, coeffs[:6], interpolation, **opts)
+    return img.transform(size, Image.PERSPECTIVE, coeffs, interpolation, **opts)
+
+
 @torch.jit.unused
 def to_grayscale(img: Image.Image, num_output_channels: int) -> Image.Image:
     if not _is_pil_image(img):
@@ -420,3 +440,32 @@ def equalize(img: Image.Image) -> Image.Image:
     if not _is_pil_image(img):
         raise TypeError(f"img should be PIL Image. Got {type(img)}")
     return ImageOps.equalize(img)
+
+
+@torch.jit.unused
+def adjust_colors(img: Image.Image, ops: List[Tuple[str, float]]) -> Image.Image:
+    if not _is_pil_image(img):
+        raise TypeError(f"img should be PIL Image. Got {type(img)}")
+
+    for name, factor in ops:
+        if name == "brightness":
+            img = adjust_brightness(img, factor)
+        elif name == "contrast":
+            img = adjust_contrast(img, factor)
+        elif name == "saturation":
+            img = adjust_saturation(img, factor)
+        elif name == "hue":
+            img = adjust_hue(img, factor)
+        elif name == "posterize":
+            img = posterize(img, int(factor))
+        elif name == "solarize":
+            img = solarize(img, factor)  # type: ignore[arg-type]
+        elif name == "invert":
+            img = invert(img)
+        elif name == "autocontrast":
+            img = autocontrast(img)
+        elif name == "equalize":
+            img = equalize(img)
+        else:
+            raise ValueError(f"Unknown color adjustment {name}")
+    return img
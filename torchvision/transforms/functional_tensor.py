@@ -1,9 +1,11 @@
+import functools
 import warnings
 from typing import Optional, Tuple, List
 
 import torch
 from torch import Tensor
 from torch.nn.functional import grid_sample, conv2d, interpolate, pad as torch_pad
+from torchvision.extension import _assert_has_ops
 
 
 def _is_tensor_a_torch_image(x: Tensor) -> bool:
@@ -170,9 +172,20 @@ def adjust_brightness(img: Tensor, brightness_factor: float) -> Tensor:
 
     _assert_channels(img, [1, 3])
 
+    if img.dtype == torch.uint8:
+        lut = _identity_lut(img)
+        return _apply_lut(img, _blend(lut, torch.zeros_like(lut), brightness_factor))
+
     return _blend(img, torch.zeros_like(img), brightness_factor)
 
 
+def _mean_gray(img: Tensor) -> Tensor:
+    dtype = img.dtype if torch.is_floating_point(img) else torch.float32
+    if get_dimensions(img)[0] == 3:
+        return torch.mean(rgb_to_grayscale(img).to(dtype), dim=(-3, -2, -1), keepdim=True)
+    return torch.mean(img.to(dtype), dim=(-3, -2, -1), keepdim=True)
+
+
 def adjust_contrast(img: Tensor, contrast_factor: float) -> Tensor:
     if contrast_factor < 0:
         raise ValueError(f"contrast_factor ({contrast_factor}) is not non-negative.")
@@ -180,12 +193,10 @@ def adjust_contrast(img: Tensor, contrast_factor: float) -> Tensor:
     _assert_image_tensor(img)
 
     _assert_channels(img, [3, 1])
-    c = get_dimensions(img)[0]
-    dtype = img.dtype if torch.is_floating_point(img) else torch.float32
-    if c == 3:
-        mean = torch.mean(rgb_to_grayscale(img).to(dtype), dim=(-3, -2, -1), keepdim=True)
-    else:
-        mean = torch.mean(img.to(dtype), dim=(-3, -2, -1), keepdim=True)
+    mean = _mean_gray(img)
+
+    if img.dtype == torch.uint8:
+        return _apply_lut(img, _blend(_identity_lut(img), mean, contrast_factor))
 
     return _blend(img, mean, contrast_factor)
 
@@ -242,6 +253,13 @@ def adjust_gamma(img: Tensor, gamma: float, gain: float = 1) -> Tensor:
     if gamma < 0:
         raise ValueError("Gamma should be a non-negative real number")
 
+    if img.dtype == torch.uint8:
+        return _apply_lut(img, _adjust_gamma(_identity_lut(img), gamma, gain))
+
+    return _adjust_gamma(img, gamma, gain)
+
+
+def _adjust_gamma(img: Tensor, gamma: float, gain: float) -> Tensor:
     result = img
     dtype = img.dtype
     if not torch.is_floating_point(img):
@@ -259,6 +277,106 @@ def _blend(img1: Tensor, img2: Tensor, ratio: float) -> Tensor:
     return (ratio * img1 + (1.0 - ratio) * img2).clamp(0, bound).to(img1.dtype)
 
 
+def _identity_lut(img: Tensor) -> Tensor:
+    # The 256 values of uint8 images as a [1, 1, 256] image. Running an element-wise adjustment on it gives the lookup
+    # table of the adjustment, broadcast to [..., C or 1, 1, 256] when it depends on statistics of the images.
+    return torch.arange(256, device=img.device).to(torch.uint8).view(1, 1, 256)
+
+
+def _apply_lut(img: Tensor, lut: Tensor) -> Tensor:
+    # Maps all the values of img with a single gather. The leading dimensions of lut are broadcast to the ones of img.
+    if lut.numel() == 256:
+        return lut.reshape(-1).index_select(0, img.reshape(-1).to(torch.int32)).reshape(img.shape)
+    if img.numel() == 0:
+        return img
+
+    lut = lut.expand(list(img.shape[:-2]) + [1, 256]).reshape(-1, 256)
+    index = img.reshape(lut.shape[0], -1).to(torch.int32)
+    index.add_(torch.arange(0, lut.numel(), 256, dtype=torch.int32, device=img.device).view(-1, 1))
+    return lut.reshape(-1).index_select(0, index.view(-1)).view(img.shape)
+
+
+def _assert_batched_params(img: Tensor, params: Tensor, name: str) -> None:
+    _assert_image_tensor(img)
+    if img.ndim != 4:
+        raise ValueError(f"Expected a batch of images of shape [N, C, H, W], got {list(img.shape)}")
+    if params.shape[0] != img.shape[0]:
+        raise ValueError(f"Expected {img.shape[0]} values of {name}, one per image, got {params.shape[0]}")
+
+
+def _blend_per_sample(img1: Tensor, img2: Tensor, ratios: Tensor) -> Tensor:
+    dtype = img1.dtype if img1.is_floating_point() else torch.float32
+    ratios = ratios.to(dtype=dtype, device=img1.device).view(-1, 1, 1, 1)
+    bound = 1.0 if img1.is_floating_point() else 255.0
+    return (ratios * img1 + (1.0 - ratios) * img2).clamp(0, bound).to(img1.dtype)
+
+
+def batched_adjust_brightness(img: Tensor, brightness_factors: Tensor) -> Tensor:
+    _assert_batched_params(img, brightness_factors, "brightness_factors")
+    if bool((brightness_factors < 0).any()):
+        raise ValueError("brightness_factors should be non-negative.")
+
+    _assert_channels(img, [1, 3])
+
+    if img.dtype == torch.uint8:
+        lut = _identity_lut(img)
+        return _apply_lut(img, _blend_per_sample(lut, torch.zeros_like(lut), brightness_factors))
+
+    return _blend_per_sample(img, torch.zeros_like(img), brightness_factors)
+
+
+def batched_adjust_contrast(img: Tensor, contrast_factors: Tensor) -> Tensor:
+    _assert_batched_params(img, contrast_factors, "contrast_factors")
+    if bool((contrast_factors < 0).any()):
+        raise ValueError("contrast_factors should be non-negative.")
+
+    _assert_channels(img, [3, 1])
+    mean = _mean_gray(img)
+
+    if img.dtype == torch.uint8:
+        return _apply_lut(img, _blend_per_sample(_identity_lut(img), mean, contrast_factors))
+
+    return _blend_per_sample(img, mean, contrast_factors)
+
+
+def batched_adjust_hue(img: Tensor, hue_factors: Tensor) -> Tensor:
+    _assert_batched_params(img, hue_factors, "hue_factors")
+    if bool(((hue_factors < -0.5) | (hue_factors > 0.5)).any()):
+        raise ValueError("hue_factors should be in [-0.5, 0.5].")
+
+    _assert_channels(img, [1, 3])
+    if get_dimensions(img)[0] == 1:  # Match PIL behaviour
+        return img
+
+    orig_dtype = img.dtype
+    if img.dtype == torch.uint8:
+        img = img.to(dtype=torch.float32) / 255.0
+
+    img = _rgb2hsv(img)
+    h, s, v = img.unbind(dim=-3)
+    h = (h + hue_factors.to(dtype=h.dtype, device=h.device).view(-1, 1, 1)) % 1.0
+    img = torch.stack((h, s, v), dim=-3)
+    img_hue_adj = _hsv2rgb(img)
+
+    if orig_dtype == torch.uint8:
+        img_hue_adj = (img_hue_adj * 255.0).to(dtype=orig_dtype)
+
+    return img_hue_adj
+
+
+def batched_adjust_saturation(img: Tensor, saturation_factors: Tensor) -> Tensor:
+    _assert_batched_params(img, saturation_factors, "saturation_factors")
+    if bool((saturation_factors < 0).any()):
+        raise ValueError("saturation_factors should be non-negative.")
+
+    _assert_channels(img, [1, 3])
+
+    if get_dimensions(img)[0] == 1:  # Match PIL behaviour
+        return img
+
+    return _blend_per_sample(img, rgb_to_grayscale(img), saturation_factors)
+
+
 def _rgb2hsv(img: Tensor) -> Tensor:
     r, g, b = img.unbind(dim=-3)
 
@@ -423,12 +541,23 @@ def pad(img: Tensor, padding: List[int], fill: int = 0, padding_mode: str = "con
     return img
 
 
+def _resize_uint8(img: Tensor, size: List[int], interpolation: str, antialias: bool) -> Tensor:
+    # Resamples a uint8 CPU image with fixed-point separable filters, without converting it to float. The native op
+    # keeps the memory format of the image, so that HWC images viewed as CHW stay HWC.
+    _assert_has_ops()
+    c, h, w = get_dimensions(img)
+    shape = img.shape
+    img = torch.ops.torchvision._resize_uint8(img.reshape([-1, c, h, w]), size, interpolation, antialias)
+    return img.reshape(list(shape[:-2]) + size)
+
+
 def resize(
     img: Tensor,
     size: List[int],
     interpolation: str = "bilinear",
     max_size: Optional[int] = None,
     antialias: Optional[bool] = None,
+    native_uint8: bool = False,
 ) -> Tensor:
     _assert_image_tensor(img)
 
@@ -485,6 +614,9 @@ def resize(
     else:  # specified both h and w
         new_w, new_h = size[1], size[0]
 
+    if native_uint8 and img.dtype == torch.uint8 and img.device.type == "cpu" and interpolation != "nearest":
+        return _resize_uint8(img, [new_h, new_w], interpolation, antialias)
+
     img, need_cast, need_squeeze, out_dtype = _cast_squeeze_in(img, [torch.float32, torch.float64])
 
     # Define align_corners to avoid warnings
@@ -627,8 +759,9 @@ def _gen_affine_grid(
     base_grid[..., 2].fill_(1)
 
     rescaled_theta = theta.transpose(1, 2) / torch.tensor([0.5 * w, 0.5 * h], dtype=theta.dtype, device=theta.device)
-    output_grid = base_grid.view(1, oh * ow, 3).bmm(rescaled_theta)
-    return output_grid.view(1, oh, ow, 2)
+    # theta can hold one matrix per image of a batch, they all share the same base grid
+    output_grid = base_grid.view(1, oh * ow, 3).expand(theta.shape[0], oh * ow, 3).bmm(rescaled_theta)
+    return output_grid.view(theta.shape[0], oh, ow, 2)
 
 
 def affine(
@@ -644,6 +777,70 @@ def affine(
     return _apply_grid_transform(img, grid, interpolation, fill=fill)
 
 
+def batched_affine(
+    img: Tensor, matrices: Tensor, interpolation: str = "nearest", fill: Optional[List[float]] = None
+) -> Tensor:
+    _assert_batched_params(img, matrices, "matrices")
+    _assert_grid_transform_inputs(img, None, interpolation, fill, ["nearest", "bilinear"])
+
+    dtype = img.dtype if torch.is_floating_point(img) else torch.float32
+    theta = matrices.to(dtype=dtype, device=img.device).reshape(-1, 2, 3)
+    shape = img.shape
+    grid = _gen_affine_grid(theta, w=shape[-1], h=shape[-2], ow=shape[-1], oh=shape[-2])
+    return _apply_grid_transform(img, grid, interpolation, fill=fill)
+
+
+def _crop_source_indices(
+    start: Tensor, length: Tensor, out_size: int, interpolation: str
+) -> Tuple[Tensor, Tensor, Tensor]:
+    # Source pixels of each output pixel, as computed by interpolate(..., align_corners=False) when resizing a
+    # crop of the given start and length to out_size. Returns the two neighbours and the weight of the second one.
+    scale = (length / out_size).unsqueeze(1)
+    dst = torch.arange(out_size, dtype=start.dtype, device=start.device).unsqueeze(0)
+    last = (length - 1).unsqueeze(1)
+    if interpolation == "nearest":
+        src = torch.floor(dst * scale)
+    else:
+        src = ((dst + 0.5) * scale - 0.5).clamp(min=0.0)
+    idx0 = torch.min(torch.floor(src), last)
+    idx1 = torch.min(idx0 + 1, last)
+    offset = start.unsqueeze(1)
+    return (idx0 + offset).long(), (idx1 + offset).long(), src - idx0
+
+
+def batched_resized_crop(img: Tensor, boxes: Tensor, size: List[int], interpolation: str = "bilinear") -> Tensor:
+    _assert_batched_params(img, boxes, "boxes")
+    if interpolation not in ["nearest", "bilinear"]:
+        raise ValueError(f"Interpolation mode '{interpolation}' is unsupported with batched Tensor input")
+
+    oh, ow = size[0], size[1]
+    n, c = img.shape[0], img.shape[1]
+    dtype = img.dtype if torch.is_floating_point(img) else torch.float32
+    top, left, height, width = boxes.to(dtype=dtype, device=img.device).unbind(dim=1)
+    y0, y1, ly = _crop_source_indices(top, height, oh, interpolation)
+    x0, x1, lx = _crop_source_indices(left, width, ow, interpolation)
+
+    # Rows and then columns are gathered separately, in the dtype of the image, so only the output sized
+    # intermediates are ever cast to float
+    rows_shape = [n, c, oh, img.shape[-1]]
+    out_shape = [n, c, oh, ow]
+    if interpolation == "nearest":
+        rows = img.gather(2, y0.view(n, 1, oh, 1).expand(rows_shape))
+        return rows.gather(3, x0.view(n, 1, 1, ow).expand(out_shape))
+
+    ly = ly.view(n, 1, oh, 1)
+    rows0 = img.gather(2, y0.view(n, 1, oh, 1).expand(rows_shape)).to(dtype)
+    rows1 = img.gather(2, y1.view(n, 1, oh, 1).expand(rows_shape)).to(dtype)
+    rows = rows0 * (1.0 - ly) + rows1 * ly
+    lx = lx.view(n, 1, 1, ow)
+    cols0 = rows.gather(3, x0.view(n, 1, 1, ow).expand(out_shape))
+    cols1 = rows.gather(3, x1.view(n, 1, 1, ow).expand(out_shape))
+    out = cols0 * (1.0 - lx) + cols1 * lx
+    if not img.is_floating_point():
+        out = torch.round(out).to(img.dtype)
+    return out
+
+
 def _compute_output_size(matrix: List[float], w: int, h: int) -> Tuple[int, int]:
 
     # Inspired of PIL implementation:
@@ -741,6 +938,44 @@ def perspective(
     return _apply_grid_transform(img, grid, interpolation, fill=fill)
 
 
+def _homography_grid(
+    matrix: List[float], w: int, h: int, ow: int, oh: int, dtype: torch.dtype, device: torch.device
+) -> Tensor:
+    # Same as _perspective_grid with a full 3x3 matrix, and an output size that can differ from the input one:
+    # matrix maps the coordinates of the output pixel centers to the input, with the origin at the top-left corner
+    theta = torch.tensor(matrix, dtype=dtype, device=device).reshape(1, 3, 3)
+
+    d = 0.5
+    base_grid = torch.empty(1, oh, ow, 3, dtype=dtype, device=device)
+    x_grid = torch.linspace(d, ow * 1.0 + d - 1.0, steps=ow, device=device)
+    base_grid[..., 0].copy_(x_grid)
+    y_grid = torch.linspace(d, oh * 1.0 + d - 1.0, steps=oh, device=device).unsqueeze_(-1)
+    base_grid[..., 1].copy_(y_grid)
+    base_grid[..., 2].fill_(1)
+
+    output_grid = base_grid.view(1, oh * ow, 3).bmm(theta.transpose(1, 2))
+    output_grid = output_grid[..., :2] / output_grid[..., 2:]
+    output_grid = output_grid / torch.tensor([0.5 * w, 0.5 * h], dtype=dtype, device=device) - 1.0
+    return output_grid.view(1, oh, ow, 2)
+
+
+def homography(
+    img: Tensor,
+    matrix: List[float],
+    output_size: List[int],
+    interpolation: str = "bilinear",
+    fill: Optional[List[float]] = None,
+) -> Tensor:
+    _assert_grid_transform_inputs(img, None, interpolation, fill, ["nearest", "bilinear"])
+    if len(matrix) != 9:
+        raise ValueError("Argument matrix should have 9 float values")
+
+    oh, ow = output_size[0], output_size[1]
+    dtype = img.dtype if torch.is_floating_point(img) else torch.float32
+    grid = _homography_grid(matrix, w=img.shape[-1], h=img.shape[-2], ow=ow, oh=oh, dtype=dtype, device=img.device)
+    return _apply_grid_transform(img, grid, interpolation, fill=fill)
+
+
 def _get_gaussian_kernel1d(kernel_size: int, sigma: float) -> Tensor:
     ksize_half = (kernel_size - 1) * 0.5
 
@@ -751,13 +986,78 @@ def _get_gaussian_kernel1d(kernel_size: int, sigma: float) -> Tensor:
     return kernel1d
 
 
-def _get_gaussian_kernel2d(
-    kernel_size: List[int], sigma: List[float], dtype: torch.dtype, device: torch.device
+def _make_blur_kernel1d(kernel_size: int, sigma: float, dtype: torch.dtype, device: torch.device) -> Tensor:
+    kernel = _get_gaussian_kernel1d(kernel_size, sigma)
+    if dtype == torch.uint8:
+        # integer weights summing to 2 ** 14, i.e. fixed-point numbers with 14 fractional bits. The rounding error is
+        # put on the center weight, and the kernel stays on the CPU as its weights are read by _blur1d_fixed_point.
+        one = 1 << 14
+        kernel = torch.round(kernel * one).to(torch.int64)
+        kernel[kernel_size // 2] += one - kernel.sum()
+        return kernel
+    return kernel.to(device, dtype=dtype)
+
+
+@functools.lru_cache(maxsize=128)
+def _get_cached_blur_kernel1d(kernel_size: int, sigma: float, dtype: torch.dtype, device: torch.device) -> Tensor:
+    return _make_blur_kernel1d(kernel_size, sigma, dtype, device)
+
+
+def _get_blur_kernel1d(kernel_size: int, sigma: float, dtype: torch.dtype, device: torch.device) -> Tensor:
+    # The gaussian kernel used to blur images of the given dtype, cached outside of TorchScript
+    if not torch.jit.is_scripting():
+        return _get_cached_blur_kernel1d(kernel_size, sigma, dtype, device)
+    return _make_blur_kernel1d(kernel_size, sigma, dtype, device)
+
+
+def _get_batched_gaussian_kernel1d(
+    kernel_size: int, sigmas: Tensor, dtype: torch.dtype, device: torch.device
 ) -> Tensor:
-    kernel1d_x = _get_gaussian_kernel1d(kernel_size[0], sigma[0]).to(device, dtype=dtype)
-    kernel1d_y = _get_gaussian_kernel1d(kernel_size[1], sigma[1]).to(device, dtype=dtype)
-    kernel2d = torch.mm(kernel1d_y[:, None], kernel1d_x[None, :])
-    return kernel2d
+    # Same kernels as _get_gaussian_kernel1d, for the [N] sigmas of a batch
+    ksize_half = (kernel_size - 1) * 0.5
+    sigmas = sigmas.to(torch.float32)
+    x = torch.linspace(-ksize_half, ksize_half, steps=kernel_size, device=sigmas.device)
+    pdf = torch.exp(-0.5 * (x.unsqueeze(0) / sigmas.unsqueeze(1)).pow(2))
+    return (pdf / pdf.sum(dim=1, keepdim=True)).to(device, dtype=dtype)
+
+
+def _separable_conv2d(img: Tensor, kernel_x: Tensor, kernel_y: Tensor) -> Tensor:
+    # Depthwise convolution of a [N, C, H, W] image with the outer product of kernel_y and kernel_x, as a horizontal
+    # and a vertical pass. The kernels are [k], or [C, k] for one kernel per channel.
+    c = img.shape[-3]
+    img = conv2d(img, kernel_x.expand(c, kernel_x.shape[-1]).reshape(c, 1, 1, -1), groups=c)
+    return conv2d(img, kernel_y.expand(c, kernel_y.shape[-1]).reshape(c, 1, -1, 1), groups=c)
+
+
+def _reflect_pad(img: Tensor, padding: int, dim: int) -> Tensor:
+    # Same as the "reflect" mode of torch_pad along a single dimension, for tensors of any dtype
+    size = img.shape[dim]
+    index = torch.arange(-padding, size + padding, device=img.device).abs()
+    index = torch.where(index >= size, 2 * (size - 1) - index, index)
+    return img.index_select(dim, index)
+
+
+def _blur1d_fixed_point(img: Tensor, weights: List[int], dim: int) -> Tensor:
+    # Correlation of an int32 tensor with integer weights along dim, without padding
+    size = img.shape[dim] - len(weights) + 1
+    result = torch.zeros_like(img.narrow(dim, 0, size))
+    for i, weight in enumerate(weights):
+        if weight != 0:
+            result.add_(img.narrow(dim, i, size), alpha=weight)
+    return result
+
+
+def _gaussian_blur_fixed_point(img: Tensor, kernel_size: List[int], sigma: List[float]) -> Tensor:
+    # Separable blur of a uint8 image in int32 arithmetic. The weights have 14 fractional bits: the horizontal pass
+    # gives values below 2 ** 22 that are rounded to 8 fractional bits, and the vertical pass values below 2 ** 30 with
+    # 22 fractional bits, which are rounded back to uint8.
+    weights_x: List[int] = _get_blur_kernel1d(kernel_size[0], sigma[0], img.dtype, img.device).tolist()
+    weights_y: List[int] = _get_blur_kernel1d(kernel_size[1], sigma[1], img.dtype, img.device).tolist()
+
+    img = _reflect_pad(img, kernel_size[0] // 2, -1).to(torch.int32)
+    img = (_blur1d_fixed_point(img, weights_x, -1) + (1 << 5)) >> 6
+    img = _blur1d_fixed_point(_reflect_pad(img, kernel_size[1] // 2, -2), weights_y, -2)
+    return ((img + (1 << 21)) >> 22).to(torch.uint8)
 
 
 def gaussian_blur(img: Tensor, kernel_size: List[int], sigma: List[float]) -> Tensor:
@@ -766,21 +1066,55 @@ def gaussian_blur(img: Tensor, kernel_size: List[int], sigma: List[float]) -> Te
 
     _assert_image_tensor(img)
 
+    if img.dtype == torch.uint8:
+        return _gaussian_blur_fixed_point(img, kernel_size, sigma)
+
     dtype = img.dtype if torch.is_floating_point(img) else torch.float32
-    kernel = _get_gaussian_kernel2d(kernel_size, sigma, dtype=dtype, device=img.device)
-    kernel = kernel.expand(img.shape[-3], 1, kernel.shape[0], kernel.shape[1])
+    kernel_x = _get_blur_kernel1d(kernel_size[0], sigma[0], dtype, img.device)
+    kernel_y = _get_blur_kernel1d(kernel_size[1], sigma[1], dtype, img.device)
 
     img, need_cast, need_squeeze, out_dtype = _cast_squeeze_in(
         img,
         [
-            kernel.dtype,
+            dtype,
         ],
     )
 
     # padding = (left, right, top, bottom)
     padding = [kernel_size[0] // 2, kernel_size[0] // 2, kernel_size[1] // 2, kernel_size[1] // 2]
     img = torch_pad(img, padding, mode="reflect")
-    img = conv2d(img, kernel, groups=img.shape[-3])
+    img = _separable_conv2d(img, kernel_x, kernel_y)
+
+    img = _cast_squeeze_out(img, need_cast, need_squeeze, out_dtype)
+    return img
+
+
+def batched_gaussian_blur(img: Tensor, kernel_size: List[int], sigmas: Tensor) -> Tensor:
+    _assert_batched_params(img, sigmas, "sigmas")
+
+    n, c = img.shape[0], img.shape[1]
+    dtype = img.dtype if torch.is_floating_point(img) else torch.float32
+    sigmas = sigmas.reshape(n, -1).expand(n, 2)
+    # a depthwise convolution over the N * C channels of the batch, with the kernels of its image for each channel
+    kernel_x = _get_batched_gaussian_kernel1d(kernel_size[0], sigmas[:, 0], dtype, img.device)
+    kernel_y = _get_batched_gaussian_kernel1d(kernel_size[1], sigmas[:, 1], dtype, img.device)
+
+    img, need_cast, need_squeeze, out_dtype = _cast_squeeze_in(
+        img,
+        [
+            dtype,
+        ],
+    )
+
+    # padding = (left, right, top, bottom)
+    padding = [kernel_size[0] // 2, kernel_size[0] // 2, kernel_size[1] // 2, kernel_size[1] // 2]
+    img = torch_pad(img, padding, mode="reflect")
+    img = _separable_conv2d(
+        img.reshape(1, n * c, img.shape[-2], img.shape[-1]),
+        kernel_x.repeat_interleave(c, dim=0),
+        kernel_y.repeat_interleave(c, dim=0),
+    )
+    img = img.reshape(n, c, img.shape[-2], img.shape[-1])
 
     img = _cast_squeeze_out(img, need_cast, need_squeeze, out_dtype)
     return img
@@ -829,6 +1163,18 @@ def solarize(img: Tensor, threshold: float) -> Tensor:
 
 
 def _blurred_degenerate_image(img: Tensor) -> Tensor:
+    if img.dtype == torch.uint8:
+        # The kernel is a 3x3 box plus 4 times the center, divided by 13. The box sums are separable and computed in
+        # integers, and the division rounds like the float kernel would, as a multiple of 1 / 13 is never halfway.
+        values = img.to(torch.int32)
+        box = values[..., :-2] + values[..., 1:-1] + values[..., 2:]
+        box = box[..., :-2, :] + box[..., 1:-1, :] + box[..., 2:, :]
+        blurred = torch.div(box + 4 * values[..., 1:-1, 1:-1] + 6, 13, rounding_mode="floor")
+
+        result = img.clone()
+        result[..., 1:-1, 1:-1] = blurred.to(torch.uint8)
+        return result
+
     dtype = img.dtype if torch.is_floating_point(img) else torch.float32
 
     kernel = torch.ones((3, 3), dtype=dtype, device=img.device)
@@ -874,11 +1220,19 @@ def autocontrast(img: Tensor) -> Tensor:
 
     _assert_channels(img, [1, 3])
 
+    if img.dtype == torch.uint8:
+        return _apply_lut(img, _autocontrast(_identity_lut(img), img))
+
+    return _autocontrast(img, img)
+
+
+def _autocontrast(img: Tensor, reference: Tensor) -> Tensor:
+    # Stretches the values of img with the range of every channel of reference
     bound = 1.0 if img.is_floating_point() else 255.0
     dtype = img.dtype if torch.is_floating_point(img) else torch.float32
 
-    minimum = img.amin(dim=(-2, -1), keepdim=True).to(dtype)
-    maximum = img.amax(dim=(-2, -1), keepdim=True).to(dtype)
+    minimum = reference.amin(dim=(-2, -1), keepdim=True).to(dtype)
+    maximum = reference.amax(dim=(-2, -1), keepdim=True).to(dtype)
     scale = bound / (maximum - minimum)
     eq_idxs = torch.isfinite(scale).logical_not()
     minimum[eq_idxs] = 0
@@ -887,29 +1241,29 @@ def autocontrast(img: Tensor) -> Tensor:
     return ((img - minimum) * scale).clamp(0, bound).to(img.dtype)
 
 
-def _scale_channel(img_chan: Tensor) -> Tensor:
-    # TODO: we should expect bincount to always be faster than histc, but this
-    # isn't always the case. Once
-    # https://github.com/pytorch/pytorch/issues/53194 is fixed, remove the if
-    # block and only use bincount.
-    if img_chan.is_cuda:
-        hist = torch.histc(img_chan.to(torch.float32), bins=256, min=0, max=255)
-    else:
-        hist = torch.bincount(img_chan.view(-1), minlength=256)
-
-    nonzero_hist = hist[hist != 0]
-    step = torch.div(nonzero_hist[:-1].sum(), 255, rounding_mode="floor")
-    if step == 0:
-        return img_chan
+def _channel_histograms(img: Tensor) -> Tensor:
+    # The [..., C, 256] histograms of all the channels of a uint8 tensor, computed with a single bincount by offsetting
+    # the values of every channel by 256 times its index
+    values = img.flatten(end_dim=-3).flatten(start_dim=1).to(torch.int64)
+    num_channels = values.shape[0]
+    values.add_(torch.arange(0, num_channels * 256, 256, device=img.device).view(-1, 1))
+    hist = torch.bincount(values.view(-1), minlength=num_channels * 256)
+    return hist.view(list(img.shape[:-2]) + [256])
 
-    lut = torch.div(torch.cumsum(hist, 0) + torch.div(step, 2, rounding_mode="floor"), step, rounding_mode="floor")
-    lut = torch.nn.functional.pad(lut, [1, 0])[:-1].clamp(0, 255)
 
-    return lut[img_chan.to(torch.int64)].to(torch.uint8)
+def _equalize_lut(hist: Tensor) -> Tensor:
+    # The lookup tables of equalize for the [..., 256] histograms of channels, all computed at once
+    values = torch.arange(256, device=hist.device)
+    # the pixels with the largest value of a channel are not counted in its step
+    last = ((hist != 0) * values).argmax(dim=-1, keepdim=True)
+    step = torch.div(hist.sum(dim=-1, keepdim=True) - hist.gather(-1, last), 255, rounding_mode="floor")
 
-
-def _equalize_single_image(img: Tensor) -> Tensor:
-    return torch.stack([_scale_channel(img[c]) for c in range(img.size(0))])
+    lut = torch.div(
+        torch.cumsum(hist, -1) + torch.div(step, 2, rounding_mode="floor"), step.clamp(min=1), rounding_mode="floor"
+    )
+    lut = torch.nn.functional.pad(lut, [1, 0])[..., :-1].clamp(0, 255)
+    # channels with a step of 0 are left as they are
+    return torch.where(step == 0, values, lut).to(torch.uint8)
 
 
 def equalize(img: Tensor) -> Tensor:
@@ -923,10 +1277,129 @@ def equalize(img: Tensor) -> Tensor:
 
     _assert_channels(img, [1, 3])
 
-    if img.ndim == 3:
-        return _equalize_single_image(img)
+    return _apply_lut(img, _equalize_lut(_channel_histograms(img)).unsqueeze(-2))
+
+
+def _blend_factor(img1: Tensor, img2: Tensor, factor: Tensor) -> Tensor:
+    if factor.ndim == 0:
+        return _blend(img1, img2, float(factor))
+    return _blend_per_sample(img1, img2, factor)
+
+
+def _adjust_color(img: Tensor, name: str, factor: Tensor) -> Tensor:
+    per_sample = factor.ndim > 0
+    if name == "brightness":
+        return batched_adjust_brightness(img, factor) if per_sample else adjust_brightness(img, float(factor))
+    if name == "contrast":
+        return batched_adjust_contrast(img, factor) if per_sample else adjust_contrast(img, float(factor))
+    if name == "saturation":
+        return batched_adjust_saturation(img, factor) if per_sample else adjust_saturation(img, float(factor))
+    if name == "hue":
+        return batched_adjust_hue(img, factor) if per_sample else adjust_hue(img, float(factor))
+    if name == "posterize":
+        return posterize(img, int(factor))
+    if name == "solarize":
+        return solarize(img, float(factor))
+    if name == "invert":
+        return invert(img)
+    if name == "autocontrast":
+        return autocontrast(img)
+    if name == "equalize":
+        return equalize(img)
+    raise ValueError(f"Unknown color adjustment {name}")
+
+
+def _adjust_saturation_hue(img: Tensor, ops: List[Tuple[str, Tensor]]) -> Tensor:
+    # Saturation and hue adjustments of a uint8 image, run on a single float buffer. The values are truncated like
+    # the uint8 results of adjust_saturation and adjust_hue after every step, so that the output is the same.
+    if get_dimensions(img)[0] == 1:  # Match PIL behaviour
+        return img
+
+    result = img.to(torch.float32)
+    for name, factor in ops:
+        if name == "saturation":
+            r, g, b = result.unbind(dim=-3)
+            gray = (0.2989 * r + 0.587 * g + 0.114 * b).floor_().unsqueeze(dim=-3)
+            if factor.ndim == 0:
+                ratio = float(factor)
+                result = ratio * result + (1.0 - ratio) * gray
+            else:
+                ratios = factor.to(dtype=result.dtype, device=result.device).view(-1, 1, 1, 1)
+                result = ratios * result + (1.0 - ratios) * gray
+            result = result.clamp_(0, 255.0).floor_()
+        else:
+            h, s, v = _rgb2hsv(result / 255.0).unbind(dim=-3)
+            if factor.ndim == 0:
+                h = (h + float(factor)) % 1.0
+            else:
+                h = (h + factor.to(dtype=h.dtype, device=h.device).view(-1, 1, 1)) % 1.0
+            result = (_hsv2rgb(torch.stack((h, s, v), dim=-3)) * 255.0).floor_()
+
+    return result.to(torch.uint8)
+
+
+def adjust_colors(img: Tensor, ops: List[Tuple[str, Tensor]]) -> Tensor:
+    # Applies the color adjustments given as (name, factor) pairs in order, with the names of _adjust_color. A factor
+    # is a 0-d tensor used for all the images, or for brightness, contrast, saturation and hue a tensor with one value
+    # per image of an [N, C, H, W] batch.
+    #
+    # For uint8 images, the element-wise adjustments and equalize are folded into one lookup table per image and
+    # channel, which is only applied when an adjustment needs the current image, and at the end. Consecutive saturation
+    # and hue adjustments are run together by _adjust_saturation_hue. The result is the same as with the separate
+    # functions.
+    if len(ops) == 0:
+        return img
 
-    return torch.stack([_equalize_single_image(x) for x in img])
+    _assert_image_tensor(img)
+
+    _assert_channels(img, [1, 3])
+
+    if img.dtype != torch.uint8:
+        for name, factor in ops:
+            img = _adjust_color(img, name, factor)
+        return img
+
+    lut = _identity_lut(img)
+    pending = False
+    i = 0
+    while i < len(ops):
+        name, factor = ops[i]
+        if name in ["contrast", "autocontrast", "saturation", "hue"] and pending:
+            img = _apply_lut(img, lut)
+            lut = _identity_lut(img)
+            pending = False
+
+        if name == "saturation" or name == "hue":
+            j = i + 1
+            while j < len(ops) and ops[j][0] in ["saturation", "hue"]:
+                j += 1
+            img = _adjust_saturation_hue(img, ops[i:j])
+            i = j
+            continue
+
+        if name == "brightness":
+            lut = _blend_factor(lut, torch.zeros_like(lut), factor)
+        elif name == "contrast":
+            lut = _blend_factor(lut, _mean_gray(img), factor)
+        elif name == "autocontrast":
+            lut = _autocontrast(lut, img)
+        elif name == "equalize":
+            hist = _channel_histograms(img)
+            if pending:
+                # the histograms of the adjusted image, moved by the lookup tables
+                luts = lut.expand(list(img.shape[:-2]) + [1, 256]).squeeze(-2).to(torch.int64)
+                hist = torch.zeros_like(hist).scatter_add_(-1, luts, hist)
+                lut = torch.gather(_equalize_lut(hist), -1, luts).unsqueeze(-2)
+            else:
+                lut = _equalize_lut(hist).unsqueeze(-2)
+        else:
+            lut = _adjust_color(lut, name, factor)
+        pending = True
+        i += 1
+
+    if pending:
+        img = _apply_lut(img, lut)
+    return img
 
 
 def normalize(tensor: Tensor, mean: List[float], std: List[float], inplace: bool = False) -> Tensor:
@@ -63,6 +63,9 @@ class Compose:
 
     Args:
         transforms (list of ``Transform`` objects): list of transforms to compose.
+        fuse_geometric (bool): If True, consecutive geometric transforms are folded into a single projective
+            transform, and the image is resampled once, directly at the size of the last one. The random
+            parameters of the transforms are drawn in the same order as without fusion. Default is ``False``.
 
     Example:
         >>> transforms.Compose([
@@ -83,18 +86,96 @@ class Compose:
         Make sure to use only scriptable transformations, i.e. that work with ``torch.Tensor``, does not require
         `lambda` functions or ``PIL.Image``.
 
+    .. note::
+        With ``fuse_geometric=True``, the transforms that can be fused are :class:`Resize`, :class:`CenterCrop`,
+        :class:`RandomCrop`, :class:`RandomResizedCrop`, :class:`RandomHorizontalFlip`, :class:`RandomVerticalFlip`,
+        :class:`RandomRotation`, :class:`RandomAffine` and :class:`RandomPerspective`. Consecutive transforms are
+        fused as long as they use the same interpolation mode, ``InterpolationMode.NEAREST`` or
+        ``InterpolationMode.BILINEAR``, and the same fill, crops and flips being compatible with any of them.
+        Resizing with ``antialias=True`` on tensors, padding in :class:`RandomCrop`, ``expand=True`` in
+        :class:`RandomRotation` and ``per_sample=True`` on batches are not fused.
+
+        The output is close to, but not the same as without fusion: the image is interpolated once instead of once
+        per transform, and without antialiasing, including for PIL images.
+
     """
 
-    def __init__(self, transforms):
+    def __init__(self, transforms, fuse_geometric=False):
         if not torch.jit.is_scripting() and not torch.jit.is_tracing():
             _log_api_usage_once(self)
         self.transforms = transforms
+        self.fuse_geometric = fuse_geometric
 
     def __call__(self, img):
+        if self.fuse_geometric:
+            return self._fused_call(img)
         for t in self.transforms:
             img = t(img)
         return img
 
+    def _fused_call(self, img):
+        # The fusion key of a transform is None if it can't be fused, else its (interpolation, fill), which are
+        # None for the transforms that don't interpolate or never sample outside of the image. It only depends on
+        # the type and number of channels of the image, which the pending transforms don't change.
+        group, group_key = [], (None, None)
+        for t in self.transforms:
+            key = self._get_fusion_key(t, img)
+            if key is not None:
+                merged_key = self._merge_fusion_keys(group_key, key)
+                if merged_key is not None:
+                    group.append(t)
+                    group_key = merged_key
+                    continue
+
+            img = self._apply_fused(img, group, group_key)
+            if key is None:
+                img = t(img)
+                group, group_key = [], (None, None)
+            else:
+                group, group_key = [t], key
+        return self._apply_fused(img, group, group_key)
+
+    @staticmethod
+    def _get_fusion_key(t, img):
+        # subclasses overriding forward are run as they are
+        owner = next((cls for cls in type(t).__mro__ if "_fusion_key" in vars(cls)), None)
+        if owner is None or type(t).forward is not owner.forward:
+            return None
+        return t._fusion_key(img)
+
+    @staticmethod
+    def _merge_fusion_keys(first, second):
+        merged = []
+        for a, b in zip(first, second):
+            if a is not None and b is not None and a != b:
+                return None
+            merged.append(a if a is not None else b)
+        return tuple(merged)
+
+    @staticmethod
+    def _apply_fused(img, transforms, key):
+        if len(transforms) < 2:
+            for t in transforms:
+                img = t(img)
+            return img
+
+        _, height, width = F.get_dimensions(img)
+        size = [height, width]
+        matrix = [1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0]
+        for t in transforms:
+            # draws the random parameters of the transform for an image of the given size
+            step, size = t._get_homography(size[0], size[1])
+            matrix = F._compose_homographies(matrix, step)
+
+        if size == [height, width] and matrix == [1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0]:
+            return img
+
+        interpolation, fill = key
+        if interpolation is None:
+            # only crops and flips, which sample the input exactly at its pixel centers
+            interpolation = InterpolationMode.NEAREST
+        return F._homography(img, matrix, size, interpolation, fill)
+
     def __repr__(self) -> str:
         format_string = self.__class__.__name__ + "("
         for t in self.transforms:
@@ -314,10 +395,15 @@ class Resize(torch.nn.Module):
 
             .. warning::
                 There is no autodiff support for ``antialias=True`` option with input ``img`` as Tensor.
+        native_uint8 (bool): if ``True``, uint8 tensors on the CPU are resized with ``InterpolationMode.BILINEAR``
+            and ``InterpolationMode.BICUBIC`` by a native fixed-point kernel, without a conversion to float.
+            See :func:`~torchvision.transforms.functional.resize`. Default is ``False``.
 
     """
 
-    def __init__(self, size, interpolation=InterpolationMode.BILINEAR, max_size=None, antialias=None):
+    def __init__(
+        self, size, interpolation=InterpolationMode.BILINEAR, max_size=None, antialias=None, native_uint8=False
+    ):
         super().__init__()
         _log_api_usage_once(self)
         if not isinstance(size, (int, Sequence)):
@@ -337,6 +423,7 @@ class Resize(torch.nn.Module):
 
         self.interpolation = interpolation
         self.antialias = antialias
+        self.native_uint8 = native_uint8
 
     def forward(self, img):
         """
@@ -346,11 +433,25 @@ class Resize(torch.nn.Module):
         Returns:
             PIL Image or Tensor: Rescaled image.
         """
-        return F.resize(img, self.size, self.interpolation, self.max_size, self.antialias)
+        return F.resize(img, self.size, self.interpolation, self.max_size, self.antialias, self.native_uint8)
+
+    def _fusion_key(self, img):
+        if self.interpolation not in _FUSED_INTERPOLATION_MODES or (
+            isinstance(img, Tensor) and (self.antialias or self.native_uint8)
+        ):
+            return None
+        return self.interpolation, None
+
+    def _get_homography(self, height, width):
+        size = [self.size] if isinstance(self.size, int) else list(self.size)
+        new_size = F._compute_resized_output_size([height, width], size, self.max_size)
+        return F._get_crop_resize_homography(0, 0, height, width, new_size), new_size
 
     def __repr__(self) -> str:
-        detail = f"(size={self.size}, interpolation={self.interpolation.value}, max_size={self.max_size}, antialias={self.antialias})"
-        return f"{self.__class__.__name__}{detail}"
+        detail = f"(size={self.size}, interpolation={self.interpolation.value}, max_size={self.max_size}, antialias={self.antialias}"
+        if self.native_uint8:
+            detail += ", native_uint8=True"
+        return f"{self.__class__.__name__}{detail})"
 
 
 class CenterCrop(torch.nn.Module):
@@ -380,6 +481,15 @@ class CenterCrop(torch.nn.Module):
         """
         return F.center_crop(img, self.size)
 
+    def _fusion_key(self, img):
+        # images smaller than the crop are padded with 0
+        channels, _, _ = F.get_dimensions(img)
+        return None, [0.0] * channels
+
+    def _get_homography(self, height, width):
+        crop_height, crop_width = self.size
+        return F._get_center_crop_homography(height, width, crop_height, crop_width), [crop_height, crop_width]
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(size={self.size})"
 
@@ -629,17 +739,7 @@ class RandomCrop(torch.nn.Module):
             tuple: params (i, j, h, w) to be passed to ``crop`` for random crop.
         """
         _, h, w = F.get_dimensions(img)
-        th, tw = output_size
-
-        if h + 1 < th or w + 1 < tw:
-            raise ValueError(f"Required crop size {(th, tw)} is larger then input image size {(h, w)}")
-
-        if w == tw and h == th:
-            return 0, 0, h, w
-
-        i = torch.randint(0, h - th + 1, size=(1,)).item()
-        j = torch.randint(0, w - tw + 1, size=(1,)).item()
-        return i, j, th, tw
+        return _get_random_crop_params(h, w, output_size)
 
     def __init__(self, size, padding=None, pad_if_needed=False, fill=0, padding_mode="constant"):
         super().__init__()
@@ -677,6 +777,15 @@ class RandomCrop(torch.nn.Module):
 
         return F.crop(img, i, j, h, w)
 
+    def _fusion_key(self, img):
+        if self.padding is not None or self.pad_if_needed:
+            return None
+        return None, None
+
+    def _get_homography(self, height, width):
+        i, j, h, w = _get_random_crop_params(height, width, self.size)
+        return F._get_crop_resize_homography(i, j, h, w, [h, w]), [h, w]
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(size={self.size}, padding={self.padding})"
 
@@ -708,6 +817,14 @@ class RandomHorizontalFlip(torch.nn.Module):
             return F.hflip(img)
         return img
 
+    def _fusion_key(self, img):
+        return None, None
+
+    def _get_homography(self, height, width):
+        if torch.rand(1) < self.p:
+            return F._get_flip_homography(height, width, horizontal=True), [height, width]
+        return [1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0], [height, width]
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(p={self.p})"
 
@@ -739,6 +856,14 @@ class RandomVerticalFlip(torch.nn.Module):
             return F.vflip(img)
         return img
 
+    def _fusion_key(self, img):
+        return None, None
+
+    def _get_homography(self, height, width):
+        if torch.rand(1) < self.p:
+            return F._get_flip_homography(height, width, horizontal=False), [height, width]
+        return [1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0], [height, width]
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(p={self.p})"
 
@@ -805,6 +930,18 @@ class RandomPerspective(torch.nn.Module):
             return F.perspective(img, startpoints, endpoints, self.interpolation, fill)
         return img
 
+    def _fusion_key(self, img):
+        if self.interpolation not in _FUSED_INTERPOLATION_MODES:
+            return None
+        channels, _, _ = F.get_dimensions(img)
+        return self.interpolation, _get_fusion_fill(self.fill, channels)
+
+    def _get_homography(self, height, width):
+        if torch.rand(1) < self.p:
+            startpoints, endpoints = self.get_params(width, height, self.distortion_scale)
+            return F._get_perspective_coeffs(startpoints, endpoints) + [1.0], [height, width]
+        return [1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0], [height, width]
+
     @staticmethod
     def get_params(width: int, height: int, distortion_scale: float) -> Tuple[List[List[int]], List[List[int]]]:
         """Get parameters for ``perspective`` for a random perspective transform.
@@ -870,10 +1007,21 @@ class RandomResizedCrop(torch.nn.Module):
             If input is Tensor, only ``InterpolationMode.NEAREST``, ``InterpolationMode.BILINEAR`` and
             ``InterpolationMode.BICUBIC`` are supported.
             For backward compatibility integer values (e.g. ``PIL.Image.NEAREST``) are still acceptable.
+        per_sample (bool): If True and the input is a batch of tensor images of shape [N, C, H, W], a crop is drawn
+            independently for every image and the whole batch is cropped and resized at once. Only
+            ``InterpolationMode.NEAREST`` and ``InterpolationMode.BILINEAR`` are supported in this mode.
+            Default is ``False``, i.e. the same crop is used for all the images of a batch.
 
     """
 
-    def __init__(self, size, scale=(0.08, 1.0), ratio=(3.0 / 4.0, 4.0 / 3.0), interpolation=InterpolationMode.BILINEAR):
+    def __init__(
+        self,
+        size,
+        scale=(0.08, 1.0),
+        ratio=(3.0 / 4.0, 4.0 / 3.0),
+        interpolation=InterpolationMode.BILINEAR,
+        per_sample=False,
+    ):
         super().__init__()
         _log_api_usage_once(self)
         self.size = _setup_size(size, error_msg="Please provide only two dimensions (h, w) for size.")
@@ -893,9 +1041,13 @@ class RandomResizedCrop(torch.nn.Module):
             )
             interpolation = _interpolation_modes_from_int(interpolation)
 
+        if per_sample and interpolation not in (InterpolationMode.NEAREST, InterpolationMode.BILINEAR):
+            raise ValueError(f"Interpolation mode '{interpolation.value}' is not supported with per_sample=True")
+
         self.interpolation = interpolation
         self.scale = scale
         self.ratio = ratio
+        self.per_sample = per_sample
 
     @staticmethod
     def get_params(img: Tensor, scale: List[float], ratio: List[float]) -> Tuple[int, int, int, int]:
@@ -911,35 +1063,45 @@ class RandomResizedCrop(torch.nn.Module):
             sized crop.
         """
         _, height, width = F.get_dimensions(img)
+        return _get_resized_crop_params(height, width, scale, ratio)
+
+    @staticmethod
+    def _get_params_per_sample(img: Tensor, scale: List[float], ratio: List[float]) -> Tensor:
+        # Same sampling as get_params for each image of the batch: all the attempts are drawn at once, and the
+        # first valid one of every image is kept. Returns the [N, 4] (i, j, h, w) crops.
+        batch_size = img.shape[0]
+        _, height, width = F.get_dimensions(img)
         area = height * width
 
         log_ratio = torch.log(torch.tensor(ratio))
-        for _ in range(10):
-            target_area = area * torch.empty(1).uniform_(scale[0], scale[1]).item()
-            aspect_ratio = torch.exp(torch.empty(1).uniform_(log_ratio[0], log_ratio[1])).item()
+        target_area = area * torch.empty(batch_size, 10).uniform_(scale[0], scale[1])
+        aspect_ratio = torch.exp(torch.empty(batch_size, 10).uniform_(float(log_ratio[0]), float(log_ratio[1])))
 
-            w = int(round(math.sqrt(target_area * aspect_ratio)))
-            h = int(round(math.sqrt(target_area / aspect_ratio)))
-
-            if 0 < w <= width and 0 < h <= height:
-                i = torch.randint(0, height - h + 1, size=(1,)).item()
-                j = torch.randint(0, width - w + 1, size=(1,)).item()
-                return i, j, h, w
+        w = torch.round(torch.sqrt(target_area * aspect_ratio))
+        h = torch.round(torch.sqrt(target_area / aspect_ratio))
+        valid = (w > 0) & (w <= width) & (h > 0) & (h <= height)
+        first_valid = valid.to(torch.uint8).argmax(dim=1, keepdim=True)
+        found = valid.any(dim=1)
+        w = w.gather(1, first_valid).squeeze(1)
+        h = h.gather(1, first_valid).squeeze(1)
 
         # Fallback to central crop
         in_ratio = float(width) / float(height)
         if in_ratio < min(ratio):
-            w = width
-            h = int(round(w / min(ratio)))
+            fallback_w = width
+            fallback_h = int(round(fallback_w / min(ratio)))
         elif in_ratio > max(ratio):
-            h = height
-            w = int(round(h * max(ratio)))
+            fallback_h = height
+            fallback_w = int(round(fallback_h * max(ratio)))
         else:  # whole image
-            w = width
-            h = height
-        i = (height - h) // 2
-        j = (width - w) // 2
-        return i, j, h, w
+            fallback_w = width
+            fallback_h = height
+        w = torch.where(found, w, torch.full_like(w, fallback_w))
+        h = torch.where(found, h, torch.full_like(h, fallback_h))
+
+        i = torch.where(found, torch.floor(torch.rand(batch_size) * (height - h + 1)), torch.floor((height - h) / 2))
+        j = torch.where(found, torch.floor(torch.rand(batch_size) * (width - w + 1)), torch.floor((width - w) / 2))
+        return torch.stack([i, j, h, w], dim=1).long()
 
     def forward(self, img):
         """
@@ -949,15 +1111,33 @@ class RandomResizedCrop(torch.nn.Module):
         Returns:
             PIL Image or Tensor: Randomly cropped and resized image.
         """
+        if self.per_sample and isinstance(img, Tensor) and img.ndim == 4:
+            boxes = self._get_params_per_sample(img, self.scale, self.ratio)
+            return F._batched_resized_crop(img, boxes, self.size, self.interpolation)
+
         i, j, h, w = self.get_params(img, self.scale, self.ratio)
         return F.resized_crop(img, i, j, h, w, self.size, self.interpolation)
 
+    def _fusion_key(self, img):
+        if self.interpolation not in _FUSED_INTERPOLATION_MODES:
+            return None
+        if self.per_sample and isinstance(img, Tensor) and img.ndim == 4:
+            return None
+        return self.interpolation, None
+
+    def _get_homography(self, height, width):
+        i, j, h, w = _get_resized_crop_params(height, width, self.scale, self.ratio)
+        return F._get_crop_resize_homography(i, j, h, w, list(self.size)), list(self.size)
+
     def __repr__(self) -> str:
         interpolate_str = self.interpolation.value
         format_string = self.__class__.__name__ + f"(size={self.size}"
         format_string += f", scale={tuple(round(s, 4) for s in self.scale)}"
         format_string += f", ratio={tuple(round(r, 4) for r in self.ratio)}"
-        format_string += f", interpolation={interpolate_str})"
+        format_string += f", interpolation={interpolate_str}"
+        if self.per_sample:
+            format_string += ", per_sample=True"
+        format_string += ")"
         return format_string
 
 
@@ -1156,15 +1336,19 @@ class ColorJitter(torch.nn.Module):
         hue (float or tuple of float (min, max)): How much to jitter hue.
             hue_factor is chosen uniformly from [-hue, hue] or the given [min, max].
             Should have 0<= hue <= 0.5 or -0.5 <= min <= max <= 0.5.
+        per_sample (bool): If True and the input is a batch of tensor images of shape [N, C, H, W], the factors
+            are drawn independently for every image and applied to the whole batch at once. The order of the
+            adjustments is still shared by the images of the batch. Default is ``False``.
     """
 
-    def __init__(self, brightness=0, contrast=0, saturation=0, hue=0):
+    def __init__(self, brightness=0, contrast=0, saturation=0, hue=0, per_sample=False):
         super().__init__()
         _log_api_usage_once(self)
         self.brightness = self._check_input(brightness, "brightness")
         self.contrast = self._check_input(contrast, "contrast")
         self.saturation = self._check_input(saturation, "saturation")
         self.hue = self._check_input(hue, "hue", center=0, bound=(-0.5, 0.5), clip_first_on_zero=False)
+        self.per_sample = per_sample
 
     @torch.jit.unused
     def _check_input(self, value, name, center=1, bound=(0, float("inf")), clip_first_on_zero=True):
@@ -1218,6 +1402,42 @@ class ColorJitter(torch.nn.Module):
 
         return fn_idx, b, c, s, h
 
+    @staticmethod
+    def _get_params_per_sample(
+        brightness: Optional[List[float]],
+        contrast: Optional[List[float]],
+        saturation: Optional[List[float]],
+        hue: Optional[List[float]],
+        batch_size: int,
+    ) -> Tuple[Tensor, Optional[Tensor], Optional[Tensor], Optional[Tensor], Optional[Tensor]]:
+        # Same as get_params, with [batch_size] factors
+        fn_idx = torch.randperm(4)
+
+        b = None if brightness is None else torch.empty(batch_size).uniform_(brightness[0], brightness[1])
+        c = None if contrast is None else torch.empty(batch_size).uniform_(contrast[0], contrast[1])
+        s = None if saturation is None else torch.empty(batch_size).uniform_(saturation[0], saturation[1])
+        h = None if hue is None else torch.empty(batch_size).uniform_(hue[0], hue[1])
+
+        return fn_idx, b, c, s, h
+
+    def _forward_per_sample(self, img: Tensor) -> Tensor:
+        fn_idx, brightness_factors, contrast_factors, saturation_factors, hue_factors = self._get_params_per_sample(
+            self.brightness, self.contrast, self.saturation, self.hue, img.shape[0]
+        )
+
+        ops: List[Tuple[str, Tensor]] = []
+        for fn_id in fn_idx:
+            if fn_id == 0 and brightness_factors is not None:
+                ops.append(("brightness", brightness_factors))
+            elif fn_id == 1 and contrast_factors is not None:
+                ops.append(("contrast", contrast_factors))
+            elif fn_id == 2 and saturation_factors is not None:
+                ops.append(("saturation", saturation_factors))
+            elif fn_id == 3 and hue_factors is not None:
+                ops.append(("hue", hue_factors))
+
+        return F._batched_adjust_colors(img, ops)
+
     def forward(self, img):
         """
         Args:
@@ -1226,21 +1446,26 @@ class ColorJitter(torch.nn.Module):
         Returns:
             PIL Image or Tensor: Color jittered image.
         """
+        if self.per_sample and isinstance(img, Tensor) and img.ndim == 4:
+            return self._forward_per_sample(img)
+
         fn_idx, brightness_factor, contrast_factor, saturation_factor, hue_factor = self.get_params(
             self.brightness, self.contrast, self.saturation, self.hue
         )
 
+        # the adjustments are applied together, with lookup tables for uint8 tensor images
+        ops: List[Tuple[str, float]] = []
         for fn_id in fn_idx:
             if fn_id == 0 and brightness_factor is not None:
-                img = F.adjust_brightness(img, brightness_factor)
+                ops.append(("brightness", brightness_factor))
             elif fn_id == 1 and contrast_factor is not None:
-                img = F.adjust_contrast(img, contrast_factor)
+                ops.append(("contrast", contrast_factor))
             elif fn_id == 2 and saturation_factor is not None:
-                img = F.adjust_saturation(img, saturation_factor)
+                ops.append(("saturation", saturation_factor))
             elif fn_id == 3 and hue_factor is not None:
-                img = F.adjust_hue(img, hue_factor)
+                ops.append(("hue", hue_factor))
 
-        return img
+        return F._adjust_colors(img, ops)
 
     def __repr__(self) -> str:
         s = (
@@ -1248,7 +1473,8 @@ class ColorJitter(torch.nn.Module):
             f"brightness={self.brightness}"
             f", contrast={self.contrast}"
             f", saturation={self.saturation}"
-            f", hue={self.hue})"
+            f", hue={self.hue}"
+            f"{', per_sample=True' if self.per_sample else ''})"
         )
         return s
 
@@ -1278,13 +1504,23 @@ class RandomRotation(torch.nn.Module):
             .. warning::
                 This parameter was deprecated in ``0.12`` and will be removed in ``0.14``. Please use ``interpolation``
                 instead.
+        per_sample (bool): If True and the input is a batch of tensor images of shape [N, C, H, W], an angle is
+            drawn independently for every image and the whole batch is rotated at once. Can't be used with
+            ``expand=True``. Default is ``False``.
 
     .. _filters: https://pillow.readthedocs.io/en/latest/handbook/concepts.html#filters
 
     """
 
     def __init__(
-        self, degrees, interpolation=InterpolationMode.NEAREST, expand=False, center=None, fill=0, resample=None
+        self,
+        degrees,
+        interpolation=InterpolationMode.NEAREST,
+        expand=False,
+        center=None,
+        fill=0,
+        resample=None,
+        per_sample=False,
     ):
         super().__init__()
         _log_api_usage_once(self)
@@ -1313,6 +1549,10 @@ class RandomRotation(torch.nn.Module):
         self.resample = self.interpolation = interpolation
         self.expand = expand
 
+        if per_sample and expand:
+            raise ValueError("expand=True is not supported with per_sample=True, the rotated images differ in size")
+        self.per_sample = per_sample
+
         if fill is None:
             fill = 0
         elif not isinstance(fill, (Sequence, numbers.Number)):
@@ -1345,10 +1585,34 @@ class RandomRotation(torch.nn.Module):
                 fill = [float(fill)] * channels
             else:
                 fill = [float(f) for f in fill]
+
+        if self.per_sample and isinstance(img, Tensor) and img.ndim == 4:
+            batch_size = img.shape[0]
+            angles = torch.empty(batch_size).uniform_(float(self.degrees[0]), float(self.degrees[1]))
+            # like rotate, the angle is negated to match the rotation direction of affine
+            zeros = torch.zeros(batch_size, 2)
+            return F._batched_affine(
+                img, -angles, zeros, torch.ones(batch_size), zeros, self.interpolation, fill, self.center
+            )
+
         angle = self.get_params(self.degrees)
 
         return F.rotate(img, angle, self.resample, self.expand, self.center, fill)
 
+    def _fusion_key(self, img):
+        if self.interpolation not in _FUSED_INTERPOLATION_MODES or self.expand:
+            return None
+        if self.per_sample and isinstance(img, Tensor) and img.ndim == 4:
+            return None
+        channels, _, _ = F.get_dimensions(img)
+        return self.interpolation, _get_fusion_fill(self.fill, channels)
+
+    def _get_homography(self, height, width):
+        angle = self.get_params(self.degrees)
+        # like rotate, the angle is negated to match the rotation direction of affine
+        matrix = F._get_affine_homography(height, width, -angle, [0.0, 0.0], 1.0, [0.0, 0.0], self.center)
+        return matrix, [height, width]
+
     def __repr__(self) -> str:
         interpolate_str = self.interpolation.value
         format_string = self.__class__.__name__ + f"(degrees={self.degrees}"
@@ -1358,6 +1622,8 @@ class RandomRotation(torch.nn.Module):
             format_string += f", center={self.center}"
         if self.fill is not None:
             format_string += f", fill={self.fill}"
+        if self.per_sample:
+            format_string += ", per_sample=True"
         format_string += ")"
         return format_string
 
@@ -1398,6 +1664,9 @@ class RandomAffine(torch.nn.Module):
                 instead.
         center (sequence, optional): Optional center of rotation, (x, y). Origin is the upper left corner.
             Default is the center of the image.
+        per_sample (bool): If True and the input is a batch of tensor images of shape [N, C, H, W], the parameters
+            of the transformation are drawn independently for every image and the whole batch is transformed at
+            once. Default is ``False``.
 
     .. _filters: https://pillow.readthedocs.io/en/latest/handbook/concepts.html#filters
 
@@ -1414,6 +1683,7 @@ class RandomAffine(torch.nn.Module):
         fillcolor=None,
         resample=None,
         center=None,
+        per_sample=False,
     ):
         super().__init__()
         _log_api_usage_once(self)
@@ -1473,6 +1743,7 @@ class RandomAffine(torch.nn.Module):
             _check_sequence_input(center, "center", req_sizes=(2,))
 
         self.center = center
+        self.per_sample = per_sample
 
     @staticmethod
     def get_params(
@@ -1512,6 +1783,37 @@ class RandomAffine(torch.nn.Module):
 
         return angle, translations, scale, shear
 
+    @staticmethod
+    def _get_params_per_sample(
+        degrees: List[float],
+        translate: Optional[List[float]],
+        scale_ranges: Optional[List[float]],
+        shears: Optional[List[float]],
+        img_size: List[int],
+        batch_size: int,
+    ) -> Tuple[Tensor, Tensor, Tensor, Tensor]:
+        # Same as get_params, with [batch_size] angles and scales and [batch_size, 2] translations and shears
+        angles = torch.empty(batch_size).uniform_(float(degrees[0]), float(degrees[1]))
+        translations = torch.zeros(batch_size, 2)
+        if translate is not None:
+            max_dx = float(translate[0] * img_size[0])
+            max_dy = float(translate[1] * img_size[1])
+            translations[:, 0].uniform_(-max_dx, max_dx)
+            translations[:, 1].uniform_(-max_dy, max_dy)
+            translations = torch.round(translations)
+
+        scales = torch.ones(batch_size)
+        if scale_ranges is not None:
+            scales.uniform_(scale_ranges[0], scale_ranges[1])
+
+        shear = torch.zeros(batch_size, 2)
+        if shears is not None:
+            shear[:, 0].uniform_(shears[0], shears[1])
+            if len(shears) == 4:
+                shear[:, 1].uniform_(shears[2], shears[3])
+
+        return angles, translations, scales, shear
+
     def forward(self, img):
         """
             img (PIL Image or Tensor): Image to be transformed.
@@ -1529,10 +1831,31 @@ class RandomAffine(torch.nn.Module):
 
         img_size = [width, height]  # flip for keeping BC on get_params call
 
+        if self.per_sample and isinstance(img, Tensor) and img.ndim == 4:
+            angles, translations, scales, shears = self._get_params_per_sample(
+                self.degrees, self.translate, self.scale, self.shear, img_size, img.shape[0]
+            )
+            return F._batched_affine(img, angles, translations, scales, shears, self.interpolation, fill, self.center)
+
         ret = self.get_params(self.degrees, self.translate, self.scale, self.shear, img_size)
 
         return F.affine(img, *ret, interpolation=self.interpolation, fill=fill, center=self.center)
 
+    def _fusion_key(self, img):
+        if self.interpolation not in _FUSED_INTERPOLATION_MODES:
+            return None
+        if self.per_sample and isinstance(img, Tensor) and img.ndim == 4:
+            return None
+        channels, _, _ = F.get_dimensions(img)
+        return self.interpolation, _get_fusion_fill(self.fill, channels)
+
+    def _get_homography(self, height, width):
+        angle, translations, scale, shear = self.get_params(
+            self.degrees, self.translate, self.scale, self.shear, [width, height]
+        )
+        matrix = F._get_affine_homography(height, width, angle, list(translations), scale, list(shear), self.center)
+        return matrix, [height, width]
+
     def __repr__(self) -> str:
         s = f"{self.__class__.__name__}(degrees={self.degrees}"
         s += f", translate={self.translate}" if self.translate is not None else ""
@@ -1541,6 +1864,7 @@ class RandomAffine(torch.nn.Module):
         s += f", interpolation={self.interpolation.value}" if self.interpolation != InterpolationMode.NEAREST else ""
         s += f", fill={self.fill}" if self.fill != 0 else ""
         s += f", center={self.center}" if self.center is not None else ""
+        s += ", per_sample=True" if self.per_sample else ""
         s += ")"
 
         return s
@@ -1768,13 +2092,15 @@ class GaussianBlur(torch.nn.Module):
             creating kernel to perform blurring. If float, sigma is fixed. If it is tuple
             of float (min, max), sigma is chosen uniformly at random to lie in the
             given range.
+        per_sample (bool): If True and the input is a batch of tensor images of shape [N, C, H, W], sigma is
+            chosen independently for every image and the whole batch is blurred at once. Default is ``False``.
 
     Returns:
         PIL Image or Tensor: Gaussian blurred version of the input image.
 
     """
 
-    def __init__(self, kernel_size, sigma=(0.1, 2.0)):
+    def __init__(self, kernel_size, sigma=(0.1, 2.0), per_sample=False):
         super().__init__()
         _log_api_usage_once(self)
         self.kernel_size = _setup_size(kernel_size, "Kernel size should be a tuple/list of two integers")
@@ -1793,6 +2119,7 @@ class GaussianBlur(torch.nn.Module):
             raise ValueError("sigma should be a single number or a list/tuple with length 2.")
 
         self.sigma = sigma
+        self.per_sample = per_sample
 
     @staticmethod
     def get_params(sigma_min: float, sigma_max: float) -> float:
@@ -1815,14 +2142,79 @@ class GaussianBlur(torch.nn.Module):
         Returns:
             PIL Image or Tensor: Gaussian blurred image
         """
+        if self.per_sample and isinstance(img, Tensor) and img.ndim == 4:
+            sigmas = torch.empty(img.shape[0]).uniform_(self.sigma[0], self.sigma[1])
+            return F._batched_gaussian_blur(img, self.kernel_size, sigmas)
+
         sigma = self.get_params(self.sigma[0], self.sigma[1])
         return F.gaussian_blur(img, self.kernel_size, [sigma, sigma])
 
     def __repr__(self) -> str:
-        s = f"{self.__class__.__name__}(kernel_size={self.kernel_size}, sigma={self.sigma})"
+        s = f"{self.__class__.__name__}(kernel_size={self.kernel_size}, sigma={self.sigma}"
+        s += ", per_sample=True)" if self.per_sample else ")"
         return s
 
 
+_FUSED_INTERPOLATION_MODES = (InterpolationMode.NEAREST, InterpolationMode.BILINEAR)
+
+
+def _get_fusion_fill(fill, channels):
+    if isinstance(fill, (int, float)):
+        return [float(fill)] * channels
+    fill = [float(f) for f in fill]
+    return fill * channels if len(fill) == 1 else fill
+
+
+def _get_random_crop_params(height: int, width: int, output_size: Tuple[int, int]) -> Tuple[int, int, int, int]:
+    # RandomCrop.get_params for an image of the given size
+    th, tw = output_size
+
+    if height + 1 < th or width + 1 < tw:
+        raise ValueError(f"Required crop size {(th, tw)} is larger then input image size {(height, width)}")
+
+    if width == tw and height == th:
+        return 0, 0, height, width
+
+    i = torch.randint(0, height - th + 1, size=(1,)).item()
+    j = torch.randint(0, width - tw + 1, size=(1,)).item()
+    return i, j, th, tw
+
+
+def _get_resized_crop_params(
+    height: int, width: int, scale: List[float], ratio: List[float]
+) -> Tuple[int, int, int, int]:
+    # RandomResizedCrop.get_params for an image of the given size
+    area = height * width
+
+    log_ratio = torch.log(torch.tensor(ratio))
+    for _ in range(10):
+        target_area = area * torch.empty(1).uniform_(scale[0], scale[1]).item()
+        aspect_ratio = torch.exp(torch.empty(1).uniform_(log_ratio[0], log_ratio[1])).item()
+
+        w = int(round(math.sqrt(target_area * aspect_ratio)))
+        h = int(round(math.sqrt(target_area / aspect_ratio)))
+
+        if 0 < w <= width and 0 < h <= height:
+            i = torch.randint(0, height - h + 1, size=(1,)).item()
+            j = torch.randint(0, width - w + 1, size=(1,)).item()
+            return i, j, h, w
+
+    # Fallback to central crop
+    in_ratio = float(width) / float(height)
+    if in_ratio < min(ratio):
+        w = width
+        h = int(round(w / min(ratio)))
+    elif in_ratio > max(ratio):
+        h = height
+        w = int(round(h * max(ratio)))
+    else:  # whole image
+        w = width
+        h = height
+    i = (height - h) // 2
+    j = (width - w) // 2
+    return i, j, h, w
+
+
 def _setup_size(size, error_msg):
     if isinstance(size, numbers.Number):
         return int(size), int(size)